@@ -52,6 +52,7 @@ class DestinationAdmin(admin.ModelAdmin):
     list_per_page = 20
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ('display_order', 'is_featured', 'is_active')
+    readonly_fields = ('starting_price',)
 
     fieldsets = (
         ('Basic Information', {
@@ -66,7 +67,7 @@ class DestinationAdmin(admin.ModelAdmin):
         }),
         ('Pricing', {
             'fields': ('starting_price',),
-            'description': 'Set the starting price for packages to this destination'
+            'description': 'Lowest published package price here or in any sub-destination, kept current automatically'
         }),
         ('SEO', {
             'fields': ('meta_title', 'meta_description'),
@@ -0,0 +1,285 @@
+"""
+Read-only catalog JSON API
+
+GET /adminside/api/catalog/<resource>/ for destinations, packages,
+accommodations and travel modes. Rows are read with one values_list()
+query (no model instances), selected by ``?fields=`` and paged by primary
+key with an opaque ``?cursor=``; list filters are resource specific.
+
+Responses are cached under the catalog content generation (see
+adminside.typeahead), carry a strong ETag of the body and short shared
+cache headers, and answer If-None-Match with 304.
+
+Usage:
+GET /adminside/api/catalog/packages/?fields=id,name,adult_price&destination=3&limit=50
+GET /adminside/api/catalog/packages/?cursor=<next cursor from the last page>
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from adminside import typeahead
+
+CACHE_PREFIX = 'catalog_api'
+
+
+def _subtree(prefix):
+    """Filter on a destination and its descendants"""
+    return lambda value: (
+        Q(**{f'{prefix}_id': value}) |
+        Q(**{f'{prefix}__parent_id': value}) |
+        Q(**{f'{prefix}__parent__parent_id': value})
+    )
+
+
+def _flag(field):
+    return lambda value: Q(**{field: value.lower() in ('1', 'true', 'yes')})
+
+
+def _exact(field):
+    return lambda value: Q(**{field: value})
+
+
+def _as_float(field):
+    return Cast(field, FloatField())
+
+
+def _has_children():
+    from adminside.models import Destination
+    return Exists(Destination.objects.filter(parent=OuterRef('pk'), is_active=True))
+
+
+def _destinations():
+    from adminside.models import Destination
+    return Destination.objects.filter(is_active=True)
+
+
+def _packages():
+    from adminside.models import Package
+    return Package.objects.filter(status=Package.PUBLISHED)
+
+
+def _accommodations():
+    from adminside.models import Accommodation
+    return Accommodation.objects.filter(is_active=True)
+
+
+def _travel_modes():
+    from adminside.models import TravelMode
+    return TravelMode.objects.filter(is_active=True)
+
+
+# Resource -> queryset factory, {field: column or expression factory},
+# default fields, {query parameter: value -> Q}
+RESOURCES = {
+    'destinations': {
+        'queryset': _destinations,
+        'fields': {
+            'id': 'pk',
+            'name': 'name',
+            'slug': 'slug',
+            'type': 'destination_type',
+            'parent': 'parent_id',
+            'has_children': _has_children,
+            'is_featured': 'is_featured',
+            'starting_price': lambda: _as_float('starting_price'),
+            'image_url': 'image',
+            'meta_description': 'meta_description',
+        },
+        'default': ('id', 'name', 'slug', 'type', 'parent', 'has_children'),
+        'filters': {
+            'parent': _exact('parent_id'),
+            'type': _exact('destination_type'),
+            'featured': _flag('is_featured'),
+        },
+    },
+    'packages': {
+        'queryset': _packages,
+        'fields': {
+            'id': 'pk',
+            'name': 'name',
+            'slug': 'slug',
+            'destination': 'main_destination__name',
+            'destination_id': 'main_destination_id',
+            'duration_days': 'duration_days',
+            'duration_nights': 'duration_nights',
+            'adult_price': 'adult_price',
+            'child_price': 'child_price',
+            'rating': lambda: _as_float('rating'),
+            'total_reviews': 'total_reviews',
+            'is_featured': 'is_featured',
+            'image_url': 'featured_image',
+            'published_at': 'published_at',
+        },
+        'default': ('id', 'name', 'slug', 'destination', 'duration_days', 'adult_price', 'image_url'),
+        'filters': {
+            'destination': _subtree('main_destination'),
+            'featured': _flag('is_featured'),
+        },
+    },
+    'accommodations': {
+        'queryset': _accommodations,
+        'fields': {
+            'id': 'pk',
+            'name': 'name',
+            'slug': 'slug',
+            'type': 'accommodation_type',
+            'destination': 'destination__name',
+            'destination_id': 'destination_id',
+            'price_per_room': 'price_per_room_per_night',
+            'max_occupancy_per_room': 'max_occupancy_per_room',
+            'rating': lambda: _as_float('rating'),
+            'total_reviews': 'total_reviews',
+            'is_featured': 'is_featured',
+            'image_url': 'image',
+        },
+        'default': ('id', 'name', 'slug', 'type', 'destination', 'price_per_room', 'rating', 'image_url'),
+        'filters': {
+            'destination': _subtree('destination'),
+            'type': _exact('accommodation_type'),
+            'featured': _flag('is_featured'),
+        },
+    },
+    'travel_modes': {
+        'queryset': _travel_modes,
+        'fields': {
+            'id': 'pk',
+            'name': 'name',
+            'type': 'transport_type',
+            'departure_location': 'departure_location',
+            'arrival_location': 'arrival_location',
+            'departure_time': 'departure_time',
+            'arrival_time': 'arrival_time',
+            'duration_minutes': 'duration_minutes',
+            'price_per_person': 'price_per_person',
+            'child_discount_percentage': 'child_discount_percentage',
+        },
+        'default': ('id', 'name', 'type', 'departure_location', 'arrival_location', 'price_per_person'),
+        'filters': {
+            'type': _exact('transport_type'),
+            'from': _exact('departure_location__iexact'),
+            'to': _exact('arrival_location__iexact'),
+        },
+    },
+}
+
+
+class BadRequest(Exception):
+    """Invalid query parameter; the message is returned to the client"""
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest('Invalid cursor')
+
+
+def _fields(spec, requested):
+    if not requested:
+        return list(spec['default'])
+    names = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+    unknown = [name for name in names if name not in spec['fields']]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(spec['fields'])}")
+    return names
+
+
+def _limit(value):
+    default = getattr(settings, 'CATALOG_API_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'CATALOG_API_MAX_PAGE_SIZE', 100)
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise BadRequest('limit must be a number')
+    return min(max(limit, 1), maximum)
+
+
+def page(resource, params):
+    """
+    One page of ``resource`` as {'results': [...], 'next_cursor': ...}
+
+    ``params`` is the request's query dict. The primary key is always
+    selected (for the cursor) but only returned when asked for.
+    """
+    spec = RESOURCES[resource]
+    names = _fields(spec, params.get('fields'))
+    limit = _limit(params.get('limit'))
+
+    queryset = spec['queryset']()
+    for param, to_q in spec['filters'].items():
+        value = params.get(param)
+        if value:
+            try:
+                queryset = queryset.filter(to_q(value))
+            except (TypeError, ValueError):
+                raise BadRequest(f'Invalid value for {param}')
+    if params.get('cursor'):
+        queryset = queryset.filter(pk__gt=decode_cursor(params['cursor']))
+
+    columns = []
+    for name in names:
+        column = spec['fields'][name]
+        if callable(column):
+            alias = f'api_{name}'
+            queryset = queryset.annotate(**{alias: column()})
+            column = alias
+        columns.append(column)
+
+    rows = list(queryset.order_by('pk').values_list('pk', *columns)[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return {
+        'results': [dict(zip(names, row[1:])) for row in rows[:limit]],
+        'next_cursor': next_cursor,
+    }
+
+
+def _cache_key(resource, params):
+    query = sorted((key, params.get(key)) for key in params)
+    key = repr((resource, query, typeahead.shared_generation()))
+    return f'{CACHE_PREFIX}:{hashlib.sha1(key.encode()).hexdigest()}'
+
+
+@require_GET
+def catalog(request, resource):
+    """
+    List endpoint of the catalog API (see the module docstring)
+    """
+    if resource not in RESOURCES:
+        raise Http404('Unknown catalog resource')
+
+    key = _cache_key(resource, request.GET)
+    cached = cache.get(key)
+    if cached is None:
+        try:
+            body = json.dumps(page(resource, request.GET), cls=DjangoJSONEncoder, separators=(',', ':'))
+        except BadRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        cached = (body, etag)
+        cache.set(key, cached, getattr(settings, 'CATALOG_API_CACHE_SECONDS', 300))
+    body, etag = cached
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'CATALOG_API_MAX_AGE', 60))
+    return response
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class AdminsideConfig(AppConfig):
     name = 'adminside'
+
+    def ready(self):
+        from . import destination_prices, package_cards, placeholders, typeahead
+        package_cards.connect_signals()
+        destination_prices.connect_signals()
+        placeholders.connect_signals()
+        typeahead.connect_signals()
@@ -0,0 +1,151 @@
+"""
+Destination.starting_price rollups
+
+A destination's starting price is the lowest display price (see
+adminside.package_cards) of the published packages whose main destination
+is it or any of its descendants, or None without any. It is stored so
+destination cards need no aggregation per request:
+
+- refresh_destinations recomputes some destinations and walks up their
+  ancestors, one UPDATE per level;
+- rebuild recomputes every destination, deepest level first, with one
+  UPDATE per level.
+
+Each UPDATE sets the lesser of the destination's own packages' minimum and
+its children's starting prices, so a level only reads the level below it.
+Package card refreshes, package status and destination changes, package
+deletions and destination moves call refresh_destinations, and
+``python manage.py rebuild_destination_prices`` runs rebuild.
+
+Usage:
+    destination_prices.refresh_destinations([package.main_destination_id])
+"""
+
+from django.db.models import DecimalField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Least
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from adminside import typeahead
+from .models import Destination, Package
+
+# Hierarchies are country -> city -> place; a loop of parents stops here
+MAX_DEPTH = 8
+
+ROLLUP_FIELDS = {'main_destination', 'main_destination_id', 'status'}
+
+
+def _starting_price():
+    price = DecimalField(max_digits=10, decimal_places=2)
+    own = Subquery(
+        Package.objects.filter(main_destination=OuterRef('pk'), status=Package.PUBLISHED).order_by()
+        .values('main_destination').annotate(price=Min('display_price')).values('price'),
+        output_field=price,
+    )
+    children = Subquery(
+        Destination.objects.filter(parent=OuterRef('pk')).order_by()
+        .values('parent').annotate(price=Min('starting_price')).values('price'),
+        output_field=price,
+    )
+    # LEAST is NULL when either side is NULL outside PostgreSQL
+    return Least(Coalesce(own, children), Coalesce(children, own), output_field=price)
+
+
+def refresh_destinations(destination_ids):
+    """
+    Recompute the starting price of ``destination_ids`` and their ancestors
+
+    A destination listed together with one of its descendants is
+    recomputed again once the descendant's level is done.
+    """
+    level = {pk for pk in destination_ids if pk is not None}
+    if not level:
+        return
+    for _ in range(MAX_DEPTH):
+        Destination.objects.filter(pk__in=level).update(starting_price=_starting_price())
+        level = set(
+            Destination.objects.filter(pk__in=level, parent__isnull=False).values_list('parent_id', flat=True)
+        )
+        if not level:
+            break
+    typeahead.bump_generation()
+
+
+def rebuild():
+    """
+    Recompute the starting price of every destination
+
+    Returns the number of destinations per level, root level first.
+    """
+    parents = dict(Destination.objects.values_list('pk', 'parent_id'))
+    depths = {}
+    for pk in parents:
+        chain = []
+        while pk is not None and pk not in depths and len(chain) < MAX_DEPTH:
+            chain.append(pk)
+            pk = parents.get(pk)
+        depth = depths.get(pk, -1)
+        for node in reversed(chain):
+            depth += 1
+            depths[node] = depth
+
+    levels = [[] for _ in range(max(depths.values(), default=-1) + 1)]
+    for pk, depth in depths.items():
+        levels[depth].append(pk)
+    for level in reversed(levels):
+        Destination.objects.filter(pk__in=level).update(starting_price=_starting_price())
+    typeahead.bump_generation()
+    return [len(level) for level in levels]
+
+
+def _package_saving(sender, instance, raw, update_fields, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance._state.adding or (update_fields is not None and not ROLLUP_FIELDS & set(update_fields)):
+        return
+    instance._rollup_previous = Package.objects.filter(pk=instance.pk).values_list(
+        'main_destination_id', 'status'
+    ).first()
+
+
+def _package_saved(sender, instance, created, raw, update_fields, **kwargs):
+    """post_save receiver for Package: a status or destination change (prices come from package_cards)"""
+    if raw or (update_fields is not None and not ROLLUP_FIELDS & set(update_fields)):
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if (created and instance.status == Package.PUBLISHED) or (
+        previous and previous != (instance.main_destination_id, instance.status)
+    ):
+        refresh_destinations({instance.main_destination_id, previous[0] if previous else None})
+
+
+def _package_deleted(sender, instance, **kwargs):
+    if instance.status == Package.PUBLISHED:
+        refresh_destinations([instance.main_destination_id])
+
+
+def _destination_saving(sender, instance, raw, **kwargs):
+    instance._rollup_parent = None
+    if not raw and not instance._state.adding:
+        instance._rollup_parent = Destination.objects.filter(pk=instance.pk).values_list('parent_id', flat=True).first()
+
+
+def _destination_saved(sender, instance, created, raw, **kwargs):
+    """
+    post_save receiver for Destination: the save may have written a stale
+    starting price, and a move changes both ancestor chains
+    """
+    if not created and not raw:
+        refresh_destinations([instance.pk, getattr(instance, '_rollup_parent', None)])
+
+
+def _destination_deleted(sender, instance, **kwargs):
+    refresh_destinations([instance.parent_id])
+
+
+def connect_signals():
+    """Keep starting prices current (called from AdminsideConfig.ready)"""
+    pre_save.connect(_package_saving, sender=Package, dispatch_uid='destination_prices_pre_save_package')
+    post_save.connect(_package_saved, sender=Package, dispatch_uid='destination_prices_save_package')
+    post_delete.connect(_package_deleted, sender=Package, dispatch_uid='destination_prices_delete_package')
+    pre_save.connect(_destination_saving, sender=Destination, dispatch_uid='destination_prices_pre_save_destination')
+    post_save.connect(_destination_saved, sender=Destination, dispatch_uid='destination_prices_save_destination')
+    post_delete.connect(_destination_deleted, sender=Destination, dispatch_uid='destination_prices_delete_destination')
@@ -0,0 +1,227 @@
+"""
+Faceted filtering for package_list and accommodation_list
+
+A facet is a list of options, each a Q on the listed model: price and
+duration ranges, minimum ratings, or packages offering an accommodation or
+transport type. The filter state is the options selected per facet, carried
+in the query string as repeated parameters
+(?price=1000-2500&price=2500-5000&transport=flight); options of one facet
+are ORed and facets are ANDed.
+
+An option's count is the number of listed rows matching it together with
+the selections of the other facets, so picking an option never zeroes its
+siblings. Every count of a listing comes from one query of conditional
+aggregates (COUNT(...) FILTER (WHERE ...)) over the listed rows. Results
+are cached per listing query and filter signature under the catalog
+content generation (see adminside.typeahead) for FACET_CACHE_SECONDS.
+
+The accommodation and transport types a package offers are precomputed
+into Package.facet_mask (one bit per type), so those options are a bit
+test on the row instead of a subquery over the many-to-many tables per
+option. adminside.package_cards keeps the mask current.
+
+Usage:
+    state = facets.FilterState.from_query(facets.PACKAGE_FACETS, request.GET)
+    counts = facets.count(facets.PACKAGE_FACETS, packages, state)
+    packages = packages.filter(state.q())
+    panel = facets.groups(facets.PACKAGE_FACETS, state, counts, request.GET)
+"""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.lookups import GreaterThan
+
+from adminside import typeahead
+from .models import Accommodation, TravelMode
+
+CACHE_PREFIX = 'facets'
+
+# Bits of Package.facet_mask: accommodation types, then transport types from bit 8
+ACCOMMODATION_BITS = {value: 1 << i for i, (value, _) in enumerate(Accommodation.ACCOMMODATION_TYPES)}
+TRANSPORT_BITS = {value: 1 << (8 + i) for i, (value, _) in enumerate(TravelMode.TRANSPORT_TYPES)}
+
+
+class Facet:
+    """
+    A filterable attribute: query parameter ``key`` and its
+    (value, label, Q) options
+    """
+
+    def __init__(self, key, label, options):
+        self.key = key
+        self.label = label
+        self.options = options
+        self._q = {value: q for value, _, q in options}
+
+    def q(self, values):
+        """Q matching any of ``values``"""
+        combined = Q()
+        for value in values:
+            combined |= self._q[value]
+        return combined
+
+
+class FilterState:
+    """
+    Selected option values per facet key, in facet option order
+    """
+    __slots__ = ('facets', 'selected')
+
+    def __init__(self, facets, selected):
+        self.facets = facets
+        self.selected = selected
+
+    @classmethod
+    def from_query(cls, facets, params):
+        """State of a query dict; unknown values are dropped"""
+        selected = {}
+        for facet in facets:
+            values = set(params.getlist(facet.key))
+            chosen = [value for value, _, _ in facet.options if value in values]
+            if chosen:
+                selected[facet.key] = chosen
+        return cls(facets, selected)
+
+    def __bool__(self):
+        return bool(self.selected)
+
+    def q(self, exclude=None):
+        """Q of the selections, without the facet ``exclude``"""
+        combined = Q()
+        for facet in self.facets:
+            if facet.key != exclude and facet.key in self.selected:
+                combined &= facet.q(self.selected[facet.key])
+        return combined
+
+    def signature(self):
+        """Canonical query string of the selections"""
+        return urlencode([(key, value) for key, values in sorted(self.selected.items()) for value in values])
+
+
+def _range(field, low, high):
+    bounds = {}
+    if low is not None:
+        bounds[f'{field}__gte'] = low
+    if high is not None:
+        bounds[f'{field}__lt'] = high
+    return Q(**bounds)
+
+
+def _has_bit(bit):
+    return Q(GreaterThan(F('facet_mask').bitand(bit), 0))
+
+
+def _rating_facet():
+    return Facet('rating', 'Rating', [
+        ('4.5', '4.5 & up', Q(rating__gte=4.5)),
+        ('4', '4 & up', Q(rating__gte=4)),
+        ('3', '3 & up', Q(rating__gte=3)),
+    ])
+
+
+PACKAGE_FACETS = (
+    Facet('price', 'Price per adult', [
+        ('under-1000', 'Under $1,000', _range('adult_price', None, 1000)),
+        ('1000-2500', '$1,000 – $2,500', _range('adult_price', 1000, 2500)),
+        ('2500-5000', '$2,500 – $5,000', _range('adult_price', 2500, 5000)),
+        ('5000-plus', '$5,000 & up', _range('adult_price', 5000, None)),
+    ]),
+    Facet('duration', 'Duration', [
+        ('1-3', '1 – 3 days', _range('duration_days', None, 4)),
+        ('4-7', '4 – 7 days', _range('duration_days', 4, 8)),
+        ('8-14', '8 – 14 days', _range('duration_days', 8, 15)),
+        ('15-plus', '15 days & up', _range('duration_days', 15, None)),
+    ]),
+    Facet('accommodation', 'Accommodation', [
+        (value, label, _has_bit(ACCOMMODATION_BITS[value])) for value, label in Accommodation.ACCOMMODATION_TYPES
+    ]),
+    _rating_facet(),
+    Facet('transport', 'Transport', [
+        (value, label, _has_bit(TRANSPORT_BITS[value])) for value, label in TravelMode.TRANSPORT_TYPES
+    ]),
+)
+
+ACCOMMODATION_FACETS = (
+    Facet('type', 'Accommodation type', [
+        (value, label, Q(accommodation_type=value)) for value, label in Accommodation.ACCOMMODATION_TYPES
+    ]),
+    Facet('price', 'Price per night', [
+        ('under-150', 'Under $150', _range('price_per_room_per_night', None, 150)),
+        ('150-300', '$150 – $300', _range('price_per_room_per_night', 150, 300)),
+        ('300-500', '$300 – $500', _range('price_per_room_per_night', 300, 500)),
+        ('500-plus', '$500 & up', _range('price_per_room_per_night', 500, None)),
+    ]),
+    _rating_facet(),
+)
+
+
+def _cache_key(queryset, state):
+    key = repr((str(queryset.query), state.signature(), typeahead.shared_generation()))
+    return f'{CACHE_PREFIX}:{hashlib.sha1(key.encode()).hexdigest()}'
+
+
+def count(facets, queryset, state):
+    """
+    Counts of a listing in one query:
+    {'all': rows, 'total': rows matching ``state``, 'options': {facet key: {value: rows}}}
+    """
+    key = _cache_key(queryset, state)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    aggregates = {'all': Count('pk'), 'total': Count('pk', filter=state.q())}
+    for f, facet in enumerate(facets):
+        others = state.q(exclude=facet.key)
+        for o, (_, _, q) in enumerate(facet.options):
+            aggregates[f'facet_{f}_{o}'] = Count('pk', filter=others & q)
+    row = queryset.order_by().aggregate(**aggregates)
+
+    counts = {
+        'all': row['all'],
+        'total': row['total'],
+        'options': {
+            facet.key: {value: row[f'facet_{f}_{o}'] for o, (value, _, _) in enumerate(facet.options)}
+            for f, facet in enumerate(facets)
+        },
+    }
+    cache.set(key, counts, getattr(settings, 'FACET_CACHE_SECONDS', 300))
+    return counts
+
+
+def groups(facets, state, counts, params):
+    """
+    Template rows of the facet panel: per facet its options with their
+    count, whether selected and the query string toggling them (other
+    parameters kept, page reset)
+    """
+    rows = []
+    for facet in facets:
+        selected = state.selected.get(facet.key, [])
+        options = []
+        for value, label, _ in facet.options:
+            query = params.copy()
+            query.pop('page', None)
+            values = [v for v in selected if v != value] if value in selected else selected + [value]
+            query.setlist(facet.key, values)
+            options.append({
+                'value': value,
+                'label': label,
+                'count': counts['options'][facet.key][value],
+                'selected': value in selected,
+                'query': query.urlencode(),
+            })
+        rows.append({'key': facet.key, 'label': facet.label, 'options': options})
+    return rows
+
+
+def filter_query(params):
+    """Query string of a listing's filters and search, without the page number"""
+    query = params.copy()
+    query.pop('page', None)
+    return query.urlencode()
+
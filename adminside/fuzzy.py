@@ -0,0 +1,150 @@
+"""
+Typo-tolerant name lookup for destinations and packages
+
+On PostgreSQL names are matched with pg_trgm's word similarity: the
+``%>`` operator (``trigram_word_similar``) is answered by the GIN trigram
+indexes from migration 0010, and matches are ranked by
+TrigramWordSimilarity. Other databases (SQLite in development) use a
+per-process TrigramIndex built the same way pg_trgm splits words, with an
+inverted trigram -> rows index so only rows sharing a trigram with the
+query are scored. It is rebuilt when the catalog content generation moves
+(see adminside.typeahead).
+
+Usage:
+fuzzy.search('destinations', 'Amboselli')  # [(pk, 'Amboseli', 0.8), ...]
+fuzzy.suggest('Capetown')                   # ['Cape Town']
+"""
+
+import threading
+
+from django.db import connection
+
+from adminside import typeahead
+
+# pg_trgm's default pg_trgm.word_similarity_threshold
+WORD_SIMILARITY_THRESHOLD = 0.6
+MIN_QUERY_LENGTH = 3
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _active_destinations():
+    from adminside.models import Destination
+    return Destination.objects.filter(is_active=True)
+
+
+def _published_packages():
+    from adminside.models import Package
+    return Package.objects.filter(status=Package.PUBLISHED)
+
+
+# Kind -> queryset factory of the rows searched by name
+KINDS = {
+    'destinations': _active_destinations,
+    'packages': _published_packages,
+}
+
+
+def trigrams(text):
+    """
+    pg_trgm's trigrams of ``text``: every word padded with two spaces in
+    front and one behind
+
+    Usage:
+    trigrams('Mara')  # {'  m', ' ma', 'mar', 'ara', 'ra '}
+    """
+    grams = set()
+    for word in typeahead.fold(text).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted trigram index over (pk, name) rows"""
+
+    def __init__(self, rows):
+        self.names = {}
+        self.sizes = {}
+        self.postings = {}
+        for pk, name in rows:
+            grams = trigrams(name)
+            self.names[pk] = name
+            self.sizes[pk] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(pk)
+
+    def search(self, query, limit, threshold=WORD_SIMILARITY_THRESHOLD):
+        """
+        Rows whose name contains most of the query's trigrams, best first
+
+        The score is the share of query trigrams found in the name (close to
+        pg_trgm's word_similarity); ties go to the name with the higher
+        whole-string similarity.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for pk in self.postings.get(gram, ()):
+                shared[pk] = shared.get(pk, 0) + 1
+
+        matches = []
+        for pk, count in shared.items():
+            score = count / len(grams)
+            if score >= threshold:
+                similarity = count / (len(grams) + self.sizes[pk] - count)
+                matches.append((-score, -similarity, self.names[pk], pk))
+        matches.sort()
+        return [(pk, name, -score) for score, _, name, pk in matches[:limit]]
+
+
+def _index(kind):
+    """The fallback index of ``kind``, rebuilt after catalog changes"""
+    generation = typeahead.current_generation()
+    built = _indexes.get(kind)
+    if built is None or built[0] != generation:
+        with _lock:
+            built = _indexes.get(kind)
+            if built is None or built[0] != generation:
+                built = (generation, TrigramIndex(KINDS[kind]().values_list('pk', 'name').iterator()))
+                _indexes[kind] = built
+    return built[1]
+
+
+def search(kind, query, limit=50):
+    """
+    Up to ``limit`` (pk, name, score) rows of ``kind`` whose name is close
+    to ``query``, best first
+    """
+    query = (query or '').strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return list(
+            KINDS[kind]()
+            .filter(name__trigram_word_similar=query)
+            .annotate(similarity=TrigramWordSimilarity(query, 'name'))
+            .order_by('-similarity', 'name')
+            .values_list('pk', 'name', 'similarity')[:limit]
+        )
+    return _index(kind).search(query, limit)
+
+
+def suggest(query, limit=3):
+    """
+    Did-you-mean: the closest destination and package names to ``query``
+    """
+    matches = search('destinations', query, limit) + search('packages', query, limit)
+    matches.sort(key=lambda match: -match[2])
+    names = []
+    for _, name, _ in matches:
+        if name not in names:
+            names.append(name)
+    return names[:limit]
@@ -0,0 +1,78 @@
+"""
+Responsive image URLs built with Uploadcare CDN transformations
+
+Every preset lists the widths to offer in ``srcset`` and the ``sizes``
+hint for the browser. Each variant is the original CDN URL (including any
+crop the editor applied) followed by ``-/resize/<w>x/``, ``-/format/auto/``
+and ``-/quality/smart/``, so phones download a small WebP/AVIF instead of
+the full-resolution upload. Computed URLs are memoized per (CDN URL,
+preset) in an LRU because the same images render on every page view.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+
+DEFAULT_PRESETS = {
+    # 4:4 destination/accommodation/blog cards in 1-4 column grids
+    'card': {
+        'widths': (320, 480, 640, 800),
+        'src_width': 640,
+        'sizes': '(max-width: 576px) 100vw, (max-width: 992px) 50vw, 25vw',
+    },
+    # Full-bleed hero slides and page banners
+    'hero': {
+        'widths': (640, 960, 1280, 1600, 2048),
+        'src_width': 1280,
+        'sizes': '100vw',
+    },
+    # Small list and cart thumbnails
+    'thumbnail': {
+        'widths': (80, 160, 240),
+        'src_width': 160,
+        'sizes': '80px',
+    },
+}
+
+ResponsiveImage = namedtuple('ResponsiveImage', ['src', 'srcset', 'sizes'])
+
+
+def get_presets():
+    """Presets from RESPONSIVE_IMAGE_PRESETS, defaulting to DEFAULT_PRESETS"""
+    return getattr(settings, 'RESPONSIVE_IMAGE_PRESETS', DEFAULT_PRESETS)
+
+
+def get_preset(name):
+    """Return the named preset or raise ValueError"""
+    try:
+        return get_presets()[name]
+    except KeyError:
+        raise ValueError(f"Unknown responsive image preset: {name}")
+
+
+def transformed_url(cdn_url, width):
+    """
+    Uploadcare URL resized to ``width`` with automatic format and quality
+    """
+    base = cdn_url if cdn_url.endswith('/') else f'{cdn_url}/'
+    return f'{base}-/resize/{width}x/-/format/auto/-/quality/smart/'
+
+
+@lru_cache(maxsize=4096)
+def build(cdn_url, preset_name):
+    """
+    Return the ResponsiveImage (src, srcset, sizes) for an Uploadcare URL
+    """
+    preset = get_preset(preset_name)
+    srcset = ', '.join(f'{transformed_url(cdn_url, width)} {width}w' for width in preset['widths'])
+    return ResponsiveImage(
+        src=transformed_url(cdn_url, preset['src_width']),
+        srcset=srcset,
+        sizes=preset['sizes'],
+    )
+
+
+def clear_cache():
+    """Forget memoized URLs (after presets change)"""
+    build.cache_clear()
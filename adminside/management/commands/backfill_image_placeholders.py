@@ -0,0 +1,46 @@
+"""
+Compute blurred LQIP placeholders for catalog images that have none yet
+
+Usage:
+    python manage.py backfill_image_placeholders
+    python manage.py backfill_image_placeholders --workers 16 --force
+    python manage.py backfill_image_placeholders --model adminside.Package
+    python manage.py backfill_image_placeholders --cdn-url http://localhost:8080/
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from adminside.placeholders import PLACEHOLDER_FIELDS, backfill
+
+
+class Command(BaseCommand):
+    help = 'Fetch tiny renditions of Uploadcare images and store them as inline placeholders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent CDN fetches (default: 8)')
+        parser.add_argument('--force', action='store_true', help='Recompute placeholders that are up to date')
+        parser.add_argument(
+            '--model', action='append', dest='models', choices=sorted(PLACEHOLDER_FIELDS),
+            help='Only this model (repeatable)'
+        )
+        parser.add_argument('--cdn-url', help='Fetch from this host instead of https://ucarecdn.com/')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        if options['cdn_url']:
+            settings.LQIP_CDN_URL = options['cdn_url']
+
+        self.stdout.write('Computing image placeholders...')
+        results = backfill(
+            options['models'],
+            max_workers=options['workers'],
+            force=options['force'],
+            stdout=self.stdout,
+        )
+
+        updated = sum(counts[0] for counts in results.values())
+        failed = sum(counts[1] for counts in results.values())
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f'✅ {updated} placeholders stored, {failed} failed'))
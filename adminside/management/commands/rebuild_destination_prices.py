@@ -0,0 +1,22 @@
+"""
+Recompute every destination's starting price from the published packages
+of the destination and its descendants, one UPDATE per hierarchy level
+
+Usage:
+    python manage.py rebuild_destination_prices
+"""
+
+from django.core.management.base import BaseCommand
+
+from adminside.destination_prices import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute Destination.starting_price across the destination hierarchy'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding destination starting prices...')
+        levels = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {sum(levels)} destinations updated in {len(levels)} levels ({" / ".join(map(str, levels))})'
+        ))
@@ -0,0 +1,33 @@
+"""
+Recompute the denormalized card fields of every package (display price,
+cheapest accommodation, primary transport and facet mask)
+
+Usage:
+    python manage.py refresh_package_cards
+    python manage.py refresh_package_cards --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminside.models import Package
+from adminside.package_cards import refresh_packages
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized package card fields from the accommodations and travel modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Packages per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.stdout.write('Recomputing package cards...')
+        package_ids = list(Package.objects.order_by('pk').values_list('pk', flat=True))
+        changed = 0
+        for start in range(0, len(package_ids), batch_size):
+            changed += refresh_packages(package_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {changed} of {len(package_ids)} packages updated'))
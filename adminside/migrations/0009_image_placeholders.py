@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminside', '0008_alter_heroslider_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accommodation',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Inline blurred placeholder (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='accommodation',
+            name='image_lqip_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='destination',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Inline blurred placeholder (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='destination',
+            name='image_lqip_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='heroslider',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Inline blurred placeholder (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='heroslider',
+            name='image_lqip_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='featured_image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Inline blurred placeholder (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='featured_image_lqip_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+pg_trgm GIN indexes on the names searched by adminside.fuzzy
+
+PostgreSQL only: other databases use the in-process fallback index, and
+the indexes are not part of the model state so SQLite schemas stay valid.
+"""
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ('adminside_destination_name_trgm', 'adminside_destination'),
+    ('adminside_package_name_trgm', 'adminside_package'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} USING gin (name gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminside', '0009_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
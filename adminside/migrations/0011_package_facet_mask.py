@@ -0,0 +1,42 @@
+"""
+Package.facet_mask: the accommodation and transport types a package offers,
+as the bits used by adminside.facets
+"""
+
+from django.db import migrations, models
+
+# Type values in bit order, as in Accommodation.ACCOMMODATION_TYPES and TravelMode.TRANSPORT_TYPES
+ACCOMMODATION_TYPES = ['hotel', 'lodge', 'resort', 'guesthouse', 'airbnb']
+TRANSPORT_TYPES = ['flight', 'train', 'bus', 'car', 'boat', 'cruiser']
+
+
+def populate_masks(apps, schema_editor):
+    Package = apps.get_model('adminside', 'Package')
+    masks = {}
+    accommodation_links = Package.available_accommodations.through.objects.filter(accommodation__is_active=True)
+    for package_id, kind in accommodation_links.values_list('package_id', 'accommodation__accommodation_type').distinct():
+        if kind in ACCOMMODATION_TYPES:
+            masks[package_id] = masks.get(package_id, 0) | 1 << ACCOMMODATION_TYPES.index(kind)
+    travel_links = Package.available_travel_modes.through.objects.filter(travelmode__is_active=True)
+    for package_id, kind in travel_links.values_list('package_id', 'travelmode__transport_type').distinct():
+        if kind in TRANSPORT_TYPES:
+            masks[package_id] = masks.get(package_id, 0) | 1 << (8 + TRANSPORT_TYPES.index(kind))
+    Package.objects.bulk_update(
+        [Package(pk=pk, facet_mask=mask) for pk, mask in masks.items()], ['facet_mask'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminside', '0010_trigram_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='package',
+            name='facet_mask',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_masks, migrations.RunPython.noop),
+    ]
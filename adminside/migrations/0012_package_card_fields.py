@@ -0,0 +1,73 @@
+"""
+Denormalized package card fields (see adminside.package_cards): the "from"
+price, the cheapest accommodation and the primary transport type
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_cards(apps, schema_editor):
+    Package = apps.get_model('adminside', 'Package')
+    cards = {pk: [adult_price, None, ''] for pk, adult_price in Package.objects.values_list('pk', 'adult_price')}
+    cheapest = {}
+    accommodation_links = Package.available_accommodations.through.objects.filter(accommodation__is_active=True)
+    for package_id, accommodation_id, price in accommodation_links.values_list(
+        'package_id', 'accommodation_id', 'accommodation__price_per_room_per_night'
+    ):
+        if package_id not in cheapest or (price, accommodation_id) < cheapest[package_id]:
+            cheapest[package_id] = (price, accommodation_id)
+    for package_id, (price, accommodation_id) in cheapest.items():
+        cards[package_id][0] += price
+        cards[package_id][1] = accommodation_id
+    travel_links = Package.available_travel_modes.through.objects.filter(travelmode__is_active=True).order_by(
+        'travelmode__transport_type', 'travelmode__departure_time', 'travelmode_id'
+    )
+    for package_id, kind in travel_links.values_list('package_id', 'travelmode__transport_type'):
+        if not cards[package_id][2]:
+            cards[package_id][2] = kind
+    Package.objects.bulk_update(
+        [
+            Package(pk=pk, display_price=price, cheapest_accommodation_id=accommodation_id, primary_transport_type=kind)
+            for pk, (price, accommodation_id, kind) in cards.items()
+        ],
+        ['display_price', 'cheapest_accommodation', 'primary_transport_type'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminside', '0011_package_facet_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='package',
+            name='display_price',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Adult price plus the cheapest accommodation's nightly rate"
+            ),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='cheapest_accommodation',
+            field=models.ForeignKey(
+                blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='adminside.accommodation'
+            ),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='primary_transport_type',
+            field=models.CharField(
+                blank=True, choices=[
+                    ('flight', 'Flight'), ('train', 'Train'), ('bus', 'Bus'),
+                    ('car', 'Car/Private Vehicle'), ('boat', 'Boat/Ferry'), ('cruiser', 'Cruiser'),
+                ],
+                default='', editable=False, max_length=20
+            ),
+        ),
+        migrations.RunPython(populate_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+"""
+Destination.starting_price becomes the lowest published package display
+price of the destination and its descendants (see adminside.destination_prices);
+hand-entered prices are replaced
+"""
+
+from django.db import migrations, models
+from django.db.models import DecimalField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Least
+
+
+def rebuild_starting_prices(apps, schema_editor):
+    Destination = apps.get_model('adminside', 'Destination')
+    Package = apps.get_model('adminside', 'Package')
+    price = DecimalField(max_digits=10, decimal_places=2)
+    own = Subquery(
+        Package.objects.filter(main_destination=OuterRef('pk'), status='published').order_by()
+        .values('main_destination').annotate(price=Min('display_price')).values('price'),
+        output_field=price,
+    )
+    children = Subquery(
+        Destination.objects.filter(parent=OuterRef('pk')).order_by()
+        .values('parent').annotate(price=Min('starting_price')).values('price'),
+        output_field=price,
+    )
+    starting_price = Least(Coalesce(own, children), Coalesce(children, own), output_field=price)
+
+    # Deepest level first: places, then cities, then countries
+    parents = dict(Destination.objects.values_list('pk', 'parent_id'))
+    depths = {}
+    for pk in parents:
+        depth, node = 0, parents[pk]
+        while node is not None and depth < 8:
+            depth, node = depth + 1, parents.get(node)
+        depths.setdefault(depth, []).append(pk)
+    for depth in sorted(depths, reverse=True):
+        Destination.objects.filter(pk__in=depths[depth]).update(starting_price=starting_price)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminside', '0012_package_card_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='destination',
+            name='starting_price',
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True,
+                help_text='Lowest published package price here or in any sub-destination (in USD), '
+                          'kept current by adminside.destination_prices'
+            ),
+        ),
+        migrations.RunPython(rebuild_starting_prices, migrations.RunPython.noop),
+    ]
@@ -27,6 +27,8 @@ class Destination(models.Model):
     destination_type = models.CharField(max_length=10, choices=DESTINATION_TYPES)
     description = CKEditor5Field(config_name='default', help_text="Detailed destination description with rich text formatting")
     image = ImageField(blank=True, null=True, manual_crop="4:4")
+    image_lqip = models.TextField(blank=True, default='', editable=False, help_text="Inline blurred placeholder (data URI)")
+    image_lqip_source = models.CharField(max_length=500, blank=True, default='', editable=False)
     
     # Hierarchical relationship
     parent = models.ForeignKey(
@@ -47,7 +49,7 @@ class Destination(models.Model):
         decimal_places=2,
         null=True,
         blank=True,
-        help_text="Starting price for packages to this destination (in USD)"
+        help_text="Lowest published package price here or in any sub-destination (in USD), kept current by adminside.destination_prices"
     )
 
     # Display order and featured status
@@ -164,6 +166,8 @@ class Accommodation(models.Model):
     
     # Media
     image = ImageField(blank=False, null=False, manual_crop="4:4")
+    image_lqip = models.TextField(blank=True, default='', editable=False, help_text="Inline blurred placeholder (data URI)")
+    image_lqip_source = models.CharField(max_length=500, blank=True, default='', editable=False)
     
     # Features and amenities
     amenities = models.TextField(help_text="Comma-separated list of amenities")
@@ -288,6 +292,12 @@ class Package(models.Model):
         (PUBLISHED, 'Published'),
         (ARCHIVED, 'Archived'),
     ]
+
+    # Card labels of the primary transport; other types have always read "Bus"
+    TRAVEL_LABELS = {
+        TravelMode.TRAIN: "Train",
+        TravelMode.FLIGHT: "Flight",
+    }
     
     # Basic information
     name = models.CharField(max_length=200)
@@ -317,6 +327,8 @@ class Package(models.Model):
     
     # Media
     featured_image = ImageField(blank=False, null=False, manual_crop="4:4")
+    featured_image_lqip = models.TextField(blank=True, default='', editable=False, help_text="Inline blurred placeholder (data URI)")
+    featured_image_lqip_source = models.CharField(max_length=500, blank=True, default='', editable=False)
     
     # Accommodation and travel options
     available_accommodations = models.ManyToManyField(
@@ -329,6 +341,19 @@ class Package(models.Model):
         related_name='packages',
         blank=True
     )
+
+    # Card data derived from the options above, maintained by adminside.package_cards
+    display_price = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Adult price plus the cheapest accommodation's nightly rate"
+    )
+    cheapest_accommodation = models.ForeignKey(
+        Accommodation, null=True, blank=True, on_delete=models.SET_NULL, related_name='+', editable=False
+    )
+    primary_transport_type = models.CharField(
+        max_length=20, choices=TravelMode.TRANSPORT_TYPES, blank=True, default='', editable=False
+    )
+    # Accommodation and transport types offered, as adminside.facets bits
+    facet_mask = models.PositiveIntegerField(default=0, editable=False)
     
     # Bookings - handled through PackageBooking model
     
@@ -372,6 +397,13 @@ class Package(models.Model):
     def get_absolute_url(self):
         return reverse('package_detail', kwargs={'slug': self.slug})
 
+    @property
+    def travel_label(self):
+        """Transport shown on package cards"""
+        if not self.primary_transport_type:
+            return "N/A"
+        return self.TRAVEL_LABELS.get(self.primary_transport_type, "Bus")
+
     @property
     def is_published(self):
         return self.status == self.PUBLISHED
@@ -530,6 +562,8 @@ class HeroSlider(models.Model):
         manual_crop="2048x1080",
         help_text="Hero slider image (recommended size: 2048x1080px for optimal quality)"
     )
+    image_lqip = models.TextField(blank=True, default='', editable=False, help_text="Inline blurred placeholder (data URI)")
+    image_lqip_source = models.CharField(max_length=500, blank=True, default='', editable=False)
     is_active = models.BooleanField(
         default=True,
         help_text="Enable/disable this slide"
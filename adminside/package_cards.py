@@ -0,0 +1,137 @@
+"""
+Denormalized package card data
+
+Package cards show a "from" price (adult price plus the cheapest active
+accommodation's nightly rate) and the package's transport, and the
+faceted listings test the accommodation and transport types offered
+(see adminside.facets). Deriving them per listing means reading both
+many-to-many relations for every card, so they are stored on Package:
+
+- display_price and cheapest_accommodation
+- primary_transport_type: the first active travel mode in TravelMode's
+  default ordering
+- facet_mask: the adminside.facets type bits
+
+refresh_packages recomputes them from the relations and writes the rows
+that changed, then refreshes the starting prices of the destinations whose
+packages were repriced (adminside.destination_prices). Signals call it
+when a package is saved, when its relations change and when a linked
+accommodation or travel mode is saved or deleted; bulk inserts
+(generate_scale_data, data syncs) call it directly, and
+``python manage.py refresh_package_cards`` recomputes every package.
+
+Usage:
+    package_cards.refresh_packages([package.pk])
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from adminside import destination_prices, typeahead
+from .facets import ACCOMMODATION_BITS, TRANSPORT_BITS
+from .models import Accommodation, Package, TravelMode
+
+CARD_FIELDS = ['display_price', 'cheapest_accommodation', 'primary_transport_type', 'facet_mask']
+
+
+def refresh_packages(package_ids=None):
+    """
+    Recompute the card fields of ``package_ids`` (every package when None)
+
+    Returns the number of packages that changed.
+    """
+    packages = Package.objects.all()
+    accommodation_links = Package.available_accommodations.through.objects.filter(accommodation__is_active=True)
+    travel_links = Package.available_travel_modes.through.objects.filter(travelmode__is_active=True)
+    if package_ids is not None:
+        package_ids = list(package_ids)
+        packages = packages.filter(pk__in=package_ids)
+        accommodation_links = accommodation_links.filter(package_id__in=package_ids)
+        travel_links = travel_links.filter(package_id__in=package_ids)
+
+    current = {
+        row[0]: row[1:] for row in packages.values_list(
+            'pk', 'main_destination_id', 'adult_price', 'display_price', 'cheapest_accommodation_id', 'primary_transport_type', 'facet_mask'
+        )
+    }
+    masks = dict.fromkeys(current, 0)
+    cheapest = {}
+    transports = {}
+    for package_id, accommodation_id, kind, price in accommodation_links.values_list(
+        'package_id', 'accommodation_id', 'accommodation__accommodation_type', 'accommodation__price_per_room_per_night'
+    ):
+        masks[package_id] |= ACCOMMODATION_BITS.get(kind, 0)
+        if package_id not in cheapest or (price, accommodation_id) < cheapest[package_id]:
+            cheapest[package_id] = (price, accommodation_id)
+    # TravelMode's default ordering, which the cards used to read with .first()
+    for package_id, kind in travel_links.values_list('package_id', 'travelmode__transport_type').order_by(
+        'travelmode__transport_type', 'travelmode__departure_time', 'travelmode_id'
+    ):
+        masks[package_id] |= TRANSPORT_BITS.get(kind, 0)
+        transports.setdefault(package_id, kind)
+
+    changed = []
+    repriced_destinations = set()
+    for pk, (destination_id, adult_price, *stored) in current.items():
+        price, accommodation_id = cheapest.get(pk, (0, None))
+        values = {
+            'display_price': adult_price + price,
+            'cheapest_accommodation_id': accommodation_id,
+            'primary_transport_type': transports.get(pk, ''),
+            'facet_mask': masks[pk],
+        }
+        if list(values.values()) != stored:
+            changed.append(Package(pk=pk, **values))
+            if values['display_price'] != stored[0]:
+                repriced_destinations.add(destination_id)
+    if changed:
+        Package.objects.bulk_update(changed, CARD_FIELDS, batch_size=1000)
+        typeahead.bump_generation()
+        destination_prices.refresh_destinations(repriced_destinations)
+    return len(changed)
+
+
+def _package_saved(sender, instance, raw, update_fields, **kwargs):
+    """post_save receiver for Package: the adult price may have changed"""
+    if raw or (update_fields is not None and 'adult_price' not in update_fields):
+        return
+    refresh_packages([instance.pk])
+
+
+def _relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """m2m_changed receiver for Package.available_accommodations/available_travel_modes"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_packages([instance.pk])
+    elif action == 'pre_clear':
+        instance._card_package_ids = list(instance.packages.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_packages(getattr(instance, '_card_package_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_packages(pk_set)
+
+
+def _option_saved(sender, instance, created, raw, **kwargs):
+    """post_save receiver for Accommodation and TravelMode: the type, price or status may have changed"""
+    if not created and not raw:
+        refresh_packages(instance.packages.values_list('pk', flat=True))
+
+
+def _option_deleting(sender, instance, **kwargs):
+    instance._card_package_ids = list(instance.packages.values_list('pk', flat=True))
+
+
+def _option_deleted(sender, instance, **kwargs):
+    refresh_packages(getattr(instance, '_card_package_ids', []))
+
+
+def connect_signals():
+    """Keep the card fields current (called from AdminsideConfig.ready)"""
+    post_save.connect(_package_saved, sender=Package, dispatch_uid='package_cards_save_package')
+    for field, model in (('available_accommodations', Accommodation), ('available_travel_modes', TravelMode)):
+        label = model._meta.label_lower
+        m2m_changed.connect(
+            _relations_changed, sender=getattr(Package, field).through, dispatch_uid=f'package_cards_m2m_{label}'
+        )
+        post_save.connect(_option_saved, sender=model, dispatch_uid=f'package_cards_save_{label}')
+        pre_delete.connect(_option_deleting, sender=model, dispatch_uid=f'package_cards_pre_delete_{label}')
+        post_delete.connect(_option_deleted, sender=model, dispatch_uid=f'package_cards_delete_{label}')
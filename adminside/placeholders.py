@@ -0,0 +1,207 @@
+"""
+Low-quality image placeholders (LQIP) for catalog images
+
+For every image in PLACEHOLDER_FIELDS a ~16px wide, blurred JPEG is
+fetched from the Uploadcare CDN and stored on the row as a base64 data URI
+(a few hundred bytes). Templates inline it as the background of the real
+image, so cards and heroes show the image's colours instead of a blank box
+while the full image loads.
+
+Placeholders are recomputed in a django-q task whenever the image changes
+(the CDN URL they were made from is kept next to them). The backfill
+fetches concurrently from a bounded thread pool; LQIP_CDN_URL points it at
+a local HTTP stand-in for the CDN in development and tests.
+"""
+
+import base64
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_save
+
+logger = logging.getLogger(__name__)
+
+# model label -> image field; placeholders live in <field>_lqip / <field>_lqip_source
+PLACEHOLDER_FIELDS = {
+    'adminside.Destination': 'image',
+    'adminside.Accommodation': 'image',
+    'adminside.Package': 'featured_image',
+    'adminside.HeroSlider': 'image',
+    'blog.Post': 'image',
+}
+
+UPLOADCARE_CDN_URL = 'https://ucarecdn.com/'
+LQIP_WIDTH = 16
+FETCH_WIDTH = 32
+BULK_UPDATE_SIZE = 200
+
+
+def lqip_fields(field_name):
+    """Names of the (placeholder, source URL) columns of an image field"""
+    return f'{field_name}_lqip', f'{field_name}_lqip_source'
+
+
+def cdn_url_of(image):
+    """CDN URL of an Uploadcare image value ('' when empty)"""
+    if not image:
+        return ''
+    return getattr(image, 'cdn_url', None) or str(image)
+
+
+def fetch_url(cdn_url):
+    """
+    URL of a tiny JPEG rendition of ``cdn_url``
+
+    With LQIP_CDN_URL set, the Uploadcare host is swapped for it so the
+    fetch can be served by a local stand-in.
+    """
+    base = cdn_url if cdn_url.endswith('/') else f'{cdn_url}/'
+    stand_in = getattr(settings, 'LQIP_CDN_URL', '')
+    if stand_in and base.startswith(UPLOADCARE_CDN_URL):
+        base = stand_in.rstrip('/') + '/' + base[len(UPLOADCARE_CDN_URL):]
+    return f'{base}-/resize/{FETCH_WIDTH}x/-/format/jpeg/-/quality/lightest/'
+
+
+def encode_lqip(image_bytes):
+    """Downscale, blur and encode image bytes as a base64 JPEG data URI"""
+    from PIL import Image, ImageFilter
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = image.convert('RGB')
+        height = max(1, round(image.height * LQIP_WIDTH / image.width))
+        image = image.resize((LQIP_WIDTH, height), Image.LANCZOS).filter(ImageFilter.GaussianBlur(0.6))
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=40, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(output.getvalue()).decode('ascii')
+
+
+def compute_lqip(cdn_url, session=None, timeout=None):
+    """
+    Fetch the tiny rendition of ``cdn_url`` and return its data URI
+    """
+    import requests
+
+    timeout = timeout or getattr(settings, 'LQIP_FETCH_TIMEOUT', 10)
+    response = (session or requests).get(fetch_url(cdn_url), timeout=timeout)
+    response.raise_for_status()
+    return encode_lqip(response.content)
+
+
+def needs_placeholder(instance, field_name):
+    """True when the image changed since its placeholder was computed"""
+    lqip_field, source_field = lqip_fields(field_name)
+    return cdn_url_of(getattr(instance, field_name)) != getattr(instance, source_field)
+
+
+def update_placeholder(model_label, pk):
+    """
+    Recompute and store the placeholder of one row (django-q task body)
+
+    Uses queryset.update() so updated_at and the save signals are left alone.
+    """
+    model = apps.get_model(model_label)
+    field_name = PLACEHOLDER_FIELDS[model_label]
+    lqip_field, source_field = lqip_fields(field_name)
+
+    instance = model.objects.filter(pk=pk).only('pk', field_name).first()
+    if instance is None:
+        return False
+
+    cdn_url = cdn_url_of(getattr(instance, field_name))
+    lqip = compute_lqip(cdn_url) if cdn_url else ''
+    model.objects.filter(pk=pk).update(**{lqip_field: lqip, source_field: cdn_url})
+    return True
+
+
+def queue_placeholder(sender, instance, **kwargs):
+    """post_save receiver queueing a placeholder refresh when the image changed"""
+    model_label = sender._meta.label
+    if not needs_placeholder(instance, PLACEHOLDER_FIELDS[model_label]):
+        return
+
+    try:
+        from django_q.tasks import async_task
+
+        async_task(
+            'adminside.tasks.compute_image_placeholder_async',
+            model_label,
+            instance.pk,
+            task_name=f'lqip_{sender._meta.model_name}_{instance.pk}',
+            timeout=30,
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue image placeholder for {model_label} {instance.pk}: {e}")
+
+
+def connect_signals():
+    """Connect queue_placeholder for every model with a placeholder"""
+    for model_label in PLACEHOLDER_FIELDS:
+        post_save.connect(
+            queue_placeholder,
+            sender=apps.get_model(model_label),
+            dispatch_uid=f'lqip_{model_label}',
+        )
+
+
+def backfill(model_labels=None, max_workers=8, force=False, session=None, stdout=None):
+    """
+    Compute missing (or, with ``force``, all) placeholders concurrently
+
+    Fetches run in a pool of ``max_workers`` threads with at most
+    ``max_workers * 4`` requests in flight; results are written from the
+    calling thread with bulk_update. Returns {model label: (updated, failed)}.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    results = {}
+    for model_label in model_labels or PLACEHOLDER_FIELDS:
+        model = apps.get_model(model_label)
+        field_name = PLACEHOLDER_FIELDS[model_label]
+        lqip_field, source_field = lqip_fields(field_name)
+
+        rows = model.objects.only('pk', field_name, source_field).order_by('pk').iterator(chunk_size=500)
+        pending = [row for row in rows if cdn_url_of(getattr(row, field_name)) and (force or needs_placeholder(row, field_name))]
+
+        updated, failed = [], 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            window = max_workers * 4
+            for start in range(0, len(pending), window):
+                futures = {
+                    executor.submit(compute_lqip, cdn_url_of(getattr(row, field_name)), session): row
+                    for row in pending[start:start + window]
+                }
+                for future in as_completed(futures):
+                    row = futures[future]
+                    try:
+                        setattr(row, lqip_field, future.result())
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Could not compute placeholder for {model_label} {row.pk}: {e}")
+                        continue
+                    setattr(row, source_field, cdn_url_of(getattr(row, field_name)))
+                    updated.append(row)
+
+                if len(updated) >= BULK_UPDATE_SIZE:
+                    model.objects.bulk_update(updated, [lqip_field, source_field])
+                    results.setdefault(model_label, [0, 0])[0] += len(updated)
+                    updated = []
+
+        if updated:
+            model.objects.bulk_update(updated, [lqip_field, source_field])
+        totals = results.setdefault(model_label, [0, 0])
+        totals[0] += len(updated)
+        totals[1] = failed
+        if stdout:
+            stdout.write(f'  {model_label}: {totals[0]} updated, {failed} failed')
+
+    return {label: tuple(counts) for label, counts in results.items()}
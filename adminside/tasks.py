@@ -0,0 +1,37 @@
+"""
+Django-Q async tasks for the adminside catalog
+"""
+
+import logging
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def compute_image_placeholder_async(model_label, pk, **kwargs):
+    """
+    Async task to recompute the LQIP placeholder of one catalog image
+
+    Args:
+        model_label (str): Model label, e.g. 'adminside.Package'
+        pk (int): Primary key of the row
+        **kwargs: Additional arguments (ignored, for compatibility)
+
+    Returns:
+        dict: Task result
+    """
+    from .placeholders import update_placeholder
+
+    try:
+        updated = update_placeholder(model_label, pk)
+    except Exception as e:
+        logger.error(f"Failed to compute image placeholder for {model_label} {pk}: {e}")
+        return {'success': False, 'error': str(e)}
+
+    return {
+        'success': updated,
+        'model': model_label,
+        'pk': pk,
+        'timestamp': timezone.now().isoformat()
+    }
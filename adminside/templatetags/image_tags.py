@@ -3,7 +3,9 @@ Custom template tags for image handling with placeholder support and currency fo
 """
 from django import template
 from django.templatetags.static import static
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from adminside import image_urls
 from decimal import Decimal
 import re
 
@@ -51,22 +53,74 @@ def is_valid_django_url(url):
     # Basic validation for Django media URLs
     return url.startswith('/') or url.startswith('http')
 
+def uploadcare_cdn_url(image_field):
+    """
+    Return the image's Uploadcare CDN URL, or None if it has no valid one
+    """
+    if image_field and hasattr(image_field, 'cdn_url'):
+        cdn_url = getattr(image_field, 'cdn_url', None)
+        if is_valid_uploadcare_url(cdn_url):
+            return cdn_url
+    return None
+
+def default_image_url(content_type="default", use_placeholder=False):
+    """
+    Static URL of the configured default image for a content type
+    """
+    from django.conf import settings
+
+    default_images_config = getattr(settings, 'DEFAULT_IMAGES', {})
+
+    if use_placeholder:
+        # Use SVG placeholder
+        placeholder_path = default_images_config.get('PLACEHOLDER_SVG', 'images/mbuganiluxeadventuresplaceholder.svg')
+        return static(placeholder_path)
+
+    # Map content types to configuration keys
+    content_type_mapping = {
+        'DESTINATION': 'DESTINATIONS',
+        'DESTINATIONS': 'DESTINATIONS',
+        'ACCOMMODATION': 'ACCOMMODATIONS',
+        'ACCOMMODATIONS': 'ACCOMMODATIONS',
+        'PACKAGE': 'PACKAGES',
+        'PACKAGES': 'PACKAGES',
+        'BLOG': 'BLOG_POSTS',
+        'BLOG_POST': 'BLOG_POSTS',
+        'BLOG_POSTS': 'BLOG_POSTS',
+        'JOB': 'JOB_LISTINGS',
+        'JOB_LISTING': 'JOB_LISTINGS',
+        'JOB_LISTINGS': 'JOB_LISTINGS',
+        'JOBS': 'JOB_LISTINGS',
+    }
+
+    # Get the mapped key or use the content type directly
+    config_key = content_type_mapping.get(content_type.upper(), content_type.upper())
+
+    # Get the appropriate default image
+    if config_key in default_images_config:
+        return static(default_images_config[config_key])
+    return static(default_images_config.get('DEFAULT', 'assets/images/logo/websitelogo.png'))
+
 @register.simple_tag
-def image_with_placeholder(image_field, css_class="", alt_text="", placeholder_path="images/mbuganiluxeadventuresplaceholder.svg"):
+def image_with_placeholder(image_field, css_class="", alt_text="", placeholder_path="images/mbuganiluxeadventuresplaceholder.svg", preset="card", lqip=""):
     """
     Template tag to display an image with automatic placeholder fallback
 
+    Uploadcare images are served as resized srcset variants of ``preset``,
+    over the blurred ``lqip`` data URI while they load.
+
     Usage:
     {% load image_tags %}
     {% image_with_placeholder destination.image "img-fluid" "Destination Image" %}
+    {% image_with_placeholder package.featured_image "" package.name preset="hero" lqip=package.featured_image_lqip %}
     """
     image_url = None
 
     # Try Uploadcare image first
-    if image_field and hasattr(image_field, 'cdn_url'):
-        cdn_url = getattr(image_field, 'cdn_url', None)
-        if is_valid_uploadcare_url(cdn_url):
-            image_url = cdn_url
+    cdn_url = uploadcare_cdn_url(image_field)
+    if cdn_url and preset:
+        return responsive_image(image_field, preset, css_class=css_class, alt_text=alt_text, lqip=lqip)
+    image_url = cdn_url
 
     # Try regular Django image field if Uploadcare failed
     if not image_url and image_field and hasattr(image_field, 'url'):
@@ -85,25 +139,28 @@ def image_with_placeholder(image_field, css_class="", alt_text="", placeholder_p
     return mark_safe(html)
 
 @register.simple_tag
-def image_with_default(image_field, content_type="default", css_class="", alt_text="", use_placeholder=False):
+def image_with_default(image_field, content_type="default", css_class="", alt_text="", use_placeholder=False, preset="card", lqip=""):
     """
     Template tag to display an image with centralized default image fallback
 
+    Uploadcare images are served as resized srcset variants of ``preset``
+    (pass preset="" for the original upload), over the blurred ``lqip``
+    data URI while they load.
+
     Usage:
     {% load image_tags %}
     {% image_with_default destination.image "destinations" "img-fluid" "Destination Image" %}
     {% image_with_default accommodation.image "accommodations" "img-fluid" "Accommodation Image" %}
     {% image_with_default job.image "job_listings" "img-fluid" "Job Image" %}
+    {% image_with_default destination.image "destinations" "img-fluid" destination.name lqip=destination.image_lqip %}
     """
-    from django.conf import settings
-
     image_url = None
 
     # Try Uploadcare image first
-    if image_field and hasattr(image_field, 'cdn_url'):
-        cdn_url = getattr(image_field, 'cdn_url', None)
-        if is_valid_uploadcare_url(cdn_url):
-            image_url = cdn_url
+    cdn_url = uploadcare_cdn_url(image_field)
+    if cdn_url and preset:
+        return responsive_image(image_field, preset, content_type, css_class, alt_text, lqip=lqip)
+    image_url = cdn_url
 
     # Try regular Django image field if Uploadcare failed
     if not image_url and image_field and hasattr(image_field, 'url'):
@@ -113,43 +170,7 @@ def image_with_default(image_field, content_type="default", css_class="", alt_te
 
     # Use centralized default image system if no valid image found
     if not image_url:
-        default_images_config = getattr(settings, 'DEFAULT_IMAGES', {})
-
-        if use_placeholder:
-            # Use SVG placeholder
-            placeholder_path = default_images_config.get('PLACEHOLDER_SVG', 'images/mbuganiluxeadventuresplaceholder.svg')
-            image_url = static(placeholder_path)
-        else:
-            # Use content-type specific default
-            content_type_upper = content_type.upper()
-
-            # Map content types to configuration keys
-            content_type_mapping = {
-                'DESTINATION': 'DESTINATIONS',
-                'DESTINATIONS': 'DESTINATIONS',
-                'ACCOMMODATION': 'ACCOMMODATIONS',
-                'ACCOMMODATIONS': 'ACCOMMODATIONS',
-                'PACKAGE': 'PACKAGES',
-                'PACKAGES': 'PACKAGES',
-                'BLOG': 'BLOG_POSTS',
-                'BLOG_POST': 'BLOG_POSTS',
-                'BLOG_POSTS': 'BLOG_POSTS',
-                'JOB': 'JOB_LISTINGS',
-                'JOB_LISTING': 'JOB_LISTINGS',
-                'JOB_LISTINGS': 'JOB_LISTINGS',
-                'JOBS': 'JOB_LISTINGS',
-            }
-
-            # Get the mapped key or use the content type directly
-            config_key = content_type_mapping.get(content_type_upper, content_type_upper)
-
-            # Get the appropriate default image
-            if config_key in default_images_config:
-                default_path = default_images_config[config_key]
-            else:
-                default_path = default_images_config.get('DEFAULT', 'assets/images/logo/websitelogo.png')
-
-            image_url = static(default_path)
+        image_url = default_image_url(content_type, use_placeholder)
 
     css_classes = f'class="{css_class}"' if css_class else ''
     alt_attribute = f'alt="{alt_text}"' if alt_text else 'alt="Image"'
@@ -182,22 +203,23 @@ def image_url_with_placeholder(image_field, placeholder_path="images/mbuganiluxe
     return static(placeholder_path)
 
 @register.simple_tag
-def image_url_with_default(image_field, content_type="default", use_placeholder=False):
+def image_url_with_default(image_field, content_type="default", use_placeholder=False, preset=None):
     """
     Template tag to get image URL with centralized default image fallback
 
+    With ``preset`` an Uploadcare image is resized to the preset's default
+    width; without it the original upload URL is returned (e.g. og:image).
+
     Usage:
     {% load image_tags %}
     {% image_url_with_default destination.image "destinations" %}
     {% image_url_with_default package.featured_image "packages" %}
+    {% image_url_with_default slide.image "packages" preset="hero" %}
     """
-    from django.conf import settings
-
     # Try Uploadcare image first
-    if image_field and hasattr(image_field, 'cdn_url'):
-        cdn_url = getattr(image_field, 'cdn_url', None)
-        if is_valid_uploadcare_url(cdn_url):
-            return cdn_url
+    cdn_url = uploadcare_cdn_url(image_field)
+    if cdn_url:
+        return image_urls.build(cdn_url, preset).src if preset else cdn_url
 
     # Try regular Django image field if Uploadcare failed
     if image_field and hasattr(image_field, 'url'):
@@ -206,43 +228,88 @@ def image_url_with_default(image_field, content_type="default", use_placeholder=
             return django_url
 
     # Use centralized default image system if no valid image found
-    default_images_config = getattr(settings, 'DEFAULT_IMAGES', {})
+    return default_image_url(content_type, use_placeholder)
 
-    if use_placeholder:
-        # Use SVG placeholder
-        placeholder_path = default_images_config.get('PLACEHOLDER_SVG', 'images/mbuganiluxeadventuresplaceholder.svg')
-        return static(placeholder_path)
-    else:
-        # Use content-type specific default
-        content_type_upper = content_type.upper()
-
-        # Map content types to configuration keys
-        content_type_mapping = {
-            'DESTINATION': 'DESTINATIONS',
-            'DESTINATIONS': 'DESTINATIONS',
-            'ACCOMMODATION': 'ACCOMMODATIONS',
-            'ACCOMMODATIONS': 'ACCOMMODATIONS',
-            'PACKAGE': 'PACKAGES',
-            'PACKAGES': 'PACKAGES',
-            'BLOG': 'BLOG_POSTS',
-            'BLOG_POST': 'BLOG_POSTS',
-            'BLOG_POSTS': 'BLOG_POSTS',
-            'JOB': 'JOB_LISTINGS',
-            'JOB_LISTING': 'JOB_LISTINGS',
-            'JOB_LISTINGS': 'JOB_LISTINGS',
-            'JOBS': 'JOB_LISTINGS',
-        }
-
-        # Get the mapped key or use the content type directly
-        config_key = content_type_mapping.get(content_type_upper, content_type_upper)
-
-        # Get the appropriate default image
-        if config_key in default_images_config:
-            default_path = default_images_config[config_key]
-        else:
-            default_path = default_images_config.get('DEFAULT', 'assets/images/logo/websitelogo.png')
+@register.simple_tag
+def responsive_image(image_field, preset="card", content_type="default", css_class="", alt_text="", eager=False, lqip=""):
+    """
+    Template tag rendering an <img> with srcset/sizes for a named preset
+
+    Non-Uploadcare images and defaults are rendered as a plain <img>.
+    Pass eager=True for above-the-fold images (e.g. the first hero slide)
+    and the row's ``<field>_lqip`` to show its blurred placeholder inline.
+
+    Usage:
+    {% load image_tags %}
+    {% responsive_image destination.image "card" "destinations" "img-fluid" destination.name lqip=destination.image_lqip %}
+    """
+    cdn_url = uploadcare_cdn_url(image_field)
+    loading = 'eager' if eager else 'lazy'
+    alt_text = alt_text or 'Image'
+
+    if not cdn_url:
+        image_url = None
+        if image_field and hasattr(image_field, 'url'):
+            django_url = getattr(image_field, 'url', None)
+            if is_valid_django_url(django_url):
+                image_url = django_url
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}" decoding="async">',
+            image_url or default_image_url(content_type), css_class, alt_text, loading
+        )
+
+    image = image_urls.build(cdn_url, preset)
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="{}" decoding="async"{}>',
+        image.src, image.srcset, image.sizes, css_class, alt_text, loading, lqip_style(lqip)
+    )
+
+def lqip_style(lqip):
+    """
+    style attribute painting a placeholder data URI behind an <img>
+    """
+    if not lqip or not lqip.startswith('data:image/'):
+        return ''
+    return format_html(' style="background-image: url({}); background-size: cover;"', lqip)
+
+@register.simple_tag
+def card_image(image_field, content_type="default", css_class="", alt_text="", lqip=""):
+    """
+    Usage:
+    {% load image_tags %}
+    {% card_image accommodation.image "accommodations" "img-fluid" accommodation.name lqip=accommodation.image_lqip %}
+    """
+    return responsive_image(image_field, 'card', content_type, css_class, alt_text, lqip=lqip)
+
+@register.simple_tag
+def hero_image(image_field, content_type="default", css_class="", alt_text="", eager=True, lqip=""):
+    """
+    Usage:
+    {% load image_tags %}
+    {% hero_image destination.image "destinations" "hero-img" destination.name lqip=destination.image_lqip %}
+    """
+    return responsive_image(image_field, 'hero', content_type, css_class, alt_text, eager, lqip)
 
-        return static(default_path)
+@register.simple_tag
+def thumbnail_image(image_field, content_type="default", css_class="", alt_text=""):
+    """
+    Usage:
+    {% load image_tags %}
+    {% thumbnail_image item.package.featured_image "packages" "cart-thumb" item.package.name %}
+    """
+    return responsive_image(image_field, 'thumbnail', content_type, css_class, alt_text)
+
+@register.simple_tag
+def image_srcset(image_field, preset="card"):
+    """
+    Template tag returning the srcset of an Uploadcare image ('' otherwise)
+
+    Usage:
+    {% load image_tags %}
+    <source srcset="{% image_srcset slide.image "hero" %}" sizes="100vw">
+    """
+    cdn_url = uploadcare_cdn_url(image_field)
+    return image_urls.build(cdn_url, preset).srcset if cdn_url else ''
 
 @register.filter
 def has_image(image_field):
@@ -0,0 +1,113 @@
+"""
+Unit tests for the read-only catalog JSON API
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from adminside import api, typeahead
+from adminside.models import Accommodation, Destination, Package
+
+
+class CatalogApiTest(TestCase):
+    """Test field selection, filters, cursor paging and validators"""
+
+    def setUp(self):
+        self.kenya = Destination.objects.create(
+            name='Kenya', slug='kenya', destination_type=Destination.COUNTRY, description='Kenya'
+        )
+        self.nairobi = Destination.objects.create(
+            name='Nairobi', slug='nairobi', destination_type=Destination.CITY,
+            description='Capital', parent=self.kenya
+        )
+        self.tanzania = Destination.objects.create(
+            name='Tanzania', slug='tanzania', destination_type=Destination.COUNTRY, description='Tanzania'
+        )
+        self.packages = [
+            Package.objects.create(
+                name=f'Nairobi Tour {day}', slug=f'nairobi-tour-{day}', description='Tour',
+                main_destination=self.nairobi, duration_days=day, duration_nights=day - 1,
+                adult_price=100 * day, child_price=50 * day, status=Package.PUBLISHED
+            )
+            for day in (1, 2, 3)
+        ]
+        Package.objects.create(
+            name='Zanzibar Draft', slug='zanzibar-draft', description='Draft', main_destination=self.tanzania,
+            duration_days=2, duration_nights=1, adult_price=300, child_price=150
+        )
+        Accommodation.objects.create(
+            name='City Lodge', slug='city-lodge', description='Lodge', destination=self.nairobi,
+            price_per_room_per_night=120, rating='4.5'
+        )
+
+    def _get(self, resource, **params):
+        return self.client.get(reverse('adminside:catalog_api', kwargs={'resource': resource}), params)
+
+    def test_destinations_annotate_has_children_in_one_query(self):
+        """Test has_children comes from an EXISTS subquery"""
+        with self.assertNumQueries(1):
+            response = self._get('destinations', type='country')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['name'], row['has_children']) for row in response.json()['results']],
+            [('Kenya', True), ('Tanzania', False)]
+        )
+
+    def test_sparse_fieldsets(self):
+        """Test ?fields= selects columns and rejects unknown ones"""
+        response = self._get('accommodations', fields='name,rating')
+        self.assertEqual(response.json()['results'], [{'name': 'City Lodge', 'rating': 4.5}])
+
+        response = self._get('accommodations', fields='name,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_cursor_paging_through_subtree_filter(self):
+        """Test published packages of a destination subtree page by cursor"""
+        first = self._get('packages', destination=self.kenya.pk, fields='name', limit=2).json()
+        self.assertEqual([row['name'] for row in first['results']], ['Nairobi Tour 1', 'Nairobi Tour 2'])
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = self._get('packages', destination=self.kenya.pk, fields='name', limit=2, cursor=first['next_cursor']).json()
+        self.assertEqual([row['name'] for row in second['results']], ['Nairobi Tour 3'])
+        self.assertIsNone(second['next_cursor'])
+
+        self.assertEqual(self._get('packages', cursor='not a cursor!').status_code, 400)
+        self.assertEqual(self._get('packages', destination='abc').status_code, 400)
+
+    def test_etag_and_cache_headers(self):
+        """Test responses revalidate with 304 and allow short shared caching"""
+        response = self._get('travel_modes')
+        self.assertEqual(response.json(), {'results': [], 'next_cursor': None})
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+        revalidated = self.client.get(
+            reverse('adminside:catalog_api', kwargs={'resource': 'travel_modes'}),
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_cache_key_ignores_the_process_generation(self):
+        """Test processes that handled different numbers of saves share cached responses"""
+        key = api._cache_key('packages', {'limit': '2'})
+
+        with mock.patch.object(typeahead, '_local_generation', typeahead._local_generation + 3):
+            self.assertEqual(api._cache_key('packages', {'limit': '2'}), key)
+
+    def test_unknown_resource_is_404(self):
+        """Test only catalog resources are exposed"""
+        self.assertEqual(self._get('bookings').status_code, 404)
+
+    def test_ajax_destinations_checks_children_in_one_query(self):
+        """Test the legacy AJAX endpoint no longer queries per destination"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('adminside:get_destinations_ajax'))
+
+        self.assertEqual(
+            [(row['name'], row['has_children']) for row in response.json()['destinations']],
+            [('Kenya', True), ('Tanzania', False)]
+        )
@@ -0,0 +1,177 @@
+"""
+Unit tests for the async read-heavy views served under ASGI
+"""
+
+import importlib
+import sys
+
+from asgiref.sync import iscoroutinefunction
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+from adminside import fuzzy
+from adminside.models import Accommodation, Destination, Package
+from blog import view_counts
+from blog.models import Category, Comment, Post
+
+URLCONF_MODULES = ('users.urls', 'adminside.urls', 'blog.urls', 'tours_travels.urls')
+
+
+def _reload_urlconf():
+    """Re-read select_view() choices after ASYNC_VIEWS_ENABLED changed"""
+    for name in URLCONF_MODULES:
+        importlib.reload(sys.modules[name])
+    clear_url_caches()
+
+
+@override_settings(ASYNC_VIEWS_ENABLED=True)
+class AsyncViewsTest(TestCase):
+    """Test the async views through the ASGI test client"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        _reload_urlconf()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        _reload_urlconf()
+
+    def setUp(self):
+        fuzzy._indexes.clear()
+        self.addCleanup(fuzzy._indexes.clear)
+        self.addCleanup(view_counts._drain)
+        self.kenya = Destination.objects.create(
+            name='Kenya', slug='kenya', destination_type=Destination.COUNTRY, description='Kenya'
+        )
+        self.nairobi = Destination.objects.create(
+            name='Nairobi', slug='nairobi', destination_type=Destination.CITY,
+            description='Capital', parent=self.kenya
+        )
+        self.closed = Destination.objects.create(
+            name='Closed Camp', slug='closed-camp', destination_type=Destination.PLACE,
+            description='Closed', parent=self.kenya, is_active=False
+        )
+        self.package = Package.objects.create(
+            name='Nairobi Safari Day', slug='nairobi-safari-day', description='City safari',
+            main_destination=self.nairobi, duration_days=1, duration_nights=0,
+            adult_price=150, child_price=75, status=Package.PUBLISHED, is_featured=True
+        )
+        Package.objects.create(
+            name='Closed Camp Stay', slug='closed-camp-stay', description='Closed',
+            main_destination=self.closed, duration_days=2, duration_nights=1,
+            adult_price=300, child_price=150, status=Package.PUBLISHED
+        )
+        Accommodation.objects.create(
+            name='City Lodge', slug='city-lodge', description='Lodge', destination=self.nairobi,
+            price_per_room_per_night=120, rating='4.5', is_featured=True
+        )
+        self.category = Category.objects.create(title='Safari', slug='safari')
+        self.post = Post.objects.create(
+            title='Migration Season', content='<p>Crossings</p>', status='published',
+            category=self.category, featured=True
+        )
+        self.later = Post.objects.create(title='Gorilla Trekking', content='<p>Bwindi</p>', status='published')
+
+    def test_urls_route_to_async_views(self):
+        """Test ASYNC_VIEWS_ENABLED swaps in the async views"""
+        urls = {
+            reverse('home:users-home'): 'ahome',
+            reverse('adminside:package_list'): 'apackage_list',
+            reverse('adminside:package_detail', kwargs={'slug': 'x'}): 'apackage_detail',
+            reverse('adminside:destination_detail', kwargs={'slug': 'x'}): 'adestination_detail',
+            reverse('blog:blog-list'): 'ablog_list',
+            reverse('blog:blog-detail', kwargs={'slug': 'x'}): 'ablog_detail',
+        }
+        for url, name in urls.items():
+            func = resolve(url).func
+            self.assertEqual(func.__name__, name)
+            self.assertTrue(iscoroutinefunction(func))
+
+    async def test_home(self):
+        """Test the homepage sections are read asynchronously"""
+        response = await self.async_client.get(reverse('home:users-home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['package'].slug for row in response.context['package_data']],
+            ['nairobi-safari-day', 'closed-camp-stay']
+        )
+        self.assertEqual([accommodation.name for accommodation in response.context['featured_accommodations']], ['City Lodge'])
+
+    async def test_package_list_counts_and_pages(self):
+        """Test filter pill counts and the listed page match the sync view"""
+        response = await self.async_client.get(reverse('adminside:package_list'), {'category': 'multiday_bush_safaris'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([package.pk for package in response.context['page_obj']], [self.package.pk])
+        self.assertEqual(
+            [(pill['key'], pill['count']) for pill in response.context['categories']],
+            [('all', 2), ('multiday_bush_safaris', 1), ('nairobi_excursions', 1), ('outbound_packages', 0)]
+        )
+
+        response = await self.async_client.get(
+            reverse('adminside:package_list'), {'destination': self.kenya.pk},
+            headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+        self.assertEqual(response.json()['total_count'], 1)
+
+    async def test_package_list_fuzzy_fallback(self):
+        """Test a misspelled search falls back to close names"""
+        response = await self.async_client.get(reverse('adminside:package_list'), {'search': 'Nairobbi'})
+
+        self.assertEqual([package.pk for package in response.context['page_obj']], [self.package.pk])
+        self.assertEqual(response.context['suggestions'][0], 'Nairobi')
+
+    async def test_package_detail_revalidates(self):
+        """Test the conditional GET validators work on the async view"""
+        url = reverse('adminside:package_detail', kwargs={'slug': self.package.slug})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Nairobi Safari Day')
+
+        revalidated = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+        missing = await self.async_client.get(reverse('adminside:package_detail', kwargs={'slug': 'missing'}))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_destination_detail_lists_active_subtree(self):
+        """Test packages of inactive descendants are left out, as get_all_children() does"""
+        response = await self.async_client.get(reverse('adminside:destination_detail', kwargs={'slug': 'kenya'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([package.pk for package in response.context['packages']], [self.package.pk])
+        self.assertEqual([accommodation.name for accommodation in response.context['accommodations']], ['City Lodge'])
+
+        missing = await self.async_client.get(reverse('adminside:destination_detail', kwargs={'slug': 'closed-camp'}))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_blog_list(self):
+        """Test the listing, featured posts and unknown category redirect"""
+        response = await self.async_client.get(reverse('blog:blog-list'), {'sort': 'oldest'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['blog']), [self.post, self.later])
+        self.assertEqual(response.context['featured_blog'], [self.post])
+        self.assertEqual(response.context['blog_count'], 2)
+
+        response = await self.async_client.get(reverse('blog:blog-list'), {'category': 'nope'})
+        self.assertRedirects(response, reverse('blog:blog-list'), fetch_redirect_response=False)
+
+    async def test_blog_detail_and_comment(self):
+        """Test the post page counts a view and comment POSTs still work"""
+        url = reverse('blog:blog-detail', kwargs={'slug': self.post.slug})
+        response = await self.async_client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'].views, 1)
+        self.assertEqual(response.context['previous_post'], None)
+        self.assertEqual(response.context['next_post'], self.later)
+
+        response = await self.async_client.post(
+            url, {'full_name': 'Amina', 'email': 'amina@example.com', 'comment': 'Lovely'}
+        )
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertTrue(await Comment.objects.filter(post=self.post, full_name='Amina').aexists())
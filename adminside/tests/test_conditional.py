@@ -0,0 +1,129 @@
+"""
+Unit tests for ETag / Last-Modified conditional responses on detail pages
+"""
+
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from adminside.models import Accommodation, Destination, Package, TravelMode
+
+
+class ConditionalDetailPageTest(TestCase):
+    """Test 304 responses for package, destination and accommodation pages"""
+
+    def setUp(self):
+        self.country = Destination.objects.create(
+            name='Kenya',
+            slug='kenya',
+            destination_type=Destination.COUNTRY,
+            description='Beautiful East African country'
+        )
+        self.destination = Destination.objects.create(
+            name='Maasai Mara',
+            slug='maasai-mara',
+            destination_type=Destination.PLACE,
+            description='Famous wildlife reserve',
+            parent=self.country
+        )
+        self.accommodation = Accommodation.objects.create(
+            name='Safari Lodge',
+            slug='safari-lodge',
+            description='Lodge in the Mara',
+            destination=self.destination,
+            price_per_room_per_night=100
+        )
+        self.package = Package.objects.create(
+            name='Maasai Mara Safari',
+            slug='maasai-mara-safari',
+            description='3-day wildlife safari',
+            main_destination=self.destination,
+            duration_days=3,
+            duration_nights=2,
+            adult_price=1500,
+            child_price=1050,
+            status=Package.PUBLISHED
+        )
+        self.package.available_accommodations.add(self.accommodation)
+        self.package_url = reverse('adminside:package_detail', kwargs={'slug': self.package.slug})
+
+    def test_full_response_carries_validators(self):
+        """Test the first visit gets the page with ETag and Last-Modified"""
+        response = self.client.get(self.package_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        """Test If-None-Match answers 304 from the validator query alone"""
+        etag = self.client.get(self.package_url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.package_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_returns_304(self):
+        """Test an up-to-date If-Modified-Since answers 304"""
+        last_modified = self.client.get(self.package_url)['Last-Modified']
+
+        response = self.client.get(self.package_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_change_invalidates_etag(self):
+        """Test editing a related row changes the package ETag"""
+        first = self.client.get(self.package_url)
+
+        later = timezone.now() + datetime.timedelta(minutes=5)
+        Accommodation.objects.filter(pk=self.accommodation.pk).update(updated_at=later)
+        response = self.client.get(self.package_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertNotEqual(response['Last-Modified'], first['Last-Modified'])
+
+    def test_added_relation_invalidates_etag(self):
+        """Test linking a travel mode changes the ETag even without a newer timestamp"""
+        travel_mode = TravelMode.objects.create(
+            name='Safari Jeep',
+            transport_type='road',
+            departure_location='Nairobi',
+            arrival_location='Maasai Mara',
+            departure_time=datetime.time(7, 0),
+            arrival_time=datetime.time(12, 0),
+            duration_minutes=300,
+            price_per_person=50
+        )
+        etag = self.client.get(self.package_url)['ETag']
+
+        self.package.available_travel_modes.add(travel_mode)
+        response = self.client.get(self.package_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_destination_and_accommodation_pages(self):
+        """Test destination and accommodation pages revalidate and see package changes"""
+        for url in (
+            reverse('adminside:destination_detail', kwargs={'slug': self.country.slug}),
+            reverse('adminside:accommodation_detail', kwargs={'slug': self.accommodation.slug}),
+        ):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            Package.objects.filter(pk=self.package.pk).update(status=Package.DRAFT)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+            Package.objects.filter(pk=self.package.pk).update(status=Package.PUBLISHED)
+
+    def test_missing_object_still_404s(self):
+        """Test unknown slugs skip the validators and 404"""
+        response = self.client.get(reverse('adminside:package_detail', kwargs={'slug': 'missing'}),
+                                   HTTP_IF_NONE_MATCH='W/"anything"')
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,103 @@
+"""
+Unit tests for the read replica database router, on two local databases
+"""
+
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from adminside.models import Destination, Package
+from blog.models import Comment, Post
+from tours_travels import db_router
+
+
+@override_settings(REPLICA_DATABASE='replica', REPLICA_PIN_COOKIE='primary_pin')
+class ReplicaRouterTest(TestCase):
+    """Test catalog reads go to the replica and writes pin requests to the primary"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        db_router.reset_lag_checks()
+        self.addCleanup(db_router.reset_lag_checks)
+        # The same rows on both databases, plus one package only each side has
+        for alias in ('default', 'replica'):
+            nairobi = Destination.objects.using(alias).create(
+                pk=1, name='Nairobi', slug='nairobi', destination_type=Destination.CITY, description='Capital'
+            )
+            Package.objects.using(alias).create(
+                name=f'{alias.title()} Safari', slug=f'{alias}-safari', description='Safari',
+                main_destination=nairobi, duration_days=1, duration_nights=0,
+                adult_price=100, child_price=50, status=Package.PUBLISHED
+            )
+            Post.objects.using(alias).create(pk=1, title='Migration Season', content='<p>Crossings</p>',
+                                             status='published')
+
+    def listed_packages(self, response):
+        return [package.name for package in response.context['page_obj']]
+
+    def test_catalog_reads_use_the_replica(self):
+        """Test the package list is read from the replica"""
+        response = self.client.get(reverse('adminside:package_list'))
+
+        self.assertEqual(self.listed_packages(response), ['Replica Safari'])
+        self.assertNotIn('primary_pin', response.cookies)
+
+    async def test_catalog_reads_use_the_replica_under_asgi(self):
+        """Test the request state reaches the ORM thread of an ASGI request"""
+        response = await self.async_client.get(reverse('adminside:package_list'))
+
+        self.assertEqual(self.listed_packages(response), ['Replica Safari'])
+
+    def test_write_pins_following_requests_to_the_primary(self):
+        """Test a request that writes sets the pin cookie and later reads use the primary"""
+        url = reverse('blog:blog-detail', kwargs={'slug': 'migration-season'})
+        response = self.client.post(url, {'full_name': 'Amina', 'email': 'amina@example.com', 'comment': 'Lovely'})
+
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(response.cookies['primary_pin']['max-age'], 15)
+        self.assertTrue(Comment.objects.using('default').filter(full_name='Amina').exists())
+        self.assertFalse(Comment.objects.using('replica').exists())
+
+        response = self.client.get(reverse('adminside:package_list'))
+        self.assertEqual(self.listed_packages(response), ['Default Safari'])
+
+    def test_lagging_or_unreachable_replica_falls_back_to_the_primary(self):
+        """Test reads use the primary while the replica is too far behind or down"""
+        with mock.patch.object(db_router, 'replica_lag', return_value=60.0):
+            response = self.client.get(reverse('adminside:package_list'))
+        self.assertEqual(self.listed_packages(response), ['Default Safari'])
+
+        db_router.reset_lag_checks()
+        with mock.patch.object(db_router, 'replica_lag', side_effect=OperationalError('timeout')):
+            response = self.client.get(reverse('adminside:package_list'))
+        self.assertEqual(self.listed_packages(response), ['Default Safari'])
+
+    def test_lag_is_checked_once_per_interval(self):
+        """Test the lag result is cached for REPLICA_LAG_CHECK_INTERVAL"""
+        with mock.patch.object(db_router, 'replica_lag', return_value=0.0) as replica_lag:
+            self.client.get(reverse('adminside:package_list'))
+            self.client.get(reverse('adminside:package_list'))
+
+        self.assertEqual(replica_lag.call_count, 1)
+
+    def test_reads_outside_requests_use_the_primary(self):
+        """Test tasks and commands keep reading from the primary"""
+        self.assertEqual(Package.objects.get().name, 'Default Safari')
+
+    def test_replica_instances_are_written_to_the_primary(self):
+        """Test instances read from the replica are saved and related on the primary"""
+        token = db_router.current_request.set(db_router.RequestState())
+        try:
+            post = Post.objects.get()
+            self.assertEqual(post._state.db, 'replica')
+            post.title = 'Migration Season 2030'
+            post.save()
+            comment = Comment.objects.create(post=post, full_name='Amina', email='amina@example.com', comment='Hi')
+        finally:
+            db_router.current_request.reset(token)
+
+        self.assertEqual(comment._state.db, 'default')
+        self.assertEqual(Post.objects.using('default').get().title, 'Migration Season 2030')
+        self.assertEqual(Post.objects.using('replica').get().title, 'Migration Season')
@@ -0,0 +1,109 @@
+"""
+Unit tests for the Destination.starting_price rollups (adminside.destination_prices)
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from adminside import destination_prices
+from adminside.models import Accommodation, Destination, Package
+
+
+class DestinationPriceTest(TestCase):
+    """Test starting prices follow package changes up the hierarchy"""
+
+    def setUp(self):
+        self.kenya = self.destination('Kenya', Destination.COUNTRY)
+        self.nairobi = self.destination('Nairobi', Destination.CITY, self.kenya)
+        self.mombasa = self.destination('Mombasa', Destination.CITY, self.kenya)
+        self.karen = self.destination('Karen', Destination.PLACE, self.nairobi)
+
+    def destination(self, name, destination_type, parent=None):
+        return Destination.objects.create(
+            name=name, slug=name.lower(), destination_type=destination_type, description=name, parent=parent
+        )
+
+    def package(self, name, destination, adult_price, status=Package.PUBLISHED):
+        return Package.objects.create(
+            name=name, slug=name.lower(), description=name, main_destination=destination,
+            duration_days=3, duration_nights=2, adult_price=adult_price, child_price=adult_price // 2, status=status
+        )
+
+    def prices(self):
+        prices = dict(Destination.objects.values_list('slug', 'starting_price'))
+        return [prices[slug] for slug in ('kenya', 'nairobi', 'mombasa', 'karen')]
+
+    def test_prices_roll_up_to_ancestors(self):
+        """Test the lowest published price reaches every ancestor and drafts are ignored"""
+        self.package('Karen Walk', self.karen, 800)
+        self.package('Beach Week', self.mombasa, 1200)
+        self.package('Draft Trip', self.nairobi, 100, status=Package.DRAFT)
+
+        self.assertEqual(self.prices(), [800, 800, 1200, 800])
+
+    def test_price_status_and_destination_changes(self):
+        """Test price, status and main destination changes recompute both ancestor chains"""
+        walk = self.package('Karen Walk', self.karen, 800)
+        self.package('Beach Week', self.mombasa, 1200)
+
+        walk.adult_price = 1500
+        walk.save()
+        self.assertEqual(self.prices(), [1200, 1500, 1200, 1500])
+
+        walk.main_destination = self.mombasa
+        walk.save()
+        self.assertEqual(self.prices(), [1200, None, 1200, None])
+
+        walk.status = Package.ARCHIVED
+        walk.save()
+        walk.main_destination = self.karen
+        walk.save()
+        self.assertEqual(self.prices(), [1200, None, 1200, None])
+
+        Package.objects.get(slug='beach-week').delete()
+        self.assertEqual(self.prices(), [None, None, None, None])
+
+    def test_accommodation_price_reprices_destinations(self):
+        """Test a cheaper linked accommodation lowers the display price and the rollups"""
+        walk = self.package('Karen Walk', self.karen, 800)
+        hotel = Accommodation.objects.create(
+            name='City Hotel', slug='city-hotel', accommodation_type=Accommodation.HOTEL, description='Hotel',
+            destination=self.nairobi, price_per_room_per_night=90
+        )
+        walk.available_accommodations.add(hotel)
+        self.assertEqual(self.prices()[0], 890)
+
+        hotel.price_per_room_per_night = 40
+        hotel.save()
+        self.assertEqual(self.prices(), [840, 840, None, 840])
+
+    def test_moving_a_destination(self):
+        """Test moving a city under another country reprices both countries"""
+        self.package('Karen Walk', self.karen, 800)
+        tanzania = self.destination('Tanzania', Destination.COUNTRY)
+
+        self.nairobi.parent = tanzania
+        self.nairobi.save()
+
+        tanzania.refresh_from_db()
+        self.assertEqual(tanzania.starting_price, 800)
+        self.assertEqual(self.prices()[0], None)
+
+    def test_rebuild_one_update_per_level(self):
+        """Test the full rebuild replaces stale prices with one UPDATE per level"""
+        self.package('Karen Walk', self.karen, 800)
+        self.package('Beach Week', self.mombasa, 1200)
+        Destination.objects.update(starting_price=Decimal('5.00'))
+
+        with self.assertNumQueries(4):
+            levels = destination_prices.rebuild()
+
+        self.assertEqual(levels, [1, 2, 1])
+        self.assertEqual(self.prices(), [800, 800, 1200, 800])
+
+        out = StringIO()
+        call_command('rebuild_destination_prices', stdout=out)
+        self.assertIn('4 destinations updated in 3 levels', out.getvalue())
@@ -0,0 +1,156 @@
+"""
+Unit tests for faceted filtering of the package and accommodation lists
+"""
+
+from datetime import time
+
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from adminside import facets, package_cards
+from adminside.models import Accommodation, Destination, Package, TravelMode
+
+LOCMEM_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'facet-tests'},
+}
+
+
+class FacetTest(TestCase):
+    """Test facet counts, filter state and the listing views"""
+
+    def setUp(self):
+        self.nairobi = Destination.objects.create(
+            name='Nairobi', slug='nairobi', destination_type=Destination.CITY, description='Capital'
+        )
+        self.lodge = Accommodation.objects.create(
+            name='Mara Lodge', slug='mara-lodge', accommodation_type=Accommodation.LODGE, description='Lodge',
+            destination=self.nairobi, price_per_room_per_night=200, rating='4.6'
+        )
+        self.hotel = Accommodation.objects.create(
+            name='City Hotel', slug='city-hotel', accommodation_type=Accommodation.HOTEL, description='Hotel',
+            destination=self.nairobi, price_per_room_per_night=90, rating='3.8'
+        )
+        self.flight = TravelMode.objects.create(
+            name='Mara Flight', transport_type=TravelMode.FLIGHT, departure_location='Nairobi',
+            arrival_location='Maasai Mara', departure_time=time(7), arrival_time=time(8),
+            duration_minutes=60, price_per_person=300
+        )
+        # (days, price, rating, accommodations, travel modes)
+        rows = [
+            (2, 800, '4.7', [self.lodge], [self.flight]),
+            (5, 1800, '4.2', [self.lodge, self.hotel], []),
+            (9, 3000, '3.5', [self.hotel], [self.flight]),
+            (3, 1200, '4.0', [], []),
+        ]
+        self.packages = []
+        for i, (days, price, rating, accommodations, travel_modes) in enumerate(rows):
+            package = Package.objects.create(
+                name=f'Safari {i}', slug=f'safari-{i}', description='Safari', main_destination=self.nairobi,
+                duration_days=days, duration_nights=days - 1, adult_price=price, child_price=price // 2,
+                rating=rating, status=Package.PUBLISHED
+            )
+            package.available_accommodations.set(accommodations)
+            package.available_travel_modes.set(travel_modes)
+            self.packages.append(package)
+
+    def counts(self, query):
+        state = facets.FilterState.from_query(facets.PACKAGE_FACETS, QueryDict(query))
+        return facets.count(facets.PACKAGE_FACETS, Package.objects.filter(status=Package.PUBLISHED), state)
+
+    def test_counts_come_from_one_query(self):
+        """Test every option of every facet is counted by one aggregate query"""
+        with self.assertNumQueries(1):
+            counts = self.counts('')
+
+        self.assertEqual((counts['all'], counts['total']), (4, 4))
+        self.assertEqual(counts['options']['price'], {'under-1000': 1, '1000-2500': 2, '2500-5000': 1, '5000-plus': 0})
+        self.assertEqual(counts['options']['duration']['1-3'], 2)
+        self.assertEqual(counts['options']['accommodation'][Accommodation.LODGE], 2)
+        self.assertEqual(counts['options']['transport'][TravelMode.FLIGHT], 2)
+        self.assertEqual(counts['options']['rating'], {'4.5': 1, '4': 3, '3': 4})
+
+    def test_counts_apply_the_other_facets(self):
+        """Test a facet's own selection leaves its counts alone while narrowing the others"""
+        counts = self.counts('transport=flight&price=under-1000&price=2500-5000&price=bogus')
+
+        self.assertEqual(counts['total'], 2)
+        # Only the transport selection applies to the price counts
+        self.assertEqual(counts['options']['price'], {'under-1000': 1, '1000-2500': 0, '2500-5000': 1, '5000-plus': 0})
+        # Both price ranges (ORed) and the transport apply to the duration counts
+        self.assertEqual(counts['options']['duration'], {'1-3': 1, '4-7': 0, '8-14': 1, '15-plus': 0})
+
+    def test_signature_is_canonical(self):
+        """Test the order and repetition of parameters do not change the signature"""
+        first = facets.FilterState.from_query(facets.PACKAGE_FACETS, QueryDict('rating=4&price=1000-2500&price=under-1000'))
+        second = facets.FilterState.from_query(facets.PACKAGE_FACETS, QueryDict('price=under-1000&rating=4&price=1000-2500&price=under-1000'))
+
+        self.assertEqual(first.signature(), second.signature())
+        self.assertEqual(first.signature(), 'price=under-1000&price=1000-2500&rating=4')
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_counts_are_cached_until_the_catalog_changes(self):
+        """Test repeated counts are served from the cache and a save invalidates them"""
+        self.counts('rating=4')
+        with self.assertNumQueries(0):
+            self.counts('rating=4')
+
+        self.packages[3].adult_price = 6000
+        with self.captureOnCommitCallbacks(execute=True):
+            self.packages[3].save()
+        self.assertEqual(self.counts('rating=4')['options']['price']['5000-plus'], 1)
+
+    def test_package_list_filters_and_links(self):
+        """Test the listing applies the selections and the panel links toggle one option"""
+        response = self.client.get(reverse('adminside:package_list'), {'accommodation': 'lodge', 'page': 1})
+
+        self.assertEqual({package.pk for package in response.context['page_obj']}, {p.pk for p in self.packages[:2]})
+        accommodation = next(facet for facet in response.context['facets'] if facet['key'] == 'accommodation')
+        lodge = next(option for option in accommodation['options'] if option['value'] == 'lodge')
+        self.assertTrue(lodge['selected'])
+        self.assertEqual(lodge['query'], '')
+        self.assertEqual(response.context['filter_query'], 'accommodation=lodge')
+
+        response = self.client.get(
+            reverse('adminside:package_list'), {'accommodation': 'lodge', 'duration': '4-7'},
+            headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+        self.assertEqual(response.json()['total_count'], 1)
+        self.assertIn('facet-option selected', response.json()['facets_html'])
+
+    def test_package_list_queries(self):
+        """Test facets add one query to the listing"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('adminside:package_list'), {'price': '1000-2500', 'transport': 'flight'})
+
+        self.assertEqual(sum('FILTER (WHERE' in query['sql'] for query in queries), 1)
+
+    def test_accommodation_list_type_facet(self):
+        """Test the accommodation list keeps ?type= and counts types, prices and ratings"""
+        response = self.client.get(reverse('adminside:accommodation_list'), {'type': 'hotel'})
+
+        self.assertEqual([accommodation.pk for accommodation in response.context['page_obj']], [self.hotel.pk])
+        price = next(facet for facet in response.context['facets'] if facet['key'] == 'price')
+        self.assertEqual([option['count'] for option in price['options']], [1, 0, 0, 0])
+        self.assertContains(response, 'Accommodation type: Hotel')
+
+    def test_masks_follow_relations_and_types(self):
+        """Test the precomputed type bits change with the links and the linked rows"""
+        package = self.packages[3]
+        package.available_accommodations.add(self.lodge)
+        self.assertEqual(self.counts('accommodation=lodge')['total'], 3)
+
+        self.hotel.packages.add(package)
+        self.assertEqual(self.counts('accommodation=hotel')['total'], 3)
+
+        self.lodge.accommodation_type = Accommodation.RESORT
+        self.lodge.save()
+        counts = self.counts('')
+        self.assertEqual(counts['options']['accommodation'][Accommodation.LODGE], 0)
+        self.assertEqual(counts['options']['accommodation'][Accommodation.RESORT], 3)
+
+        self.flight.delete()
+        self.assertEqual(self.counts('')['options']['transport'][TravelMode.FLIGHT], 0)
+        self.assertEqual(package_cards.refresh_packages(), 0)
@@ -0,0 +1,95 @@
+"""
+Unit tests for typo-tolerant destination and package lookup
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from adminside import fuzzy
+from adminside.models import Destination, Package
+
+
+class FuzzyLookupTest(TestCase):
+    """Test the trigram fallback index and the search views using it"""
+
+    def setUp(self):
+        fuzzy._indexes.clear()
+        self.addCleanup(fuzzy._indexes.clear)
+
+        self.kenya = Destination.objects.create(
+            name='Kenya', slug='kenya', destination_type=Destination.COUNTRY, description='Kenya'
+        )
+        self.mara = Destination.objects.create(
+            name='Maasai Mara', slug='maasai-mara', destination_type=Destination.PLACE,
+            description='Reserve', parent=self.kenya
+        )
+        self.amboseli = Destination.objects.create(
+            name='Amboseli', slug='amboseli', destination_type=Destination.PLACE,
+            description='Elephants', parent=self.kenya
+        )
+        self.cape_town = Destination.objects.create(
+            name='Cape Town', slug='cape-town', destination_type=Destination.CITY, description='Table Mountain'
+        )
+        self.package = Package.objects.create(
+            name='Amboseli Elephant Safari', slug='amboseli-elephant-safari', description='Safari',
+            main_destination=self.amboseli, duration_days=3, duration_nights=2,
+            adult_price=1500, child_price=1050, status=Package.PUBLISHED
+        )
+        self.mara_package = Package.objects.create(
+            name='Great Migration Tour', slug='great-migration-tour', description='Safari',
+            main_destination=self.mara, duration_days=5, duration_nights=4,
+            adult_price=2500, child_price=1750, status=Package.PUBLISHED
+        )
+
+    def _names(self, kind, query):
+        return [name for _, name, _ in fuzzy.search(kind, query)]
+
+    def test_trigrams_match_pg_trgm(self):
+        """Test words are padded like pg_trgm and accents are folded"""
+        self.assertEqual(fuzzy.trigrams('Mará'), {'  m', ' ma', 'mar', 'ara', 'ra '})
+        self.assertEqual(fuzzy.trigrams('a'), {'  a', ' a '})
+
+    def test_misspelled_names_match(self):
+        """Test common misspellings find the intended destination first"""
+        self.assertEqual(self._names('destinations', 'Amboselli')[0], 'Amboseli')
+        self.assertEqual(self._names('destinations', 'Capetown'), ['Cape Town'])
+        self.assertEqual(self._names('destinations', 'Masai Mara'), ['Maasai Mara'])
+        self.assertEqual(self._names('destinations', 'Zanzibar'), [])
+        self.assertEqual(self._names('destinations', 'ma'), [])
+
+    def test_index_follows_catalog_changes(self):
+        """Test the fallback index is rebuilt after a catalog save"""
+        self.assertEqual(self._names('destinations', 'Samburru'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Destination.objects.create(
+                name='Samburu', slug='samburu', destination_type=Destination.PLACE, description='Reserve'
+            )
+
+        self.assertEqual(self._names('destinations', 'Samburru'), ['Samburu'])
+
+    def test_search_redirects_to_closest_destination(self):
+        """Test the search form tolerates typos"""
+        response = self.client.post(reverse('users:search'), {'search': 'Amboselli'})
+
+        self.assertRedirects(
+            response, reverse('users:users-destination', kwargs={'id': self.amboseli.pk}),
+            fetch_redirect_response=False
+        )
+
+    def test_package_list_falls_back_to_fuzzy_matches(self):
+        """Test a misspelled package search lists close packages with a did-you-mean"""
+        response = self.client.get(reverse('adminside:package_list'), {'search': 'Masai Mara'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([package.pk for package in response.context['page_obj']], [self.mara_package.pk])
+        self.assertEqual(response.context['suggestions'], ['Maasai Mara'])
+        self.assertContains(response, 'Did you mean')
+
+    def test_exact_package_search_skips_fuzzy(self):
+        """Test exact matches are listed without suggestions"""
+        response = self.client.get(reverse('adminside:package_list'), {'search': 'Amboseli'})
+
+        self.assertEqual([package.pk for package in response.context['page_obj']], [self.package.pk])
+        self.assertEqual(response.context['suggestions'], [])
+        self.assertNotContains(response, 'Did you mean')
@@ -0,0 +1,97 @@
+"""
+Unit tests for responsive Uploadcare image URLs and template tags
+"""
+
+from types import SimpleNamespace
+
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from adminside import image_urls
+from adminside.templatetags import image_tags
+
+CDN_URL = 'https://ucarecdn.com/3f1c9a2e-5b7d-4e8a-9c0f-1a2b3c4d5e6f/-/crop/1080x1080/0,0/'
+
+
+class ImageUrlBuilderTest(TestCase):
+    """Test cases for the responsive image URL builder"""
+
+    def setUp(self):
+        image_urls.clear_cache()
+
+    def test_variants_keep_crop_and_add_transformations(self):
+        """Test that every srcset variant is resized, auto-formatted and smart-compressed"""
+        image = image_urls.build(CDN_URL, 'card')
+
+        self.assertEqual(
+            image.src,
+            CDN_URL + '-/resize/640x/-/format/auto/-/quality/smart/'
+        )
+        self.assertIn(CDN_URL + '-/resize/320x/-/format/auto/-/quality/smart/ 320w', image.srcset)
+        self.assertEqual(image.srcset.count('w,') + 1, len(image_urls.DEFAULT_PRESETS['card']['widths']))
+        self.assertEqual(image.sizes, image_urls.DEFAULT_PRESETS['card']['sizes'])
+
+    def test_urls_are_memoized(self):
+        """Test that repeated lookups for the same (url, preset) hit the LRU"""
+        image_urls.build(CDN_URL, 'hero')
+        image_urls.build(CDN_URL, 'hero')
+
+        self.assertEqual(image_urls.build.cache_info().hits, 1)
+
+    def test_unknown_preset(self):
+        """Test that an unknown preset name is rejected"""
+        with self.assertRaises(ValueError):
+            image_urls.build(CDN_URL, 'poster')
+
+    @override_settings(RESPONSIVE_IMAGE_PRESETS={'tiny': {'widths': (10,), 'src_width': 10, 'sizes': '10px'}})
+    def test_presets_from_settings(self):
+        """Test that RESPONSIVE_IMAGE_PRESETS replaces the defaults"""
+        self.assertTrue(image_urls.build(CDN_URL, 'tiny').src.endswith('-/resize/10x/-/format/auto/-/quality/smart/'))
+
+
+class ResponsiveImageTagTest(TestCase):
+    """Test cases for the responsive image template tags"""
+
+    def render(self, template, **context):
+        return Template('{% load image_tags %}' + template).render(Context(context))
+
+    def test_card_image_renders_srcset(self):
+        """Test that card_image emits srcset, sizes and lazy loading"""
+        html = self.render(
+            '{% card_image image "destinations" "img-fluid" name %}',
+            image=SimpleNamespace(cdn_url=CDN_URL), name='Masai <Mara>'
+        )
+
+        self.assertIn('srcset="', html)
+        self.assertIn('sizes="(max-width: 576px)', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('alt="Masai &lt;Mara&gt;"', html)
+
+    def test_hero_image_is_eager(self):
+        """Test that hero images are not lazy loaded"""
+        html = self.render('{% hero_image image %}', image=SimpleNamespace(cdn_url=CDN_URL))
+
+        self.assertIn('loading="eager"', html)
+        self.assertIn('-/resize/2048x/', html)
+
+    def test_missing_image_falls_back_to_default(self):
+        """Test that images without an Uploadcare URL use the default image"""
+        html = self.render('{% thumbnail_image None "accommodations" %}')
+
+        self.assertIn(image_tags.default_image_url('accommodations'), html)
+        self.assertNotIn('srcset', html)
+
+    def test_image_with_default_uses_card_preset(self):
+        """Test that the existing tag now serves resized variants"""
+        html = image_tags.image_with_default(SimpleNamespace(cdn_url=CDN_URL), 'destinations')
+        self.assertIn('-/resize/320x/', html)
+
+        original = image_tags.image_with_default(SimpleNamespace(cdn_url=CDN_URL), 'destinations', preset='')
+        self.assertNotIn('-/resize/', original)
+
+    def test_image_url_with_default_preset(self):
+        """Test that a preset resizes the URL while the default stays the original"""
+        image = SimpleNamespace(cdn_url=CDN_URL)
+
+        self.assertEqual(image_tags.image_url_with_default(image), CDN_URL)
+        self.assertIn('-/resize/1280x/', image_tags.image_url_with_default(image, preset='hero'))
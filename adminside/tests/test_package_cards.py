@@ -0,0 +1,105 @@
+"""
+Unit tests for the denormalized package card fields (adminside.package_cards)
+"""
+
+from datetime import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from adminside import package_cards
+from adminside.models import Accommodation, Destination, Package, TravelMode
+
+
+class PackageCardTest(TestCase):
+    """Test the card fields follow packages, their relations and the linked rows"""
+
+    def setUp(self):
+        self.nairobi = Destination.objects.create(
+            name='Nairobi', slug='nairobi', destination_type=Destination.CITY, description='Capital'
+        )
+        self.lodge = Accommodation.objects.create(
+            name='Mara Lodge', slug='mara-lodge', accommodation_type=Accommodation.LODGE, description='Lodge',
+            destination=self.nairobi, price_per_room_per_night=200
+        )
+        self.hotel = Accommodation.objects.create(
+            name='City Hotel', slug='city-hotel', accommodation_type=Accommodation.HOTEL, description='Hotel',
+            destination=self.nairobi, price_per_room_per_night=90
+        )
+        self.train = self.travel_mode('Madaraka Express', TravelMode.TRAIN)
+        self.flight = self.travel_mode('Mara Flight', TravelMode.FLIGHT)
+        self.package = Package.objects.create(
+            name='Safari', slug='safari', description='Safari', main_destination=self.nairobi,
+            duration_days=4, duration_nights=3, adult_price=1500, child_price=750, status=Package.PUBLISHED
+        )
+
+    def travel_mode(self, name, transport_type):
+        return TravelMode.objects.create(
+            name=name, transport_type=transport_type, departure_location='Nairobi', arrival_location='Mombasa',
+            departure_time=time(7), arrival_time=time(12), duration_minutes=300, price_per_person=50
+        )
+
+    def card(self):
+        package = Package.objects.get(pk=self.package.pk)
+        return package.display_price, package.cheapest_accommodation_id, package.primary_transport_type
+
+    def test_fields_follow_relations(self):
+        """Test the price uses the cheapest active accommodation and the transport the first travel mode"""
+        self.assertEqual(self.card(), (1500, None, ''))
+        self.assertEqual(Package.objects.get(pk=self.package.pk).travel_label, 'N/A')
+
+        self.package.available_accommodations.set([self.lodge, self.hotel])
+        self.package.available_travel_modes.set([self.train, self.flight])
+        self.assertEqual(self.card(), (1590, self.hotel.pk, TravelMode.FLIGHT))
+        self.assertEqual(Package.objects.get(pk=self.package.pk).travel_label, 'Flight')
+
+        self.flight.packages.remove(self.package)
+        self.assertEqual(self.card()[2], TravelMode.TRAIN)
+
+    def test_fields_follow_linked_rows(self):
+        """Test saving or deleting an accommodation and saving the package refresh the price"""
+        self.package.available_accommodations.set([self.lodge, self.hotel])
+
+        self.hotel.price_per_room_per_night = 250
+        self.hotel.save()
+        self.assertEqual(self.card()[:2], (1700, self.lodge.pk))
+
+        self.lodge.is_active = False
+        self.lodge.save()
+        self.assertEqual(self.card()[:2], (1750, self.hotel.pk))
+
+        self.package.refresh_from_db()
+        self.package.adult_price = 1000
+        self.package.save()
+        self.assertEqual(self.card()[0], 1250)
+
+        self.hotel.delete()
+        self.assertEqual(self.card()[:2], (1000, None))
+
+    def test_home_cards_read_no_relations(self):
+        """Test the homepage package cards come from the package rows alone"""
+        from users.views import _home_context, _home_querysets
+
+        self.package.available_accommodations.set([self.hotel])
+        self.package.available_travel_modes.set([self.train])
+
+        with CaptureQueriesContext(connection) as queries:
+            cards = _home_context(**_home_querysets())['package_data']
+
+        self.assertEqual([(card['price'], card['travel'], card['nights']) for card in cards], [(1590, 'Train', 3)])
+        self.assertFalse([query for query in queries if 'available_' in query['sql']])
+
+    def test_command_recomputes_every_package(self):
+        """Test refresh_package_cards repairs fields written around the signals"""
+        self.package.available_accommodations.set([self.hotel])
+        Package.objects.update(display_price=0, cheapest_accommodation=None, facet_mask=0)
+
+        out = StringIO()
+        call_command('refresh_package_cards', '--batch-size', '1', stdout=out)
+
+        self.assertIn('1 of 1 packages updated', out.getvalue())
+        self.assertEqual(self.card()[:2], (1590, self.hotel.pk))
+        self.assertEqual(package_cards.refresh_packages(), 0)
@@ -0,0 +1,147 @@
+"""
+Unit tests for precomputed LQIP image placeholders
+"""
+
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from adminside import image_urls, placeholders
+from adminside.models import Destination
+
+UUID = '3f1c9a2e-5b7d-4e8a-9c0f-1a2b3c4d5e6f'
+CDN_URL = f'https://ucarecdn.com/{UUID}/'
+
+
+def jpeg_bytes(color=(200, 120, 40), size=(64, 48)):
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format='JPEG')
+    return output.getvalue()
+
+
+class StandInCDNHandler(BaseHTTPRequestHandler):
+    """Serves the same small JPEG for every path and records the paths"""
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        body = jpeg_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PlaceholderTest(TestCase):
+    """Test cases for computing and storing image placeholders"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInCDNHandler)
+        cls.server.paths = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.cdn_url = f'http://127.0.0.1:{cls.server.server_address[1]}/'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.paths.clear()
+        with mock.patch('django_q.tasks.async_task'):
+            self.destination = Destination.objects.create(
+                name='Kenya',
+                slug='kenya',
+                destination_type=Destination.COUNTRY,
+                description='Beautiful East African country',
+                image=CDN_URL,
+            )
+
+    def test_encode_lqip_returns_small_data_uri(self):
+        """Test that the encoded placeholder is a tiny JPEG data URI"""
+        lqip = placeholders.encode_lqip(jpeg_bytes(size=(1024, 768)))
+
+        self.assertTrue(lqip.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(lqip), 1500)
+
+    def test_fetch_url_uses_stand_in_host(self):
+        """Test that LQIP_CDN_URL replaces the Uploadcare host"""
+        with override_settings(LQIP_CDN_URL='http://localhost:9000/'):
+            url = placeholders.fetch_url(CDN_URL)
+
+        self.assertEqual(url, f'http://localhost:9000/{UUID}/-/resize/32x/-/format/jpeg/-/quality/lightest/')
+
+    def test_backfill_stores_placeholder_and_source(self):
+        """Test that the backfill fetches each image once and stores the data URI"""
+        with override_settings(LQIP_CDN_URL=self.cdn_url):
+            results = placeholders.backfill(['adminside.Destination'], max_workers=2)
+
+        self.destination.refresh_from_db()
+        self.assertEqual(results['adminside.Destination'], (1, 0))
+        self.assertTrue(self.destination.image_lqip.startswith('data:image/jpeg;base64,'))
+        self.assertEqual(self.destination.image_lqip_source, CDN_URL)
+        self.assertEqual(self.server.paths, [f'/{UUID}/-/resize/32x/-/format/jpeg/-/quality/lightest/'])
+
+        # Up-to-date rows are skipped unless forced
+        with override_settings(LQIP_CDN_URL=self.cdn_url):
+            results = placeholders.backfill(['adminside.Destination'], max_workers=2)
+        self.assertEqual(results['adminside.Destination'], (0, 0))
+
+    def test_backfill_counts_failures(self):
+        """Test that unreachable images are counted and left without a placeholder"""
+        with override_settings(LQIP_CDN_URL='http://127.0.0.1:1/', LQIP_FETCH_TIMEOUT=1):
+            results = placeholders.backfill(['adminside.Destination'], max_workers=2)
+
+        self.destination.refresh_from_db()
+        self.assertEqual(results['adminside.Destination'], (0, 1))
+        self.assertEqual(self.destination.image_lqip, '')
+
+    def test_update_placeholder(self):
+        """Test that the task body recomputes one row"""
+        with override_settings(LQIP_CDN_URL=self.cdn_url):
+            self.assertTrue(placeholders.update_placeholder('adminside.Destination', self.destination.pk))
+
+        self.destination.refresh_from_db()
+        self.assertTrue(self.destination.image_lqip.startswith('data:image/'))
+        self.assertFalse(placeholders.needs_placeholder(self.destination, 'image'))
+
+    @mock.patch('django_q.tasks.async_task')
+    def test_changed_image_queues_task(self, async_task):
+        """Test that saving a new image queues a placeholder refresh, and an unchanged one does not"""
+        self.destination.image_lqip_source = CDN_URL
+        self.destination.save()
+        async_task.assert_not_called()
+
+        self.destination.image = 'https://ucarecdn.com/9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d/'
+        self.destination.save()
+
+        async_task.assert_called_once()
+        self.assertEqual(async_task.call_args[0][:3], (
+            'adminside.tasks.compute_image_placeholder_async', 'adminside.Destination', self.destination.pk
+        ))
+
+    def test_template_inlines_placeholder(self):
+        """Test that image tags paint the placeholder behind the image"""
+        image_urls.clear_cache()
+        lqip = placeholders.encode_lqip(jpeg_bytes())
+        self.destination.image_lqip = lqip
+        html = Template(
+            '{% load image_tags %}'
+            '{% image_with_default destination.image "destinations" "img-fluid" destination.name lqip=destination.image_lqip %}'
+        ).render(Context({'destination': self.destination}))
+
+        self.assertIn(f'style="background-image: url({lqip}); background-size: cover;"', html)
+        self.assertIn('srcset=', html)
@@ -0,0 +1,110 @@
+"""
+Unit tests for the gzipped sitemap index and per-section sitemaps
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from adminside.models import Destination
+from blog.models import Post
+from users.models import JobListing
+
+
+class SitemapTest(TestCase):
+    """Test sitemap generation, splitting and cache invalidation"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        override = override_settings(SITEMAP_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        for name in ('Maasai Mara', 'Amboseli', 'Tsavo'):
+            Destination.objects.create(
+                name=name, slug=name, destination_type=Destination.PLACE, description='Wildlife reserve'
+            )
+        Destination.objects.create(
+            name='Closed Camp', slug='closed-camp', destination_type=Destination.PLACE,
+            description='Closed', is_active=False
+        )
+
+    def _section(self, section, page=1):
+        response = self.client.get(reverse('sitemap_section', kwargs={'section': section, 'page': page}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        return gzip.decompress(b''.join(response.streaming_content)).decode()
+
+    def test_index_lists_every_section(self):
+        """Test the index links one page per section, gzip-encoded when accepted"""
+        response = self.client.get(reverse('sitemap_index'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        index = gzip.decompress(b''.join(response.streaming_content)).decode()
+        for section in ('posts', 'packages', 'destinations', 'accommodations', 'jobs'):
+            self.assertIn(f'http://testserver/sitemap-{section}-1.xml.gz', index)
+
+        plain = self.client.get(reverse('sitemap_index'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(plain.streaming_content).decode(), index)
+
+    def test_section_lists_active_rows(self):
+        """Test a section page holds the active rows with their lastmod"""
+        sitemap = self._section('destinations')
+
+        self.assertIn('<loc>http://testserver/adminside/destinations/amboseli/</loc><lastmod>', sitemap)
+        self.assertEqual(sitemap.count('<url>'), 3)
+        self.assertNotIn('closed-camp', sitemap)
+
+    def test_section_is_split_into_pages(self):
+        """Test sections roll over to a new file every SITEMAP_MAX_URLS URLs"""
+        with self.settings(SITEMAP_MAX_URLS=2):
+            index = gzip.decompress(b''.join(self.client.get(
+                reverse('sitemap_index'), HTTP_ACCEPT_ENCODING='gzip'
+            ).streaming_content)).decode()
+            first, second = self._section('destinations', 1), self._section('destinations', 2)
+            missing = self.client.get(reverse('sitemap_section', kwargs={'section': 'destinations', 'page': 3}))
+
+        self.assertIn('sitemap-destinations-2.xml.gz', index)
+        self.assertEqual((first.count('<url>'), second.count('<url>')), (2, 1))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_cache_is_reused_until_a_row_changes(self):
+        """Test unchanged sections are served from disk and rebuilt after a change"""
+        self._section('destinations')
+        builds = os.listdir(self.cache_dir)
+
+        with self.assertNumQueries(1):  # the fingerprint aggregate only
+            self._section('destinations')
+        self.assertEqual(os.listdir(self.cache_dir), builds)
+
+        Destination.objects.create(name='Samburu', slug='samburu', destination_type=Destination.PLACE, description='Reserve')
+        self.assertIn('/samburu/', self._section('destinations'))
+        self.assertEqual(len([d for d in os.listdir(self.cache_dir) if d.startswith('sitemap-destinations-')]), 1)
+
+    def test_unknown_section_is_404(self):
+        """Test only configured sections are served"""
+        response = self.client.get(reverse('sitemap_section', kwargs={'section': 'users', 'page': 1}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_blog_sitemap_redirects_to_index(self):
+        """Test the old blog sitemap URL points at the sitemap index"""
+        Post.objects.create(title='Migration Season', content='<p>Crossings</p>', status='published')
+
+        response = self.client.get(reverse('blog:blog-sitemap'))
+
+        self.assertRedirects(response, reverse('sitemap_index'), status_code=301)
+        self.assertIn('/blog/post/migration-season/', self._section('posts'))
+
+    def test_jobs_section_lists_open_positions(self):
+        """Test active job listings link to the careers detail page"""
+        JobListing.objects.create(
+            title='Safari Guide', slug='safari-guide', description='d', requirements='r', responsibilities='r'
+        )
+
+        self.assertIn('<loc>http://testserver/careers/job/safari-guide/</loc>', self._section('jobs'))
@@ -0,0 +1,119 @@
+"""
+Unit tests for the in-memory typeahead index and endpoint
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from adminside import typeahead
+from adminside.models import Accommodation, Destination, Package
+
+
+@override_settings(TYPEAHEAD_BACKGROUND_REBUILD=False)
+class TypeaheadTest(TestCase):
+    """Test prefix lookups, ranking and rebuilds of the typeahead index"""
+
+    def setUp(self):
+        typeahead._index = None
+        self.addCleanup(setattr, typeahead, '_index', None)
+
+        self.kenya = Destination.objects.create(
+            name='Kenya', slug='kenya', destination_type=Destination.COUNTRY, description='Kenya'
+        )
+        self.mara = Destination.objects.create(
+            name='Maasai Mara', slug='maasai-mara', destination_type=Destination.PLACE,
+            description='Reserve', parent=self.kenya, meta_title='Masai Mara National Reserve'
+        )
+        self.malindi = Destination.objects.create(
+            name='Malindi', slug='malindi', destination_type=Destination.PLACE,
+            description='Coast', parent=self.kenya, is_featured=True
+        )
+        Destination.objects.create(
+            name='Mount Kenya', slug='mount-kenya', destination_type=Destination.PLACE,
+            description='Hidden', is_active=False
+        )
+        self.package = Package.objects.create(
+            name='Mara Migration Safari', slug='mara-migration-safari', description='Safari',
+            main_destination=self.mara, duration_days=3, duration_nights=2,
+            adult_price=1500, child_price=1050, status=Package.PUBLISHED, total_bookings=40
+        )
+        Accommodation.objects.create(
+            name='Kâkâ Lodge', slug='kaka-lodge', description='Lodge',
+            destination=self.mara, price_per_room_per_night=100
+        )
+
+    def _names(self, query, limit=typeahead.TOP_K):
+        return [result['name'] for result in typeahead.search(query, limit)]
+
+    def test_fold_strips_accents_and_punctuation(self):
+        """Test folding lower-cases, removes accents and splits on punctuation"""
+        self.assertEqual(typeahead.fold('Zanzíbar – Stone-Town'), 'zanzibar stone town')
+
+    def test_prefix_matches_any_word_and_alias(self):
+        """Test prefixes match inner words, meta titles and accent-folded names"""
+        self.assertEqual(self._names('mig'), ['Mara Migration Safari'])
+        self.assertIn('Maasai Mara', self._names('masai'))
+        self.assertEqual(self._names('KAKA'), ['Kâkâ Lodge'])
+        self.assertEqual(self._names('mount'), [])
+
+    def test_ranking_prefers_featured_then_popular(self):
+        """Test featured entries lead and multi-word queries narrow the results"""
+        self.assertEqual(self._names('ma')[0], 'Malindi')
+        self.assertEqual(self._names('ma', limit=2), ['Malindi', 'Mara Migration Safari'])
+        self.assertEqual(self._names('mara saf'), ['Mara Migration Safari'])
+
+    def test_lookup_runs_no_queries(self):
+        """Test a warm index answers without the database"""
+        typeahead.search('ma')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('users:typeahead'), {'q': 'maasai', 'limit': 3})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()['results'][0]
+        self.assertEqual(result, {
+            'type': 'destination',
+            'name': 'Maasai Mara',
+            'context': 'Kenya',
+            'url': reverse('adminside:destination_detail', kwargs={'slug': 'maasai-mara'}),
+        })
+
+    def test_catalog_change_rebuilds_index(self):
+        """Test saving a catalog row bumps the generation on commit and refreshes the index"""
+        self.assertEqual(self._names('amb'), [])
+
+        generation = typeahead.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Destination.objects.create(
+                name='Amboseli', slug='amboseli', destination_type=Destination.PLACE, description='Elephants'
+            )
+            self.assertEqual(typeahead.current_generation(), generation)
+        self.assertNotEqual(typeahead.current_generation(), generation)
+        self.assertEqual(self._names('amb'), ['Amboseli'])
+
+        self.package.status = Package.DRAFT
+        with self.captureOnCommitCallbacks(execute=True):
+            self.package.save()
+        self.assertEqual(self._names('mig'), [])
+
+
+class SearchRedirectTest(TestCase):
+    """Test the destination search form"""
+
+    def test_search_redirects_to_first_match(self):
+        """Test a matching search redirects to the destination"""
+        destination = Destination.objects.create(
+            name='Amboseli', slug='amboseli', destination_type=Destination.COUNTRY, description='Elephants'
+        )
+
+        response = self.client.post(reverse('users:search'), {'search': '  ambos '})
+
+        self.assertRedirects(
+            response, reverse('users:users-destination', kwargs={'id': destination.pk}), fetch_redirect_response=False
+        )
+
+    def test_search_without_match_goes_back(self):
+        """Test an unmatched search returns to the referring page"""
+        response = self.client.post(reverse('users:search'), {'search': 'atlantis'}, HTTP_REFERER='/aboutus/')
+
+        self.assertRedirects(response, '/aboutus/', fetch_redirect_response=False)
@@ -0,0 +1,341 @@
+"""
+In-memory typeahead index over destination, package and accommodation names
+
+Every process keeps a PrefixIndex of the active catalog: the accent-folded
+words of each name and alias (meta title, parent destination), sorted, so the
+entries matching a prefix are one bisect away. The best TOP_K entries of every
+prefix up to SHORT_PREFIX characters are ranked at build time, since those
+ranges are the largest; longer prefixes rank their few matches per query.
+Lookups run no queries, apart from reading the shared generation (below).
+
+Catalog saves and deletes bump a content generation (in this process and in
+the shared cache) once their transaction commits, so no process can build
+an index from the old rows under the new generation. A process compares its index with the shared generation
+at most every TYPEAHEAD_CHECK_SECONDS and rebuilds in the background when it
+is stale, serving the previous index meanwhile.
+"""
+
+import bisect
+import heapq
+import logging
+import math
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+GENERATION_CACHE_KEY = 'catalog_content_generation'
+SHORT_PREFIX = 3
+TOP_K = 10
+FEATURED_BONUS = 10.0
+SLUG_PLACEHOLDER = 'typeahead-slug-placeholder'
+
+_index = None
+_index_generation = None
+_local_generation = 0
+_last_check = 0.0
+_shared_generation = None
+_build_lock = threading.Lock()
+
+
+def fold(text):
+    """
+    Lower-case ``text``, strip accents and turn punctuation into spaces
+
+    Usage:
+    fold('Zanzíbar – Stone Town')  # 'zanzibar stone town'
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c if c.isalnum() else ' ' for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+class PrefixIndex:
+    """
+    Sorted (word, entry) pairs with precomputed rankings for short prefixes
+
+    ``entries`` is a list of (result dict, score, folded names); the first
+    name is the entry's own, the rest are aliases. Entries matching through
+    their own name rank above alias-only matches, then by score. Each result
+    dict is returned as-is, so it must be JSON serialisable.
+    """
+
+    def __init__(self, entries):
+        self.results = [result for result, _, _ in entries]
+        # Position of every entry in score order; ties go to the shorter,
+        # then alphabetically first name
+        ranked = sorted(
+            range(len(entries)),
+            key=lambda entry_id: (-entries[entry_id][1], len(self.results[entry_id]['name']), self.results[entry_id]['name'])
+        )
+        self.ranked = ranked
+        self.positions = [0] * len(entries)
+        for position, entry_id in enumerate(ranked):
+            self.positions[entry_id] = position
+        self.words = [set(' '.join(names).split()) for _, _, names in entries]
+
+        self.own_words = [set(names[0].split()) for _, _, names in entries]
+
+        # (word, entry id, 0 for the entry's own name / 1 for an alias)
+        triples = []
+        for entry_id, own_words in enumerate(self.own_words):
+            triples.extend((word, entry_id, 0 if word in own_words else 1) for word in self.words[entry_id])
+        triples.sort()
+        self.keys = [word for word, _, _ in triples]
+        self.matches = [(entry_id, alias) for _, entry_id, alias in triples]
+
+        short = {}
+        for word, entry_id, alias in triples:
+            for length in range(1, min(len(word), SHORT_PREFIX) + 1):
+                matched = short.setdefault(word[:length], {})
+                matched[entry_id] = min(alias, matched.get(entry_id, 1))
+        self.short = {
+            prefix: self._rank(matched, TOP_K)
+            for prefix, matched in short.items()
+        }
+
+    def __len__(self):
+        return len(self.results)
+
+    def _rank_key(self, matched):
+        total, positions = len(self.positions), self.positions
+        return lambda entry_id: matched[entry_id] * total + positions[entry_id]
+
+    def _rank(self, matched, limit):
+        """Best ``limit`` ids of {entry id: alias flag}"""
+        return heapq.nsmallest(limit, matched, key=self._rank_key(matched))
+
+    def _range(self, prefix):
+        """Slice of ``keys`` starting with ``prefix``"""
+        start = bisect.bisect_left(self.keys, prefix)
+        return start, bisect.bisect_left(self.keys, prefix + '\U0010ffff', start)
+
+    def _matching(self, start, end):
+        """{entry id: alias flag} of the entries in a slice of ``keys``"""
+        matched = {}
+        for entry_id, alias in self.matches[start:end]:
+            matched[entry_id] = min(alias, matched.get(entry_id, 1))
+        return matched
+
+    def search(self, query, limit=TOP_K):
+        """
+        Best ``limit`` results whose words start with every word of ``query``
+
+        Usage:
+        index.search('maasai m')
+        """
+        terms = fold(query).split()
+        if not terms:
+            return []
+
+        if len(terms) == 1 and len(terms[0]) <= SHORT_PREFIX and limit <= TOP_K:
+            return [self.results[entry_id] for entry_id in self.short.get(terms[0], [])[:limit]]
+
+        # Collect the term with the fewest matching words, filter by the rest
+        ranges = sorted((end - start, start, end, term) for term, (start, end) in zip(terms, map(self._range, terms)))
+        size, start, end, first = ranges[0]
+        rest = [term for *_, term in ranges[1:]]
+        if rest and size > len(self.ranked) // 4:
+            return self._scan(terms, limit)
+        matched = self._matching(start, end)
+        if not rest:
+            return [self.results[entry_id] for entry_id in self._rank(matched, limit)]
+
+        # Check the other terms in rank order, stopping once ``limit`` pass
+        results, words = [], self.words
+        for entry_id in sorted(matched, key=self._rank_key(matched)):
+            if all(any(word.startswith(term) for word in words[entry_id]) for term in rest):
+                results.append(self.results[entry_id])
+                if len(results) == limit:
+                    break
+        return results
+
+    def _scan(self, terms, limit):
+        """
+        Walk every entry in score order: cheaper than collecting a match set
+        when all the terms are common
+        """
+        own, aliases, words = [], [], self.words
+        for entry_id in self.ranked:
+            entry_words = words[entry_id]
+            if all(any(word.startswith(term) for word in entry_words) for term in terms):
+                if any(word.startswith(terms[0]) for word in self.own_words[entry_id]):
+                    own.append(self.results[entry_id])
+                    if len(own) == limit:
+                        break
+                elif len(aliases) < limit:
+                    aliases.append(self.results[entry_id])
+        return (own + aliases)[:limit]
+
+
+def _popularity(*counts):
+    return math.log1p(sum(counts))
+
+
+def load_entries():
+    """Read the active catalog as PrefixIndex entries (three queries)"""
+    from django.db.models import Count, Q
+
+    from adminside.models import Accommodation, Destination, Package
+
+    def url_template(url_name):
+        return reverse(url_name, kwargs={'slug': SLUG_PLACEHOLDER})
+
+    entries = []
+
+    template = url_template('adminside:destination_detail')
+    destinations = (
+        Destination.objects.filter(is_active=True)
+        .annotate(published_packages=Count('packages', filter=Q(packages__status=Package.PUBLISHED)))
+        .values_list('name', 'slug', 'meta_title', 'is_featured', 'parent__name', 'published_packages')
+    )
+    for name, slug, meta_title, is_featured, parent, packages in destinations:
+        entries.append((
+            {'type': 'destination', 'name': name, 'context': parent or '',
+             'url': template.replace(SLUG_PLACEHOLDER, slug)},
+            FEATURED_BONUS * is_featured + _popularity(packages),
+            (fold(name), fold(meta_title)),
+        ))
+
+    template = url_template('adminside:package_detail')
+    packages = (
+        Package.objects.filter(status=Package.PUBLISHED)
+        .values_list('name', 'slug', 'meta_title', 'is_featured', 'main_destination__name',
+                     'total_bookings', 'total_reviews', 'rating')
+    )
+    for name, slug, meta_title, is_featured, destination, bookings, reviews, rating in packages:
+        entries.append((
+            {'type': 'package', 'name': name, 'context': destination or '',
+             'url': template.replace(SLUG_PLACEHOLDER, slug)},
+            FEATURED_BONUS * is_featured + _popularity(bookings, reviews) + float(rating) / 5,
+            (fold(name), fold(meta_title), fold(destination)),
+        ))
+
+    template = url_template('adminside:accommodation_detail')
+    accommodations = (
+        Accommodation.objects.filter(is_active=True)
+        .values_list('name', 'slug', 'is_featured', 'destination__name', 'total_reviews', 'rating')
+    )
+    for name, slug, is_featured, destination, reviews, rating in accommodations:
+        entries.append((
+            {'type': 'accommodation', 'name': name, 'context': destination or '',
+             'url': template.replace(SLUG_PLACEHOLDER, slug)},
+            FEATURED_BONUS * is_featured + _popularity(reviews) + float(rating) / 5,
+            (fold(name), fold(destination)),
+        ))
+    return entries
+
+
+def _shared():
+    """The shared content generation, read at most every TYPEAHEAD_CHECK_SECONDS"""
+    global _last_check, _shared_generation
+    now = time.monotonic()
+    if now - _last_check >= getattr(settings, 'TYPEAHEAD_CHECK_SECONDS', 30):
+        _last_check = now
+        try:
+            _shared_generation = cache.get(GENERATION_CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read the catalog content generation: {e}")
+    return _shared_generation
+
+
+def current_generation():
+    """(local, shared) content generation an up-to-date index was built at"""
+    return _local_generation, _shared()
+
+
+def shared_generation():
+    """
+    The shared content generation alone, for keys of the shared cache (the
+    local one differs between processes)
+    """
+    return _shared()
+
+
+def rebuild(generation=None):
+    """Build a fresh index and make it the current one"""
+    global _index, _index_generation
+    generation = generation or current_generation()
+    started = time.monotonic()
+    index = PrefixIndex(load_entries())
+    _index, _index_generation = index, generation
+    logger.info(f"Typeahead index rebuilt: {len(index)} entries in {time.monotonic() - started:.2f}s")
+    return index
+
+
+def _rebuild_in_background(generation):
+    try:
+        rebuild(generation)
+    except Exception as e:
+        logger.error(f"Typeahead index rebuild failed: {e}")
+    finally:
+        _build_lock.release()
+
+
+def get_index():
+    """
+    The current index: built on first use, and rebuilt in a background
+    thread once the content generation moves on
+    """
+    generation = current_generation()
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                return rebuild(generation)
+    if _index_generation != generation and _build_lock.acquire(blocking=False):
+        if getattr(settings, 'TYPEAHEAD_BACKGROUND_REBUILD', True):
+            threading.Thread(target=_rebuild_in_background, args=(generation,), daemon=True).start()
+        else:
+            _rebuild_in_background(generation)
+    return _index
+
+
+def search(query, limit=TOP_K):
+    """
+    Typeahead results for ``query``
+
+    Usage:
+    typeahead.search('serenge')  # [{'type': 'destination', 'name': 'Serengeti', ...}]
+    """
+    return get_index().search(query, limit)
+
+
+def bump_generation(using=None, **kwargs):
+    """
+    post_save/post_delete receiver marking every typeahead index stale once
+    the current transaction commits (at once outside a transaction)
+
+    Usage:
+    typeahead.bump_generation()
+    """
+    transaction.on_commit(_bump, using=using)
+
+
+def _bump():
+    global _local_generation, _last_check
+    _local_generation += 1
+    _last_check = 0.0
+    try:
+        if not cache.add(GENERATION_CACHE_KEY, 1, None):
+            cache.incr(GENERATION_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Could not bump the catalog content generation: {e}")
+
+
+def connect_signals():
+    """Connect bump_generation for the catalog models (called from AdminsideConfig.ready)"""
+    from adminside.models import Accommodation, Destination, Package, TravelMode
+
+    # Travel modes are not indexed, but the catalog API caches them under
+    # the same generation
+    for model in (Destination, Package, Accommodation, TravelMode):
+        label = model._meta.label_lower
+        post_save.connect(bump_generation, sender=model, dispatch_uid=f'typeahead_save_{label}')
+        post_delete.connect(bump_generation, sender=model, dispatch_uid=f'typeahead_delete_{label}')
@@ -1,16 +1,17 @@
 from django.urls import path
-from . import views
+from tours_travels.async_views import select_view
+from . import api, views
 
 app_name = 'adminside'
 
 urlpatterns = [
     # Destination URLs
     path('destinations/', views.destination_list, name='destination_list'),
-    path('destinations/<slug:slug>/', views.destination_detail, name='destination_detail'),
+    path('destinations/<slug:slug>/', select_view(views.destination_detail, views.adestination_detail), name='destination_detail'),
 
     # Package URLs
-    path('packages/', views.package_list, name='package_list'),
-    path('packages/<slug:slug>/', views.package_detail, name='package_detail'),
+    path('packages/', select_view(views.package_list, views.apackage_list), name='package_list'),
+    path('packages/<slug:slug>/', select_view(views.package_detail, views.apackage_detail), name='package_detail'),
     path('user-packages/', views.user_package_list, name='user_package_list'),
 
     # Accommodation URLs
@@ -24,4 +25,7 @@ urlpatterns = [
     path('ajax/destinations/', views.get_destinations_ajax, name='get_destinations_ajax'),
     path('ajax/packages/', views.get_packages_by_destination_ajax, name='get_packages_by_destination_ajax'),
     path('ajax/accommodations/', views.get_accommodations_by_destination_ajax, name='get_accommodations_by_destination_ajax'),
+
+    # Read-only catalog JSON API
+    path('api/catalog/<slug:resource>/', api.catalog, name='catalog_api'),
 ]
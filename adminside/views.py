@@ -1,8 +1,15 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.db.models import Q, Prefetch
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render, get_object_or_404
+from django.http import Http404, JsonResponse
+from django.db.models import Case, Exists, FloatField, OuterRef, Prefetch, Q, Value, When
+from django.db.models.functions import Greatest
 from django.core.paginator import Paginator
 from django.views.generic import ListView, DetailView
+from tours_travels.async_views import alist, apaginate, arender
+from tours_travels.conditional import conditional_page, related_changes
+from . import facets, fuzzy
 from .models import (
     Destination,
     Accommodation,
@@ -37,6 +44,28 @@ def destination_list(request):
     }
     return render(request, 'adminside/destination_list.html', context)
 
+def _subtree_of(prefix=''):
+    """Q matching rows whose ``prefix`` destination is OuterRef('pk') or one of its descendants"""
+    return (
+        Q(**{f'{prefix}pk': OuterRef('pk')}) |
+        Q(**{f'{prefix}parent': OuterRef('pk')}) |
+        Q(**{f'{prefix}parent__parent': OuterRef('pk')})
+    )
+
+
+def destination_validator(request, slug):
+    """Conditional GET validator row for destination_detail"""
+    return Destination.objects.filter(slug=slug, is_active=True).values_list(
+        'updated_at',
+        'image_lqip_source',
+        'parent__updated_at',
+        *related_changes(Destination.objects.filter(_subtree_of()).exclude(pk=OuterRef('pk'))),
+        *related_changes(Package.objects.filter(_subtree_of('main_destination__'), status=Package.PUBLISHED)),
+        *related_changes(Accommodation.objects.filter(_subtree_of('destination__'), is_active=True)),
+    ).first()
+
+
+@conditional_page(destination_validator)
 def destination_detail(request, slug):
     """Detail view for a specific destination"""
     destination = get_object_or_404(
@@ -66,51 +95,111 @@ def destination_detail(request, slug):
     }
     return render(request, 'adminside/destination_detail.html', context)
 
+
+def _in_active_subtree(prefix, slug):
+    """
+    Q matching rows whose ``prefix`` destination is ``slug`` or one of its
+    active descendants, as Destination.get_all_children() lists them
+    """
+    return (
+        Q(**{f'{prefix}__slug': slug}) |
+        Q(**{f'{prefix}__parent__slug': slug, f'{prefix}__is_active': True}) |
+        Q(**{
+            f'{prefix}__parent__parent__slug': slug,
+            f'{prefix}__parent__is_active': True,
+            f'{prefix}__is_active': True,
+        })
+    )
+
+
+@conditional_page(destination_validator)
+async def adestination_detail(request, slug):
+    """
+    Async destination_detail: the subtree is matched by slug, so the
+    destination, its packages and its accommodations are read together
+    """
+    destination, packages, accommodations = await asyncio.gather(
+        Destination.objects.select_related('parent').prefetch_related('children').filter(
+            slug=slug, is_active=True
+        ).afirst(),
+        alist(Package.objects.filter(
+            _in_active_subtree('main_destination', slug),
+            status=Package.PUBLISHED
+        ).select_related('main_destination').prefetch_related('available_accommodations')[:12]),
+        alist(Accommodation.objects.filter(
+            _in_active_subtree('destination', slug),
+            is_active=True
+        ).select_related('destination')[:12]),
+    )
+    if destination is None:
+        raise Http404('No Destination matches the given query.')
+
+    context = {
+        'destination': destination,
+        'packages': packages,
+        'accommodations': accommodations,
+        'page_title': destination.name
+    }
+    return await arender(request, 'adminside/destination_detail.html', context)
+
 # Package Views
-def package_list(request):
-    """Enhanced package list with modern filtering and AJAX support"""
-    packages = Package.objects.filter(status=Package.PUBLISHED).select_related('main_destination')
+PACKAGE_CATEGORIES = (
+    ('all', 'All Packages'),
+    ('multiday_bush_safaris', 'Multiday Bush Safaris'),
+    ('nairobi_excursions', 'Nairobi Excursions'),
+    ('outbound_packages', 'Outbound Packages'),
+)
 
-    # Get filter parameters
-    category = request.GET.get('category', 'all')
-    destination_id = request.GET.get('destination')
-    search_query = request.GET.get('search', '').strip()
 
-    # Category filtering based on destination type
-    if category != 'all':
-        if category == 'multiday_bush_safaris':
-            packages = packages.filter(
-                Q(name__icontains='multiday') |
-                Q(description__icontains='multiday') |
-                Q(name__icontains='bush safari') |
-                Q(description__icontains='bush safari') |
-                Q(name__icontains='safari') |
-                Q(description__icontains='safari')
-            )
-        elif category == 'nairobi_excursions':
-            packages = packages.filter(
-                Q(main_destination__name__icontains='nairobi') |
-                Q(name__icontains='nairobi') |
-                Q(description__icontains='nairobi') |
-                Q(name__icontains='excursion') |
-                Q(description__icontains='excursion')
-            )
-        elif category == 'outbound_packages':
-            packages = packages.filter(
-                Q(name__icontains='outbound') |
-                Q(description__icontains='outbound')
-            )
+def _category_filter(category):
+    """Q of a package_list filter pill (empty for 'all' and unknown pills)"""
+    if category == 'multiday_bush_safaris':
+        return (
+            Q(name__icontains='multiday') |
+            Q(description__icontains='multiday') |
+            Q(name__icontains='bush safari') |
+            Q(description__icontains='bush safari') |
+            Q(name__icontains='safari') |
+            Q(description__icontains='safari')
+        )
+    if category == 'nairobi_excursions':
+        return (
+            Q(main_destination__name__icontains='nairobi') |
+            Q(name__icontains='nairobi') |
+            Q(description__icontains='nairobi') |
+            Q(name__icontains='excursion') |
+            Q(description__icontains='excursion')
+        )
+    if category == 'outbound_packages':
+        return Q(name__icontains='outbound') | Q(description__icontains='outbound')
+    return Q()
 
-    # Filter by specific destination if provided
-    if destination_id:
-        try:
-            destination = Destination.objects.get(id=destination_id, is_active=True)
-            destination_ids = [destination.id] + [child.id for child in destination.get_all_children()]
-            packages = packages.filter(main_destination_id__in=destination_ids)
-        except Destination.DoesNotExist:
-            pass
 
-    # Search functionality
+def _category_querysets():
+    """Published packages of each filter pill, in PACKAGE_CATEGORIES order"""
+    published = Package.objects.filter(status=Package.PUBLISHED)
+    return [published.filter(_category_filter(key)) for key, _ in PACKAGE_CATEGORIES]
+
+
+def _package_list_params(request):
+    return (
+        request.GET.get('category', 'all'),
+        request.GET.get('destination'),
+        request.GET.get('search', '').strip(),
+    )
+
+
+def _listed_packages(category, destination_ids, search_query):
+    """
+    (listed, unsearched) package querysets of package_list: published
+    packages of the pill and destination subtree, then the search
+    """
+    packages = Package.objects.filter(status=Package.PUBLISHED).select_related('main_destination')
+    packages = packages.filter(_category_filter(category))
+    if destination_ids:
+        packages = packages.filter(main_destination_id__in=destination_ids)
+
+    unsearched = packages
     if search_query:
         packages = packages.filter(
             Q(name__icontains=search_query) |
@@ -118,73 +207,208 @@ def package_list(request):
             Q(main_destination__name__icontains=search_query) |
             Q(inclusions__icontains=search_query)
         )
+    return packages, unsearched
 
-    # Handle AJAX requests for dynamic filtering
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        from django.template.loader import render_to_string
-
-        # Pagination for AJAX
-        paginator = Paginator(packages, 12)
-        page_number = request.GET.get('page', 1)
-        page_obj = paginator.get_page(page_number)
 
-        html = render_to_string('adminside/package_cards.html', {
-            'page_obj': page_obj,
-            'request': request
-        })
+def _is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
-        return JsonResponse({
-            'html': html,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'current_page': page_obj.number,
-            'total_pages': paginator.num_pages,
-            'total_count': paginator.count
-        })
-
-    # Regular pagination for non-AJAX requests
-    paginator = Paginator(packages, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
 
-    # Get destination categories for filter pills
-    categories = [
-        {'key': 'all', 'name': 'All Packages', 'count': Package.objects.filter(status=Package.PUBLISHED).count()},
-        {'key': 'multiday_bush_safaris', 'name': 'Multiday Bush Safaris', 'count': Package.objects.filter(status=Package.PUBLISHED).filter(Q(name__icontains='multiday') | Q(description__icontains='multiday') | Q(name__icontains='bush safari') | Q(description__icontains='bush safari') | Q(name__icontains='safari') | Q(description__icontains='safari')).count()},
-        {'key': 'nairobi_excursions', 'name': 'Nairobi Excursions', 'count': Package.objects.filter(status=Package.PUBLISHED).filter(Q(main_destination__name__icontains='nairobi') | Q(name__icontains='nairobi') | Q(description__icontains='nairobi') | Q(name__icontains='excursion') | Q(description__icontains='excursion')).count()},
-        {'key': 'outbound_packages', 'name': 'Outbound Packages', 'count': Package.objects.filter(status=Package.PUBLISHED).filter(Q(name__icontains='outbound') | Q(description__icontains='outbound')).count()},
-    ]
+def _package_cards_response(request, paginator, page_obj, suggestions, facet_groups):
+    """JSON of the package cards and facet panel, for AJAX filtering"""
+    from django.template.loader import render_to_string
 
-    context = {
+    html = render_to_string('adminside/package_cards.html', {
+        'page_obj': page_obj,
+        'suggestions': suggestions,
+        'request': request
+    })
+    facets_html = render_to_string('adminside/facet_filters.html', {'facets': facet_groups})
+
+    return JsonResponse({
+        'html': html,
+        'facets_html': facets_html,
+        'has_next': page_obj.has_next(),
+        'has_previous': page_obj.has_previous(),
+        'current_page': page_obj.number,
+        'total_pages': paginator.num_pages,
+        'total_count': paginator.count
+    })
+
+
+def _package_list_context(request, page_obj, counts, suggestions, facet_groups):
+    category, destination_id, search_query = _package_list_params(request)
+    return {
         'page_obj': page_obj,
-        'categories': categories,
+        'facets': facet_groups,
+        'filter_query': facets.filter_query(request.GET),
+        # Destination categories for filter pills
+        'categories': [
+            {'key': key, 'name': name, 'count': count}
+            for (key, name), count in zip(PACKAGE_CATEGORIES, counts)
+        ],
         'current_category': category,
         'current_destination_id': destination_id,
         'search_query': search_query,
+        'suggestions': suggestions,
         'page_title': 'Travel Packages - Mbugani Luxe Adventures',
         'meta_description': 'Discover luxury safari packages and adventure tours with Mbugani Luxe Adventures. Explore Uganda, Kenya, Tanzania and more with our premium travel experiences.'
     }
+
+
+def package_list(request):
+    """Enhanced package list with modern filtering and AJAX support"""
+    category, destination_id, search_query = _package_list_params(request)
+
+    # Filter by specific destination if provided
+    destination_ids = None
+    if destination_id:
+        try:
+            destination = Destination.objects.get(id=destination_id, is_active=True)
+            destination_ids = [destination.id] + [child.id for child in destination.get_all_children()]
+        except Destination.DoesNotExist:
+            pass
+
+    state = facets.FilterState.from_query(facets.PACKAGE_FACETS, request.GET)
+    packages, unsearched = _listed_packages(category, destination_ids, search_query)
+    suggestions = []
+    facet_counts = facets.count(facets.PACKAGE_FACETS, packages, state)
+    if search_query and facet_counts['all'] == 0:
+        # No exact match: fall back to typo-tolerant name matching
+        packages = _fuzzy_packages(unsearched, search_query)
+        facet_counts = facets.count(facets.PACKAGE_FACETS, packages, state)
+        suggestions = fuzzy.suggest(search_query)
+    paginator = Paginator(packages.filter(state.q()), 12)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    facet_groups = facets.groups(facets.PACKAGE_FACETS, state, facet_counts, request.GET)
+
+    # Handle AJAX requests for dynamic filtering
+    if _is_ajax(request):
+        return _package_cards_response(request, paginator, page_obj, suggestions, facet_groups)
+
+    counts = [queryset.count() for queryset in _category_querysets()]
+    context = _package_list_context(request, page_obj, counts, suggestions, facet_groups)
     return render(request, 'adminside/package_list.html', context)
 
-def package_detail(request, slug):
-    """Detail view for a specific package"""
-    package = get_object_or_404(
-        Package.objects.select_related('main_destination').prefetch_related(
-            'available_accommodations',
-            'available_travel_modes',
-            'itinerary__days__destination',
-            'itinerary__days__accommodation'
+
+async def _asubtree_ids(destination_id):
+    """Ids of an active destination and its active descendants, None if it is unknown"""
+    if not destination_id:
+        return None
+    try:
+        destination = await Destination.objects.aget(id=destination_id, is_active=True)
+    except Destination.DoesNotExist:
+        return None
+    children = await sync_to_async(destination.get_all_children)()
+    return [destination.id] + [child.id for child in children]
+
+
+async def apackage_list(request):
+    """Async package_list: the destination lookup and filter pill counts are gathered"""
+    category, destination_id, search_query = _package_list_params(request)
+    counts = [] if _is_ajax(request) else [queryset.acount() for queryset in _category_querysets()]
+    destination_ids, *counts = await asyncio.gather(_asubtree_ids(destination_id), *counts)
+
+    state = facets.FilterState.from_query(facets.PACKAGE_FACETS, request.GET)
+    packages, unsearched = _listed_packages(category, destination_ids, search_query)
+    suggestions = []
+    facet_counts = await sync_to_async(facets.count)(facets.PACKAGE_FACETS, packages, state)
+    if search_query and facet_counts['all'] == 0:
+        # No exact match: fall back to typo-tolerant name matching
+        packages = await sync_to_async(_fuzzy_packages)(unsearched, search_query)
+        facet_counts, suggestions = await asyncio.gather(
+            sync_to_async(facets.count)(facets.PACKAGE_FACETS, packages, state),
+            sync_to_async(fuzzy.suggest)(search_query),
+        )
+    paginator, page_obj = await apaginate(packages.filter(state.q()), 12, request.GET.get('page'))
+    facet_groups = facets.groups(facets.PACKAGE_FACETS, state, facet_counts, request.GET)
+
+    if _is_ajax(request):
+        return await sync_to_async(_package_cards_response)(request, paginator, page_obj, suggestions, facet_groups)
+
+    context = _package_list_context(request, page_obj, counts, suggestions, facet_groups)
+    return await arender(request, 'adminside/package_list.html', context)
+
+def _fuzzy_packages(packages, search_query):
+    """
+    Packages whose name, or main destination's name, is close to
+    ``search_query`` (see adminside.fuzzy), closest first
+    """
+    scores = {}
+    for pk, _, score in fuzzy.search('packages', search_query):
+        scores[('package', pk)] = score
+    for pk, _, score in fuzzy.search('destinations', search_query):
+        scores[('destination', pk)] = score
+    if not scores:
+        return packages.none()
+
+    package_ids = [pk for kind, pk in scores if kind == 'package']
+    destination_ids = [pk for kind, pk in scores if kind == 'destination']
+    score_field = FloatField()
+    return packages.filter(
+        Q(pk__in=package_ids) | Q(main_destination_id__in=destination_ids)
+    ).annotate(
+        name_score=Case(
+            *[When(pk=pk, then=Value(scores[('package', pk)], output_field=score_field)) for pk in package_ids],
+            default=Value(0.0), output_field=score_field
         ),
-        slug=slug,
-        status=Package.PUBLISHED
+        destination_score=Case(
+            *[When(main_destination_id=pk, then=Value(scores[('destination', pk)], output_field=score_field))
+              for pk in destination_ids],
+            default=Value(0.0), output_field=score_field
+        ),
+    ).order_by(Greatest('name_score', 'destination_score').desc(), '-is_featured', 'name')
+
+
+def package_validator(request, slug):
+    """Conditional GET validator row for package_detail"""
+    package = OuterRef('pk')
+    return Package.objects.filter(slug=slug, status=Package.PUBLISHED).values_list(
+        'updated_at',
+        'featured_image_lqip_source',
+        'main_destination__updated_at',
+        *related_changes(Itinerary.objects.filter(package=package)),
+        *related_changes(ItineraryDay.objects.filter(itinerary__package=package)),
+        *related_changes(Destination.objects.filter(itinerary_days__itinerary__package=package)),
+        *related_changes(Accommodation.objects.filter(
+            Q(packages=package) | Q(itinerary_days__itinerary__package=package)
+        )),
+        *related_changes(TravelMode.objects.filter(packages=package)),
+    ).first()
+
+
+def _package_detail_queryset():
+    return Package.objects.select_related('main_destination').prefetch_related(
+        'available_accommodations',
+        'available_travel_modes',
+        'itinerary__days__destination',
+        'itinerary__days__accommodation'
     )
 
+
+@conditional_page(package_validator)
+def package_detail(request, slug):
+    """Detail view for a specific package"""
+    package = get_object_or_404(_package_detail_queryset(), slug=slug, status=Package.PUBLISHED)
+
     context = {
         'package': package,
         'page_title': package.name
     }
     return render(request, 'adminside/package_detail.html', context)
 
+
+@conditional_page(package_validator)
+async def apackage_detail(request, slug):
+    """Async package_detail"""
+    package = await aget_object_or_404(_package_detail_queryset(), slug=slug, status=Package.PUBLISHED)
+
+    context = {
+        'package': package,
+        'page_title': package.name
+    }
+    return await arender(request, 'adminside/package_detail.html', context)
+
 # Accommodation Views
 def accommodation_list(request):
     """List accommodations with filtering by destination hierarchy"""
@@ -201,11 +425,6 @@ def accommodation_list(request):
         except Destination.DoesNotExist:
             pass
 
-    # Filter by accommodation type
-    accommodation_type = request.GET.get('type')
-    if accommodation_type:
-        accommodations = accommodations.filter(accommodation_type=accommodation_type)
-
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
@@ -215,8 +434,12 @@ def accommodation_list(request):
             Q(destination__name__icontains=search_query)
         )
 
+    # Type, price and rating facets, counted in one query
+    state = facets.FilterState.from_query(facets.ACCOMMODATION_FACETS, request.GET)
+    facet_counts = facets.count(facets.ACCOMMODATION_FACETS, accommodations, state)
+
     # Pagination
-    paginator = Paginator(accommodations, 12)
+    paginator = Paginator(accommodations.filter(state.q()), 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -240,13 +463,27 @@ def accommodation_list(request):
         'page_obj': page_obj,
         'countries': countries,
         'current_destination_id': destination_id,
-        'current_type': accommodation_type,
         'search_query': search_query,
-        'accommodation_types': Accommodation.ACCOMMODATION_TYPES,
+        'facets': facets.groups(facets.ACCOMMODATION_FACETS, state, facet_counts, request.GET),
+        'has_facet_filters': bool(state),
+        'filter_query': facets.filter_query(request.GET),
         'page_title': 'Accommodations'
     }
     return render(request, 'adminside/accommodation_list.html', context)
 
+def accommodation_validator(request, slug):
+    """Conditional GET validator row for accommodation_detail"""
+    return Accommodation.objects.filter(slug=slug, is_active=True).values_list(
+        'updated_at',
+        'image_lqip_source',
+        'destination__updated_at',
+        *related_changes(Package.objects.filter(
+            available_accommodations=OuterRef('pk'), status=Package.PUBLISHED
+        )),
+    ).first()
+
+
+@conditional_page(accommodation_validator)
 def accommodation_detail(request, slug):
     """Detail view for a specific accommodation"""
     accommodation = get_object_or_404(
@@ -317,11 +554,14 @@ def get_destinations_ajax(request):
             is_active=True
         ).order_by('display_order', 'name')
 
+    destinations = destinations.annotate(
+        has_children=Exists(Destination.objects.filter(parent=OuterRef('pk'), is_active=True))
+    )
     data = [{
         'id': dest.id,
         'name': dest.name,
         'type': dest.destination_type,
-        'has_children': dest.children.filter(is_active=True).exists()
+        'has_children': dest.has_children
     } for dest in destinations]
 
     return JsonResponse({'destinations': data})
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from . import related, view_counts
+        related.connect_signals()
+        post_migrate.connect(view_counts.ensure_schedule, sender=self)
+        post_migrate.connect(related.ensure_schedule, sender=self)
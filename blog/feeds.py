@@ -0,0 +1,79 @@
+"""
+RSS and Atom feeds of the latest published posts
+
+The feeds are written once per change of the published posts (count and
+newest ``updated``) into gzip files next to the sitemaps and served from disk,
+like tours_travels.sitemaps.
+"""
+
+import gzip
+import os
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from tours_travels import sitemaps
+
+FEED_TITLE = 'Mbugani Luxe Adventures Blog'
+FEED_DESCRIPTION = 'Safari stories, travel guides and news from Mbugani Luxe Adventures'
+
+FEED_TYPES = {
+    'rss': (Rss201rev2Feed, 'blog:blog-rss'),
+    'atom': (Atom1Feed, 'blog:blog-atom'),
+}
+
+
+def _feed_items():
+    return getattr(settings, 'BLOG_FEED_ITEMS', 20)
+
+
+def write_feed(kind, path):
+    """Write the ``kind`` feed of the latest BLOG_FEED_ITEMS posts to a gzip file"""
+    from blog.models import Post
+
+    feed_class, url_name = FEED_TYPES[kind]
+    site_url = sitemaps.site_url()
+    feed = feed_class(
+        title=FEED_TITLE,
+        link=site_url + reverse('blog:blog-list'),
+        description=FEED_DESCRIPTION,
+        feed_url=site_url + reverse(url_name),
+        language=settings.LANGUAGE_CODE,
+    )
+    url_template = site_url + reverse('blog:blog-detail', kwargs={'slug': sitemaps.SLUG_PLACEHOLDER})
+    rows = (
+        Post.objects.filter(status='published')
+        .order_by('-date')
+        .values_list('title', 'slug', 'summary', 'date', 'updated', 'category__title')[:_feed_items()]
+    )
+    for title, slug, summary, date, updated, category in rows.iterator():
+        link = url_template.replace(sitemaps.SLUG_PLACEHOLDER, slug)
+        feed.add_item(
+            title=title,
+            link=link,
+            description=summary or '',
+            unique_id=link,
+            pubdate=date,
+            updateddate=updated,
+            categories=[category] if category else None,
+        )
+
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        feed.write(f, 'utf-8')
+
+
+def build_feed(kind):
+    """Path of the current gzipped ``kind`` feed, building it if needed"""
+    rows, updated = sitemaps.section_state('posts')
+    version = sitemaps.fingerprint(kind, rows, updated, _feed_items())
+    directory = sitemaps.cached_build(
+        f'feed-{kind}', version, lambda directory: write_feed(kind, os.path.join(directory, 'feed.xml.gz'))
+    )
+    return os.path.join(directory, 'feed.xml.gz')
+
+
+def feed_response(request, kind):
+    """Serve the ``kind`` feed (see sitemaps.gzip_file_response)"""
+    feed_class, _ = FEED_TYPES[kind]
+    return sitemaps.gzip_file_response(request, build_feed(kind), feed_class.content_type)
@@ -0,0 +1,41 @@
+"""
+Fill the derived plain-text columns of blog posts (plain text, word count,
+read minutes, summary, meta description) in chunks
+
+Usage:
+    python manage.py backfill_post_text
+    python manage.py backfill_post_text --all --chunk-size 500
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Compute the derived text columns of blog posts that have none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Posts loaded and updated per batch (default: 200)')
+        parser.add_argument('--all', action='store_true', help='Recompute posts that already have derived text')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        posts = Post.objects.all() if options['all'] else Post.objects.filter(read_minutes__isnull=True)
+        post_ids = list(posts.order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f'Computing derived text for {len(post_ids)} posts...')
+
+        for start in range(0, len(post_ids), chunk_size):
+            chunk = list(
+                Post.objects.filter(pk__in=post_ids[start:start + chunk_size]).only('pk', 'content', 'excerpt')
+            )
+            for post in chunk:
+                post.update_derived_text()
+            # bulk_update leaves the auto_now 'updated' timestamp alone
+            Post.objects.bulk_update(chunk, Post.DERIVED_TEXT_FIELDS)
+            self.stdout.write(f'  {min(start + chunk_size, len(post_ids))}/{len(post_ids)}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Derived text stored for {len(post_ids)} posts'))
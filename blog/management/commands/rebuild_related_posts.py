@@ -0,0 +1,23 @@
+"""
+Rebuild the precomputed related-posts index of every published blog post
+
+Usage:
+    python manage.py rebuild_related_posts
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import related
+
+
+class Command(BaseCommand):
+    help = 'Recompute Post.related_post_ids from tag overlap, category and recency'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = related.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Related posts stored for {count} posts in {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_alter_category_options_alter_post_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Inline blurred placeholder (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_lqip_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+    ]
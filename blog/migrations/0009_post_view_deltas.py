@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.PositiveIntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('applied', models.BooleanField(default=False)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_deltas', to='blog.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['applied', 'id'], name='blog_postvi_applied_bc5283_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_view_deltas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='meta_description',
+            field=models.CharField(blank=True, editable=False, max_length=170, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='plain_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='read_minutes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='summary',
+            field=models.TextField(blank=True, editable=False, help_text='Excerpt HTML, or the start of the content', null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_derived_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='related_post_ids',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
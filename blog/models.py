@@ -4,11 +4,11 @@ from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
 from taggit.managers import TaggableManager
-from html import unescape
-from django.utils.html import strip_tags
+from django.utils.html import escape
 from shortuuid.django_fields import ShortUUIDField
 from pyuploadcare.dj.models import ImageField
 from django_ckeditor_5.fields import CKEditor5Field
+from tours_travels import text
 
 
 BLOG_PUBLISH_STATUS = (
@@ -49,6 +49,8 @@ class Category(models.Model):
 class Post(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     image = ImageField(blank=True, null=True, manual_crop="4:4",)
+    image_lqip = models.TextField(blank=True, default='', editable=False, help_text="Inline blurred placeholder (data URI)")
+    image_lqip_source = models.CharField(max_length=500, blank=True, default='', editable=False)
     title = models.CharField(max_length=1000)
     slug = models.SlugField(max_length=1000, unique=True, blank=True, help_text="SEO-friendly URL slug (auto-generated from title)")
     excerpt = CKEditor5Field(config_name='default', blank=True, null=True, help_text="Brief description of the post")
@@ -61,8 +63,20 @@ class Post(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     views = models.PositiveIntegerField(default=0)
+    # Derived from content/excerpt on save (update_derived_text); NULL until backfilled
+    plain_text = models.TextField(blank=True, default='', editable=False)
+    word_count = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    read_minutes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    summary = models.TextField(null=True, blank=True, editable=False, help_text="Excerpt HTML, or the start of the content")
+    meta_description = models.CharField(max_length=170, null=True, blank=True, editable=False)
+    # Precomputed by blog.related; NULL until the index has been built
+    related_post_ids = models.JSONField(null=True, blank=True, editable=False)
     pid = ShortUUIDField(length=10, max_length=25, alphabet="abcdefghijklmnopqrstuvxyz")
 
+    DERIVED_TEXT_FIELDS = ('plain_text', 'word_count', 'read_minutes', 'summary', 'meta_description')
+    # Columns listing pages never render
+    LISTING_DEFERRED_FIELDS = ('content', 'plain_text', 'excerpt')
+
     class Meta:
         verbose_name = "Posts"
         verbose_name_plural = "Posts"
@@ -92,35 +106,48 @@ class Post(models.Model):
                 counter += 1
 
             self.slug = slug
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.update_derived_text()
+        elif {'content', 'excerpt'} & set(update_fields):
+            self.update_derived_text()
+            kwargs['update_fields'] = set(update_fields) | set(self.DERIVED_TEXT_FIELDS)
         super().save(*args, **kwargs)
 
+    def update_derived_text(self):
+        """Recompute the plain-text columns from content and excerpt"""
+        self.plain_text = text.html_to_text(self.content)
+        self.word_count = text.word_count(self.plain_text)
+        self.read_minutes = text.read_minutes(self.word_count)
+
+        # The excerpt counts only if it has visible text (not just empty HTML)
+        if text.html_to_text(self.excerpt):
+            self.summary = self.excerpt
+        else:
+            self.summary = escape(text.truncate_text(self.plain_text, 150))
+        self.meta_description = text.truncate_text(text.html_to_text(self.summary), 160)
+
     def get_absolute_url(self):
         """Return the canonical URL for this post"""
         return reverse('blog:blog-detail', kwargs={'slug': self.slug})
 
     def get_read_time(self):
-        string = self.content + unescape(strip_tags(self.content))
-        total_words = len((string).split())
-
-        return round(total_words / 200)
+        if self.read_minutes is None:
+            return text.read_minutes(text.word_count(text.html_to_text(self.content)))
+        return self.read_minutes
 
     def get_excerpt(self):
         """Return excerpt if available, otherwise generate from content"""
-        if self.excerpt:
-            # Check if excerpt has meaningful content (not just empty HTML)
-            clean_excerpt = strip_tags(self.excerpt).strip()
-            if clean_excerpt and clean_excerpt != '&nbsp;':
-                return self.excerpt
-
-        # Auto-generate excerpt from content (first 150 characters)
-        clean_content = strip_tags(self.content)
-        return clean_content[:150] + "..." if len(clean_content) > 150 else clean_content
+        if self.summary is None:
+            self.update_derived_text()
+        return self.summary
 
     def get_meta_description(self):
         """Return SEO meta description (max 160 characters)"""
-        excerpt = self.get_excerpt()
-        clean_excerpt = strip_tags(excerpt)
-        return clean_excerpt[:160] + "..." if len(clean_excerpt) > 160 else clean_excerpt
+        if self.meta_description is None:
+            self.update_derived_text()
+        return self.meta_description
 
     def get_reading_time_display(self):
         """Return formatted reading time"""
@@ -128,11 +155,19 @@ class Post(models.Model):
         return f"{time} min read" if time > 0 else "Quick read"
 
     def get_related_posts(self, limit=6):
-        """Get related posts from same category"""
+        """
+        Related posts from the precomputed index (blog.related), fetched by
+        primary key; posts without an index entry yet get the same category
+        """
+        if self.related_post_ids is not None:
+            ids = self.related_post_ids[:limit]
+            posts = Post.objects.filter(pk__in=ids, status='published').defer(*self.LISTING_DEFERRED_FIELDS).in_bulk()
+            return [posts[pk] for pk in ids if pk in posts]
+
         return Post.objects.filter(
             category=self.category,
             status='published'
-        ).exclude(pk=self.pk).order_by('-views', '-date')[:limit]
+        ).defer(*self.LISTING_DEFERRED_FIELDS).exclude(pk=self.pk).order_by('-views', '-date')[:limit]
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -146,4 +181,24 @@ class Comment(models.Model):
         ordering = ['-date']
 
     def __str__(self):
-        return self.comment[0:20]
\ No newline at end of file
+        return self.comment[0:20]
+
+
+class PostViewDelta(models.Model):
+    """
+    Views buffered by a web worker (blog.view_counts), added to Post.views
+    by the scheduled blog.tasks.flush_post_views task and kept for the
+    trending window
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='view_deltas')
+    views = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    applied = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['applied', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id}: +{self.views}"
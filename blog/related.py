@@ -0,0 +1,325 @@
+"""
+Precomputed related-posts index
+
+Each published post stores the ids of its BLOG_RELATED_COUNT most similar
+published posts in Post.related_post_ids, so blog_detail fetches them by
+primary key in one query. Similarity is computed over the sparse post x tag
+matrix: the cosine of the posts' IDF-weighted tag vectors, plus a bonus for
+sharing a category and a recency bonus that halves every
+RECENCY_HALF_LIFE_DAYS. Dot products are accumulated through the tag -> posts
+inverted index, so the cost follows the number of overlapping pairs rather
+than posts squared.
+
+Tag, category and status changes of published posts queue
+``blog.tasks.update_related_posts_async``; saves that change none of them
+queue nothing. The task recomputes only the changed posts, the posts now
+sharing a tag with them and the posts whose stored lists mention them,
+reading just the part of the matrix those lists need. A daily schedule
+rebuilds every list so the recency bonus and category mates stay current.
+"""
+
+import heapq
+import logging
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_WEIGHT = 0.3
+RECENCY_WEIGHT = 0.2
+RECENCY_HALF_LIFE_DAYS = 180
+SCHEDULE_NAME = 'Rebuild related blog posts'
+
+TRACKED_FIELDS = {'category', 'category_id', 'status'}
+
+
+class TagMatrix:
+    """
+    Sparse post x tag matrix of the published posts, with its inverted
+    indexes (tag -> posts, category -> posts newest first)
+
+    A partial matrix passes the published post count and the tag post
+    counts, so the IDF weights match the full matrix.
+    """
+
+    def __init__(self, posts, post_tags, now=None, total=None, tag_counts=None):
+        # posts: {post id: (category id, date)}; post_tags: {post id: set of tag ids}
+        self.posts = posts
+        self.post_tags = post_tags
+        self.tag_posts = defaultdict(set)
+        for post_id, tags in post_tags.items():
+            for tag_id in tags:
+                self.tag_posts[tag_id].add(post_id)
+        self.category_posts = defaultdict(list)
+        for post_id, (category_id, date) in sorted(posts.items(), key=lambda item: (item[1][1], item[0]), reverse=True):
+            if category_id is not None:
+                self.category_posts[category_id].append(post_id)
+
+        total = len(posts) if total is None else total
+        tag_counts = tag_counts or {}
+        self.idf = {
+            tag_id: math.log((total + 1) / (tag_counts.get(tag_id, len(tagged)) + 1)) + 1
+            for tag_id, tagged in self.tag_posts.items()
+        }
+        self.norms = {
+            post_id: math.sqrt(sum(self.idf[tag_id] ** 2 for tag_id in tags))
+            for post_id, tags in post_tags.items()
+        }
+        self.inverse_norms = {post_id: 1 / self.norms[post_id] if post_id in self.norms else 0.0 for post_id in posts}
+        self.categories = {post_id: category_id for post_id, (category_id, _) in posts.items()}
+
+        now = now or timezone.now()
+        self.recency = {
+            post_id: RECENCY_WEIGHT * 0.5 ** (max((now - date).total_seconds() / 86400, 0) / RECENCY_HALF_LIFE_DAYS)
+            for post_id, (_, date) in posts.items()
+        }
+
+    @classmethod
+    def load(cls, post_ids=None):
+        """
+        Read the matrix for all published posts (two queries), or only the
+        part top_related needs for ``post_ids``: the posts sharing a tag with
+        them, the newest posts of their categories and every tag of those
+        """
+        from django.db.models import Count
+
+        from blog.models import Post
+
+        published = Post.objects.filter(status='published')
+        tagged = _tagged_items()
+        total = tag_counts = None
+        if post_ids is not None:
+            categories = dict(published.filter(pk__in=post_ids).values_list('pk', 'category_id'))
+            loaded = set(categories)
+            loaded.update(
+                tagged.filter(tag_id__in=tagged.filter(object_id__in=categories).values('tag_id'))
+                .values_list('object_id', flat=True)
+            )
+            limit = _related_count()
+            for category_id in set(categories.values()) - {None}:
+                loaded.update(
+                    published.filter(category_id=category_id).order_by('-date', '-pk')
+                    .values_list('pk', flat=True)[:limit + 1]
+                )
+            total = published.count()
+            tag_counts = dict(
+                tagged.filter(tag_id__in=tagged.filter(object_id__in=loaded).values('tag_id'))
+                .order_by().values('tag_id').annotate(posts=Count('pk')).values_list('tag_id', 'posts')
+            )
+            published = published.filter(pk__in=loaded)
+            tagged = tagged.filter(object_id__in=loaded)
+
+        posts = {
+            post_id: (category_id, date)
+            for post_id, category_id, date in published.values_list('pk', 'category_id', 'date')
+        }
+        post_tags = defaultdict(set)
+        for post_id, tag_id in tagged.values_list('object_id', 'tag_id'):
+            post_tags[post_id].add(tag_id)
+        return cls(posts, dict(post_tags), total=total, tag_counts=tag_counts)
+
+    def top_related(self, post_id, limit):
+        """
+        Ids of the ``limit`` most similar posts, best first
+
+        score = cosine of the IDF-weighted tag vectors
+                + CATEGORY_WEIGHT for the same category
+                + RECENCY_WEIGHT halving every RECENCY_HALF_LIFE_DAYS
+        """
+        if post_id not in self.posts:
+            return []
+
+        # Dot products with every post sharing a tag, through the inverted index
+        dots = {}
+        for tag_id in self.post_tags.get(post_id, ()):
+            weight = self.idf[tag_id] ** 2
+            for other_id in self.tag_posts[tag_id]:
+                dots[other_id] = dots.get(other_id, 0.0) + weight
+        # Without shared tags only recency separates category mates, so the
+        # newest few are the only ones that can make the list
+        category_id = self.posts[post_id][0]
+        if category_id is not None:
+            for other_id in self.category_posts[category_id][:limit + 1]:
+                dots.setdefault(other_id, 0.0)
+        dots.pop(post_id, None)
+
+        inverse_norm = 1 / self.norms[post_id] if post_id in self.norms else 0.0
+        inverse_norms, base_scores, categories = self.inverse_norms, self.recency, self.categories
+        scored = [
+            (
+                dot * inverse_norm * inverse_norms[other_id] + base_scores[other_id]
+                + (CATEGORY_WEIGHT if category_id is not None and categories[other_id] == category_id else 0.0),
+                other_id,
+            )
+            for other_id, dot in dots.items()
+        ]
+        # Ties go to the newer post
+        return [other_id for _, other_id in heapq.nlargest(limit, scored)]
+
+
+def _related_count():
+    return getattr(settings, 'BLOG_RELATED_COUNT', 6)
+
+
+def _tagged_items():
+    """taggit's TaggedItem rows of the published posts"""
+    from django.contrib.contenttypes.models import ContentType
+    from taggit.models import TaggedItem
+
+    from blog.models import Post
+
+    return TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Post),
+        object_id__in=Post.objects.filter(status='published').values('pk'),
+    )
+
+
+def _listing(post_ids):
+    """Ids of the posts whose stored list mentions one of ``post_ids``"""
+    from django.db import connection
+    from django.db.models import Q
+
+    from blog.models import Post
+
+    stored = Post.objects.filter(related_post_ids__isnull=False)
+    if connection.features.supports_json_field_contains:
+        mentions = Q()
+        for post_id in post_ids:
+            mentions |= Q(related_post_ids__contains=[post_id])
+        return set(stored.filter(mentions).values_list('pk', flat=True))
+    # No JSON containment lookup (SQLite): compare the lists here
+    return {
+        post_id for post_id, related_ids in stored.values_list('pk', 'related_post_ids')
+        if post_ids.intersection(related_ids or ())
+    }
+
+
+def _store(related_lists, batch_size=500):
+    """Write {post id: related ids} with bulk updates"""
+    from blog.models import Post
+
+    posts = [Post(pk=post_id, related_post_ids=ids) for post_id, ids in related_lists.items()]
+    Post.objects.bulk_update(posts, ['related_post_ids'], batch_size=batch_size)
+    return len(posts)
+
+
+def rebuild_all():
+    """Recompute the related list of every published post; returns the count"""
+    matrix = TagMatrix.load()
+    limit = _related_count()
+    return _store({post_id: matrix.top_related(post_id, limit) for post_id in matrix.posts})
+
+
+def update_posts(post_ids):
+    """
+    Recompute the lists affected by changes to ``post_ids``: the posts
+    themselves, the posts now sharing a tag with them and the posts whose
+    stored list mentions them. Returns the number of lists written.
+    """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return 0
+    tagged = _tagged_items()
+    affected = post_ids | _listing(post_ids)
+    affected.update(
+        tagged.filter(tag_id__in=tagged.filter(object_id__in=post_ids).values('tag_id'))
+        .values_list('object_id', flat=True)
+    )
+
+    matrix = TagMatrix.load(affected)
+    limit = _related_count()
+    # Posts that are no longer published get an empty list
+    return _store({post_id: matrix.top_related(post_id, limit) for post_id in affected})
+
+
+def queue_update(post_id):
+    """Queue update_related_posts_async for one post"""
+    try:
+        from django_q.tasks import async_task
+
+        async_task(
+            'blog.tasks.update_related_posts_async',
+            [post_id],
+            task_name=f'related_posts_{post_id}',
+            timeout=30,
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue related posts update for post {post_id}: {e}")
+
+
+def post_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """pre_save receiver: remember the stored category and status"""
+    from blog.models import Post
+
+    instance._related_previous = None
+    if raw or instance._state.adding or (update_fields is not None and not TRACKED_FIELDS & set(update_fields)):
+        return
+    instance._related_previous = Post.objects.filter(pk=instance.pk).values_list('category_id', 'status').first()
+
+
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """post_save receiver: queue an update when a published post's category or status changed"""
+    if raw:
+        return
+    if created:
+        changed = instance.status == 'published'
+    else:
+        previous = getattr(instance, '_related_previous', None)
+        changed = (
+            previous is not None and previous != (instance.category_id, instance.status)
+            and 'published' in (previous[1], instance.status)
+        )
+    if changed:
+        queue_update(instance.pk)
+
+
+def post_deleted(sender, instance, **kwargs):
+    """post_delete receiver: drop the post from its neighbours' lists"""
+    if instance.status == 'published':
+        queue_update(instance.pk)
+
+
+def tags_changed(sender, instance, action, pk_set=None, **kwargs):
+    """m2m_changed receiver for taggit's through model (set() sends empty adds)"""
+    from blog.models import Post
+
+    if not isinstance(instance, Post) or instance.status != 'published':
+        return
+    if action == 'pre_clear':
+        instance._related_had_tags = instance.tags.exists()
+    elif (action in ('post_add', 'post_remove') and pk_set) or (
+        action == 'post_clear' and getattr(instance, '_related_had_tags', True)
+    ):
+        queue_update(instance.pk)
+
+
+def connect_signals():
+    """Connect the receivers keeping the index current (called from BlogConfig.ready)"""
+    from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+    from blog.models import Post
+
+    pre_save.connect(post_saving, sender=Post, dispatch_uid='blog_related_post_saving')
+    post_save.connect(post_saved, sender=Post, dispatch_uid='blog_related_post_saved')
+    post_delete.connect(post_deleted, sender=Post, dispatch_uid='blog_related_post_deleted')
+    m2m_changed.connect(tags_changed, sender=Post.tags.through, dispatch_uid='blog_related_tags_changed')
+
+
+def ensure_schedule(**kwargs):
+    """
+    Create or update the daily django-q schedule running
+    blog.tasks.rebuild_related_posts (connected to post_migrate)
+    """
+    from django_q.models import Schedule
+
+    Schedule.objects.update_or_create(
+        name=SCHEDULE_NAME,
+        defaults={
+            'func': 'blog.tasks.rebuild_related_posts',
+            'schedule_type': Schedule.DAILY,
+            'repeats': -1,
+        },
+    )
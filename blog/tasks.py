@@ -0,0 +1,82 @@
+"""
+Django-Q tasks for the blog
+"""
+
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def flush_post_views(**kwargs):
+    """
+    Scheduled task applying buffered views to Post.views and recomputing
+    Post.trending (see blog.view_counts)
+
+    Args:
+        **kwargs: Additional arguments (ignored, for compatibility)
+
+    Returns:
+        dict: Task result
+    """
+    from . import view_counts
+
+    try:
+        applied = view_counts.apply_pending()
+        trending = view_counts.update_trending() if getattr(settings, 'BLOG_TRENDING_AUTO', True) else None
+        pruned = view_counts.prune()
+    except Exception as e:
+        logger.error(f"Failed to flush buffered blog views: {e}")
+        return {'success': False, 'error': str(e)}
+
+    return {
+        'success': True,
+        'posts': len(applied),
+        'views': sum(applied.values()),
+        'trending': trending,
+        'pruned': pruned,
+        'timestamp': timezone.now().isoformat()
+    }
+
+
+def update_related_posts_async(post_ids, **kwargs):
+    """
+    Async task recomputing the related-posts lists affected by changes to
+    ``post_ids`` (see blog.related)
+
+    Args:
+        post_ids (list): Ids of the posts whose tags, category or status changed
+        **kwargs: Additional arguments (ignored, for compatibility)
+
+    Returns:
+        dict: Task result
+    """
+    from . import related
+
+    try:
+        updated = related.update_posts(post_ids)
+    except Exception as e:
+        logger.error(f"Failed to update related posts for {post_ids}: {e}")
+        return {'success': False, 'error': str(e)}
+
+    return {'success': True, 'posts': updated, 'timestamp': timezone.now().isoformat()}
+
+
+def rebuild_related_posts(**kwargs):
+    """
+    Scheduled task rebuilding every related-posts list (see blog.related)
+
+    Returns:
+        dict: Task result
+    """
+    from . import related
+
+    try:
+        updated = related.rebuild_all()
+    except Exception as e:
+        logger.error(f"Failed to rebuild related posts: {e}")
+        return {'success': False, 'error': str(e)}
+
+    return {'success': True, 'posts': updated, 'timestamp': timezone.now().isoformat()}
@@ -1,3 +1,317 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog import related, tasks, view_counts
+from blog.models import Category, Comment, Post, PostViewDelta
+from tours_travels.text import html_to_text
+
+
+class BlogDetailConditionalTest(TestCase):
+    """Test ETag revalidation of the blog detail page"""
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            title='Migration Season',
+            content='<p>The wildebeest cross the Mara river.</p>',
+            status='published'
+        )
+        self.url = reverse('blog:blog-detail', kwargs={'slug': self.post.slug})
+
+    def test_matching_etag_returns_304(self):
+        """Test an unchanged post answers If-None-Match with 304"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_approved_comment_invalidates_etag(self):
+        """Test approving a comment re-renders the page"""
+        comment = Comment.objects.create(
+            post=self.post, full_name='Amina', email='amina@example.com', comment='Great read', active=False
+        )
+        etag = self.client.get(self.url)['ETag']
+
+        Comment.objects.filter(pk=comment.pk).update(active=True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_comment_post_is_not_conditional(self):
+        """Test comment submissions bypass the validators"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.post(
+            self.url,
+            {'full_name': 'Amina', 'email': 'amina@example.com', 'comment': 'Great read'},
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 302)
+
+
+class BufferedViewCounterTest(TestCase):
+    """Test the buffered blog view counter and trending computation"""
+
+    def setUp(self):
+        view_counts._drain()
+        self.post = Post.objects.create(title='Migration Season', content='<p>Crossings</p>', status='published')
+        self.other = Post.objects.create(title='Gorilla Trekking', content='<p>Bwindi</p>', status='published')
+
+    def tearDown(self):
+        view_counts._drain()
+
+    def test_view_is_buffered_not_written(self):
+        """Test a visit does not update the post row"""
+        with self.settings(BLOG_VIEW_FLUSH_INTERVAL=3600):
+            response = self.client.get(reverse('blog:blog-detail', kwargs={'slug': self.post.slug}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'].views, 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        self.assertEqual(view_counts.pending(self.post.pk), 1)
+
+    def test_flush_and_apply(self):
+        """Test buffered views reach Post.views in one UPDATE and apply only once"""
+        for _ in range(3):
+            view_counts.record_view(self.post.pk)
+        view_counts.record_view(self.other.pk)
+
+        self.assertEqual(view_counts.flush(), 4)
+        self.assertEqual(PostViewDelta.objects.count(), 2)
+
+        with self.assertNumQueries(5):  # savepoint, claim, CASE update, mark applied, release
+            self.assertEqual(view_counts.apply_pending(), {self.post.pk: 3, self.other.pk: 1})
+        self.assertEqual(view_counts.apply_pending(), {})
+
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.post.views, self.other.views), (3, 1))
+
+    def test_trending_follows_recent_views(self):
+        """Test the scheduled task flags the most viewed posts as trending"""
+        Post.objects.filter(pk=self.other.pk).update(trending=True)
+        PostViewDelta.objects.create(post=self.post, views=10)
+        PostViewDelta.objects.create(post=self.other, views=2)
+
+        with self.settings(BLOG_TRENDING_COUNT=1):
+            result = tasks.flush_post_views()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['trending'], [self.post.pk])
+        self.assertEqual(
+            list(Post.objects.filter(trending=True).values_list('pk', flat=True)), [self.post.pk]
+        )
+
+    def test_schedule_is_registered(self):
+        """Test migrate creates the django-q schedule once"""
+        from django_q.models import Schedule
+
+        view_counts.ensure_schedule()
+        schedules = Schedule.objects.filter(func='blog.tasks.flush_post_views')
+        self.assertEqual(schedules.count(), 1)
+        self.assertEqual(schedules.get().schedule_type, Schedule.MINUTES)
+
+
+class PostDerivedTextTest(TestCase):
+    """Test the plain-text columns computed on save"""
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            title='Big Five',
+            content='<p>Lion&nbsp;and leopard</p><p>' + 'word ' * 400 + '</p><p>5 &lt; 6</p>',
+            status='published'
+        )
+
+    def test_html_to_text(self):
+        """Test block tags separate words and entities are decoded"""
+        self.assertEqual(html_to_text('<p>Big&nbsp;Five</p><p>safari</p>'), 'Big Five safari')
+        self.assertEqual(html_to_text('<h2>A</h2><script>var x;</script>B<br>C'), 'A B C')
+        self.assertEqual(html_to_text(None), '')
+
+    def test_save_fills_derived_columns(self):
+        """Test words are counted once and the summary falls back to escaped content"""
+        self.assertEqual(self.post.word_count, 406)
+        self.assertEqual(self.post.read_minutes, 2)
+        self.assertEqual(self.post.get_read_time(), 2)
+        self.assertTrue(self.post.plain_text.startswith('Lion and leopard word'))
+        self.assertEqual(self.post.summary, self.post.plain_text[:150] + '...')
+        self.assertEqual(self.post.get_meta_description(), self.post.summary)
+
+    def test_excerpt_becomes_summary(self):
+        """Test a meaningful excerpt is the summary and an empty one is ignored"""
+        self.post.excerpt = '<p>Cats &amp; more</p>'
+        self.post.save(update_fields=['excerpt'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.summary, '<p>Cats &amp; more</p>')
+        self.assertEqual(self.post.meta_description, 'Cats & more')
+
+        self.post.excerpt = '<p>&nbsp;</p>'
+        self.post.save()
+        self.assertTrue(self.post.summary.startswith('Lion and leopard'))
+
+    def test_listing_does_not_load_content(self):
+        """Test the blog list renders without selecting the content column"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:blog-list'))
+
+        self.assertEqual(response.status_code, 200)
+        post_selects = [q['sql'] for q in queries if 'FROM "blog_post"' in q['sql']]
+        self.assertTrue(post_selects)
+        for sql in post_selects:
+            self.assertNotIn('"blog_post"."content"', sql)
+            self.assertNotIn('"blog_post"."plain_text"', sql)
+
+    def test_backfill_command(self):
+        """Test the backfill fills posts saved without derived text"""
+        Post.objects.filter(pk=self.post.pk).update(
+            plain_text='', word_count=None, read_minutes=None, summary=None, meta_description=None
+        )
+        out = StringIO()
+        call_command('backfill_post_text', chunk_size=1, stdout=out)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.word_count, 406)
+        self.assertIn('1 posts', out.getvalue())
+
+
+class RelatedPostsIndexTest(TestCase):
+    """Test the precomputed tag-similarity related-posts index"""
+
+    def setUp(self):
+        patcher = mock.patch('django_q.tasks.async_task')
+        self.async_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.safari = Category.objects.create(title='Safari', slug='safari')
+        self.coast = Category.objects.create(title='Coast', slug='coast')
+        self.mara = self._post('Mara Migration', self.safari, ['wildebeest', 'kenya', 'mara'])
+        self.serengeti = self._post('Serengeti Crossing', None, ['wildebeest', 'mara'])
+        self.amboseli = self._post('Amboseli Elephants', self.safari, [])
+        self.diani = self._post('Diani Beach', self.coast, ['beach'])
+
+    def _post(self, title, category, tags):
+        post = Post.objects.create(title=title, content='<p>Story</p>', category=category, status='published')
+        post.tags.add(*tags)
+        return post
+
+    def test_rebuild_ranks_tag_overlap_then_category(self):
+        """Test shared tags outrank a shared category and unrelated posts are left out"""
+        related.rebuild_all()
+        self.mara.refresh_from_db()
+
+        self.assertEqual(self.mara.related_post_ids, [self.serengeti.pk, self.amboseli.pk])
+
+    def test_detail_fetches_related_by_primary_key(self):
+        """Test related posts come back in index order with one query"""
+        related.rebuild_all()
+        self.mara.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            posts = self.mara.get_related_posts()
+        self.assertEqual([post.pk for post in posts], [self.serengeti.pk, self.amboseli.pk])
+
+    def test_tag_change_queues_incremental_update(self):
+        """Test tagging a post queues an update that adds it to its new neighbours"""
+        related.rebuild_all()
+        self.async_task.reset_mock()
+
+        self.diani.tags.add('kenya')
+        self.async_task.assert_called_once()
+        self.assertEqual(self.async_task.call_args[0][:2], ('blog.tasks.update_related_posts_async', [self.diani.pk]))
+
+        tasks.update_related_posts_async([self.diani.pk])
+        self.mara.refresh_from_db()
+        self.diani.refresh_from_db()
+        self.assertIn(self.diani.pk, self.mara.related_post_ids)
+        self.assertEqual(self.diani.related_post_ids, [self.mara.pk])
+
+    def test_unpublished_post_leaves_neighbour_lists(self):
+        """Test unpublishing removes the post from every stored list"""
+        related.rebuild_all()
+
+        self.serengeti.status = 'draft'
+        self.serengeti.save()
+        related.update_posts([self.serengeti.pk])
+
+        self.mara.refresh_from_db()
+        self.serengeti.refresh_from_db()
+        self.assertNotIn(self.serengeti.pk, self.mara.related_post_ids)
+        self.assertEqual(self.serengeti.related_post_ids, [])
+
+    def test_unchanged_save_queues_nothing(self):
+        """Test saves and tag sets that keep the tags, category and status queue no update"""
+        self.async_task.reset_mock()
+
+        self.mara.title = 'Mara Migration Guide'
+        self.mara.save()
+        self.mara.tags.set(['wildebeest', 'kenya', 'mara'])
+        Post.objects.create(title='Draft', content='<p>Story</p>', category=self.safari, status='draft')
+        self.async_task.assert_not_called()
+
+        self.mara.category = self.coast
+        self.mara.save()
+        self.async_task.assert_called_once()
+
+    def test_update_rewrites_only_affected_lists(self):
+        """Test an update skips category mates and matches a full rebuild"""
+        related.rebuild_all()
+        self.diani.tags.add('kenya')
+
+        self.assertEqual(related.update_posts([self.diani.pk]), 2)
+        updated = dict(Post.objects.values_list('pk', 'related_post_ids'))
+        related.rebuild_all()
+        self.assertEqual(updated, dict(Post.objects.values_list('pk', 'related_post_ids')))
+
+
+class BlogFeedTest(TestCase):
+    """Test the cached RSS and Atom feeds"""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        override = override_settings(SITEMAP_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.post = Post.objects.create(
+            title='Migration Season', content='<p>The herds cross the Mara.</p>', status='published'
+        )
+        Post.objects.create(title='Draft Notes', content='<p>Not yet</p>', status='draft')
+
+    def _feed(self, url_name):
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return response, ElementTree.fromstring(b''.join(response.streaming_content))
+
+    def test_rss_lists_published_posts(self):
+        """Test the RSS feed is valid XML with only published posts"""
+        response, rss = self._feed('blog:blog-rss')
+
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertEqual([item.findtext('title') for item in rss.iter('item')], ['Migration Season'])
+        self.assertEqual(
+            rss.find('channel/item/link').text,
+            'http://testserver' + reverse('blog:blog-detail', kwargs={'slug': self.post.slug})
+        )
+
+    def test_atom_follows_post_changes(self):
+        """Test the Atom feed is rebuilt when a post is published"""
+        self._feed('blog:blog-atom')
+        Post.objects.filter(title='Draft Notes').update(status='published')
+
+        _, atom = self._feed('blog:blog-atom')
+
+        titles = [entry.findtext('{http://www.w3.org/2005/Atom}title') for entry in atom.iter('{http://www.w3.org/2005/Atom}entry')]
+        self.assertEqual(sorted(titles), ['Draft Notes', 'Migration Season'])
@@ -1,21 +1,23 @@
 from django.urls import path
 from blog import views
+from tours_travels.async_views import select_view
 
 app_name = 'blog'
 
 urlpatterns = [
     # Blog list and search
-    path('', views.blog_list, name="blog-list"),
+    path('', select_view(views.blog_list, views.ablog_list), name="blog-list"),
     path('search/', views.blog_search, name="blog-search"),
 
     # Category URLs (slug-based)
     path('category/<slug:slug>/', views.category_detail, name="category-detail"),
 
     # Post URLs (slug-based with fallback for old PIDs)
-    path('post/<slug:slug>/', views.blog_detail, name="blog-detail"),
+    path('post/<slug:slug>/', select_view(views.blog_detail, views.ablog_detail), name="blog-detail"),
     path('p/<str:pid>/', views.blog_detail_redirect, name="blog-detail-redirect"),  # Redirect old URLs
 
-    # RSS and sitemap
+    # Feeds and sitemap
     path('rss/', views.blog_rss, name="blog-rss"),
+    path('atom/', views.blog_atom, name="blog-atom"),
     path('sitemap/', views.blog_sitemap, name="blog-sitemap"),
 ]
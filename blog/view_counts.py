@@ -0,0 +1,202 @@
+"""
+Buffered blog view counter
+
+blog_detail records a view in an in-process counter instead of running an
+UPDATE on the post row. The counter is split into lock-protected shards by
+post id, so threads viewing different posts never contend. Every
+BLOG_VIEW_FLUSH_INTERVAL seconds a worker drains its shards into
+PostViewDelta rows with one bulk INSERT; the scheduled
+``blog.tasks.flush_post_views`` task adds the pending deltas to Post.views in
+one CASE UPDATE and recomputes Post.trending from the deltas of the last
+BLOG_TRENDING_WINDOW_HOURS.
+"""
+
+import atexit
+import datetime
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SHARD_COUNT = 16
+SCHEDULE_NAME = 'Flush buffered blog post views'
+
+_shards = [(threading.Lock(), Counter()) for _ in range(SHARD_COUNT)]
+_flush_lock = threading.Lock()
+_last_flush = time.time()
+_atexit_registered = False
+
+
+def record_view(post_id):
+    """
+    Count one view of ``post_id`` in this process
+
+    Usage:
+    view_counts.record_view(post.pk)
+    """
+    global _atexit_registered
+    lock, counts = _shards[post_id % SHARD_COUNT]
+    with lock:
+        counts[post_id] += 1
+
+    if not _atexit_registered:
+        # Don't lose the tail of the buffer when gunicorn recycles the worker
+        _atexit_registered = True
+        atexit.register(flush)
+    maybe_flush()
+
+
+def pending(post_id):
+    """Views of ``post_id`` buffered in this process and not yet flushed"""
+    lock, counts = _shards[post_id % SHARD_COUNT]
+    with lock:
+        return counts[post_id]
+
+
+def _drain():
+    """Empty every shard and return the summed counts"""
+    drained = Counter()
+    for lock, counts in _shards:
+        with lock:
+            drained.update(counts)
+            counts.clear()
+    return drained
+
+
+def flush():
+    """
+    Write this process's buffered views as PostViewDelta rows
+
+    Returns the number of views written. On a database error the counts go
+    back into the buffer for the next flush.
+    """
+    global _last_flush
+    from blog.models import PostViewDelta
+
+    with _flush_lock:
+        _last_flush = time.time()
+        drained = _drain()
+        if not drained:
+            return 0
+        try:
+            PostViewDelta.objects.bulk_create([
+                PostViewDelta(post_id=post_id, views=views) for post_id, views in drained.items()
+            ])
+        except Exception as e:
+            logger.warning(f"Could not flush {sum(drained.values())} buffered blog views: {e}")
+            for post_id, views in drained.items():
+                lock, counts = _shards[post_id % SHARD_COUNT]
+                with lock:
+                    counts[post_id] += views
+            return 0
+        return sum(drained.values())
+
+
+def maybe_flush():
+    """Flush the buffer if the flush interval has elapsed"""
+    interval = getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 30)
+    if time.time() - _last_flush >= interval:
+        flush()
+
+
+def apply_pending():
+    """
+    Add every unapplied PostViewDelta to Post.views in one UPDATE
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED (where the
+    database supports it), so overlapping task runs never apply a delta twice.
+    Returns {post id: views added}.
+    """
+    from blog.models import Post, PostViewDelta
+
+    with transaction.atomic():
+        rows = list(
+            PostViewDelta.objects.filter(applied=False)
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'post_id', 'views')
+        )
+        if not rows:
+            return {}
+
+        totals = Counter()
+        for _, post_id, views in rows:
+            totals[post_id] += views
+
+        Post.objects.filter(pk__in=totals).update(views=F('views') + Case(
+            *[When(pk=post_id, then=Value(views)) for post_id, views in totals.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        PostViewDelta.objects.filter(id__in=[row[0] for row in rows]).update(applied=True)
+    return dict(totals)
+
+
+def trending_post_ids(hours=None, limit=None):
+    """
+    Ids of the published posts with the most views in the last ``hours``,
+    most viewed first
+    """
+    from blog.models import PostViewDelta
+
+    hours = hours or getattr(settings, 'BLOG_TRENDING_WINDOW_HOURS', 72)
+    limit = limit or getattr(settings, 'BLOG_TRENDING_COUNT', 6)
+    since = timezone.now() - datetime.timedelta(hours=hours)
+    return list(
+        PostViewDelta.objects.filter(created__gte=since, post__status='published')
+        .values('post')
+        .annotate(total=Sum('views'))
+        .order_by('-total', 'post')
+        .values_list('post', flat=True)[:limit]
+    )
+
+
+def update_trending():
+    """
+    Flag the most viewed posts of the trending window as Post.trending
+
+    Without any views in the window the existing flags are left alone.
+    Returns the trending post ids.
+    """
+    from blog.models import Post
+
+    post_ids = trending_post_ids()
+    if post_ids:
+        with transaction.atomic():
+            Post.objects.filter(trending=True).exclude(pk__in=post_ids).update(trending=False)
+            Post.objects.filter(pk__in=post_ids, trending=False).update(trending=True)
+    return post_ids
+
+
+def prune():
+    """Delete applied deltas older than the trending window"""
+    from blog.models import PostViewDelta
+
+    hours = getattr(settings, 'BLOG_TRENDING_WINDOW_HOURS', 72)
+    since = timezone.now() - datetime.timedelta(hours=hours)
+    deleted, _ = PostViewDelta.objects.filter(applied=True, created__lt=since).delete()
+    return deleted
+
+
+def ensure_schedule(**kwargs):
+    """
+    Create or update the django-q schedule running blog.tasks.flush_post_views
+    (connected to post_migrate by BlogConfig.ready)
+    """
+    from django_q.models import Schedule
+
+    Schedule.objects.update_or_create(
+        name=SCHEDULE_NAME,
+        defaults={
+            'func': 'blog.tasks.flush_post_views',
+            'schedule_type': Schedule.MINUTES,
+            'minutes': getattr(settings, 'BLOG_VIEW_APPLY_MINUTES', 5),
+            'repeats': -1,
+        },
+    )
@@ -1,44 +1,50 @@
-from django.shortcuts import redirect, render, get_object_or_404
-from django.http import HttpResponse, Http404
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, redirect, render, get_object_or_404
+from django.http import Http404
 from django.urls import reverse
 from django.views.decorators.cache import cache_page
 from django.views.decorators.http import require_http_methods
 from django.core.cache import cache
 from django.contrib import messages
-from django.db.models import Q, Count, Prefetch, F
+from django.db.models import Q, Count, Prefetch, OuterRef
 from django.db import models
 from django.core.paginator import Paginator
 from django.utils import timezone
+from blog import feeds, view_counts
 from blog.models import Post, Category, Comment
+from tours_travels.async_views import acache_page, alist, apaginate, arender
+from tours_travels.conditional import conditional_page, related_changes
 
+BLOG_CATEGORIES_CACHE_KEY = 'blog_categories_with_counts'
 
-@cache_page(60 * 15)  # Cache for 15 minutes
-def blog_list(request):
-    """Optimized blog list view with caching and efficient queries"""
 
-    # Get base queryset with optimized queries
-    blog_queryset = Post.objects.select_related('category', 'user').prefetch_related('tags').filter(
+def _published_listing():
+    """Published posts with the columns and relations listing cards need"""
+    return Post.objects.select_related('category', 'user').prefetch_related('tags').defer(
+        *Post.LISTING_DEFERRED_FIELDS
+    ).filter(
         status="published"
     )
 
-    # Get featured posts with optimized query
-    featured_blog = blog_queryset.filter(featured=True).order_by("-date")[:6]
 
-    # Get active categories with post counts (cached)
-    categories_cache_key = 'blog_categories_with_counts'
-    categories = cache.get(categories_cache_key)
-    if categories is None:
-        categories = Category.objects.filter(active=True).annotate(
-            post_count=Count('post', filter=Q(post__status='published'))
-        ).order_by('title')
-        cache.set(categories_cache_key, categories, 60 * 30)  # Cache for 30 minutes
+def _categories_with_counts():
+    return Category.objects.filter(active=True).annotate(
+        post_count=Count('post', filter=Q(post__status='published'))
+    ).order_by('title')
 
-    # Apply filters
-    blog = blog_queryset
-    query = request.GET.get("q", "").strip()
-    category_slug = request.GET.get("category")
-    sort_by = request.GET.get("sort", "latest")
 
+def _blog_list_params(request):
+    return (
+        request.GET.get("q", "").strip(),
+        request.GET.get("category"),
+        request.GET.get("sort", "latest"),
+    )
+
+
+def _blog_list_posts(blog, query, category, sort_by):
+    """Apply the blog_list search, category and sort options to ``blog``"""
     # Search functionality with better performance
     if query:
         blog = blog.filter(
@@ -48,33 +54,22 @@ def blog_list(request):
         ).distinct()
 
     # Category filtering
-    if category_slug:
-        try:
-            category = Category.objects.get(slug=category_slug, active=True)
-            blog = blog.filter(category=category)
-        except Category.DoesNotExist:
-            messages.error(request, "Category not found.")
-            return redirect('blog:blog-list')
+    if category:
+        blog = blog.filter(category=category)
 
     # Sorting options
     if sort_by == "popular":
-        blog = blog.order_by("-views", "-date")
-    elif sort_by == "oldest":
-        blog = blog.order_by("date")
-    elif sort_by == "trending":
-        blog = blog.filter(trending=True).order_by("-date")
-    else:  # latest (default)
-        blog = blog.order_by("-date")
+        return blog.order_by("-views", "-date")
+    if sort_by == "oldest":
+        return blog.order_by("date")
+    if sort_by == "trending":
+        return blog.filter(trending=True).order_by("-date")
+    return blog.order_by("-date")  # latest (default)
 
-    # Enhanced pagination
-    paginator = Paginator(blog, 12)  # Show 12 posts per page
-    page_number = request.GET.get('page')
-    blog_page = paginator.get_page(page_number)
 
-    # Get blog count for display
-    blog_count = blog_queryset.count()
-
-    context = {
+def _blog_list_context(request, categories, blog_count, blog_page, featured_blog):
+    query, category_slug, sort_by = _blog_list_params(request)
+    return {
         "query": query,
         "categories": categories,
         "blog_count": blog_count,
@@ -85,24 +80,158 @@ def blog_list(request):
         "page_title": "Travel Blog - Mbugani Luxe Adventures",
         "meta_description": "Discover amazing travel stories, tips, and guides from Mbugani Luxe Adventures. Explore destinations, get travel advice, and plan your next adventure.",
     }
+
+
+@cache_page(60 * 15)  # Cache for 15 minutes
+def blog_list(request):
+    """Optimized blog list view with caching and efficient queries"""
+    query, category_slug, sort_by = _blog_list_params(request)
+
+    # Get base queryset with optimized queries
+    blog_queryset = _published_listing()
+
+    # Get featured posts with optimized query
+    featured_blog = blog_queryset.filter(featured=True).order_by("-date")[:6]
+
+    # Get active categories with post counts (cached)
+    categories = cache.get(BLOG_CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = _categories_with_counts()
+        cache.set(BLOG_CATEGORIES_CACHE_KEY, categories, 60 * 30)  # Cache for 30 minutes
+
+    category = None
+    if category_slug:
+        try:
+            category = Category.objects.get(slug=category_slug, active=True)
+        except Category.DoesNotExist:
+            messages.error(request, "Category not found.")
+            return redirect('blog:blog-list')
+
+    # Enhanced pagination
+    blog = _blog_list_posts(blog_queryset, query, category, sort_by)
+    paginator = Paginator(blog, 12)  # Show 12 posts per page
+    page_number = request.GET.get('page')
+    blog_page = paginator.get_page(page_number)
+
+    # Get blog count for display
+    blog_count = blog_queryset.count()
+
+    context = _blog_list_context(request, categories, blog_count, blog_page, featured_blog)
     return render(request, 'users/bloglist.html', context)
 
+
+async def _acategories_with_counts():
+    categories = await cache.aget(BLOG_CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = await alist(_categories_with_counts())
+        await cache.aset(BLOG_CATEGORIES_CACHE_KEY, categories, 60 * 30)  # Cache for 30 minutes
+    return categories
+
+
+async def _acategory(slug):
+    if not slug:
+        return None
+    return await Category.objects.filter(slug=slug, active=True).afirst()
+
+
+@acache_page(60 * 15)
+async def ablog_list(request):
+    """Async blog_list: the sidebar, featured posts and counts are read together"""
+    query, category_slug, sort_by = _blog_list_params(request)
+    blog_queryset = _published_listing()
+
+    category, featured_blog, categories, blog_count = await asyncio.gather(
+        _acategory(category_slug),
+        alist(blog_queryset.filter(featured=True).order_by("-date")[:6]),
+        _acategories_with_counts(),
+        blog_queryset.acount(),
+    )
+    if category_slug and category is None:
+        messages.error(request, "Category not found.")
+        return redirect('blog:blog-list')
+
+    blog = _blog_list_posts(blog_queryset, query, category, sort_by)
+    _, blog_page = await apaginate(blog, 12, request.GET.get('page'))
+
+    context = _blog_list_context(request, categories, blog_count, blog_page, featured_blog)
+    return await arender(request, 'users/bloglist.html', context)
+
+def blog_detail_validator(request, slug=None, pid=None):
+    """
+    Conditional GET validator row for blog_detail: the post, its active
+    comments and the published posts listed as recent/related/previous/next
+
+    The view counter is left out so buffered views don't turn every
+    revalidation into a full render.
+    """
+    if slug:
+        posts = Post.objects.filter(slug=slug, status="published")
+    elif pid:
+        posts = Post.objects.filter(pid=pid, status="published")
+    else:
+        return None
+    return posts.values_list(
+        'updated',
+        'image_lqip_source',
+        *related_changes(Comment.objects.filter(post=OuterRef('pk'), active=True), field='date'),
+        *related_changes(Post.objects.filter(status="published"), field='updated'),
+    ).first()
+
+
+def _post_queryset():
+    return Post.objects.select_related('category', 'user').prefetch_related('tags')
+
+
+def _listing_posts():
+    """Published posts for the recent and previous/next links"""
+    return Post.objects.select_related('category').defer(*Post.LISTING_DEFERRED_FIELDS).filter(status="published")
+
+
+def _record_view(request, post):
+    """Count the view (only once per session) in the buffered counter"""
+    session_key = f'viewed_post_{post.slug}'
+    if not request.session.get(session_key, False):
+        view_counts.record_view(post.pk)
+        request.session[session_key] = True
+    # Show views that are still buffered in this worker
+    post.views += view_counts.pending(post.pk)
+
+
+def _blog_detail_context(request, post, comments, recent_blogs, related_blogs, previous_post, next_post):
+    # SEO and meta data
+    page_title = f"{post.title} - Mbugani Luxe Adventures Blog"
+    meta_description = post.get_meta_description()
+    canonical_url = request.build_absolute_uri(post.get_absolute_url())
+
+    return {
+        "post": post,
+        "comments": comments,
+        "recent_blogs": recent_blogs,
+        "related_blogs": related_blogs,
+        "previous_post": previous_post,
+        "next_post": next_post,
+        "page_title": page_title,
+        "meta_description": meta_description,
+        "canonical_url": canonical_url,
+        "breadcrumbs": [
+            {"name": "Home", "url": "/"},
+            {"name": "Blog", "url": reverse("blog:blog-list")},
+            {"name": post.category.title if post.category else "Uncategorized",
+             "url": post.category.get_absolute_url() if post.category else "#"},
+            {"name": post.title, "url": ""}
+        ]
+    }
+
+
+@conditional_page(blog_detail_validator)
 def blog_detail(request, slug=None, pid=None):
     """Optimized blog detail view with slug-based URLs"""
 
     # Get post by slug (preferred) or pid (fallback)
     if slug:
-        post = get_object_or_404(
-            Post.objects.select_related('category', 'user').prefetch_related('tags'),
-            slug=slug,
-            status="published"
-        )
+        post = get_object_or_404(_post_queryset(), slug=slug, status="published")
     elif pid:
-        post = get_object_or_404(
-            Post.objects.select_related('category', 'user').prefetch_related('tags'),
-            pid=pid,
-            status="published"
-        )
+        post = get_object_or_404(_post_queryset(), pid=pid, status="published")
     else:
         raise Http404("Post not found")
 
@@ -113,17 +242,9 @@ def blog_detail(request, slug=None, pid=None):
     related_blogs = post.get_related_posts(limit=6)
 
     # Get recent blogs (excluding current post) with optimized query
-    recent_blogs = Post.objects.select_related('category').filter(
-        status="published"
-    ).exclude(pk=post.pk).order_by("-date")[:8]
+    recent_blogs = _listing_posts().exclude(pk=post.pk).order_by("-date")[:8]
 
-    # Increment view count (only once per session)
-    session_key = f'viewed_post_{post.slug}'
-    if not request.session.get(session_key, False):
-        Post.objects.filter(pk=post.pk).update(views=F('views') + 1)
-        request.session[session_key] = True
-        # Refresh post object to get updated view count
-        post.refresh_from_db(fields=['views'])
+    _record_view(request, post)
 
     # Handle comment submission
     if request.method == "POST":
@@ -144,40 +265,42 @@ def blog_detail(request, slug=None, pid=None):
             messages.error(request, "Please fill in all required fields.")
 
     # Get previous and next posts for navigation (optimized)
-    previous_post = Post.objects.select_related('category').filter(
-        status="published",
-        date__lt=post.date
-    ).order_by("-date").first()
+    previous_post = _listing_posts().filter(date__lt=post.date).order_by("-date").first()
+    next_post = _listing_posts().filter(date__gt=post.date).order_by("date").first()
 
-    next_post = Post.objects.select_related('category').filter(
-        status="published",
-        date__gt=post.date
-    ).order_by("date").first()
+    context = _blog_detail_context(request, post, comments, recent_blogs, related_blogs, previous_post, next_post)
+    return render(request, 'users/blogdetail.html', context)
 
-    # SEO and meta data
-    page_title = f"{post.title} - Mbugani Luxe Adventures Blog"
-    meta_description = post.get_meta_description()
-    canonical_url = request.build_absolute_uri(post.get_absolute_url())
 
-    context = {
-        "post": post,
-        "comments": comments,
-        "recent_blogs": recent_blogs,
-        "related_blogs": related_blogs,
-        "previous_post": previous_post,
-        "next_post": next_post,
-        "page_title": page_title,
-        "meta_description": meta_description,
-        "canonical_url": canonical_url,
-        "breadcrumbs": [
-            {"name": "Home", "url": "/"},
-            {"name": "Blog", "url": reverse("blog:blog-list")},
-            {"name": post.category.title if post.category else "Uncategorized",
-             "url": post.category.get_absolute_url() if post.category else "#"},
-            {"name": post.title, "url": ""}
-        ]
-    }
-    return render(request, 'users/blogdetail.html', context)
+@conditional_page(blog_detail_validator)
+async def ablog_detail(request, slug=None, pid=None):
+    """
+    Async blog_detail: the post is read first, then its recent, related
+    and previous/next posts together. Comment POSTs take the sync view.
+    """
+    if request.method == "POST":
+        return await sync_to_async(blog_detail.__wrapped__)(request, slug=slug, pid=pid)
+
+    if slug:
+        post = await aget_object_or_404(_post_queryset(), slug=slug, status="published")
+    elif pid:
+        post = await aget_object_or_404(_post_queryset(), pid=pid, status="published")
+    else:
+        raise Http404("Post not found")
+
+    related_blogs, recent_blogs, previous_post, next_post, _ = await asyncio.gather(
+        sync_to_async(lambda: list(post.get_related_posts(limit=6)))(),
+        alist(_listing_posts().exclude(pk=post.pk).order_by("-date")[:8]),
+        _listing_posts().filter(date__lt=post.date).order_by("-date").afirst(),
+        _listing_posts().filter(date__gt=post.date).order_by("date").afirst(),
+        sync_to_async(_record_view)(request, post),
+    )
+
+    # Left lazy, as in the sync view
+    comments = Comment.objects.filter(post=post, active=True).order_by("-date")
+
+    context = _blog_detail_context(request, post, comments, recent_blogs, related_blogs, previous_post, next_post)
+    return await arender(request, 'users/blogdetail.html', context)
 
 
 @cache_page(60 * 30)  # Cache for 30 minutes
@@ -186,7 +309,9 @@ def category_detail(request, slug):
     category = get_object_or_404(Category, slug=slug, active=True)
 
     # Get posts in this category with optimized query
-    blog_queryset = Post.objects.select_related('category', 'user').prefetch_related('tags').filter(
+    blog_queryset = Post.objects.select_related('category', 'user').prefetch_related('tags').defer(
+        *Post.LISTING_DEFERRED_FIELDS
+    ).filter(
         category=category,
         status="published"
     )
@@ -250,7 +375,9 @@ def blog_search(request):
         return redirect("blog:blog-list")
 
     # Search with optimized query
-    blog_queryset = Post.objects.select_related('category', 'user').prefetch_related('tags').filter(
+    blog_queryset = Post.objects.select_related('category', 'user').prefetch_related('tags').defer(
+        *Post.LISTING_DEFERRED_FIELDS
+    ).filter(
         Q(title__icontains=query) |
         Q(excerpt__icontains=query) |
         Q(content__icontains=query) |
@@ -295,14 +422,15 @@ def blog_detail_redirect(request, pid):
 
 
 def blog_rss(request):
-    """RSS feed for blog posts"""
-    # This would implement RSS feed functionality
-    # For now, return a simple response
-    return HttpResponse("RSS feed coming soon", content_type="text/plain")
+    """RSS feed of the latest published posts"""
+    return feeds.feed_response(request, 'rss')
+
+
+def blog_atom(request):
+    """Atom feed of the latest published posts"""
+    return feeds.feed_response(request, 'atom')
 
 
 def blog_sitemap(request):
-    """XML sitemap for blog posts"""
-    # This would implement XML sitemap functionality
-    # For now, return a simple response
-    return HttpResponse("Sitemap coming soon", content_type="text/plain")
+    """Posts are listed in the site-wide sitemap index"""
+    return redirect('sitemap_index', permanent=True)
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class StatusConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'status'
+
+    def ready(self):
+        if getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            from . import request_metrics
+            request_metrics.install()
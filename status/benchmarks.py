@@ -0,0 +1,545 @@
+"""
+Load benchmarks for the public site
+
+Drives the key pages in-process with the Django test client (latency
+percentiles and query counts per request) and, optionally, against a
+running server over HTTP with concurrent workers. Results are written as a
+JSON baseline so runs on different commits can be compared.
+
+compare_worker_profiles() starts gunicorn with one worker per profile
+(sync WSGI against uvicorn ASGI) and load-tests each at several
+concurrency levels, for throughput per worker.
+
+measure_connection_acquire() opens a burst of database connections at once,
+with and without tours_travels.pooled_postgresql, for the time a request
+waits before it can run its first query.
+
+measure_checkout_state() compares the size and encode/decode cost of the
+session's cart and checkout state before and after users.booking_state.
+"""
+
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.utils import DatabaseError, load_backend
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+PERCENTILES = (50, 95, 99)
+
+# Database engines compared by measure_connection_acquire()
+ACQUIRE_MODES = {
+    'direct': 'django.db.backends.postgresql',
+    'pooled': 'tours_travels.pooled_postgresql',
+}
+
+# Gunicorn arguments of the compared worker profiles
+WORKER_PROFILES = {
+    'sync': ['--worker-class', 'sync', 'tours_travels.wsgi:application'],
+    'asgi': ['-c', 'python:tours_travels.gunicorn_asgi', 'tours_travels.asgi:application'],
+}
+
+# Metrics compared against a baseline: (key, label, is-query-count)
+COMPARED_METRICS = (
+    ('p95_ms', 'p95 latency', False),
+    ('queries', 'queries per request', True),
+)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+def summarize_timings(timings):
+    """Latency percentiles (ms) for a list of durations in seconds"""
+    summary = {f'p{pct}_ms': round(percentile(timings, pct) * 1000, 2) for pct in PERCENTILES}
+    summary['mean_ms'] = round(sum(timings) / len(timings) * 1000, 2) if timings else 0.0
+    return summary
+
+
+def default_scenarios():
+    """
+    Return (name, path) pairs for the benchmarked pages
+
+    Detail pages use the most heavily linked published rows, so they
+    exercise the same fan-out a real visitor sees.
+    """
+    from django.db.models import Count
+    from adminside.models import Destination, Package
+    from blog.models import Post
+
+    scenarios = [
+        ('home', reverse('home:users-home')),
+        ('package_list', reverse('adminside:package_list')),
+        ('package_list_faceted', reverse('adminside:package_list') + '?price=1000-2500&price=2500-5000&rating=4&transport=flight'),
+        ('blog_list', reverse('blog:blog-list')),
+    ]
+
+    package = (
+        Package.objects.filter(status=Package.PUBLISHED)
+        .annotate(accommodation_count=Count('available_accommodations'))
+        .order_by('-accommodation_count', 'pk')
+        .only('pk', 'slug')
+        .first()
+    )
+    if package:
+        scenarios.append(('package_detail', reverse('adminside:package_detail', kwargs={'slug': package.slug})))
+        scenarios.append(('checkout_add_to_cart', reverse('home:add_to_cart', kwargs={'package_id': package.pk})))
+        scenarios.append(('checkout_customize', reverse('home:checkout_customize', kwargs={'package_id': package.pk})))
+
+    destination = (
+        Destination.objects.filter(is_active=True, destination_type=Destination.COUNTRY)
+        .annotate(child_count=Count('children'))
+        .order_by('-child_count', 'pk')
+        .only('slug')
+        .first()
+    )
+    if destination:
+        scenarios.append(('destination_detail', reverse('adminside:destination_detail', kwargs={'slug': destination.slug})))
+
+    post = Post.objects.filter(status='published').order_by('-views', 'pk').only('slug').first()
+    if post:
+        scenarios.append(('blog_detail', reverse('blog:blog-detail', kwargs={'slug': post.slug})))
+
+    return scenarios
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries a request issues"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_in_process(scenarios, requests=50, warmup=5):
+    """
+    Request each scenario ``requests`` times with the test client
+
+    Returns {name: {path, requests, status, p50_ms, p95_ms, p99_ms, mean_ms,
+    queries}} where ``queries`` is the median per-request query count.
+    """
+    results = {}
+    for name, path in scenarios:
+        client = Client(SERVER_NAME='localhost')
+        for _ in range(warmup):
+            client.get(path)
+
+        timings, query_counts = [], []
+        status = None
+        for _ in range(requests):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = client.get(path)
+                timings.append(time.perf_counter() - start)
+            query_counts.append(counter.count)
+            status = response.status_code
+
+        results[name] = {
+            'path': path,
+            'requests': requests,
+            'status': status,
+            **summarize_timings(timings),
+            'queries': percentile(query_counts, 50),
+        }
+    return results
+
+
+def run_http(base_url, scenarios, requests=200, concurrency=10, timeout=30):
+    """
+    Request each scenario over HTTP from ``concurrency`` worker threads
+
+    Returns {name: {path, requests, concurrency, errors, throughput_rps,
+    p50_ms, p95_ms, p99_ms, mean_ms}}.
+    """
+    results = {}
+    for name, path in scenarios:
+        url = base_url.rstrip('/') + path
+        timings = []
+        errors = 0
+        lock = threading.Lock()
+
+        def fetch(_):
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    timings.append(elapsed)
+                else:
+                    errors += 1
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(fetch, range(requests)))
+        wall_time = time.perf_counter() - wall_start
+
+        results[name] = {
+            'path': path,
+            'requests': requests,
+            'concurrency': concurrency,
+            'errors': errors,
+            'throughput_rps': round(len(timings) / wall_time, 2) if wall_time else 0.0,
+            **summarize_timings(timings),
+        }
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def gunicorn_server(profile, workers=1, startup_timeout=60):
+    """
+    Run gunicorn with a WORKER_PROFILES profile on a free local port
+
+    Yields the base URL once /health/ answers; the server is stopped on exit.
+    """
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    command = [
+        sys.executable, '-m', 'gunicorn', *WORKER_PROFILES[profile],
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--access-logfile', os.devnull, '--log-level', 'warning',
+    ]
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    env.pop('ASYNC_VIEWS_ENABLED', None)  # each entry point picks its own views
+
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=log, stderr=log)
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    log.seek(0)
+                    raise RuntimeError(f'gunicorn ({profile}) exited: {log.read().decode(errors="replace")[-2000:]}')
+                try:
+                    with urllib.request.urlopen(base_url + '/health/', timeout=5) as response:
+                        response.read()
+                    break
+                except (urllib.error.URLError, OSError):
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f'gunicorn ({profile}) did not start within {startup_timeout}s')
+                    time.sleep(0.25)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def compare_worker_profiles(scenarios, profiles=tuple(WORKER_PROFILES), concurrency_levels=(50, 200),
+                            requests=400, warmup=20):
+    """
+    Load-test one gunicorn worker of each profile at each concurrency level
+
+    Returns {profile: {concurrency: run_http() results}}, concurrency as a
+    string so the report stays JSON-friendly.
+    """
+    results = {}
+    for profile in profiles:
+        with gunicorn_server(profile) as base_url:
+            run_http(base_url, scenarios, requests=warmup, concurrency=min(warmup, 10))
+            results[profile] = {
+                str(concurrency): run_http(base_url, scenarios, requests, concurrency)
+                for concurrency in concurrency_levels
+            }
+    return results
+
+
+def _acquire_burst(settings_dict, alias, burst, hold):
+    """
+    Connect from ``burst`` threads at once, run SELECT 1 and hold the
+    connection for ``hold`` seconds; returns (acquire timings, errors)
+    """
+    backend = load_backend(settings_dict['ENGINE'])
+    barrier = threading.Barrier(burst)
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+
+    def request(_):
+        nonlocal errors
+        wrapper = backend.DatabaseWrapper(settings_dict, alias)
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            wrapper.ensure_connection()
+            elapsed = time.perf_counter() - start
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            time.sleep(hold)
+        except DatabaseError:
+            with lock:
+                errors += 1
+            return
+        finally:
+            wrapper.close()
+        with lock:
+            timings.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=burst) as executor:
+        list(executor.map(request, range(burst)))
+    return timings, errors
+
+
+def measure_connection_acquire(alias='default', burst=50, rounds=5, hold=0.005, pool=None):
+    """
+    Time connection acquisition for ``rounds`` bursts of ``burst`` requests
+
+    'direct' opens a new connection per request (CONN_MAX_AGE = 0); 'pooled'
+    borrows from a fresh pool configured with ``pool`` (OPTIONS['pool'] keys),
+    so its first burst pays for opening the connections. Returns {mode:
+    {cold: timings summary, warm: timings summary, errors, connections_opened}}.
+    """
+    from tours_travels.pooled_postgresql.base import close_pools, get_pools
+
+    if connections[alias].vendor != 'postgresql':
+        raise RuntimeError(f'Database {alias!r} is {connections[alias].vendor}, not PostgreSQL')
+    # Fill django.contrib.postgres's per-alias type OID cache before the bursts
+    connections[alias].ensure_connection()
+    connections[alias].close()
+
+    results = {}
+    for mode, engine in ACQUIRE_MODES.items():
+        options = {key: value for key, value in connections.settings[alias]['OPTIONS'].items() if key != 'pool'}
+        if mode == 'pooled':
+            options['pool'] = {'max_size': 10, **(pool or {})}
+        settings_dict = {**connections.settings[alias], 'ENGINE': engine, 'OPTIONS': options, 'CONN_MAX_AGE': 0}
+        # Start from an empty pool with the benchmark's options
+        close_pools()
+
+        cold, warm = [], []
+        errors = 0
+        for round_number in range(rounds):
+            timings, failed = _acquire_burst(settings_dict, alias, burst, hold)
+            (cold if round_number == 0 else warm).extend(timings)
+            errors += failed
+
+        pools = get_pools()
+        opened = pools[alias].stats()['connections_opened'] if mode == 'pooled' else burst * rounds - errors
+        close_pools()
+        results[mode] = {
+            'burst': burst,
+            'rounds': rounds,
+            'cold': summarize_timings(cold),
+            'warm': summarize_timings(warm),
+            'errors': errors,
+            'connections_opened': opened,
+        }
+    return results
+
+
+
+def legacy_checkout_session(packages=1, addons=2):
+    """
+    Session values of a visitor at the summary step, in the layout used before
+    users.booking_state: the 'cart' dict, 'booking_form_data' and 'checkout_data'
+    """
+    saved_at = timezone.now().replace(tzinfo=None).isoformat()
+    cart, customization = {}, {}
+    for package_id in range(1, packages + 1):
+        addon_ids = list(range(100 * package_id, 100 * package_id + addons))
+        cart[str(package_id)] = {
+            'adults': 2, 'children': 1, 'rooms': 1, 'accommodations': addon_ids, 'travel_modes': addon_ids,
+            'custom_accommodation': '', 'self_drive': False, 'price': '1500',
+        }
+        customization = {
+            'package_id': package_id, 'selected_accommodations': [str(pk) for pk in addon_ids],
+            'custom_accommodation': '', 'selected_travel_modes': [str(pk) for pk in addon_ids], 'self_drive': False,
+        }
+    details = {
+        'full_name': 'Amina Wanjiru', 'email': 'amina@example.com', 'phone_number': '+254701363551',
+        'special_requests': '', 'travel_date': '2026-12-01', 'terms_accepted': True, 'marketing_consent': False,
+    }
+    return {
+        'cart': cart,
+        'booking_form_data': {
+            'package_selection': {'package_id': packages, 'adults': 2, 'children': 1, 'rooms': 1, '_timestamp': saved_at},
+            'customization': {**customization, '_timestamp': saved_at},
+            'details': {**details, '_timestamp': saved_at},
+        },
+        'checkout_data': details,
+    }
+
+
+def _deep_sizeof(value):
+    """Bytes held by ``value`` and the containers and strings inside it"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(key) + _deep_sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_sizeof(item) for item in value)
+    return size
+
+
+def measure_checkout_state(rounds=2000, packages=1, addons=2):
+    """
+    Compare the pre-versioned checkout session layout with users.booking_state
+
+    Both layouts describe the same cart and checkout steps (the compact one is
+    converted from the other). Reports the session payload (JSON and the
+    signed, compressed string the session engine stores), the in-memory size,
+    and per-round timings of encoding (compact: pack + encode) and decoding
+    (compact: decode + unpack).
+    """
+    from django.contrib.sessions.backends.base import SessionBase
+    from django.core.signing import JSONSerializer
+
+    from users import booking_state
+
+    legacy = legacy_checkout_session(packages, addons)
+    state = booking_state.from_legacy(legacy['cart'], legacy['booking_form_data'], legacy['checkout_data'])
+    compact = {settings.CART_SESSION_ID: state.pack()}
+    codec = SessionBase()
+    serializer = JSONSerializer()
+
+    def timed(function):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            function()
+        return round((time.perf_counter() - start) / rounds * 1e6, 2)
+
+    encoded = {'legacy': codec.encode(legacy), 'compact': codec.encode(compact)}
+    results = {
+        'legacy': {
+            'encode_us': timed(lambda: codec.encode(legacy)),
+            'decode_us': timed(lambda: codec.decode(encoded['legacy'])),
+        },
+        'compact': {
+            'encode_us': timed(lambda: codec.encode({settings.CART_SESSION_ID: state.pack()})),
+            'decode_us': timed(
+                lambda: booking_state.BookingState.unpack(codec.decode(encoded['compact'])[settings.CART_SESSION_ID])
+            ),
+        },
+    }
+    # What the request works with: the decoded dicts, or the BookingState
+    memory = {'legacy': _deep_sizeof(legacy), 'compact': _deep_sizeof(state.items) + _deep_sizeof(state.steps)}
+    for name, value in (('legacy', legacy), ('compact', compact)):
+        results[name].update({
+            'json_bytes': len(serializer.dumps(value)),
+            'session_bytes': len(encoded[name]),
+            'memory_bytes': memory[name],
+        })
+    for key in ('json_bytes', 'session_bytes', 'memory_bytes'):
+        results[f'{key}_ratio'] = round(results['legacy'][key] / results['compact'][key], 2)
+    return results
+
+
+def _git_commit():
+    """Current commit hash, if the tree is a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def dataset_counts():
+    """Row counts of the benchmarked tables"""
+    from adminside.models import Accommodation, Destination, Package
+    from blog.models import Post
+    from users.models import Booking
+
+    return {
+        'destinations': Destination.objects.count(),
+        'accommodations': Accommodation.objects.count(),
+        'packages': Package.objects.count(),
+        'bookings': Booking.objects.count(),
+        'posts': Post.objects.count(),
+    }
+
+
+def build_report(in_process, http=None, workers=None, db_pool=None, checkout_state=None):
+    """Assemble a JSON-serializable benchmark report"""
+    return {
+        'created': timezone.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'database': connections['default'].vendor,
+        'dataset': dataset_counts(),
+        'in_process': in_process,
+        'http': http or {},
+        'workers': workers or {},
+        'db_pool': db_pool or {},
+        'checkout_state': checkout_state or {},
+    }
+
+
+def save_report(report, path):
+    """Write a report to ``path`` (directories are created)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, tolerance=20.0):
+    """
+    Compare in-process results against a baseline report
+
+    Returns a list of {scenario, metric, before, after, change_pct,
+    regression} rows. Latency regresses when it grows by more than
+    ``tolerance`` percent; any extra query per request is a regression.
+    """
+    rows = []
+    before_results = baseline.get('in_process', {})
+    for name, after in current.get('in_process', {}).items():
+        before = before_results.get(name)
+        if not before:
+            continue
+        for key, label, is_query_count in COMPARED_METRICS:
+            old, new = before.get(key, 0), after.get(key, 0)
+            change = (new - old) / old * 100 if old else 0.0
+            regression = new > old if is_query_count else change > tolerance
+            rows.append({
+                'scenario': name,
+                'metric': label,
+                'before': old,
+                'after': new,
+                'change_pct': round(change, 1),
+                'regression': regression,
+            })
+    return rows
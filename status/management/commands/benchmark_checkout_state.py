@@ -0,0 +1,46 @@
+"""
+Compare the session cart and checkout state before and after users.booking_state
+
+Builds the session of a visitor at the booking summary in the old layout
+(string-keyed cart dict, booking_form_data and checkout_data), converts it
+to the compact versioned layout, and reports payload and memory sizes with
+the time to encode and decode each.
+
+Usage:
+    python manage.py benchmark_checkout_state
+    python manage.py benchmark_checkout_state --packages 3 --addons 3 --output benchmarks/checkout_state.json
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from status import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Measure session payload size and encode/decode time of the cart and checkout state'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=2000, help='Encodes and decodes timed per layout')
+        parser.add_argument('--packages', type=int, default=1, help='Packages in the cart')
+        parser.add_argument('--addons', type=int, default=2, help='Accommodations and travel modes per package')
+        parser.add_argument('--output', default='', help='Write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        if options['rounds'] < 1 or options['packages'] < 1 or options['addons'] < 0:
+            raise CommandError('--rounds and --packages must be at least 1, --addons at least 0')
+
+        results = benchmarks.measure_checkout_state(options['rounds'], options['packages'], options['addons'])
+
+        columns = ('json_bytes', 'session_bytes', 'memory_bytes', 'encode_us', 'decode_us')
+        self.stdout.write('  ' + 'layout'.ljust(9) + ''.join(column.rjust(15) for column in columns))
+        for layout in ('legacy', 'compact'):
+            self.stdout.write('  ' + layout.ljust(9) + ''.join(
+                str(results[layout][column]).rjust(15) for column in columns
+            ))
+        self.stdout.write('  ' + 'shrink'.ljust(9) + ''.join(
+            f'{results[column + "_ratio"]}x'.rjust(15) for column in columns[:3]
+        ))
+
+        if options['output']:
+            benchmarks.save_report(benchmarks.build_report({}, checkout_state=results), options['output'])
+            self.stdout.write(f'Report written to {options["output"]}')
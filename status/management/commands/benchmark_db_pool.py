@@ -0,0 +1,66 @@
+"""
+Compare connection-acquire latency with and without the connection pool
+
+Fires bursts of simultaneous requests that each connect, run SELECT 1 and
+hold the connection briefly: once opening a new PostgreSQL connection per
+request, once borrowing from tours_travels.pooled_postgresql. The first
+burst is reported separately since it fills the pool.
+
+Usage:
+    python manage.py benchmark_db_pool
+    python manage.py benchmark_db_pool --burst 100 --rounds 10 --max-size 10 --output benchmarks/db_pool.json
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from status import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Measure database connection-acquire latency under a burst, direct against pooled'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to connect to')
+        parser.add_argument('--burst', type=int, default=50, help='Simultaneous requests per burst')
+        parser.add_argument('--rounds', type=int, default=5, help='Bursts per mode')
+        parser.add_argument('--hold-ms', type=float, default=5, help='How long each request keeps its connection')
+        parser.add_argument('--max-size', type=int, default=10, help='Pool size limit for the pooled mode')
+        parser.add_argument('--check-interval', type=float, default=5,
+                            help='Idle seconds after which a checkout runs the health check')
+        parser.add_argument('--output', default='', help='Write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        if options['burst'] < 1 or options['rounds'] < 1:
+            raise CommandError('--burst and --rounds must be at least 1')
+
+        self.stdout.write(
+            f'Acquiring connections on {options["database"]!r}: {options["rounds"]} bursts of '
+            f'{options["burst"]} requests per mode, pool max_size {options["max_size"]}...'
+        )
+        pool = {
+            'max_size': options['max_size'],
+            'timeout': 30,
+            'check_interval': options['check_interval'],
+        }
+        try:
+            results = benchmarks.measure_connection_acquire(
+                options['database'], options['burst'], options['rounds'], options['hold_ms'] / 1000, pool
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write('  acquire latency ms: cold = first burst, warm = later bursts')
+        self.stdout.write('  ' + 'mode'.ljust(8) + ''.join(
+            label.rjust(11) for label in ('cold p50', 'cold p95', 'warm p50', 'warm p95', 'warm p99', 'opened', 'errors')
+        ))
+        for mode, result in results.items():
+            cells = [
+                result['cold']['p50_ms'], result['cold']['p95_ms'],
+                result['warm']['p50_ms'], result['warm']['p95_ms'], result['warm']['p99_ms'],
+                result['connections_opened'], result['errors'],
+            ]
+            self.stdout.write('  ' + mode.ljust(8) + ''.join(str(cell).rjust(11) for cell in cells))
+
+        if options['output']:
+            benchmarks.save_report(benchmarks.build_report({}, db_pool=results), options['output'])
+            self.stdout.write(f'Report written to {options["output"]}')
@@ -0,0 +1,76 @@
+"""
+Compare throughput per gunicorn worker: sync WSGI against uvicorn ASGI
+
+Starts one worker of each profile in status.benchmarks.WORKER_PROFILES on
+a local port, against the configured database, and load-tests the key pages
+at each concurrency level.
+
+Usage:
+    python manage.py benchmark_workers
+    python manage.py benchmark_workers --concurrency 50,200 --requests 800 --output benchmarks/workers.json
+    python manage.py benchmark_workers --profiles asgi --only home,package_list
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from status import benchmarks
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class Command(BaseCommand):
+    help = 'Measure requests per second of one sync and one ASGI gunicorn worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(benchmarks.WORKER_PROFILES),
+                            help='Comma-separated worker profiles to run')
+        parser.add_argument('--concurrency', default='50,200', help='Comma-separated concurrency levels')
+        parser.add_argument('--requests', type=int, default=400, help='HTTP requests per page and level')
+        parser.add_argument('--only', default='', help='Comma-separated scenario names to run')
+        parser.add_argument('--output', default='', help='Write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        profiles = _names(options['profiles'])
+        unknown = set(profiles) - set(benchmarks.WORKER_PROFILES)
+        if unknown:
+            raise CommandError(f'Unknown profiles: {", ".join(sorted(unknown))}')
+        try:
+            levels = [int(level) for level in _names(options['concurrency'])]
+        except ValueError:
+            raise CommandError('--concurrency takes comma-separated numbers')
+
+        scenarios = benchmarks.default_scenarios()
+        if options['only']:
+            wanted = set(_names(options['only']))
+            unknown = wanted - {name for name, _ in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [(name, path) for name, path in scenarios if name in wanted]
+
+        self.stdout.write(
+            f'Load testing {len(scenarios)} scenarios on one worker of {", ".join(profiles)} '
+            f'(concurrency {", ".join(map(str, levels))}, {options["requests"]} requests each)...'
+        )
+        try:
+            results = benchmarks.compare_worker_profiles(scenarios, profiles, levels, options['requests'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self._print_table(results, [name for name, _ in scenarios], profiles, levels)
+
+        if options['output']:
+            benchmarks.save_report(benchmarks.build_report({}, workers=results), options['output'])
+            self.stdout.write(f'Report written to {options["output"]}')
+
+    def _print_table(self, results, names, profiles, levels):
+        columns = [(profile, str(level)) for profile in profiles for level in levels]
+        width = max([len(name) for name in names] + [8])
+        self.stdout.write('  requests/s (errors)')
+        self.stdout.write('  ' + 'scenario'.ljust(width) + ''.join(f'{p}@{c}'.rjust(18) for p, c in columns))
+        for name in names:
+            cells = []
+            for profile, level in columns:
+                result = results[profile][level][name]
+                cells.append(f'{result["throughput_rps"]} ({result["errors"]})'.rjust(18))
+            self.stdout.write('  ' + name.ljust(width) + ''.join(cells))
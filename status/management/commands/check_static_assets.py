@@ -0,0 +1,71 @@
+"""
+Build-time check that templates only reference hashed static assets
+
+Fails when a template names a static file by a literal path (src="assets/...",
+href="/static/...", url(...)) instead of {% static %}, or when a
+STATIC_BUNDLES source is missing. {% static %} references to files that do
+not exist are reported as warnings (errors with --strict).
+
+Usage:
+    python manage.py check_static_assets
+    python manage.py check_static_assets --strict
+"""
+
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management.base import BaseCommand, CommandError
+
+from tours_travels import static_assets
+
+
+class Command(BaseCommand):
+    help = 'Check that templates reference static assets through {% static %}'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strict', action='store_true', help='Also fail on {% static %} references to missing files')
+
+    def handle(self, *args, **options):
+        errors, warnings = [], []
+
+        for bundle_name, source_names in static_assets.get_bundles().items():
+            for source_name in source_names:
+                if not self._find(source_name):
+                    errors.append(f'bundle {bundle_name}: source {source_name} not found')
+
+        for path, text in static_assets.template_files(self._template_dirs()):
+            relative_path = os.path.relpath(path, settings.BASE_DIR)
+            for line, reference in static_assets.find_literal_references(text):
+                errors.append(f'{relative_path}:{line}: literal static path {reference!r}, use {{% static %}}')
+            for line, reference in static_assets.find_static_tag_references(text):
+                if not self._find(reference):
+                    warnings.append(f'{relative_path}:{line}: {{% static {reference!r} %}} not found')
+
+        if options['strict']:
+            errors, warnings = errors + warnings, []
+        for message in warnings:
+            self.stdout.write(self.style.WARNING(f'⚠️  {message}'))
+        for message in errors:
+            self.stderr.write(self.style.ERROR(f'❌ {message}'))
+
+        if errors:
+            raise CommandError(f'{len(errors)} unhashed static asset reference(s) found')
+        self.stdout.write(self.style.SUCCESS(f'✅ Static asset references OK ({len(warnings)} warnings)'))
+
+    def _find(self, name):
+        try:
+            return finders.find(name)
+        except SuspiciousFileOperation:
+            return None
+
+    def _template_dirs(self):
+        """Project template directories (third-party apps are skipped)"""
+        base_dir = str(settings.BASE_DIR)
+        dirs = [os.path.join(base_dir, d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+        for app_config in apps.get_app_configs():
+            if app_config.path.startswith(base_dir) and 'site-packages' not in app_config.path:
+                dirs.append(os.path.join(app_config.path, 'templates'))
+        return [d for d in dict.fromkeys(dirs) if os.path.isdir(d)]
@@ -0,0 +1,50 @@
+"""
+Generate a deterministic scale-test dataset
+
+Usage:
+    python manage.py generate_scale_data                 # 10k packages, 5k destinations, 50k bookings, 20k posts
+    python manage.py generate_scale_data --scale 0.1
+    python manage.py generate_scale_data --packages 2000 --seed 7
+    python manage.py generate_scale_data --clear-only
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from status.scale_data import DEFAULT_COUNTS, ScaleDataGenerator, scaled_counts
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create a deterministic scale-test dataset (replaces any previously generated one)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply the default row counts')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+        parser.add_argument('--clear-only', action='store_true', help='Delete generated rows and exit')
+        for name, count in DEFAULT_COUNTS.items():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=int, dest=name,
+                help=f'Number of {name.replace("_", " ")} (default {count} x scale)'
+            )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive')
+
+        counts = scaled_counts(options['scale'], **{name: options[name] for name in DEFAULT_COUNTS})
+        generator = ScaleDataGenerator(seed=options['seed'], counts=counts, stdout=self.stdout)
+
+        self.stdout.write('Removing previously generated scale data...')
+        generator.clear()
+        if options['clear_only']:
+            self.stdout.write(self.style.SUCCESS('✅ Scale data removed'))
+            return
+
+        self.stdout.write(f'Generating scale data (seed {options["seed"]})...')
+        start = time.perf_counter()
+        created = generator.generate()
+        elapsed = time.perf_counter() - start
+
+        summary = ', '.join(f'{count} {name}' for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'✅ Created {summary} in {elapsed:.1f}s'))
@@ -0,0 +1,70 @@
+"""
+Measure the latency overhead of RequestMetricsMiddleware on a view
+
+Usage:
+    python manage.py measure_request_metrics_overhead
+    python manage.py measure_request_metrics_overhead --path /blog/ --requests 500
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+METRICS_MIDDLEWARE = 'status.middleware.RequestMetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = 'Compare median latency of a view with and without RequestMetricsMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='URL to request (default: the home view)')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per configuration')
+        parser.add_argument('--rounds', type=int, default=10, help='Interleaved rounds to average out drift')
+        parser.add_argument('--max-overhead', type=float, default=2.0, help='Fail above this overhead (percent)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        per_round = max(options['requests'] // options['rounds'], 1)
+
+        without_metrics = [m for m in settings.MIDDLEWARE if m != METRICS_MIDDLEWARE]
+        with_metrics = [METRICS_MIDDLEWARE] + without_metrics
+
+        self.stdout.write(f'Measuring {path} ({per_round * options["rounds"]} requests per configuration)...')
+
+        # Warm up template, URL and ORM caches for both configurations
+        self._timed_requests(path, without_metrics, per_round)
+        self._timed_requests(path, with_metrics, per_round)
+
+        baseline, instrumented = [], []
+        for _ in range(options['rounds']):
+            baseline.extend(self._timed_requests(path, without_metrics, per_round))
+            instrumented.extend(self._timed_requests(path, with_metrics, per_round))
+
+        baseline_ms = statistics.median(baseline) * 1000
+        instrumented_ms = statistics.median(instrumented) * 1000
+        overhead = (instrumented_ms - baseline_ms) / baseline_ms * 100
+
+        self.stdout.write(f'  without metrics: {baseline_ms:.3f} ms (median)')
+        self.stdout.write(f'  with metrics:    {instrumented_ms:.3f} ms (median)')
+
+        if overhead > options['max_overhead']:
+            raise CommandError(
+                f'Metrics overhead {overhead:.2f}% exceeds {options["max_overhead"]:.2f}%'
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ Metrics overhead: {overhead:.2f}%'))
+
+    def _timed_requests(self, path, middleware, count):
+        """Issue ``count`` GET requests with the given middleware stack"""
+        timings = []
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client(SERVER_NAME='localhost')
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(path)
+                timings.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    raise CommandError(f'{path} returned {response.status_code}')
+        return timings
@@ -0,0 +1,85 @@
+"""
+Benchmark the public site and record a JSON baseline
+
+Usage:
+    python manage.py run_benchmarks --output benchmarks/baseline.json
+    python manage.py run_benchmarks --compare benchmarks/baseline.json --tolerance 15
+    python manage.py run_benchmarks --http http://127.0.0.1:8000 --concurrency 20
+    python manage.py run_benchmarks --only home,package_list --requests 200
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from status import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p95/p99 latency and query counts of key pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='In-process requests per page')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per page')
+        parser.add_argument('--only', default='', help='Comma-separated scenario names to run')
+        parser.add_argument('--output', default='', help='Write the JSON report to this path')
+        parser.add_argument('--compare', default='', help='Baseline JSON report to compare against')
+        parser.add_argument('--tolerance', type=float, default=20.0, help='Allowed p95 growth (percent)')
+        parser.add_argument('--http', default='', help='Also load-test a running server at this base URL')
+        parser.add_argument('--http-requests', type=int, default=200, help='HTTP requests per page')
+        parser.add_argument('--concurrency', type=int, default=10, help='Concurrent HTTP workers')
+
+    def handle(self, *args, **options):
+        scenarios = benchmarks.default_scenarios()
+        if options['only']:
+            wanted = {name.strip() for name in options['only'].split(',') if name.strip()}
+            unknown = wanted - {name for name, _ in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [(name, path) for name, path in scenarios if name in wanted]
+
+        self.stdout.write(f'Running {len(scenarios)} scenarios in-process ({options["requests"]} requests each)...')
+        in_process = benchmarks.run_in_process(scenarios, options['requests'], options['warmup'])
+        self._print_table(in_process, ['status', 'p50_ms', 'p95_ms', 'p99_ms', 'queries'])
+
+        http = None
+        if options['http']:
+            self.stdout.write(
+                f'Load testing {options["http"]} ({options["http_requests"]} requests, '
+                f'concurrency {options["concurrency"]})...'
+            )
+            http = benchmarks.run_http(
+                options['http'], scenarios, options['http_requests'], options['concurrency']
+            )
+            self._print_table(http, ['errors', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+        report = benchmarks.build_report(in_process, http)
+        if options['output']:
+            benchmarks.save_report(report, options['output'])
+            self.stdout.write(f'Report written to {options["output"]}')
+
+        failed = [name for name, result in in_process.items() if result['status'] >= 400]
+        if failed:
+            raise CommandError(f'Scenarios returned errors: {", ".join(failed)}')
+
+        if options['compare']:
+            try:
+                baseline = benchmarks.load_report(options['compare'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read baseline: {e}')
+            self._report_comparison(benchmarks.compare(baseline, report, options['tolerance']))
+
+    def _print_table(self, results, columns):
+        width = max([len(name) for name in results] + [8])
+        self.stdout.write('  ' + 'scenario'.ljust(width) + ''.join(column.rjust(16) for column in columns))
+        for name, result in results.items():
+            self.stdout.write('  ' + name.ljust(width) + ''.join(str(result[column]).rjust(16) for column in columns))
+
+    def _report_comparison(self, rows):
+        regressions = [row for row in rows if row['regression']]
+        for row in rows:
+            line = (f'  {row["scenario"]} {row["metric"]}: {row["before"]} -> {row["after"]} '
+                    f'({row["change_pct"]:+.1f}%)')
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions against the baseline')
+        self.stdout.write(self.style.SUCCESS('✅ No regressions against the baseline'))
@@ -0,0 +1,153 @@
+"""
+Aggregate content counters shared by the status dashboard and /metrics/
+
+Each table is counted with a single conditional-aggregate query, and the
+result is cached with a short TTL and served stale-while-revalidate so that
+frequent monitoring scrapes cost (almost) nothing.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+from adminside.models import Destination, Package, Accommodation
+from blog.models import Post
+from users.models import Booking
+
+logger = logging.getLogger(__name__)
+
+CONTENT_STATS_CACHE_KEY = 'status:content_statistics'
+CONTENT_STATS_LOCK_KEY = 'status:content_statistics:refresh'
+
+# (statistics group, metric name, label name, help text)
+PROMETHEUS_METRICS = [
+    ('destinations', 'mbugani_destinations', 'type', 'Active destinations by type'),
+    ('packages', 'mbugani_packages', 'status', 'Travel packages by status'),
+    ('accommodations', 'mbugani_accommodations', 'state', 'Accommodations by active state'),
+    ('blog_posts', 'mbugani_blog_posts', 'status', 'Blog posts by status'),
+    ('bookings', 'mbugani_bookings', 'status', 'Bookings by status'),
+    ('users', 'mbugani_users', 'kind', 'User accounts by kind'),
+]
+
+
+def collect_content_statistics():
+    """
+    Count every tracked table with one conditional-aggregate query per table
+    """
+    destinations = Destination.objects.aggregate(
+        countries=Count('pk', filter=Q(destination_type=Destination.COUNTRY, is_active=True)),
+        cities=Count('pk', filter=Q(destination_type=Destination.CITY, is_active=True)),
+        places=Count('pk', filter=Q(destination_type=Destination.PLACE, is_active=True)),
+        total=Count('pk', filter=Q(is_active=True)),
+        all=Count('pk'),
+    )
+
+    packages = Package.objects.aggregate(
+        published=Count('pk', filter=Q(status=Package.PUBLISHED)),
+        draft=Count('pk', filter=Q(status=Package.DRAFT)),
+        archived=Count('pk', filter=Q(status=Package.ARCHIVED)),
+        total=Count('pk'),
+    )
+
+    accommodations = Accommodation.objects.aggregate(
+        active=Count('pk', filter=Q(is_active=True)),
+        inactive=Count('pk', filter=Q(is_active=False)),
+        total=Count('pk'),
+    )
+
+    blog_posts = Post.objects.aggregate(
+        published=Count('pk', filter=Q(status='published')),
+        draft=Count('pk', filter=Q(status='draft')),
+        total=Count('pk'),
+    )
+
+    bookings = Booking.objects.aggregate(
+        confirmed=Count('pk', filter=Q(status='confirmed')),
+        pending=Count('pk', filter=Q(status='pending')),
+        cancelled=Count('pk', filter=Q(status='cancelled')),
+        total=Count('pk'),
+    )
+
+    users = User.objects.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        staff=Count('pk', filter=Q(is_staff=True)),
+        superusers=Count('pk', filter=Q(is_superuser=True)),
+    )
+
+    return {
+        'destinations': destinations,
+        'packages': packages,
+        'accommodations': accommodations,
+        'blog_posts': blog_posts,
+        'bookings': bookings,
+        'users': users,
+    }
+
+
+def _refresh_content_statistics():
+    """Recompute the statistics and store them with a fresh soft expiry"""
+    fresh_ttl = getattr(settings, 'STATUS_STATS_CACHE_TTL', 15)
+    stale_ttl = getattr(settings, 'STATUS_STATS_STALE_TTL', 300)
+
+    stats = collect_content_statistics()
+    cache.set(
+        CONTENT_STATS_CACHE_KEY,
+        {'stats': stats, 'fresh_until': time.time() + fresh_ttl},
+        fresh_ttl + stale_ttl,
+    )
+    return stats
+
+
+def _refresh_in_background():
+    """Revalidate the cached statistics off the request thread"""
+    try:
+        _refresh_content_statistics()
+    except Exception as e:
+        logger.warning(f"Background refresh of content statistics failed: {e}")
+    finally:
+        cache.delete(CONTENT_STATS_LOCK_KEY)
+        connection.close()
+
+
+def get_cached_content_statistics():
+    """
+    Return content statistics, serving a stale copy while it is revalidated
+
+    A fresh entry is returned as-is. A stale entry is returned immediately and
+    a single background refresh is started (guarded by a cache lock so only one
+    worker recomputes). With nothing cached the statistics are computed inline.
+    """
+    entry = cache.get(CONTENT_STATS_CACHE_KEY)
+    if entry is None:
+        return _refresh_content_statistics()
+
+    if entry['fresh_until'] < time.time():
+        # The lock is released when the refresh finishes; the timeout only
+        # guards against a refresh thread that dies without cleaning up
+        if cache.add(CONTENT_STATS_LOCK_KEY, True, 60):
+            threading.Thread(target=_refresh_in_background, daemon=True).start()
+
+    return entry['stats']
+
+
+def render_prometheus(stats):
+    """
+    Render content statistics in the Prometheus text exposition format
+    """
+    lines = []
+    for group, metric, label, help_text in PROMETHEUS_METRICS:
+        values = stats.get(group)
+        if not values:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for key, value in values.items():
+            lines.append(f'{metric}{{{label}="{key}"}} {value}')
+    return "\n".join(lines) + "\n"
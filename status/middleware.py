@@ -0,0 +1,73 @@
+"""
+Middleware recording per-view performance metrics
+"""
+
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import request_metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, DB query count/time, template render time and cache
+    hits/misses for every request, keyed by the resolved URL name. Queries
+    over SLOW_QUERY_THRESHOLD_MS are also passed to status.slow_queries.
+
+    Should be placed first in MIDDLEWARE so the latency covers the whole stack.
+    Runs natively under ASGI, where the query wrappers are installed on the
+    connections of the request's database thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        record = request_metrics.RequestRecord(request)
+        token = request_metrics.current_record.set(record)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _wrap_connections(stack, record)
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            request_metrics.current_record.reset(token)
+
+        request_metrics.observe(record.view_name, duration, record)
+        return response
+
+    async def __acall__(self, request):
+        record = request_metrics.RequestRecord(request)
+        token = request_metrics.current_record.set(record)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # Connections are per thread: wrap those of the thread the ORM will run in
+                await sync_to_async(_wrap_connections)(stack, record)
+                response = await self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            request_metrics.current_record.reset(token)
+
+        request_metrics.observe(record.view_name, duration, record)
+        return response
+
+
+def _wrap_connections(stack, record):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(record.execute_wrapper))
@@ -0,0 +1,469 @@
+"""
+Per-view request metrics (latency histograms, DB, template and cache timings)
+
+Every thread records into its own shard, so the request path never takes a
+lock. Each worker process periodically writes a snapshot of its shards to a
+shared directory; /metrics/ sums the snapshots of all gunicorn workers and
+renders them in the Prometheus text exposition format. Snapshots also
+carry the counters of the worker's database connection pools
+(tours_travels.pooled_postgresql).
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Positions in a per-view stats row; histogram bucket counts follow FIELD_COUNT
+COUNT, DURATION, DB_QUERIES, DB_TIME, TEMPLATE_TIME, CACHE_HITS, CACHE_MISSES = range(7)
+FIELD_COUNT = 7
+ROW_LENGTH = FIELD_COUNT + len(LATENCY_BUCKETS) + 1
+
+# Pool stats that describe the pool right now rather than accumulate
+POOL_GAUGES = ('size', 'in_use', 'idle', 'min_size', 'max_size')
+POOL_BACKEND_MODULE = 'tours_travels.pooled_postgresql.base'
+
+UNRESOLVED_VIEW = 'unresolved'
+
+current_record = ContextVar('request_metrics_record', default=None)
+
+_shards = []
+_local = threading.local()
+_last_flush = 0.0
+
+
+class RequestRecord:
+    """
+    Counters gathered while a single request is being handled
+    """
+    __slots__ = ('db_queries', 'db_time', 'template_time', 'template_depth',
+                 'cache_hits', 'cache_misses', 'request', 'slow_query_threshold')
+
+    def __init__(self, request=None):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.request = request
+        if getattr(settings, 'SLOW_QUERY_LOG_ENABLED', True):
+            self.slow_query_threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+        else:
+            self.slow_query_threshold = float('inf')
+
+    @property
+    def view_name(self):
+        """URL name of the view handling the request, once resolved"""
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else UNRESOLVED_VIEW
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper counting queries and their duration"""
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db_time += duration
+            self.db_queries += 1
+        if duration >= self.slow_query_threshold:
+            from . import slow_queries
+            slow_queries.observe(context['connection'], sql, params, duration, self.view_name)
+        return result
+
+
+def _get_shard():
+    """Return the calling thread's private stats shard"""
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = {}
+        _local.shard = shard
+        _shards.append(shard)
+        return shard
+
+
+def observe(view_name, duration, record):
+    """
+    Add a finished request to the calling thread's shard
+    """
+    shard = _get_shard()
+    row = shard.get(view_name)
+    if row is None:
+        row = [0] * ROW_LENGTH
+        shard[view_name] = row
+
+    row[COUNT] += 1
+    row[DURATION] += duration
+    row[DB_QUERIES] += record.db_queries
+    row[DB_TIME] += record.db_time
+    row[TEMPLATE_TIME] += record.template_time
+    row[CACHE_HITS] += record.cache_hits
+    row[CACHE_MISSES] += record.cache_misses
+    row[FIELD_COUNT + bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    maybe_flush()
+
+
+def _merge(target, views):
+    """Sum per-view rows from ``views`` into ``target``"""
+    for view_name, row in views.items():
+        if len(row) != ROW_LENGTH:
+            continue
+        existing = target.get(view_name)
+        if existing is None:
+            target[view_name] = list(row)
+        else:
+            for index, value in enumerate(row):
+                existing[index] += value
+    return target
+
+
+def local_snapshot():
+    """
+    Return the summed stats of every thread in this process
+    """
+    snapshot = {}
+    for shard in list(_shards):
+        _merge(snapshot, shard.copy())
+    return snapshot
+
+
+def reset():
+    """Discard all stats recorded by this process"""
+    for shard in list(_shards):
+        shard.clear()
+
+
+def local_pool_stats():
+    """
+    Stats of this process's database connection pools by alias
+    """
+    # Only present once a pooled database connection has been configured
+    backend = sys.modules.get(POOL_BACKEND_MODULE)
+    if backend is None:
+        return {}
+    return {alias: pool.stats() for alias, pool in backend.get_pools().items()}
+
+
+def get_metrics_dir():
+    """Directory shared by all worker processes for their snapshots"""
+    return getattr(
+        settings,
+        'REQUEST_METRICS_DIR',
+        os.path.join(tempfile.gettempdir(), 'mbugani_request_metrics')
+    )
+
+
+def flush():
+    """
+    Atomically write this process's snapshot to the shared directory
+    """
+    global _last_flush
+    _last_flush = time.time()
+
+    metrics_dir = get_metrics_dir()
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'pid': os.getpid(),
+                'updated': _last_flush,
+                'views': local_snapshot(),
+                'pools': local_pool_stats(),
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write request metrics snapshot: {e}")
+
+
+def maybe_flush():
+    """Flush the snapshot if the flush interval has elapsed"""
+    interval = getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 5)
+    if time.time() - _last_flush >= interval:
+        flush()
+
+
+def _read_snapshots():
+    """
+    Yield the snapshot of every worker process
+
+    Snapshots older than REQUEST_METRICS_RETENTION (left behind by recycled
+    workers) are removed. Returns None when the directory cannot be read.
+    """
+    metrics_dir = get_metrics_dir()
+    retention = getattr(settings, 'REQUEST_METRICS_RETENTION', 24 * 60 * 60)
+    now = time.time()
+
+    try:
+        filenames = os.listdir(metrics_dir)
+    except OSError:
+        return None
+
+    snapshots = []
+    for filename in filenames:
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(metrics_dir, filename)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - data.get('updated', 0) > retention:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        snapshots.append(data)
+    return snapshots
+
+
+def aggregate_snapshot():
+    """
+    Return stats summed across all worker processes
+    """
+    flush()
+
+    snapshots = _read_snapshots()
+    if snapshots is None:
+        return local_snapshot()
+
+    snapshot = {}
+    for data in snapshots:
+        _merge(snapshot, data.get('views', {}))
+    return snapshot
+
+
+def aggregate_pool_stats():
+    """
+    Return database pool stats summed across all worker processes
+
+    Counters are summed over every retained snapshot; the size gauges only
+    over workers that flushed in the last three flush intervals, so recycled
+    workers stop counting towards the open connections.
+    """
+    flush()
+
+    snapshots = _read_snapshots()
+    if snapshots is None:
+        snapshots = [{'updated': time.time(), 'pools': local_pool_stats()}]
+
+    fresh_after = time.time() - 3 * getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 5)
+    pools = {}
+    for data in snapshots:
+        fresh = data.get('updated', 0) >= fresh_after
+        for alias, stats in data.get('pools', {}).items():
+            total = pools.setdefault(alias, {'workers': 0})
+            if fresh:
+                total['workers'] += 1
+            for key, value in stats.items():
+                if key in POOL_GAUGES and not fresh:
+                    value = 0
+                if key == 'max_wait_seconds':
+                    total[key] = max(total.get(key, 0), value)
+                else:
+                    total[key] = total.get(key, 0) + value
+    return pools
+
+
+def summarize_pools(pools):
+    """
+    Condense pool stats into wait times and utilisation for JSON responses
+    """
+    summary = {}
+    for alias, stats in sorted(pools.items()):
+        checkouts = stats.get('checkouts', 0)
+        summary[alias] = {
+            'workers': stats.get('workers', 0),
+            'connections': stats.get('size', 0),
+            'in_use': stats.get('in_use', 0),
+            'idle': stats.get('idle', 0),
+            'max_connections': stats.get('max_size', 0),
+            'utilization': round(stats.get('in_use', 0) / stats['max_size'], 3) if stats.get('max_size') else 0.0,
+            'checkouts': checkouts,
+            'avg_wait_ms': round(stats.get('wait_seconds', 0) / checkouts * 1000, 3) if checkouts else 0.0,
+            'max_wait_ms': round(stats.get('max_wait_seconds', 0) * 1000, 3),
+            'waits': stats.get('waits', 0),
+            'timeouts': stats.get('timeouts', 0),
+            'connections_opened': stats.get('connections_opened', 0),
+            'check_failures': stats.get('check_failures', 0),
+        }
+    return summary
+
+
+def summarize(snapshot):
+    """
+    Condense a snapshot into per-view averages for JSON responses
+    """
+    summary = {}
+    for view_name, row in sorted(snapshot.items()):
+        count = row[COUNT] or 1
+        summary[view_name] = {
+            'requests': row[COUNT],
+            'avg_ms': round(row[DURATION] / count * 1000, 2),
+            'avg_db_queries': round(row[DB_QUERIES] / count, 2),
+            'avg_db_ms': round(row[DB_TIME] / count * 1000, 2),
+            'avg_template_ms': round(row[TEMPLATE_TIME] / count * 1000, 2),
+            'cache_hits': row[CACHE_HITS],
+            'cache_misses': row[CACHE_MISSES],
+        }
+    return summary
+
+
+def _label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(snapshot):
+    """
+    Render a snapshot in the Prometheus text exposition format
+    """
+    views = sorted(snapshot.items())
+    lines = [
+        '# HELP mbugani_request_duration_seconds Request latency by view',
+        '# TYPE mbugani_request_duration_seconds histogram',
+    ]
+    for view_name, row in views:
+        view = _label(view_name)
+        cumulative = 0
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            cumulative += row[FIELD_COUNT + index]
+            lines.append(f'mbugani_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+        lines.append(f'mbugani_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {row[COUNT]}')
+        lines.append(f'mbugani_request_duration_seconds_sum{{view="{view}"}} {row[DURATION]:.6f}')
+        lines.append(f'mbugani_request_duration_seconds_count{{view="{view}"}} {row[COUNT]}')
+
+    counters = [
+        ('mbugani_request_db_queries_total', 'Database queries executed by view', DB_QUERIES, '{}'),
+        ('mbugani_request_db_seconds_total', 'Time spent in database queries by view', DB_TIME, '{:.6f}'),
+        ('mbugani_request_template_seconds_total', 'Time spent rendering templates by view', TEMPLATE_TIME, '{:.6f}'),
+        ('mbugani_request_cache_hits_total', 'Cache hits by view', CACHE_HITS, '{}'),
+        ('mbugani_request_cache_misses_total', 'Cache misses by view', CACHE_MISSES, '{}'),
+    ]
+    for metric, help_text, position, value_format in counters:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for view_name, row in views:
+            lines.append(f'{metric}{{view="{_label(view_name)}"}} {value_format.format(row[position])}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def render_pool_prometheus(pools):
+    """
+    Render aggregated database pool stats in the Prometheus text format
+    """
+    if not pools:
+        return ''
+    aliases = sorted(pools.items())
+    lines = [
+        '# HELP mbugani_db_pool_connections Open pooled database connections by state',
+        '# TYPE mbugani_db_pool_connections gauge',
+    ]
+    for alias, stats in aliases:
+        for state in ('in_use', 'idle'):
+            lines.append(f'mbugani_db_pool_connections{{alias="{_label(alias)}",state="{state}"}} {stats.get(state, 0)}')
+
+    lines.append('# HELP mbugani_db_pool_utilization Share of the pool size limit checked out')
+    lines.append('# TYPE mbugani_db_pool_utilization gauge')
+    for alias, stats in aliases:
+        utilization = stats.get('in_use', 0) / stats['max_size'] if stats.get('max_size') else 0
+        lines.append(f'mbugani_db_pool_utilization{{alias="{_label(alias)}"}} {utilization:.4f}')
+
+    metrics = [
+        ('mbugani_db_pool_max_connections', 'gauge', 'Pool size limit summed over workers', 'max_size', '{}'),
+        ('mbugani_db_pool_checkouts_total', 'counter', 'Connections handed out by the pool', 'checkouts', '{}'),
+        ('mbugani_db_pool_wait_seconds_total', 'counter', 'Time spent acquiring pooled connections',
+         'wait_seconds', '{:.6f}'),
+        ('mbugani_db_pool_waits_total', 'counter', 'Checkouts that waited for a connection to be returned',
+         'waits', '{}'),
+        ('mbugani_db_pool_timeouts_total', 'counter', 'Checkouts that gave up after the pool timeout',
+         'timeouts', '{}'),
+        ('mbugani_db_pool_connections_opened_total', 'counter', 'Database connections opened by the pool',
+         'connections_opened', '{}'),
+        ('mbugani_db_pool_check_failures_total', 'counter', 'Connections discarded by the checkout health check',
+         'check_failures', '{}'),
+    ]
+    for metric, metric_type, help_text, key, value_format in metrics:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for alias, stats in aliases:
+            lines.append(f'{metric}{{alias="{_label(alias)}"}} {value_format.format(stats.get(key, 0))}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _instrument_template_render():
+    """Time top-level Django template renders into the current record"""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, '_request_metrics', False):
+        return
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        record = current_record.get()
+        if record is None or record.template_depth:
+            return original_render(self, context, request)
+        record.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            record.template_time += time.perf_counter() - start
+            record.template_depth -= 1
+
+    render._request_metrics = True
+    Template.render = render
+
+
+def _instrument_cache_get():
+    """Count hits and misses of every configured cache backend's get()"""
+    from django.core.cache import caches
+
+    missing = object()
+    for alias in settings.CACHES:
+        backend_class = type(caches[alias])
+        if getattr(backend_class.get, '_request_metrics', False):
+            continue
+        original_get = backend_class.get
+
+        def get(self, key, default=None, version=None, _original_get=original_get):
+            record = current_record.get()
+            if record is None:
+                return _original_get(self, key, default, version)
+            value = _original_get(self, key, missing, version)
+            if value is missing:
+                record.cache_misses += 1
+                return default
+            record.cache_hits += 1
+            return value
+
+        get._request_metrics = True
+        backend_class.get = get
+
+
+def install():
+    """
+    Hook template rendering and cache lookups (called from StatusConfig.ready)
+    """
+    _instrument_template_render()
+    _instrument_cache_get()
@@ -0,0 +1,466 @@
+"""
+Deterministic scale-test data generator
+
+Builds a realistic catalogue (country -> city -> place destination trees,
+accommodations, travel modes, packages with M2M fan-out and itineraries),
+bookings and blog posts with ``bulk_create``. The same seed always yields
+the same rows, so benchmark baselines taken on different commits compare
+like with like. Every generated row is tagged with SCALE_PREFIX (slugs,
+usernames, booking references) so it can be removed again without touching
+real content.
+"""
+
+import logging
+import random
+from datetime import time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SCALE_PREFIX = 'scale-'
+BOOKING_PREFIX = 'SCL'
+BATCH_SIZE = 1000
+
+# Row counts at --scale 1.0
+DEFAULT_COUNTS = {
+    'destinations': 5000,
+    'accommodations': 3000,
+    'travel_modes': 300,
+    'packages': 10000,
+    'bookings': 50000,
+    'posts': 20000,
+    'users': 500,
+    'categories': 20,
+    'tags': 200,
+}
+
+ITINERARY_RATIO = 0.2  # Share of packages with a day-by-day itinerary
+
+_NAME_PREFIXES = ['Ama', 'Bara', 'Kili', 'Masa', 'Naku', 'Samb', 'Tsa', 'Zan', 'Lamu', 'Oka', 'Mara', 'Ruwe']
+_NAME_SUFFIXES = ['ni', 'ru', 'go', 'vo', 'ma', 'wa', 'ti', 'ko', 'buru', 'senga', 'landa', 'rito']
+_PLACE_KINDS = ['National Park', 'Game Reserve', 'Beach', 'Falls', 'Conservancy', 'Old Town', 'Crater', 'Lake']
+_PACKAGE_THEMES = ['Safari', 'Beach Escape', 'Cultural Tour', 'Honeymoon', 'Family Adventure', 'Bush Retreat',
+                   'Birding Expedition', 'Migration Experience', 'City Break', 'Trekking Journey']
+_WORDS = ('savannah sunrise migration lodge crater wildlife guide culture coast dhow spice forest lake '
+          'escarpment baobab acacia leopard elephant rhino lion cheetah giraffe zebra hippo flamingo '
+          'market village dinner camp fire starlit sundowner balloon walk trail reef lagoon').split()
+
+
+def scaled_counts(scale=1.0, **overrides):
+    """
+    Row counts for a scale factor, with optional per-model overrides
+    """
+    counts = {name: max(1, int(count * scale)) for name, count in DEFAULT_COUNTS.items()}
+    counts.update({name: value for name, value in overrides.items() if value is not None})
+    return counts
+
+
+class ScaleDataGenerator:
+    """
+    Generate scale-test rows from a fixed seed
+
+    Usage:
+        generator = ScaleDataGenerator(seed=42, counts=scaled_counts(0.1))
+        generator.clear()
+        created = generator.generate()
+    """
+
+    def __init__(self, seed=42, counts=None, stdout=None):
+        self.rng = random.Random(seed)
+        self.counts = counts or scaled_counts()
+        self.stdout = stdout
+        self.now = timezone.now()
+
+    def log(self, message):
+        """Report progress to the management command (or the logger)"""
+        if self.stdout:
+            self.stdout.write(message)
+        else:
+            logger.info(message)
+
+    def _name(self, words=1):
+        """Pseudo-Swahili place name"""
+        return ' '.join(
+            self.rng.choice(_NAME_PREFIXES) + self.rng.choice(_NAME_SUFFIXES)
+            for _ in range(words)
+        )
+
+    def _sentence(self, words):
+        return ' '.join(self.rng.choice(_WORDS) for _ in range(words)).capitalize() + '.'
+
+    def _html(self, paragraphs, words=40):
+        """Rich-text body like the CKEditor fields hold"""
+        return ''.join(f'<p>{self._sentence(words)}</p>' for _ in range(paragraphs))
+
+    def _bulk_create(self, model, objects, key):
+        """
+        Insert ``objects`` in batches and return them with primary keys set
+
+        Backends that cannot return ids from a bulk insert get them by
+        re-reading the rows through the unique ``key`` field.
+        """
+        for start in range(0, len(objects), BATCH_SIZE):
+            model.objects.bulk_create(objects[start:start + BATCH_SIZE], batch_size=BATCH_SIZE)
+
+        if objects and objects[0].pk is None:
+            for start in range(0, len(objects), BATCH_SIZE):
+                batch = objects[start:start + BATCH_SIZE]
+                ids = dict(
+                    model.objects.filter(**{f'{key}__in': [getattr(obj, key) for obj in batch]})
+                    .values_list(key, 'pk')
+                )
+                for obj in batch:
+                    obj.pk = ids[getattr(obj, key)]
+        return objects
+
+    def _bulk_create_through(self, through, rows):
+        """Insert M2M through rows in batches"""
+        for start in range(0, len(rows), BATCH_SIZE):
+            through.objects.bulk_create(rows[start:start + BATCH_SIZE], batch_size=BATCH_SIZE)
+
+    @transaction.atomic
+    def clear(self):
+        """
+        Delete previously generated rows (cascades to packages and bookings)
+        """
+        from adminside.models import Destination, TravelMode
+        from blog.models import Category, Post
+        from taggit.models import Tag
+        from users.models import Booking
+
+        Booking.objects.filter(booking_reference__startswith=BOOKING_PREFIX).delete()
+        Post.objects.filter(slug__startswith=SCALE_PREFIX).delete()
+        Category.objects.filter(slug__startswith=SCALE_PREFIX).delete()
+        Tag.objects.filter(slug__startswith=SCALE_PREFIX).delete()
+        TravelMode.objects.filter(name__startswith=SCALE_PREFIX).delete()
+        # Deleting the countries cascades down the tree to every package
+        Destination.objects.filter(slug__startswith=SCALE_PREFIX, parent__isnull=True).delete()
+        Destination.objects.filter(slug__startswith=SCALE_PREFIX).delete()
+        User.objects.filter(username__startswith=SCALE_PREFIX).delete()
+
+    @transaction.atomic
+    def generate(self):
+        """
+        Create every model in dependency order and return the row counts
+        """
+        countries, cities, places = self.create_destinations()
+        accommodations = self.create_accommodations(cities + places)
+        travel_modes = self.create_travel_modes()
+        packages = self.create_packages(countries + cities + places, accommodations, travel_modes)
+        itineraries = self.create_itineraries(packages, accommodations)
+        users = self.create_users()
+        bookings = self.create_bookings(packages, users, accommodations, travel_modes)
+        posts = self.create_posts(users)
+
+        return {
+            'destinations': len(countries) + len(cities) + len(places),
+            'accommodations': len(accommodations),
+            'travel_modes': len(travel_modes),
+            'packages': len(packages),
+            'itineraries': itineraries,
+            'users': len(users),
+            'bookings': bookings,
+            'posts': posts,
+        }
+
+    def create_destinations(self):
+        """
+        Build country -> city -> place trees: ~1% countries, ~9% cities
+        """
+        from adminside.models import Destination
+
+        total = self.counts['destinations']
+        country_count = max(1, round(total * 0.01))
+        city_count = max(1, round(total * 0.09))
+        place_count = max(0, total - country_count - city_count)
+
+        def build(index, kind, name, parent=None):
+            return Destination(
+                name=name,
+                slug=f'{SCALE_PREFIX}{kind}-{index}',
+                destination_type=kind,
+                description=self._html(2),
+                parent=parent,
+                display_order=index,
+                is_featured=self.rng.random() < 0.05,
+                is_active=self.rng.random() < 0.97,
+            )
+
+        countries = self._bulk_create(Destination, [
+            build(i, Destination.COUNTRY, self._name()) for i in range(country_count)
+        ], 'slug')
+        cities = self._bulk_create(Destination, [
+            build(i, Destination.CITY, self._name(), countries[i % country_count]) for i in range(city_count)
+        ], 'slug')
+        places = self._bulk_create(Destination, [
+            build(i, Destination.PLACE, f'{self._name()} {self.rng.choice(_PLACE_KINDS)}', self.rng.choice(cities))
+            for i in range(place_count)
+        ], 'slug')
+
+        self.log(f'  destinations: {country_count} countries, {city_count} cities, {place_count} places')
+        return countries, cities, places
+
+    def create_accommodations(self, destinations):
+        """Accommodations spread over cities and places"""
+        from adminside.models import Accommodation
+
+        types = [choice for choice, _ in Accommodation.ACCOMMODATION_TYPES]
+        accommodations = self._bulk_create(Accommodation, [
+            Accommodation(
+                name=f'{self._name()} {self.rng.choice(["Lodge", "Camp", "Hotel", "Resort", "House"])}',
+                slug=f'{SCALE_PREFIX}accommodation-{i}',
+                accommodation_type=self.rng.choice(types),
+                description=self._html(2),
+                destination=self.rng.choice(destinations),
+                price_per_room_per_night=self.rng.randrange(40, 1500, 10),
+                max_occupancy_per_room=self.rng.choice([2, 2, 3, 4]),
+                total_rooms=self.rng.randint(4, 120),
+                image='',
+                amenities='WiFi, Pool, Restaurant, Spa',
+                is_featured=self.rng.random() < 0.05,
+                rating=Decimal(self.rng.randint(30, 50)) / 10,
+                total_reviews=self.rng.randint(0, 800),
+            )
+            for i in range(self.counts['accommodations'])
+        ], 'slug')
+        self.log(f'  accommodations: {len(accommodations)}')
+        return accommodations
+
+    def create_travel_modes(self):
+        """Travel modes of every transport type"""
+        from adminside.models import TravelMode
+
+        types = [choice for choice, _ in TravelMode.TRANSPORT_TYPES]
+        travel_modes = self._bulk_create(TravelMode, [
+            TravelMode(
+                name=f'{SCALE_PREFIX}{i} {self._name()} Express',
+                transport_type=self.rng.choice(types),
+                departure_location=self._name(),
+                arrival_location=self._name(),
+                departure_time=dt_time(self.rng.randint(5, 20), self.rng.choice([0, 15, 30, 45])),
+                arrival_time=dt_time(self.rng.randint(6, 23), self.rng.choice([0, 15, 30, 45])),
+                duration_minutes=self.rng.randint(30, 600),
+                price_per_person=self.rng.randrange(20, 900, 5),
+                child_discount_percentage=self.rng.choice([0, 10, 25, 50]),
+            )
+            for i in range(self.counts['travel_modes'])
+        ], 'name')
+        self.log(f'  travel modes: {len(travel_modes)}')
+        return travel_modes
+
+    def create_packages(self, destinations, accommodations, travel_modes):
+        """
+        Packages with 3-8 accommodations and 1-3 travel modes each
+        """
+        from adminside import package_cards
+        from adminside.models import Package
+
+        statuses = [Package.PUBLISHED] * 8 + [Package.DRAFT, Package.ARCHIVED]
+        packages = []
+        for i in range(self.counts['packages']):
+            days = self.rng.randint(1, 14)
+            adult_price = self.rng.randrange(150, 12000, 25)
+            status = self.rng.choice(statuses)
+            packages.append(Package(
+                name=f'{days}-Day {self._name()} {self.rng.choice(_PACKAGE_THEMES)}',
+                slug=f'{SCALE_PREFIX}package-{i}',
+                description=self._html(4),
+                main_destination=self.rng.choice(destinations),
+                duration_days=days,
+                duration_nights=max(days - 1, 0),
+                adult_price=adult_price,
+                child_price=adult_price * 7 // 10,
+                inclusions=self._html(1, 20),
+                exclusions=self._html(1, 12),
+                featured_image='',
+                total_bookings=self.rng.randint(0, 400),
+                rating=Decimal(self.rng.randint(30, 50)) / 10,
+                total_reviews=self.rng.randint(0, 500),
+                status=status,
+                is_featured=self.rng.random() < 0.03,
+                published_at=self.now - timedelta(days=self.rng.randint(0, 1500)) if status == Package.PUBLISHED else None,
+            ))
+        self._bulk_create(Package, packages, 'slug')
+
+        accommodation_rows = []
+        travel_rows = []
+        AccommodationThrough = Package.available_accommodations.through
+        TravelThrough = Package.available_travel_modes.through
+        for package in packages:
+            for accommodation in self.rng.sample(accommodations, min(len(accommodations), self.rng.randint(3, 8))):
+                accommodation_rows.append(AccommodationThrough(package_id=package.pk, accommodation_id=accommodation.pk))
+            for travel_mode in self.rng.sample(travel_modes, min(len(travel_modes), self.rng.randint(1, 3))):
+                travel_rows.append(TravelThrough(package_id=package.pk, travelmode_id=travel_mode.pk))
+        self._bulk_create_through(AccommodationThrough, accommodation_rows)
+        self._bulk_create_through(TravelThrough, travel_rows)
+        # bulk_create sends no m2m_changed, so fill the card fields here
+        package_cards.refresh_packages([package.pk for package in packages])
+
+        self.log(f'  packages: {len(packages)} ({len(accommodation_rows)} accommodation and '
+                 f'{len(travel_rows)} travel mode links)')
+        return packages
+
+    def create_itineraries(self, packages, accommodations):
+        """Day-by-day itineraries for a share of the packages"""
+        from adminside.models import Itinerary, ItineraryDay
+
+        chosen = [package for package in packages if self.rng.random() < ITINERARY_RATIO]
+        itineraries = [
+            Itinerary(package=package, title=f'{package.name} Itinerary', overview=self._sentence(30))
+            for package in chosen
+        ]
+        for start in range(0, len(itineraries), BATCH_SIZE):
+            Itinerary.objects.bulk_create(itineraries[start:start + BATCH_SIZE])
+        if itineraries and itineraries[0].pk is None:
+            ids = dict(Itinerary.objects.filter(package__in=chosen).values_list('package_id', 'pk'))
+            for itinerary in itineraries:
+                itinerary.pk = ids[itinerary.package_id]
+
+        days = []
+        for itinerary, package in zip(itineraries, chosen):
+            for day_number in range(1, package.duration_days + 1):
+                days.append(ItineraryDay(
+                    itinerary_id=itinerary.pk,
+                    day_number=day_number,
+                    title=f'Day {day_number}: {self._name()}',
+                    description=self._sentence(50),
+                    destination_id=package.main_destination_id,
+                    accommodation=self.rng.choice(accommodations) if self.rng.random() < 0.5 else None,
+                    breakfast=True,
+                    lunch=self.rng.random() < 0.7,
+                    dinner=True,
+                ))
+        self._bulk_create_through(ItineraryDay, days)
+
+        self.log(f'  itineraries: {len(itineraries)} ({len(days)} days)')
+        return len(itineraries)
+
+    def create_users(self):
+        """Registered customers (passwords unusable)"""
+        password = make_password(None)
+        users = self._bulk_create(User, [
+            User(
+                username=f'{SCALE_PREFIX}user-{i}',
+                email=f'{SCALE_PREFIX}user-{i}@example.com',
+                first_name=self._name(),
+                password=password,
+            )
+            for i in range(self.counts['users'])
+        ], 'username')
+        self.log(f'  users: {len(users)}')
+        return users
+
+    def create_bookings(self, packages, users, accommodations, travel_modes):
+        """
+        Bookings (70% guest checkouts) with selected add-ons on a third of them
+        """
+        from users.models import Booking
+
+        statuses = [choice for choice, _ in Booking.STATUS_CHOICES]
+        bookable = [package for package in packages if package.status == package.PUBLISHED] or packages
+        total = self.counts['bookings']
+
+        accommodation_through = Booking.selected_accommodations.through
+        travel_through = Booking.selected_travel_modes.through
+
+        for start in range(0, total, BATCH_SIZE * 10):
+            bookings = []
+            for i in range(start, min(start + BATCH_SIZE * 10, total)):
+                package = self.rng.choice(bookable)
+                adults = self.rng.randint(1, 6)
+                children = self.rng.randint(0, 3)
+                package_price = Decimal(package.adult_price * adults + package.child_price * children)
+                bookings.append(Booking(
+                    booking_reference=f'{BOOKING_PREFIX}{i:07d}',
+                    package=package,
+                    user=self.rng.choice(users) if self.rng.random() < 0.3 else None,
+                    full_name=f'{self._name()} {self._name()}',
+                    email=f'guest{i}@example.com',
+                    phone_number=f'+2547{i:08d}',
+                    number_of_adults=adults,
+                    number_of_children=children,
+                    number_of_rooms=max(1, (adults + children) // 2),
+                    package_price=package_price,
+                    total_amount=package_price,
+                    travel_date=(self.now + timedelta(days=self.rng.randint(-365, 365))).date(),
+                    status=self.rng.choice(statuses),
+                ))
+            self._bulk_create(Booking, bookings, 'booking_reference')
+
+            accommodation_rows = []
+            travel_rows = []
+            for booking in bookings:
+                if self.rng.random() < 0.33:
+                    accommodation_rows.append(accommodation_through(
+                        booking_id=booking.pk, accommodation_id=self.rng.choice(accommodations).pk
+                    ))
+                    travel_rows.append(travel_through(
+                        booking_id=booking.pk, travelmode_id=self.rng.choice(travel_modes).pk
+                    ))
+            self._bulk_create_through(accommodation_through, accommodation_rows)
+            self._bulk_create_through(travel_through, travel_rows)
+
+        self.log(f'  bookings: {total}')
+        return total
+
+    def create_posts(self, users):
+        """
+        Blog posts in categories with 2-5 tags each (85% published)
+        """
+        from blog.models import Category, Post
+        from taggit.models import Tag, TaggedItem
+
+        categories = self._bulk_create(Category, [
+            Category(title=f'{self._name()} Travel', slug=f'{SCALE_PREFIX}category-{i}')
+            for i in range(self.counts['categories'])
+        ], 'slug')
+        tags = self._bulk_create(Tag, [
+            Tag(name=f'{SCALE_PREFIX}{self.rng.choice(_WORDS)}-{i}', slug=f'{SCALE_PREFIX}tag-{i}')
+            for i in range(self.counts['tags'])
+        ], 'slug')
+
+        statuses = ['published'] * 17 + ['draft', 'in_review', 'in_review']
+        alphabet = 'abcdefghijklmnopqrstuvxyz'
+        total = self.counts['posts']
+        content_type = ContentType.objects.get_for_model(Post)
+
+        for start in range(0, total, BATCH_SIZE * 5):
+            posts = [
+                Post(
+                    user=self.rng.choice(users),
+                    title=f'{self.rng.choice(_PACKAGE_THEMES)} in {self._name()}: {self._sentence(5)}',
+                    slug=f'{SCALE_PREFIX}post-{i}',
+                    excerpt=self._html(1, 25) if self.rng.random() < 0.6 else '',
+                    content=self._html(self.rng.randint(4, 10), 45),
+                    category=self.rng.choice(categories),
+                    status=self.rng.choice(statuses),
+                    featured=self.rng.random() < 0.02,
+                    trending=self.rng.random() < 0.02,
+                    views=int(self.rng.paretovariate(1.2) * 20),
+                    pid=''.join(self.rng.choice(alphabet) for _ in range(10)),
+                )
+                for i in range(start, min(start + BATCH_SIZE * 5, total))
+            ]
+            # bulk_create skips Post.save(), which fills the derived text columns
+            for post in posts:
+                post.update_derived_text()
+            posts = self._bulk_create(Post, posts, 'slug')
+
+            tagged = []
+            for post in posts:
+                for tag in self.rng.sample(tags, min(len(tags), self.rng.randint(2, 5))):
+                    tagged.append(TaggedItem(tag=tag, content_type=content_type, object_id=post.pk))
+            self._bulk_create_through(TaggedItem, tagged)
+
+        # bulk inserts send no signals, so build the related-posts index in one pass
+        from blog import related
+        related.rebuild_all()
+
+        self.log(f'  posts: {total} in {len(categories)} categories with {len(tags)} tags')
+        return total
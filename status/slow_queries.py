@@ -0,0 +1,297 @@
+"""
+Slow-query log with automatic EXPLAIN capture
+
+Queries slower than SLOW_QUERY_THRESHOLD_MS (sampled at SLOW_QUERY_SAMPLE_RATE)
+are recorded with their normalized SQL, a fingerprint, the calling view and
+the application stack frame that issued them. The first time a fingerprint
+is seen its plan is captured (``EXPLAIN (FORMAT JSON)`` on PostgreSQL,
+``EXPLAIN QUERY PLAN`` on SQLite). Entries live in a bounded per-process
+ring buffer that each worker mirrors to REQUEST_METRICS_DIR, so the status
+app can show the slow queries of every worker.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .request_metrics import get_metrics_dir
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = 'slow-'
+MAX_SQL_LENGTH = 4000
+MAX_PLANS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+_THIS_FILE = os.path.abspath(__file__)
+
+_entries = None
+_plans = OrderedDict()
+_lock = threading.Lock()
+_explaining = ContextVar('slow_query_explaining', default=False)
+
+
+def get_threshold():
+    """Slow-query threshold in seconds"""
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+
+
+def _get_entries():
+    """Return the ring buffer, sized from SLOW_QUERY_LOG_SIZE"""
+    global _entries
+    size = getattr(settings, 'SLOW_QUERY_LOG_SIZE', 200)
+    if _entries is None or _entries.maxlen != size:
+        _entries = deque(_entries or (), maxlen=size)
+    return _entries
+
+
+def normalize_sql(sql):
+    """
+    Strip literal values from SQL so equivalent queries share a fingerprint
+    """
+    normalized = _STRING_LITERAL.sub('?', sql)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _IN_LIST.sub('(...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def fingerprint(normalized_sql):
+    """Short stable identifier for a normalized statement"""
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:16]
+
+
+def calling_frame():
+    """
+    Return the innermost project (non-library) frame as "path:line in func"
+    """
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        filename = os.path.abspath(frame.filename)
+        if (
+            filename.startswith(_PROJECT_DIR)
+            and filename != _THIS_FILE
+            and 'site-packages' not in filename
+            and f'{os.sep}env{os.sep}' not in filename
+        ):
+            return f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+def explain(connection, sql, params):
+    """
+    Return the query plan for ``sql`` or None if it cannot be explained
+
+    Only read statements are explained. Inside a transaction the EXPLAIN runs
+    in a savepoint so a failure cannot poison the caller's transaction.
+    """
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+
+    if 'JSON' in connection.features.supported_explain_formats:
+        prefix = connection.ops.explain_query_prefix(format='json')
+    else:
+        prefix = connection.ops.explain_query_prefix()
+
+    token = _explaining.set(True)
+    try:
+        with ExitStack() as stack:
+            if connection.in_atomic_block:
+                stack.enter_context(transaction.atomic(using=connection.alias))
+            with connection.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}', params)
+                rows = cursor.fetchall()
+    except Exception as e:
+        logger.debug(f"Could not explain slow query: {e}")
+        return None
+    finally:
+        _explaining.reset(token)
+
+    if connection.vendor == 'postgresql' and rows:
+        plan = rows[0][0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+    if connection.vendor == 'sqlite':
+        return [{'id': row[0], 'parent': row[1], 'detail': row[3]} for row in rows]
+    return [list(row) for row in rows]
+
+
+def observe(connection, sql, params, duration, view_name=''):
+    """
+    Record a query if it exceeded the threshold (and is sampled)
+    """
+    if duration < get_threshold() or _explaining.get():
+        return
+    if random.random() >= getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0):
+        return
+
+    normalized = normalize_sql(sql)[:MAX_SQL_LENGTH]
+    key = fingerprint(normalized)
+
+    with _lock:
+        first_occurrence = key not in _plans
+        if first_occurrence:
+            _plans[key] = None
+            if len(_plans) > MAX_PLANS:
+                _plans.popitem(last=False)
+
+    if first_occurrence and getattr(settings, 'SLOW_QUERY_EXPLAIN', True):
+        _plans[key] = explain(connection, sql, params)
+
+    entry = {
+        'fingerprint': key,
+        'sql': normalized,
+        'duration_ms': round(duration * 1000, 2),
+        'view': view_name,
+        'frame': calling_frame(),
+        'alias': connection.alias,
+        'vendor': connection.vendor,
+        'timestamp': time.time(),
+        'plan': _plans.get(key) if first_occurrence else None,
+    }
+    with _lock:
+        _get_entries().append(entry)
+    logger.warning(f"Slow query ({entry['duration_ms']} ms) in {view_name or 'unknown view'}: {normalized[:200]}")
+    flush()
+
+
+def local_entries():
+    """Slow queries recorded by this process, oldest first"""
+    with _lock:
+        return list(_get_entries())
+
+
+def reset():
+    """Forget all recorded slow queries and captured plans"""
+    with _lock:
+        _get_entries().clear()
+        _plans.clear()
+
+
+def flush():
+    """Atomically mirror this process's ring buffer to the shared directory"""
+    metrics_dir = get_metrics_dir()
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f'{SNAPSHOT_PREFIX}{os.getpid()}.log')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'updated': time.time(), 'entries': local_entries()}, f, default=str)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write slow query log: {e}")
+
+
+def all_entries():
+    """
+    Slow queries of every worker process, newest first
+    """
+    metrics_dir = get_metrics_dir()
+    retention = getattr(settings, 'REQUEST_METRICS_RETENTION', 24 * 60 * 60)
+    now = time.time()
+    entries = []
+
+    try:
+        filenames = os.listdir(metrics_dir)
+    except OSError:
+        filenames = []
+
+    own_file = f'{SNAPSHOT_PREFIX}{os.getpid()}.log'
+    for filename in filenames:
+        if not filename.startswith(SNAPSHOT_PREFIX) or not filename.endswith('.log') or filename == own_file:
+            continue
+        try:
+            with open(os.path.join(metrics_dir, filename)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - data.get('updated', 0) <= retention:
+            entries.extend(data.get('entries', []))
+
+    entries.extend(local_entries())
+    entries.sort(key=lambda entry: entry['timestamp'], reverse=True)
+    return entries
+
+
+def summarize(entries):
+    """
+    Group slow queries by fingerprint, slowest total time first
+    """
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'last_seen': entry['timestamp'],
+                'views': set(),
+                'frame': entry['frame'],
+                'plan': None,
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['last_seen'] = max(group['last_seen'], entry['timestamp'])
+        if entry['view']:
+            group['views'].add(entry['view'])
+        if entry.get('plan') is not None:
+            group['plan'] = entry['plan']
+
+    summary = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
+    for group in summary:
+        group['views'] = sorted(group['views'])
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+    return summary
+
+
+class SlowQueryWrapper:
+    """
+    Standalone execute wrapper for code running outside a request
+    (django-q tasks, management commands)
+    """
+
+    def __init__(self, label=''):
+        self.label = label
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        observe(context['connection'], sql, params, time.perf_counter() - start, self.label)
+        return result
+
+
+@contextmanager
+def capture(label=''):
+    """
+    Log slow queries issued inside the block on every database connection
+
+    Usage:
+        with slow_queries.capture('tasks.rebuild_index'):
+            rebuild_index()
+    """
+    wrapper = SlowQueryWrapper(label)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
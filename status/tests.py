@@ -1,3 +1,817 @@
-from django.test import TestCase
+"""
+Tests for the status app statistics and the /metrics/ endpoint
+"""
 
-# Create your tests here.
+import ast
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from adminside.models import Destination, Package
+from status import benchmarks, metrics, request_metrics, slow_queries
+from status.scale_data import ScaleDataGenerator, scaled_counts
+
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'status-tests',
+    }
+}
+
+
+class ContentStatisticsTest(TestCase):
+    """Test cases for the single-pass content statistics"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.country = Destination.objects.create(
+            name='Kenya',
+            slug='kenya',
+            destination_type=Destination.COUNTRY,
+            description='Country'
+        )
+        Destination.objects.create(
+            name='Nairobi',
+            slug='nairobi',
+            destination_type=Destination.CITY,
+            description='City',
+            parent=self.country,
+            is_active=False
+        )
+        for index, status in enumerate([Package.PUBLISHED, Package.PUBLISHED, Package.DRAFT]):
+            Package.objects.create(
+                name=f'Package {index}',
+                slug=f'package-{index}',
+                description='Package',
+                main_destination=self.country,
+                duration_days=3,
+                duration_nights=2,
+                adult_price=1000,
+                child_price=500,
+                status=status
+            )
+        User.objects.create_user(username='staff', password='pass', is_staff=True)
+
+    def test_collect_uses_one_query_per_table(self):
+        """Test that each table is counted with a single aggregate query"""
+        with self.assertNumQueries(6):
+            stats = metrics.collect_content_statistics()
+
+        self.assertEqual(stats['destinations']['countries'], 1)
+        self.assertEqual(stats['destinations']['cities'], 0)
+        self.assertEqual(stats['destinations']['total'], 1)
+        self.assertEqual(stats['destinations']['all'], 2)
+        self.assertEqual(stats['packages']['published'], 2)
+        self.assertEqual(stats['packages']['draft'], 1)
+        self.assertEqual(stats['packages']['total'], 3)
+        self.assertEqual(stats['users']['staff'], 1)
+
+    def test_render_prometheus(self):
+        """Test Prometheus text exposition output"""
+        text = metrics.render_prometheus(metrics.collect_content_statistics())
+
+        self.assertIn('# TYPE mbugani_packages gauge', text)
+        self.assertIn('mbugani_packages{status="published"} 2', text)
+        self.assertIn('mbugani_destinations{type="all"} 2', text)
+        self.assertTrue(text.endswith('\n'))
+
+    @override_settings(CACHES=LOCMEM_CACHE, STATUS_STATS_CACHE_TTL=15)
+    def test_cached_statistics_are_reused(self):
+        """Test that a fresh cache entry is served without queries"""
+        cache.clear()
+        metrics.get_cached_content_statistics()
+
+        with self.assertNumQueries(0):
+            stats = metrics.get_cached_content_statistics()
+        self.assertEqual(stats['packages']['total'], 3)
+
+    @override_settings(CACHES=LOCMEM_CACHE, STATUS_STATS_CACHE_TTL=0)
+    def test_stale_statistics_are_served_while_revalidating(self):
+        """Test that a stale entry is returned immediately and refreshed once"""
+        cache.clear()
+        metrics.get_cached_content_statistics()
+
+        with mock.patch('status.metrics.threading.Thread') as thread:
+            with self.assertNumQueries(0):
+                stats = metrics.get_cached_content_statistics()
+            metrics.get_cached_content_statistics()
+
+        self.assertEqual(stats['packages']['total'], 3)
+        thread.assert_called_once()
+
+
+class MetricsEndpointTest(TestCase):
+    """Test cases for the /metrics/ endpoint"""
+
+    def test_metrics_json(self):
+        """Test the default JSON response"""
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['database']['packages_count'], 0)
+
+    def test_metrics_prometheus(self):
+        """Test the Prometheus text response"""
+        response = self.client.get('/metrics/', {'format': 'prometheus'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'mbugani_bookings{status="total"} 0', response.content)
+
+    def test_metrics_prometheus_accept_header(self):
+        """Test that scrapers sending Accept: text/plain get Prometheus text"""
+        response = self.client.get('/metrics/', HTTP_ACCEPT='text/plain;version=0.0.4')
+
+        self.assertIn(b'# TYPE mbugani_users gauge', response.content)
+
+
+class RequestMetricsTest(TestCase):
+    """Test cases for the per-view request metrics"""
+
+    def setUp(self):
+        """Use an isolated snapshot directory and empty counters"""
+        self.metrics_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(REQUEST_METRICS_DIR=self.metrics_dir)
+        self.settings_override.enable()
+        request_metrics.reset()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        request_metrics.reset()
+
+    def test_middleware_records_view(self):
+        """Test that a request is recorded under its resolved URL name"""
+        self.client.get('/metrics/')
+        self.client.get('/health/')
+
+        snapshot = request_metrics.local_snapshot()
+        self.assertEqual(snapshot['health_check'][request_metrics.COUNT], 1)
+        self.assertGreater(snapshot['metrics'][request_metrics.DB_QUERIES], 0)
+
+    async def test_middleware_records_asgi_requests(self):
+        """Test that queries are counted when the stack runs under ASGI"""
+        await self.async_client.get('/metrics/')
+
+        snapshot = request_metrics.local_snapshot()
+        self.assertEqual(snapshot['metrics'][request_metrics.COUNT], 1)
+        self.assertGreater(snapshot['metrics'][request_metrics.DB_QUERIES], 0)
+
+    def test_histogram_buckets(self):
+        """Test cumulative histogram rendering"""
+        record = request_metrics.RequestRecord()
+        request_metrics.observe('home:users-home', 0.003, record)
+        request_metrics.observe('home:users-home', 0.3, record)
+        request_metrics.observe('home:users-home', 30, record)
+
+        text = request_metrics.render_prometheus(request_metrics.local_snapshot())
+        self.assertIn('mbugani_request_duration_seconds_bucket{view="home:users-home",le="0.005"} 1', text)
+        self.assertIn('mbugani_request_duration_seconds_bucket{view="home:users-home",le="0.5"} 2', text)
+        self.assertIn('mbugani_request_duration_seconds_bucket{view="home:users-home",le="10.0"} 2', text)
+        self.assertIn('mbugani_request_duration_seconds_bucket{view="home:users-home",le="+Inf"} 3', text)
+        self.assertIn('mbugani_request_duration_seconds_count{view="home:users-home"} 3', text)
+
+    def test_snapshots_are_summed_across_workers(self):
+        """Test that snapshots written by other worker processes are included"""
+        request_metrics.observe('blog:blog-list', 0.02, request_metrics.RequestRecord())
+
+        other_worker = [0] * request_metrics.ROW_LENGTH
+        other_worker[request_metrics.COUNT] = 4
+        other_worker[request_metrics.CACHE_HITS] = 3
+        with open(os.path.join(self.metrics_dir, '99999.json'), 'w') as f:
+            json.dump({'pid': 99999, 'updated': 9e12, 'views': {'blog:blog-list': other_worker}}, f)
+
+        snapshot = request_metrics.aggregate_snapshot()
+        self.assertEqual(snapshot['blog:blog-list'][request_metrics.COUNT], 5)
+        self.assertEqual(snapshot['blog:blog-list'][request_metrics.CACHE_HITS], 3)
+
+    def test_stale_worker_snapshots_are_removed(self):
+        """Test that snapshots of long-gone workers are pruned"""
+        path = os.path.join(self.metrics_dir, '12345.json')
+        with open(path, 'w') as f:
+            json.dump({'pid': 12345, 'updated': 0, 'views': {}}, f)
+
+        request_metrics.aggregate_snapshot()
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_cache_hits_and_misses_are_counted(self):
+        """Test cache lookups made during a request are attributed to it"""
+        request_metrics.install()  # Instrument the overridden cache backend
+        record = request_metrics.RequestRecord()
+        token = request_metrics.current_record.set(record)
+        try:
+            cache.set('present', 1)
+            self.assertEqual(cache.get('present'), 1)
+            self.assertEqual(cache.get('absent', 'fallback'), 'fallback')
+        finally:
+            request_metrics.current_record.reset(token)
+
+        self.assertEqual(record.cache_hits, 1)
+        self.assertEqual(record.cache_misses, 1)
+
+
+class _FakeConnection:
+    """DB-API connection stand-in for the pool tests"""
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTest(TestCase):
+    """Test cases for the pooled PostgreSQL backend's connection pool"""
+
+    def make_pool(self, **kwargs):
+        from tours_travels.pooled_postgresql.pool import ConnectionPool
+
+        self.opened = []
+
+        def connect():
+            connection = _FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        return ConnectionPool(connect, **kwargs)
+
+    def test_returned_connections_are_reused(self):
+        """Test a returned connection is handed out again instead of opening one"""
+        pool = self.make_pool(max_size=2)
+        first = pool.getconn()
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['connections_opened']), (2, 1))
+        self.assertEqual((stats['size'], stats['in_use'], stats['idle']), (1, 1, 0))
+
+    def test_exhausted_pool_waits_then_times_out(self):
+        """Test checkouts wait for a returned connection and give up after the timeout"""
+        from tours_travels.pooled_postgresql.pool import PoolTimeout
+
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        held = pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+        pool.timeout = 5
+        returner = threading.Timer(0.05, pool.putconn, [held])
+        returner.start()
+        self.assertIs(pool.getconn(), held)
+        returner.join()
+
+        stats = pool.stats()
+        self.assertEqual((stats['timeouts'], stats['waits'], stats['connections_opened']), (1, 1, 1))
+        self.assertGreater(stats['max_wait_seconds'], 0.01)
+
+    def test_failed_health_check_replaces_connection(self):
+        """Test a connection failing the checkout check is closed and replaced"""
+        def check(connection):
+            if connection is self.opened[0]:
+                raise OSError('server closed the connection unexpectedly')
+
+        pool = self.make_pool(check=check)
+        broken = pool.getconn()
+        pool.putconn(broken)
+
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, broken)
+        self.assertTrue(broken.closed)
+        self.assertEqual(pool.stats()['check_failures'], 1)
+
+    def test_health_check_skipped_for_recently_used_connections(self):
+        """Test check_interval skips the round trip for connections returned moments ago"""
+        checked = []
+        pool = self.make_pool(check=checked.append, check_interval=60)
+        pool.putconn(pool.getconn())
+        pool.getconn()
+
+        self.assertEqual(checked, [])
+
+    def test_unusable_and_old_connections_are_closed_on_return(self):
+        """Test reset failures, closed connections and max_lifetime retire connections"""
+        pool = self.make_pool(reset=lambda connection: connection is not self.opened[0])
+        failed_reset = pool.getconn()
+        pool.putconn(failed_reset)
+        self.assertTrue(failed_reset.closed)
+
+        already_closed = pool.getconn()
+        already_closed.close()
+        pool.putconn(already_closed)
+
+        pool.max_lifetime = 0
+        expired = pool.getconn()
+        pool.putconn(expired)
+
+        self.assertTrue(expired.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_idle_connections_expire_down_to_min_size(self):
+        """Test connections idle past max_idle are closed, keeping min_size open"""
+        pool = self.make_pool(min_size=1, max_idle=0)
+        connections = [pool.getconn() for _ in range(3)]
+        for connection in connections:
+            pool.putconn(connection)
+
+        self.assertEqual(pool.stats()['size'], 1)
+        self.assertEqual(sum(connection.closed for connection in connections), 2)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_forked_child_does_not_close_parent_connections(self):
+        """Test a forked child starts an empty pool and never closes or drops inherited connections"""
+        from tours_travels.pooled_postgresql import pool as pool_module
+
+        pool = self.make_pool()
+        idle, checked_out = pool.getconn(), pool.getconn()
+        pool.putconn(idle)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child process
+            try:
+                fresh = pool.getconn()
+                pool.putconn(checked_out)
+                pool.putconn(fresh)
+                pool.close()
+                report = [
+                    fresh is not idle, fresh.closed, idle.closed, checked_out.closed,
+                    all(any(c is parked for parked in pool_module._inherited) for c in (idle, checked_out)),
+                    pool.stats()['size'],
+                ]
+                os.write(write_end, repr(report).encode())
+            finally:
+                os._exit(0)
+
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_end) as pipe:
+            report = ast.literal_eval(pipe.read())
+        # New connection, parent's untouched and kept referenced, fresh one closed by close()
+        self.assertEqual(report, [True, 1, 0, 0, True, 0])
+
+    def test_backend_returns_connection_to_pool(self):
+        """Test closing a pooled Django connection gives it back instead of closing it"""
+        from django.core.exceptions import ImproperlyConfigured
+        from tours_travels.pooled_postgresql import base
+
+        settings_dict = {
+            'ENGINE': 'tours_travels.pooled_postgresql', 'NAME': 'mbugani', 'USER': '', 'PASSWORD': '',
+            'HOST': '', 'PORT': '', 'OPTIONS': {'pool': {'max_size': 2}}, 'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TIME_ZONE': None,
+            'TEST': {},
+        }
+        wrapper = base.DatabaseWrapper(settings_dict, 'pool_test')
+        self.addCleanup(base.close_pools)
+        self.assertNotIn('pool', wrapper.get_connection_params())
+
+        pool = self.make_pool()
+        base._pools['pool_test'] = ('mbugani', pool)
+        wrapper.connection = pool.getconn()
+        wrapper.close()
+
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(pool.stats()['idle'], 1)
+        self.assertEqual(base.get_pools(), {'pool_test': pool})
+
+        persistent = base.DatabaseWrapper({**settings_dict, 'NAME': 'other', 'CONN_MAX_AGE': 600}, 'pool_test')
+        with self.assertRaises(ImproperlyConfigured):
+            persistent.pool
+
+    def test_pool_metrics_are_summed_and_rendered(self):
+        """Test pool stats flushed by workers reach the JSON and Prometheus output"""
+        from tours_travels.pooled_postgresql import base
+
+        metrics_dir = tempfile.mkdtemp()
+        pool = self.make_pool(max_size=4)
+        pool.getconn()
+        base._pools['default'] = ('mbugani', pool)
+        self.addCleanup(base._pools.pop, 'default', None)
+
+        other_worker = {'checkouts': 9, 'wait_seconds': 0.5, 'max_wait_seconds': 0.3, 'in_use': 2, 'idle': 1,
+                        'size': 3, 'max_size': 4, 'timeouts': 1}
+        with open(os.path.join(metrics_dir, '99999.json'), 'w') as f:
+            json.dump({'pid': 99999, 'updated': 9e12, 'views': {}, 'pools': {'default': other_worker}}, f)
+
+        with override_settings(REQUEST_METRICS_DIR=metrics_dir):
+            pools = request_metrics.aggregate_pool_stats()
+            response = self.client.get('/metrics/')
+
+        self.assertEqual(pools['default']['checkouts'], 10)
+        self.assertEqual(pools['default']['in_use'], 3)
+        self.assertEqual(pools['default']['max_wait_seconds'], 0.3)
+        self.assertEqual(response.json()['db_pools']['default']['utilization'], 0.375)
+
+        text = request_metrics.render_pool_prometheus(pools)
+        self.assertIn('mbugani_db_pool_connections{alias="default",state="in_use"} 3', text)
+        self.assertIn('mbugani_db_pool_utilization{alias="default"} 0.3750', text)
+        self.assertIn('mbugani_db_pool_timeouts_total{alias="default"} 1', text)
+
+
+class SlowQueryLogTest(TestCase):
+    """Test cases for the slow-query log"""
+
+    def setUp(self):
+        """Use an isolated log directory and an empty ring buffer"""
+        self.metrics_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            REQUEST_METRICS_DIR=self.metrics_dir,
+            SLOW_QUERY_THRESHOLD_MS=0,
+            SLOW_QUERY_SAMPLE_RATE=1.0,
+        )
+        self.settings_override.enable()
+        slow_queries.reset()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        slow_queries.reset()
+
+    def test_normalize_sql(self):
+        """Test that literals are stripped so equivalent queries match"""
+        first = slow_queries.normalize_sql("SELECT * FROM t WHERE id = 5 AND name = 'a'")
+        second = slow_queries.normalize_sql("SELECT *  FROM t WHERE id = 12 AND name = 'b''c'")
+
+        self.assertEqual(first, second)
+        self.assertEqual(slow_queries.fingerprint(first), slow_queries.fingerprint(second))
+        self.assertEqual(
+            slow_queries.normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)'
+        )
+
+    def test_plan_is_captured_once_per_fingerprint(self):
+        """Test that EXPLAIN runs only for the first occurrence of a statement"""
+        with slow_queries.capture('test'):
+            list(Package.objects.filter(pk=1))
+            list(Package.objects.filter(pk=2))
+
+        entries = [e for e in slow_queries.local_entries() if 'adminside_package' in e['sql']]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['fingerprint'], entries[1]['fingerprint'])
+        self.assertIsNotNone(entries[0]['plan'])
+        self.assertIsNone(entries[1]['plan'])
+        self.assertEqual(entries[0]['view'], 'test')
+        self.assertIn('status/tests.py', entries[0]['frame'])
+
+        summary = slow_queries.summarize(entries)
+        self.assertEqual(summary[0]['count'], 2)
+        self.assertIsNotNone(summary[0]['plan'])
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=3)
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the most recent SLOW_QUERY_LOG_SIZE entries are kept"""
+        with slow_queries.capture():
+            for _ in range(5):
+                Package.objects.count()
+
+        self.assertEqual(len(slow_queries.local_entries()), 3)
+
+    @override_settings(SLOW_QUERY_SAMPLE_RATE=0)
+    def test_sampling(self):
+        """Test that unsampled queries are not recorded"""
+        with slow_queries.capture():
+            Package.objects.count()
+
+        self.assertEqual(slow_queries.local_entries(), [])
+
+    def test_entries_of_other_workers_are_included(self):
+        """Test that logs mirrored by other worker processes are merged"""
+        entry = {
+            'fingerprint': 'abc', 'sql': 'SELECT ?', 'duration_ms': 250.0, 'view': 'blog:blog-list',
+            'frame': '', 'alias': 'default', 'vendor': 'sqlite', 'timestamp': 9e12, 'plan': None,
+        }
+        with open(os.path.join(self.metrics_dir, 'slow-99999.log'), 'w') as f:
+            json.dump({'updated': 9e12, 'entries': [entry]}, f)
+
+        self.assertEqual(slow_queries.all_entries()[0]['view'], 'blog:blog-list')
+
+    def test_view_requires_staff(self):
+        """Test that the slow-query page is restricted to staff"""
+        response = self.client.get('/status/slow-queries/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_json(self):
+        """Test the JSON listing of grouped slow queries"""
+        User.objects.create_user(username='staff', password='pass', is_staff=True)
+        self.client.login(username='staff', password='pass')
+
+        response = self.client.get('/status/slow-queries/', {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['threshold_ms'], 0)
+        self.assertTrue(response.json()['queries'])
+
+        response = self.client.get('/status/slow-queries/')
+        self.assertContains(response, 'Slow Query Log')
+
+
+class MaintenanceViewTest(TestCase):
+    """Test the session garbage collection report"""
+
+    def setUp(self):
+        from django.utils import timezone
+        from django_q.models import Task
+
+        User.objects.create_user(username='staff', password='pass', is_staff=True)
+        table = {'table': 'django_session', 'rows': 10, 'dead_rows': None, 'size_bytes': None}
+        Task.objects.create(
+            id='a' * 32, name='session-gc', func='users.tasks.collect_session_garbage',
+            started=timezone.now(), stopped=timezone.now(), success=True,
+            result={
+                'success': True, 'deleted': 7, 'finished': True, 'seconds': 0.2,
+                'tables': [{**table, 'deleted': 7, 'batches': 1, 'finished': True,
+                            'before': {**table, 'rows': 17}, 'after': table}],
+            },
+        )
+
+    def test_view_requires_staff(self):
+        """Test that the maintenance page is restricted to staff"""
+        response = self.client.get('/status/maintenance/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_lists_recent_runs(self):
+        """Test the runs kept by django-q and the current table statistics are shown"""
+        self.client.login(username='staff', password='pass')
+
+        data = self.client.get('/status/maintenance/', {'format': 'json'}).json()
+        self.assertEqual(data['runs'][0]['deleted'], 7)
+        self.assertEqual([table['table'] for table in data['tables']], ['django_session', 'users_guestbooking'])
+
+        response = self.client.get('/status/maintenance/')
+        self.assertContains(response, '7 rows reclaimed')
+        self.assertContains(response, '17 → 10')
+
+
+class ScaleDataTest(TestCase):
+    """Test cases for the scale-test data generator"""
+
+    def _generate(self, seed=7):
+        counts = scaled_counts(0.002, destinations=30, packages=12, bookings=40, posts=15)
+        generator = ScaleDataGenerator(seed=seed, counts=counts)
+        generator.clear()
+        return generator.generate()
+
+    def test_generates_requested_counts(self):
+        """Test that every model gets the requested number of rows"""
+        created = self._generate()
+
+        self.assertEqual(created['destinations'], 30)
+        self.assertEqual(Package.objects.filter(slug__startswith='scale-').count(), 12)
+        self.assertEqual(created['bookings'], 40)
+        self.assertEqual(created['posts'], 15)
+        self.assertTrue(Destination.objects.filter(slug__startswith='scale-place-', parent__isnull=False).exists())
+        self.assertTrue(all(p.available_accommodations.exists() for p in Package.objects.all()))
+
+    def test_same_seed_same_data(self):
+        """Test that regenerating with the same seed reproduces the rows"""
+        self._generate()
+        first = list(Package.objects.order_by('slug').values_list('slug', 'name', 'adult_price'))
+        self._generate()
+        second = list(Package.objects.order_by('slug').values_list('slug', 'name', 'adult_price'))
+
+        self.assertEqual(first, second)
+
+    def test_clear_removes_generated_rows(self):
+        """Test that clear() deletes only generated rows"""
+        self._generate()
+        ScaleDataGenerator().clear()
+
+        self.assertFalse(Package.objects.exists())
+        self.assertFalse(User.objects.filter(username__startswith='scale-').exists())
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class BenchmarkTest(TestCase):
+    """Test cases for the benchmark runner"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        samples = list(range(1, 101))
+        self.assertEqual(benchmarks.percentile(samples, 50), 50)
+        self.assertEqual(benchmarks.percentile(samples, 99), 99)
+        self.assertEqual(benchmarks.percentile([3], 95), 3)
+        self.assertEqual(benchmarks.percentile([], 95), 0.0)
+
+    def test_run_in_process(self):
+        """Test latency and query counts recorded through the test client"""
+        results = benchmarks.run_in_process([('metrics', '/metrics/')], requests=3, warmup=1)
+
+        self.assertEqual(results['metrics']['status'], 200)
+        self.assertEqual(results['metrics']['requests'], 3)
+        self.assertGreater(results['metrics']['queries'], 0)
+        self.assertGreaterEqual(results['metrics']['p99_ms'], results['metrics']['p50_ms'])
+
+    def test_run_http(self):
+        """Test the concurrent HTTP load driver against a local server"""
+        server = HTTPServer(('127.0.0.1', 0), _OkHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base_url = f'http://127.0.0.1:{server.server_address[1]}'
+            results = benchmarks.run_http(base_url, [('root', '/')], requests=8, concurrency=4)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(results['root']['errors'], 0)
+        self.assertGreater(results['root']['throughput_rps'], 0)
+
+    def test_compare_worker_profiles(self):
+        """Test each profile is load-tested at every concurrency level"""
+        started = []
+
+        @contextmanager
+        def fake_gunicorn(profile):
+            started.append(profile)
+            server = HTTPServer(('127.0.0.1', 0), _OkHandler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                yield f'http://127.0.0.1:{server.server_address[1]}'
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        with mock.patch.object(benchmarks, 'gunicorn_server', fake_gunicorn):
+            results = benchmarks.compare_worker_profiles(
+                [('root', '/')], concurrency_levels=(2, 4), requests=8, warmup=2
+            )
+
+        self.assertEqual(started, ['sync', 'asgi'])
+        self.assertEqual(set(results['asgi']), {'2', '4'})
+        self.assertEqual(results['sync']['4']['root']['concurrency'], 4)
+        self.assertEqual(results['sync']['4']['root']['errors'], 0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower p95 and extra queries are reported as regressions"""
+        baseline = {'in_process': {'home': {'p95_ms': 10.0, 'queries': 5}}}
+        current = {'in_process': {'home': {'p95_ms': 11.0, 'queries': 6}}}
+
+        rows = {row['metric']: row for row in benchmarks.compare(baseline, current, tolerance=20)}
+        self.assertFalse(rows['p95 latency']['regression'])
+        self.assertTrue(rows['queries per request']['regression'])
+
+    def test_measure_checkout_state(self):
+        """Test the compact checkout state is at least 3x smaller in JSON and in memory"""
+        results = benchmarks.measure_checkout_state(rounds=5)
+
+        self.assertGreaterEqual(results['json_bytes_ratio'], 3)
+        self.assertGreaterEqual(results['memory_bytes_ratio'], 3)
+        self.assertLess(results['compact']['session_bytes'], results['legacy']['session_bytes'])
+        self.assertGreater(results['compact']['decode_us'], 0)
+
+
+class StaticAssetPipelineTest(TestCase):
+    """Test cases for the bundled, hashed and precompressed static files"""
+
+    BUNDLES = {
+        'bundles/site.css': ('css/base.css', 'vendor/lib/css/lib.css'),
+        'bundles/site.js': ('js/app.js', 'vendor/lib/lib.min.js'),
+    }
+
+    def setUp(self):
+        """Collect a small static tree into a temporary STATIC_ROOT"""
+        self.source_dir = tempfile.mkdtemp()
+        self.static_root = tempfile.mkdtemp()
+        files = {
+            'css/base.css': '@import url("https://fonts.example.com/css?family=A;B");\n'
+                            '/* heading */\nh1 , h2 {\n  content: "a  /* b */";\n  color: red;\n}\n',
+            'vendor/lib/css/lib.css': '/*! lib v1 */\n.icon { background: url(../img/icon.png) no-repeat; }\n'
+                                      '.gone { background: url(../img/missing.png); }\n',
+            'vendor/lib/img/icon.png': 'png',
+            'js/app.js': 'function add(a, b) {\n    // sum\n    return a + b;\n}\n',
+            'vendor/lib/lib.min.js': 'var lib=1;\n//# sourceMappingURL=lib.min.js.map\n',
+        }
+        for name, content in files.items():
+            path = os.path.join(self.source_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+
+        self.settings_override = override_settings(
+            STATIC_ROOT=self.static_root,
+            STATICFILES_DIRS=[self.source_dir],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='tours_travels.static_assets.BundledStaticFilesStorage',
+            STATIC_BUNDLES=self.BUNDLES,
+            STATIC_BUNDLES_ENABLED=True,
+        )
+        self.settings_override.enable()
+
+        from django.core.management import call_command
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(self.static_root, 'staticfiles.json')) as f:
+            self.manifest = json.load(f)['paths']
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def read(self, name):
+        with open(os.path.join(self.static_root, name)) as f:
+            return f.read()
+
+    def test_bundles_are_minified_and_hashed(self):
+        """Test that bundles are concatenated, minified and written under a hashed name"""
+        css = self.read(self.manifest['bundles/site.css'])
+        self.assertNotEqual(self.manifest['bundles/site.css'], 'bundles/site.css')
+        self.assertTrue(css.startswith('@charset "UTF-8";@import url("https://fonts.example.com/css?family=A;B");'))
+        self.assertIn('h1,h2{content: "a  /* b */";color: red}', css)
+        self.assertIn('/*! lib v1 */', css)
+        self.assertNotIn('heading', css)
+        # url() rebased to the bundle directory and pointed at the hashed file
+        icon = self.manifest['vendor/lib/img/icon.png']
+        self.assertIn(f'../vendor/lib/img/{os.path.basename(icon)}', css)
+        # A missing reference is left alone instead of failing collectstatic
+        self.assertIn('url(../vendor/lib/img/missing.png)', css)
+
+        js = self.read(self.manifest['bundles/site.js'])
+        self.assertIn('var lib=1;', js)
+        self.assertNotIn('sourceMappingURL', js)
+
+    def test_precompressed_siblings(self):
+        """Test that hashed files get .gz (and .br with brotli) siblings"""
+        hashed = os.path.join(self.static_root, self.manifest['bundles/site.css'])
+        self.assertTrue(os.path.exists(hashed + '.gz'))
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            return
+        self.assertTrue(os.path.exists(hashed + '.br'))
+
+    def test_template_tag_links_hashed_bundle(self):
+        """Test that {% static_bundle %} links the bundle or, when disabled, its sources"""
+        from django.template import Context, Template
+
+        template = Template('{% load static_bundles %}{% static_bundle "bundles/site.js" defer=True %}')
+        html = template.render(Context())
+        self.assertEqual(html, f'<script defer src="/static/{self.manifest["bundles/site.js"]}"></script>')
+
+        with override_settings(STATIC_BUNDLES_ENABLED=False):
+            html = template.render(Context())
+        self.assertEqual(html.count('<script defer'), 2)
+        self.assertIn(self.manifest['js/app.js'], html)
+
+    def test_missing_file_url_falls_back(self):
+        """Test that {% static %} of an uncollected file does not raise"""
+        from django.templatetags.static import static
+
+        self.assertEqual(static('img/not-there.png'), '/static/img/not-there.png')
+
+    def test_whitenoise_serves_hashed_files_as_immutable(self):
+        """Test the Cache-Control header WhiteNoise sends for hashed names"""
+        from django.test import Client
+
+        response = Client().get(f'/static/{self.manifest["bundles/site.css"]}', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response.close()
+
+
+class StaticReferenceCheckTest(TestCase):
+    """Test cases for the check_static_assets build check"""
+
+    def test_literal_references_are_found(self):
+        """Test that literal asset paths are reported and {% static %} or external URLs are not"""
+        from tours_travels.static_assets import find_literal_references
+
+        text = (
+            '<img src="assets/images/a.jpg">\n'
+            '<link href="/static/css/b.css" rel="stylesheet">\n'
+            '<div style="background: url(\'../images/c.png\')"></div>\n'
+            '<img src="{% static \'assets/images/a.jpg\' %}">\n'
+            '<script src="https://cdn.example.com/lib.js"></script>\n'
+            '<img src="{{ post.image.url }}"><a href="/about/">About</a>\n'
+        )
+        self.assertEqual(find_literal_references(text), [
+            (1, 'assets/images/a.jpg'),
+            (2, '/static/css/b.css'),
+            (3, '../images/c.png'),
+        ])
+
+    def test_project_templates_pass(self):
+        """Test that the project's own templates pass the build check"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        stdout = StringIO()
+        call_command('check_static_assets', stdout=stdout)
+        self.assertIn('Static asset references OK', stdout.getvalue())
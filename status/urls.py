@@ -5,4 +5,6 @@ app_name = 'status'
 
 urlpatterns = [
     path('', views.system_status, name='dashboard'),
+    path('slow-queries/', views.slow_queries, name='slow_queries'),
+    path('maintenance/', views.maintenance, name='maintenance'),
 ]
@@ -1,14 +1,17 @@
 from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
 from django.http import JsonResponse
 from django.db import connection
 from django.core.mail import get_connection
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Q
 from django.contrib.auth.models import User
-from adminside.models import Destination, Package, Accommodation
-from blog.models import Post
+from adminside.models import Destination, Package
 from users.models import Booking
+from .metrics import get_cached_content_statistics
+from . import slow_queries as slow_query_log
+from datetime import datetime
+import json
 import smtplib
 import os
 
@@ -47,74 +50,73 @@ def system_status(request):
         return render(request, 'status/dashboard.html', context)
 
 
-def get_content_statistics():
+@staff_member_required
+def slow_queries(request):
     """
-    Gather content statistics from the database
+    Slow-query log grouped by fingerprint, with captured EXPLAIN plans
+
+    Add ?format=json for the raw grouped data.
     """
-    try:
-        # Destination statistics by type
-        destinations = {
-            'countries': Destination.objects.filter(
-                destination_type=Destination.COUNTRY,
-                is_active=True
-            ).count(),
-            'cities': Destination.objects.filter(
-                destination_type=Destination.CITY,
-                is_active=True
-            ).count(),
-            'places': Destination.objects.filter(
-                destination_type=Destination.PLACE,
-                is_active=True
-            ).count(),
-            'total': Destination.objects.filter(is_active=True).count()
-        }
+    groups = slow_query_log.summarize(slow_query_log.all_entries())
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'threshold_ms': getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100),
+            'queries': groups,
+        })
+
+    for group in groups:
+        group['plan_json'] = json.dumps(group['plan'], indent=2) if group['plan'] is not None else ''
+        group['last_seen_at'] = datetime.fromtimestamp(
+            group['last_seen'],
+            tz=timezone.get_current_timezone() if settings.USE_TZ else None
+        )
 
-        # Package statistics by status
-        packages = {
-            'published': Package.objects.filter(status=Package.PUBLISHED).count(),
-            'draft': Package.objects.filter(status=Package.DRAFT).count(),
-            'archived': Package.objects.filter(status=Package.ARCHIVED).count(),
-            'total': Package.objects.all().count()
-        }
+    context = {
+        'queries': groups,
+        'threshold_ms': getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100),
+        'buffer_size': getattr(settings, 'SLOW_QUERY_LOG_SIZE', 200),
+        'last_updated': timezone.now(),
+        'page_title': 'Slow Query Log'
+    }
+    return render(request, 'status/slow_queries.html', context)
 
-        # Accommodation statistics
-        accommodations = {
-            'active': Accommodation.objects.filter(is_active=True).count(),
-            'inactive': Accommodation.objects.filter(is_active=False).count(),
-            'total': Accommodation.objects.all().count()
-        }
 
-        # Blog post statistics
-        blog_posts = {
-            'published': Post.objects.filter(status='published').count(),
-            'draft': Post.objects.filter(status='draft').count(),
-            'total': Post.objects.all().count()
-        }
+@staff_member_required
+def maintenance(request):
+    """
+    Recent session garbage collection runs (users.session_gc): rows deleted
+    and table size and bloat before and after, with the current statistics
 
-        # Booking statistics
-        bookings = {
-            'confirmed': Booking.objects.filter(status='confirmed').count(),
-            'pending': Booking.objects.filter(status='pending').count(),
-            'cancelled': Booking.objects.filter(status='cancelled').count(),
-            'total': Booking.objects.all().count()
-        }
+    Add ?format=json for the raw reports.
+    """
+    from django.contrib.sessions.models import Session
+    from users import session_gc
+    from users.models import GuestBooking
+
+    runs = session_gc.recent_runs()
+    tables = [session_gc.table_stats(model) for model in (Session, GuestBooking)]
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'tables': tables, 'runs': runs})
+
+    context = {
+        'runs': runs,
+        'tables': tables,
+        'batch_size': getattr(settings, 'SESSION_GC_BATCH_SIZE', 5000),
+        'interval_minutes': getattr(settings, 'SESSION_GC_MINUTES', 60),
+        'last_updated': timezone.now(),
+        'page_title': 'Session Maintenance'
+    }
+    return render(request, 'status/maintenance.html', context)
 
-        # User statistics
-        users = {
-            'total': User.objects.all().count(),
-            'active': User.objects.filter(is_active=True).count(),
-            'staff': User.objects.filter(is_staff=True).count(),
-            'superusers': User.objects.filter(is_superuser=True).count()
-        }
 
-        return {
-            'destinations': destinations,
-            'packages': packages,
-            'accommodations': accommodations,
-            'blog_posts': blog_posts,
-            'bookings': bookings,
-            'users': users
-        }
+def get_content_statistics():
+    """
+    Gather content statistics from the database (cached, see status.metrics)
+    """
+    try:
+        return get_cached_content_statistics()
 
     except Exception as e:
         return {'error': str(e)}
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tours_travels.settings')
+# Serve the read-heavy pages from their async views (see tours_travels.async_views)
+os.environ.setdefault('ASYNC_VIEWS_ENABLED', 'True')
 
 application = get_asgi_application()
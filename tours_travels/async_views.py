@@ -0,0 +1,81 @@
+"""
+Helpers for the async variants of the read-heavy public views
+
+Under ASGI (see tours_travels.gunicorn_asgi) ASYNC_VIEWS_ENABLED routes the
+hot pages to their ``a``-prefixed async views, which read through the async
+ORM. Django 5.0 still runs every async ORM call in the request's single
+database thread, so queries awaited together with asyncio.gather() are
+issued back to back rather than in parallel; the gain is that a worker's
+event loop keeps serving other requests while one waits on the database.
+
+Templates may still touch lazy relations, request.user or the session, so
+pages are rendered in that same database thread.
+
+Usage:
+path('packages/', select_view(views.package_list, views.apackage_list), name='package_list')
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.middleware.cache import CacheMiddleware
+from django.shortcuts import render
+
+
+def select_view(sync_view, async_view):
+    """``async_view`` when ASYNC_VIEWS_ENABLED, else ``sync_view`` (read at URLconf import)"""
+    return async_view if getattr(settings, 'ASYNC_VIEWS_ENABLED', False) else sync_view
+
+
+async def arender(request, template_name, context=None, **kwargs):
+    """render() in the request's database thread"""
+    return await sync_to_async(render)(request, template_name, context, **kwargs)
+
+
+async def alist(queryset):
+    """
+    Evaluate ``queryset`` (prefetches included) without blocking the event loop
+
+    Usage:
+    packages, destinations = await asyncio.gather(alist(packages), alist(destinations))
+    """
+    return [obj async for obj in queryset]
+
+
+async def apaginate(queryset, per_page, number):
+    """
+    Paginator.get_page() with the count and page rows read asynchronously
+
+    Returns (paginator, page); the page's object_list is a list.
+    """
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    page = paginator.get_page(number)
+    page.object_list = await alist(page.object_list)
+    return paginator, page
+
+
+def acache_page(timeout):
+    """
+    cache_page() for async views
+
+    Django's decorator runs the cache lookup in the event loop, which the
+    database cache backend refuses; here both the lookup and the store run
+    in the request's database thread.
+    """
+    def decorator(view_func):
+        middleware = CacheMiddleware(view_func, page_timeout=timeout)
+
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            response = await sync_to_async(middleware.process_request)(request)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+                response = await sync_to_async(middleware.process_response)(request, response)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+"""
+Conditional GET (ETag / Last-Modified) for detail pages
+
+Each decorated view supplies a validator: one ``values_list()`` query
+returning the page object's ``updated_at`` plus, through correlated
+subqueries, the latest change and row count of every related set the page
+renders. The ETag hashes that row with the deploy version, the visitor's
+user and CSRF cookie (which are rendered into the page); Last-Modified is
+the newest timestamp. A matching If-None-Match / If-Modified-Since gets a
+304 before the view runs any other query or template.
+
+Requests with pending flash messages, and anything but GET/HEAD, always
+get the full page.
+"""
+
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import DateTimeField, F, Func, IntegerField, Subquery
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+def related_changes(queryset, field='updated_at'):
+    """
+    Return (latest ``field``, row count) subqueries over a correlated queryset
+
+    Usage:
+    Package.objects.filter(slug=slug).values_list(
+        'updated_at', *related_changes(TravelMode.objects.filter(packages=OuterRef('pk')))
+    )
+    """
+    queryset = queryset.order_by()
+    latest = queryset.annotate(latest=Func(F(field), function='MAX', output_field=DateTimeField()))
+    rows = queryset.annotate(rows=Func(F('pk'), function='COUNT', output_field=IntegerField()))
+    return (
+        Subquery(latest.values('latest')[:1], output_field=DateTimeField()),
+        Subquery(rows.values('rows')[:1], output_field=IntegerField()),
+    )
+
+
+def _is_conditional_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if not getattr(settings, 'CONDITIONAL_GET_ENABLED', True):
+        return False
+    # A pending message must be rendered, not answered with a cached page
+    return len(get_messages(request)) == 0
+
+
+def _csrf_secret(request):
+    # Set from the cookie by CsrfViewMiddleware, or created by get_token() while rendering
+    return request.META.get('CSRF_COOKIE', '')
+
+
+def _etag(request, row):
+    fingerprint = repr((
+        row,
+        getattr(settings, 'CONDITIONAL_GET_VERSION', ''),
+        request.user.pk if hasattr(request, 'user') else None,
+        _csrf_secret(request),
+    ))
+    return 'W/"%s"' % hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+def _validators(request, validator, args, kwargs):
+    """(row, etag, last modified) for the request, computed once per request"""
+    if not hasattr(request, '_conditional_validators'):
+        result = None
+        if _is_conditional_request(request):
+            row = validator(request, *args, **kwargs)
+            if row is not None:
+                timestamps = [value for value in row if isinstance(value, datetime.datetime)]
+                last_modified = max(timestamps) if timestamps else None
+                if last_modified and timezone.is_naive(last_modified):
+                    last_modified = timezone.make_aware(last_modified)
+                result = (row, _etag(request, row), last_modified)
+        request._conditional_validators = result
+    return request._conditional_validators
+
+
+def conditional_page(validator):
+    """
+    Decorator answering conditional GETs of a detail view with 304s
+
+    ``validator(request, *args, **kwargs)`` returns the validator row from
+    a single query (``.values_list(...).first()``), or None when the object
+    does not exist so the view can 404 as usual. Async views are supported;
+    the validator query then runs in the request's database thread.
+
+    Usage:
+    @conditional_page(package_validator)
+    def package_detail(request, slug):
+    """
+    def etag_func(request, *args, **kwargs):
+        validators = _validators(request, validator, args, kwargs)
+        return validators[1] if validators else None
+
+    def last_modified_func(request, *args, **kwargs):
+        validators = _validators(request, validator, args, kwargs)
+        return validators[2] if validators else None
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        def finish(request, response, csrf_secret):
+            validators = getattr(request, '_conditional_validators', None)
+            if validators and response.status_code == 200 and _csrf_secret(request) != csrf_secret:
+                # The page set a new CSRF cookie: tag it with the secret it was rendered with
+                response['ETag'] = _etag(request, validators[0])
+            if response.has_header('ETag'):
+                # Let browsers keep the page but revalidate it on every visit
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                csrf_secret = _csrf_secret(request)
+                # condition() calls the validator funcs in the event loop: query first in the DB thread
+                await sync_to_async(_validators)(request, validator, args, kwargs)
+                response = await conditional_view(request, *args, **kwargs)
+                return finish(request, response, csrf_secret)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            csrf_secret = _csrf_secret(request)
+            response = conditional_view(request, *args, **kwargs)
+            return finish(request, response, csrf_secret)
+
+        return wrapper
+
+    return decorator
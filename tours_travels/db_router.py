@@ -0,0 +1,139 @@
+"""
+Database router sending catalog and blog reads to a read replica
+
+Reads of REPLICA_MODELS made while serving a request go to the
+settings.REPLICA_DATABASE alias; writes, and everything outside a request
+(django-q tasks, management commands), use the primary. The request's state
+comes from tours_travels.middleware.PrimaryPinMiddleware: once a request
+writes, its remaining reads use the primary and a cookie keeps the client's
+next requests there for REPLICA_PIN_SECONDS, so visitors read their own
+writes. Reads also fall back to the primary while the replica lags more than
+REPLICA_MAX_LAG_SECONDS (checked every REPLICA_LAG_CHECK_INTERVAL seconds).
+
+Usage:
+    DATABASE_ROUTERS = ['tours_travels.db_router.ReplicaRouter']
+    REPLICA_DATABASE = 'replica'
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Read-mostly catalog and blog models (app_label.model_name)
+REPLICA_MODELS = frozenset({
+    'adminside.destination', 'adminside.package', 'adminside.accommodation', 'adminside.travelmode',
+    'adminside.itinerary', 'adminside.itineraryday', 'blog.post', 'blog.category',
+})
+
+# Bookkeeping writes that do not pin a request to the primary
+PIN_EXEMPT_MODELS = frozenset({'django_cache.cacheentry', 'sessions.session', 'blog.postviewdelta'})
+
+# Replay delay of a streaming PostgreSQL standby; 0 when it has replayed everything received
+POSTGRESQL_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+current_request = ContextVar('db_router_request', default=None)
+
+_lag_checks = {}  # alias -> (time.monotonic() of the check, lag in seconds)
+_lag_lock = threading.Lock()
+
+
+class RequestState:
+    """
+    Whether the current request must read from the primary
+    """
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+    @property
+    def use_primary(self):
+        return self.pinned or self.wrote
+
+
+def _model_label(model):
+    meta = model._meta
+    # Many-to-many through tables follow the model that declares the field
+    parent = getattr(meta, 'auto_created', None)
+    if parent:
+        meta = parent._meta
+    return f'{meta.app_label}.{meta.model_name}'
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind the primary (0 for non-PostgreSQL replicas)"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+def replica_available(alias):
+    """
+    Whether the replica is reachable and within REPLICA_MAX_LAG_SECONDS
+
+    One thread per process re-checks after REPLICA_LAG_CHECK_INTERVAL;
+    others use the last result meanwhile.
+    """
+    checked, lag = _lag_checks.get(alias, (None, None))
+    now = time.monotonic()
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+    if (checked is None or now - checked >= interval) and _lag_lock.acquire(blocking=False):
+        try:
+            try:
+                lag = replica_lag(alias)
+            except DatabaseError as e:
+                logger.warning(f"Read replica {alias!r} unavailable, reading from the primary: {e}")
+                lag = float('inf')
+            _lag_checks[alias] = (now, lag)
+        finally:
+            _lag_lock.release()
+    return lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5)
+
+
+def reset_lag_checks():
+    """Forget cached replica lag results"""
+    _lag_checks.clear()
+
+
+class ReplicaRouter:
+    """
+    Route catalog reads to the replica; all writes go to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(settings, 'REPLICA_DATABASE', None)
+        state = current_request.get()
+        if not alias or state is None or state.use_primary:
+            return None
+        if _model_label(model) not in REPLICA_MODELS or not replica_available(alias):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = current_request.get()
+        if state is not None and _model_label(model) not in PIN_EXEMPT_MODELS:
+            state.wrote = True
+        # Explicit, so instances read from the replica are not saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, getattr(settings, 'REPLICA_DATABASE', None)}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
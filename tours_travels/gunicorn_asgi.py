@@ -0,0 +1,30 @@
+"""
+Gunicorn profile serving the ASGI application with uvicorn workers
+
+Each worker runs an event loop: a request waiting on the database or SMTP
+no longer holds the whole worker, and tours_travels.asgi routes the
+read-heavy pages to their async views. Command-line flags still override
+these values.
+
+Usage:
+gunicorn -c python:tours_travels.gunicorn_asgi tours_travels.asgi:application
+"""
+
+import os
+
+try:
+    import uvicorn_worker  # noqa: F401
+    worker_class = 'uvicorn_worker.UvicornWorker'
+except ImportError:
+    # Older uvicorn releases ship the worker themselves
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '3'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '240'))
+max_requests = 1000
+max_requests_jitter = 100
+preload_app = True
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
@@ -15,6 +15,10 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from adminside.models import Package, Destination
 from users.models import Booking
+from status import request_metrics
+from status.metrics import get_cached_content_statistics, render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
 
 @require_http_methods(["GET"])
@@ -203,18 +207,38 @@ def liveness_check(request):
 def metrics(request):
     """
     Basic metrics endpoint for monitoring
+
+    Returns JSON by default and the Prometheus text exposition format when
+    requested with ?format=prometheus or an Accept header preferring text/plain
+    (as sent by Prometheus scrapers). Counters come from the cached
+    single-pass aggregates in status.metrics; per-view request metrics are
+    summed across all worker processes by status.request_metrics, as are
+    the database connection pool counters.
     """
     try:
+        stats = get_cached_content_statistics()
+        request_snapshot = request_metrics.aggregate_snapshot()
+        pool_stats = request_metrics.aggregate_pool_stats()
+
+        if wants_prometheus(request):
+            return HttpResponse(
+                render_prometheus(stats)
+                + request_metrics.render_prometheus(request_snapshot)
+                + request_metrics.render_pool_prometheus(pool_stats),
+                content_type=PROMETHEUS_CONTENT_TYPE,
+                status=200
+            )
+
         metrics_data = {
             "timestamp": time.time(),
             "database": {
-                "users_count": User.objects.count(),
-                "packages_count": Package.objects.count(),
-                "destinations_count": Destination.objects.count(),
-                "bookings_count": Booking.objects.count(),
-                "published_packages": Package.objects.filter(status=Package.PUBLISHED).count(),
-                "pending_bookings": Booking.objects.filter(status='pending').count(),
-                "confirmed_bookings": Booking.objects.filter(status='confirmed').count(),
+                "users_count": stats['users']['total'],
+                "packages_count": stats['packages']['total'],
+                "destinations_count": stats['destinations']['all'],
+                "bookings_count": stats['bookings']['total'],
+                "published_packages": stats['packages']['published'],
+                "pending_bookings": stats['bookings']['pending'],
+                "confirmed_bookings": stats['bookings']['confirmed'],
             },
             "system": {
                 "debug_mode": settings.DEBUG,
@@ -222,7 +246,9 @@ def metrics(request):
                 "database_engine": settings.DATABASES['default']['ENGINE'],
                 "cache_backend": settings.CACHES['default']['BACKEND'],
                 "email_backend": settings.EMAIL_BACKEND,
-            }
+            },
+            "requests": request_metrics.summarize(request_snapshot),
+            "db_pools": request_metrics.summarize_pools(pool_stats),
         }
         
         # Add memory usage if available
@@ -246,6 +272,19 @@ def metrics(request):
         }, status=500)
 
 
+def wants_prometheus(request):
+    """
+    Check whether the client asked for the Prometheus text format
+    """
+    if request.GET.get('format') == 'prometheus':
+        return True
+    accept = request.headers.get('Accept', '')
+    return (
+        'application/openmetrics-text' in accept
+        or ('text/plain' in accept and 'application/json' not in accept)
+    )
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def csp_report(request):
@@ -0,0 +1,92 @@
+"""
+Project middleware
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import db_router
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI
+
+    WhiteNoise's middleware is sync-only, so Django would otherwise switch
+    the rest of the stack (and every async view) to a thread per request.
+    Static files are looked up in memory and opened off the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class PrimaryPinMiddleware:
+    """
+    Give tours_travels.db_router the read-your-writes state of each request
+
+    Requests carrying the REPLICA_PIN_COOKIE read from the primary. A request
+    that writes sets the cookie for REPLICA_PIN_SECONDS, long enough for the
+    replica to catch up. Unused when no REPLICA_DATABASE is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REPLICA_DATABASE', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'REPLICA_PIN_COOKIE', 'primary_pin')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = db_router.RequestState(pinned=self.cookie_name in request.COOKIES)
+        token = db_router.current_request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.current_request.reset(token)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        state = db_router.RequestState(pinned=self.cookie_name in request.COOKIES)
+        token = db_router.current_request.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.current_request.reset(token)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 15),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,8 @@
+"""
+Pooled PostgreSQL database backend
+
+Usage (settings.DATABASES):
+    'ENGINE': 'tours_travels.pooled_postgresql',
+    'OPTIONS': {'pool': {'min_size': 2, 'max_size': 10}},
+    'CONN_MAX_AGE': 0,
+"""
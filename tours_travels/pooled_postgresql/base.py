@@ -0,0 +1,150 @@
+"""
+PostgreSQL backend borrowing connections from a per-process pool
+
+Django 5.0 has no built-in pool (OPTIONS['pool'] arrives in 5.1 and needs
+psycopg 3), so this wraps django.db.backends.postgresql: opening a
+connection checks one out of the alias's ConnectionPool and closing it
+rolls back any open transaction and returns it. CONN_MAX_AGE must be 0 so
+connections go back to the pool at the end of every request.
+
+The pool settings live in OPTIONS['pool'] (the keys Django 5.1 forwards to
+psycopg_pool, plus check_interval):
+
+    'OPTIONS': {
+        'pool': {'min_size': 2, 'max_size': 10, 'timeout': 10,
+                 'max_lifetime': 1800, 'max_idle': 300, 'check_interval': 30},
+    }
+
+Connections never carry session state between checkouts, which keeps them
+safe behind PgBouncer/Supavisor in transaction mode: psycopg2 does not use
+server-side prepared statements, and server-side cursors must be disabled
+with DISABLE_SERVER_SIDE_CURSORS.
+"""
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+from django.dispatch import receiver
+from django.utils.asyncio import async_unsafe
+
+from .pool import ConnectionPool, PoolTimeout
+
+POOL_OPTIONS = ('min_size', 'max_size', 'timeout', 'max_lifetime', 'max_idle', 'check_interval')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pools():
+    """Pools of this process by database alias"""
+    return {alias: pool for alias, (_, pool) in list(_pools.items())}
+
+
+def close_pools():
+    """Close the idle connections of every pool and forget the pools"""
+    with _pools_lock:
+        pools = [pool for _, pool in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+@receiver(setting_changed)
+def _reset_pools(*, setting, **kwargs):
+    if setting == 'DATABASES':
+        close_pools()
+
+
+def _check(connection):
+    """Checkout health check: one round trip, leaving no transaction open"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if not connection.autocommit:
+        connection.rollback()
+
+
+def _reset(connection):
+    """End whatever transaction the borrower left open; False if the connection is broken"""
+    status = connection.info.transaction_status
+    if status == base.Database.extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != base.Database.extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    django.db.backends.postgresql with connections checked out of a pool
+    """
+
+    def __init__(self, settings_dict, alias='default'):
+        super().__init__(settings_dict, alias)
+        if is_psycopg3:
+            raise ImproperlyConfigured(
+                'tours_travels.pooled_postgresql wraps psycopg2; with psycopg 3 on Django 5.1+ '
+                'use django.db.backends.postgresql with OPTIONS["pool"] instead.'
+            )
+
+    @property
+    def pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool') or {}
+        if options is True:
+            options = {}
+        unknown = set(options) - set(POOL_OPTIONS)
+        if unknown:
+            raise ImproperlyConfigured(f'Unknown database pool options: {", ".join(sorted(unknown))}')
+        return options
+
+    @property
+    def pool(self):
+        """This alias's pool, created on first use and again when NAME changes (test databases)"""
+        name = self.settings_dict['NAME']
+        database, pool = _pools.get(self.alias, (None, None))
+        if pool is not None and database == name:
+            return pool
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Pooled connections need CONN_MAX_AGE = 0.')
+        with _pools_lock:
+            database, pool = _pools.get(self.alias, (None, None))
+            if pool is not None and database != name:
+                pool.close()
+                pool = None
+            if pool is None:
+                # A plain wrapper opens the connections, so none is tied to a thread's wrapper
+                opener = base.DatabaseWrapper(self.settings_dict, self.alias)
+                conn_params = self.get_connection_params()
+                pool = ConnectionPool(
+                    lambda: opener.get_new_connection(conn_params),
+                    check=_check, reset=_reset, name=self.alias, **self.pool_options
+                )
+                _pools[self.alias] = (name, pool)
+        return pool
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        try:
+            connection = self.pool.getconn()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+        # The parent class validated the level when it opened the connection
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            IsolationLevel.READ_COMMITTED if isolation_level is None else IsolationLevel(isolation_level)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+                # Another thread may check it out from now on
+                self.connection = None
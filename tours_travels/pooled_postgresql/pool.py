@@ -0,0 +1,261 @@
+"""
+Thread-safe database connection pool with checkout health checks
+
+Works on any DB-API connection: the backend passes in the callables that
+open, check and reset a connection. Callers block for up to ``timeout``
+seconds when all ``max_size`` connections are checked out. Connections idle
+for longer than ``max_idle`` are closed until ``min_size`` remain, and
+connections older than ``max_lifetime`` are replaced on their next return.
+
+A pool belongs to the process that created it: after a fork (gunicorn
+--preload, django-q workers) the child starts an empty pool. Connections
+inherited from the parent are never closed or garbage collected in the
+child: closing one, or letting psycopg2 finalize it (PQfinish), sends
+Terminate on the socket the parent still uses and ends its session. They
+are parked in a module-level list for the life of the process instead.
+
+Usage:
+    pool = ConnectionPool(connect, check=check, reset=reset, max_size=10)
+    connection = pool.getconn()
+    try:
+        ...
+    finally:
+        pool.putconn(connection)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# id(connection) -> pid of the process that opened it, for every pool
+_owner_pids = {}
+# Connections opened by another process, kept referenced and never closed
+_inherited = []
+
+
+def _is_inherited(connection):
+    return _owner_pids.get(id(connection), os.getpid()) != os.getpid()
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded LIFO pool; the most recently returned connection is handed out
+    first so the others can age out under low traffic
+    """
+
+    def __init__(self, connect, check=None, reset=None, name='default', min_size=0, max_size=10,
+                 timeout=10.0, max_lifetime=30 * 60, max_idle=5 * 60, check_interval=0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f'Invalid pool sizes: min_size={min_size}, max_size={max_size}')
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self._connect = connect
+        self._check = check
+        self._reset = reset
+        self._lock = threading.Condition()
+        self._pid = os.getpid()
+        self._closed = False
+        self._idle = deque()  # (connection, returned_at), most recent on the right
+        self._opened_at = {}  # id(connection) -> time.monotonic() when opened
+        self._size = 0
+        self._in_use = 0
+        self._stats = dict.fromkeys((
+            'checkouts', 'waits', 'wait_seconds', 'max_wait_seconds', 'timeouts',
+            'connections_opened', 'connections_closed', 'check_failures',
+        ), 0)
+
+    def _after_fork(self):
+        """Park the parent's connections and start empty (called with the lock held)"""
+        logger.info(f'Database pool {self.name!r} reset after fork')
+        self._pid = os.getpid()
+        _inherited.extend(connection for connection, _ in self._idle)
+        self._idle.clear()
+        self._opened_at.clear()
+        self._size = 0
+        self._in_use = 0
+
+    def getconn(self):
+        """
+        Return a healthy connection, opening one if the pool is not full
+
+        Raises PoolTimeout when none is returned to the pool in time.
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._after_fork()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No connection available in database pool {self.name!r} '
+                            f'after {self.timeout}s ({self.max_size} in use)'
+                        )
+                    waited = True
+                    self._lock.wait(remaining)
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                else:
+                    connection, returned_at = None, None
+                    self._size += 1
+                self._in_use += 1
+
+            if connection is None:
+                connection = self._open()
+            elif not self._healthy(connection, returned_at):
+                self._discard(connection)
+                continue
+
+            wait = time.monotonic() - start
+            with self._lock:
+                self._stats['checkouts'] += 1
+                self._stats['wait_seconds'] += wait
+                self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], wait)
+                if waited:
+                    self._stats['waits'] += 1
+            return connection
+
+    def _open(self):
+        """Open a connection for a slot already counted in _size and _in_use"""
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opened_at[id(connection)] = time.monotonic()
+            _owner_pids[id(connection)] = os.getpid()
+            self._stats['connections_opened'] += 1
+        return connection
+
+    def _healthy(self, connection, returned_at):
+        """Run the checkout health check when the connection sat idle long enough"""
+        if getattr(connection, 'closed', False):
+            return False
+        if self._check is None or time.monotonic() - returned_at < self.check_interval:
+            return True
+        try:
+            self._check(connection)
+        except Exception as e:
+            logger.warning(f'Discarding broken connection from database pool {self.name!r}: {e}')
+            with self._lock:
+                self._stats['check_failures'] += 1
+            return False
+        return True
+
+    def putconn(self, connection):
+        """Give a checked-out connection back, closing it if it is unusable or too old"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._after_fork()
+            if _is_inherited(connection):
+                # Checked out in the parent before the fork: leave its socket alone
+                _inherited.append(connection)
+                return
+            opened_at = self._opened_at.get(id(connection))
+        if opened_at is None:
+            # Not ours (e.g. checked out before the pool was replaced)
+            self._close(connection)
+            return
+
+        reusable = not getattr(connection, 'closed', False)
+        if reusable and self._reset is not None:
+            try:
+                reusable = self._reset(connection) is not False
+            except Exception as e:
+                logger.warning(f'Could not reset connection for database pool {self.name!r}: {e}')
+                reusable = False
+        if reusable and (self._closed or time.monotonic() - opened_at >= self.max_lifetime):
+            reusable = False
+        if not reusable:
+            self._discard(connection)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            expired = self._expire_idle()
+            self._lock.notify()
+        for stale in expired:
+            self._close(stale)
+
+    def _expire_idle(self):
+        """Pop connections idle past max_idle, keeping min_size open (lock held)"""
+        expired = []
+        cutoff = time.monotonic() - self.max_idle
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            connection, _ = self._idle.popleft()
+            self._opened_at.pop(id(connection), None)
+            self._size -= 1
+            expired.append(connection)
+        return expired
+
+    def _discard(self, connection):
+        """Close a checked-out connection and free its slot"""
+        with self._lock:
+            self._opened_at.pop(id(connection), None)
+            self._size -= 1
+            self._in_use -= 1
+            self._lock.notify()
+        self._close(connection)
+
+    def _close(self, connection):
+        """Close a connection this process opened; park one it inherited"""
+        if _is_inherited(connection):
+            _inherited.append(connection)
+            return
+        with self._lock:
+            _owner_pids.pop(id(connection), None)
+            self._stats['connections_closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close every idle connection; checked-out ones close when returned"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._after_fork()
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            for connection in idle:
+                self._opened_at.pop(id(connection), None)
+            self._size -= len(idle)
+            self._closed = True
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self):
+        """Current sizes and cumulative counters, for status.request_metrics"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._after_fork()
+            return {
+                **self._stats,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
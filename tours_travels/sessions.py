@@ -0,0 +1,173 @@
+"""
+Session engine that writes a session only when its contents change
+
+Built on django.contrib.sessions' cached_db engine; the one write happens
+when SessionMiddleware saves at response time:
+
+- nothing is written when no value actually changed, however often
+  session.modified was set (Cart and FormDataManager set it on every call);
+- only the keys that changed are merged onto the stored copy, so
+  concurrent requests of one visitor do not undo each other's changes;
+- create() only reserves a key, so a new session costs one write at
+  response time instead of an INSERT followed by an UPDATE.
+
+With a shared cache (SESSION_CACHE_ALIAS, e.g. Redis) the cache holds the
+current session and the django_session row is refreshed at most every
+SESSION_DB_PERSIST_INTERVAL seconds while the session changes, or at once
+when the login changes. Without one (DummyCache, or DatabaseCache, whose
+writes are database writes too) every change goes straight to the
+database. Both tiers store the same compressed, signed JSON string.
+
+Usage:
+    SESSION_ENGINE = 'tours_travels.sessions'
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.db import IntegrityError, router, transaction
+
+KEY_PREFIX = 'tours_travels.sessions'
+
+# Changes to these keys (login, logout) always reach the database at once
+AUTH_SESSION_KEYS = frozenset({'_auth_user_id', '_auth_user_backend', '_auth_user_hash'})
+
+
+class SessionStore(CachedDBStore):
+    """
+    cached_db session store with change detection and write-behind
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._snapshot = {}  # Serialized value of every key as stored
+        self._expires_at = None  # Stored expiry (timestamp)
+        self._dirty_since = None  # Oldest change not yet in the database row
+        self._unsaved = False  # Key reserved by create(), nothing stored yet
+
+    @property
+    def uses_cache(self):
+        """Whether a shared cache holds the sessions between database writes"""
+        return not isinstance(self._cache, (DummyCache, DatabaseCache))
+
+    def _serialize_values(self, data):
+        serializer = self.serializer()
+        return {key: serializer.dumps(value) for key, value in data.items()}
+
+    def _read(self):
+        """Return (data, expires_at, dirty_since) as stored, or None"""
+        if self.uses_cache:
+            try:
+                entry = self._cache.get(self.cache_key)
+            except Exception:
+                # Some backends raise on invalid keys (see cached_db)
+                entry = None
+            if entry is not None:
+                return self.decode(entry['data']), entry['expires'], entry['dirty_since']
+
+        s = self._get_session_from_db()
+        if s is None:
+            return None
+        expires_at = s.expire_date.timestamp()
+        if self.uses_cache:
+            self._cache.set(
+                self.cache_key,
+                {'data': s.session_data, 'expires': expires_at, 'dirty_since': None},
+                self.get_expiry_age(expiry=s.expire_date),
+            )
+        return self.decode(s.session_data), expires_at, None
+
+    def load(self):
+        stored = self._read()
+        if stored is None:
+            data, self._expires_at, self._dirty_since = {}, None, None
+        else:
+            data, self._expires_at, self._dirty_since = stored
+        self._snapshot = self._serialize_values(data)
+        return data
+
+    def exists(self, session_key):
+        if self.uses_cache and session_key and (self.cache_key_prefix + session_key) in self._cache:
+            return True
+        return super(CachedDBStore, self).exists(session_key)
+
+    def create(self):
+        # Reserve a key; the response-time save() stores the session
+        self._session_key = self._get_new_session_key()
+        self._unsaved = True
+        self.modified = True
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            self.create()
+        creating = must_create or self._unsaved
+        data = self._get_session(no_load=creating)
+        now = time.time()
+
+        values = self._serialize_values(data)
+        changed = {key for key, value in values.items() if self._snapshot.get(key) != value}
+        removed = set(self._snapshot) - set(values)
+        refresh = self._expires_at is not None and self._expires_at - now < self.get_expiry_age() / 2
+        if not (creating or changed or removed or refresh):
+            return
+
+        if not creating and (changed or removed):
+            stored = self._read()
+            if stored is not None:
+                merged = {**stored[0], **{key: data[key] for key in changed}}
+                for key in removed:
+                    merged.pop(key, None)
+                data = self._session_cache = merged
+                values = self._serialize_values(data)
+
+        dirty_since = self._dirty_since or now
+        persist = (
+            not self.uses_cache
+            or (changed | removed) & AUTH_SESSION_KEYS
+            or now - dirty_since >= getattr(settings, 'SESSION_DB_PERSIST_INTERVAL', 300)
+        )
+        while True:
+            try:
+                self._write(data, creating, persist, None if persist else dirty_since)
+                break
+            except CreateError:
+                if must_create:
+                    raise
+                self._session_key = self._get_new_session_key()
+
+        self._snapshot = values
+        self._expires_at = self.get_expiry_date().timestamp()
+        self._dirty_since = None if persist else dirty_since
+        self._unsaved = False
+
+    def _write(self, data, creating, persist, dirty_since):
+        """Store the encoded session in the cache and, if ``persist``, the database"""
+        obj = self.create_model_instance(data)
+        if persist:
+            using = router.db_for_write(self.model, instance=obj)
+            try:
+                with transaction.atomic(using=using):
+                    # Without force_update: rows only ever cached are inserted now
+                    obj.save(force_insert=creating, using=using)
+            except IntegrityError:
+                if creating:
+                    raise CreateError
+                raise UpdateError
+        if self.uses_cache:
+            entry = {'data': obj.session_data, 'expires': obj.expire_date.timestamp(), 'dirty_since': dirty_since}
+            if creating and not persist:
+                if not self._cache.add(self.cache_key, entry, self.get_expiry_age()):
+                    raise CreateError
+            else:
+                self._cache.set(self.cache_key, entry, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        if self.uses_cache:
+            return super().delete(session_key)
+        # Skip cached_db's cache delete: nothing is cached
+        return super(CachedDBStore, self).delete(session_key)
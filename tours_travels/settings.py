@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 from decouple import config
 
@@ -63,6 +64,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # pg_trgm lookups for adminside.fuzzy
     'django_ckeditor_5',  # CKEditor 5 for modern rich text editing
     'import_export',
     'django_q',  # Django-Q for background tasks
@@ -76,8 +78,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'status.middleware.RequestMetricsMiddleware',  # Per-view latency/DB/template/cache metrics
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'tours_travels.middleware.StaticFilesMiddleware',  # WhiteNoise static files (sync and ASGI)
+    'tours_travels.middleware.PrimaryPinMiddleware',  # Read-your-writes for the read replica router
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -116,13 +120,37 @@ WSGI_APPLICATION = 'tours_travels.wsgi.application'
 # - settings_prod.py for production (PostgreSQL)
 
 # Default database configuration using environment variable
+# Served under ASGI (tours_travels.asgi turns this on): route the read-heavy
+# pages to their async views (tours_travels.async_views). Each ASGI request
+# runs its queries in a thread of its own, so connections are not persisted.
+ASYNC_VIEWS_ENABLED = config('ASYNC_VIEWS_ENABLED', default=False, cast=bool)
+
 DATABASES = {
     'default': dj_database_url.parse(
         os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3'),
-        conn_max_age=600,
+        conn_max_age=0 if ASYNC_VIEWS_ENABLED else 600,
         conn_health_checks=True,
     )
 }
+
+# Read replica for catalog and blog reads (tours_travels.db_router), enabled
+# by DATABASE_REPLICA_URL. A request that writes is pinned to the primary for
+# REPLICA_PIN_SECONDS; reads fall back to the primary while the replica lags
+# more than REPLICA_MAX_LAG_SECONDS (checked every REPLICA_LAG_CHECK_INTERVAL)
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL', '')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=0 if ASYNC_VIEWS_ENABLED else 600,
+        conn_health_checks=True,
+        test_options={'MIRROR': 'default'},
+    )
+REPLICA_DATABASE = 'replica' if DATABASE_REPLICA_URL else None
+DATABASE_ROUTERS = ['tours_travels.db_router.ReplicaRouter']
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '15'))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -170,7 +198,7 @@ MAX_BOOKING_ROOMS = int(os.getenv('MAX_BOOKING_ROOMS', '10'))
 
 SITE_ID = 1
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # collectstatic output; sources live in static/
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
@@ -186,10 +214,16 @@ LOGOUT_REDIRECT_URL = 'users:users-home'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR,'media/')
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# collectstatic bundles/minifies STATIC_BUNDLES, writes content-hashed names and
+# .gz/.br siblings; WhiteNoise serves hashed names as immutable
+STATICFILES_STORAGE = "tours_travels.static_assets.BundledStaticFilesStorage"
+# Templates link the bundles when DEBUG is off and the source files otherwise;
+# set STATIC_BUNDLES_ENABLED = True/False to override
 
-# STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
-STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
+# ETag/Last-Modified 304s on detail pages (tours_travels.conditional).
+# The deploy's commit is part of every ETag so template changes invalidate them
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED', default=True, cast=bool)
+CONDITIONAL_GET_VERSION = os.getenv('RENDER_GIT_COMMIT', os.getenv('RAILWAY_GIT_COMMIT_SHA', ''))
 
 UPLOADCARE = {
   # Don’t forget to set real keys when it gets real :)
@@ -265,9 +299,95 @@ Q_CLUSTER = {
     'catch_up': False,  # Don't process old tasks on startup
 }
 
+# Derivatives of locally stored uploads (job images, CKEditor uploads),
+# generated by django-q workers in a pool of IMAGE_PIPELINE_PROCESSES threads.
+# IMAGE_PIPELINE_TIMEOUT defaults to Q_CLUSTER['timeout'] less 5 seconds and
+# is capped there (see users.tasks.task_time_budget)
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVE_FORMATS = ('avif', 'webp', 'jpeg')  # Unsupported encoders are skipped
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv('IMAGE_DERIVATIVE_QUALITY', '80'))
+IMAGE_PIPELINE_PROCESSES = int(os.getenv('IMAGE_PIPELINE_PROCESSES', '2'))
+IMAGE_PIPELINE_TIMEOUT = int(os.getenv('IMAGE_PIPELINE_TIMEOUT', '0')) or None
+
+# Blurred inline placeholders (LQIP) for Uploadcare catalog images.
+# LQIP_CDN_URL replaces https://ucarecdn.com/ when fetching (local stand-in)
+LQIP_CDN_URL = os.getenv('LQIP_CDN_URL', '')
+LQIP_FETCH_TIMEOUT = int(os.getenv('LQIP_FETCH_TIMEOUT', '10'))
+
 # Cart session configuration
 CART_SESSION_ID = 'cart'
 
+# Sessions (tours_travels.sessions): written once per request and only when
+# a value changed. With a shared cache as SESSION_CACHE_ALIAS the database
+# row is refreshed at most every SESSION_DB_PERSIST_INTERVAL seconds
+SESSION_ENGINE = 'tours_travels.sessions'
+SESSION_DB_PERSIST_INTERVAL = int(os.getenv('SESSION_DB_PERSIST_INTERVAL', '300'))
+
+# Expired sessions and orphaned GuestBookings (users.session_gc), deleted by a
+# django-q schedule every SESSION_GC_MINUTES in batches of SESSION_GC_BATCH_SIZE
+# rows with SESSION_GC_PAUSE seconds between them. A run stops after
+# SESSION_GC_MAX_SECONDS, which defaults to Q_CLUSTER['timeout'] less 15
+# seconds and is capped there (see users.tasks.task_time_budget)
+SESSION_GC_MINUTES = int(os.getenv('SESSION_GC_MINUTES', '60'))
+SESSION_GC_BATCH_SIZE = int(os.getenv('SESSION_GC_BATCH_SIZE', '5000'))
+SESSION_GC_PAUSE = float(os.getenv('SESSION_GC_PAUSE', '0.5'))
+SESSION_GC_MAX_SECONDS = int(os.getenv('SESSION_GC_MAX_SECONDS', '0')) or None
+SESSION_GC_GUEST_BOOKING_GRACE = int(os.getenv('SESSION_GC_GUEST_BOOKING_GRACE', str(24 * 60 * 60)))
+
+# Buffered blog view counter (blog.view_counts): web workers write their
+# buffered views every BLOG_VIEW_FLUSH_INTERVAL seconds; a django-q schedule
+# adds them to Post.views every BLOG_VIEW_APPLY_MINUTES and flags the
+# BLOG_TRENDING_COUNT most viewed posts of the window as trending
+BLOG_VIEW_FLUSH_INTERVAL = int(os.getenv('BLOG_VIEW_FLUSH_INTERVAL', '30'))
+BLOG_VIEW_APPLY_MINUTES = int(os.getenv('BLOG_VIEW_APPLY_MINUTES', '5'))
+BLOG_TRENDING_AUTO = config('BLOG_TRENDING_AUTO', default=True, cast=bool)
+BLOG_TRENDING_WINDOW_HOURS = int(os.getenv('BLOG_TRENDING_WINDOW_HOURS', '72'))
+BLOG_TRENDING_COUNT = int(os.getenv('BLOG_TRENDING_COUNT', '6'))
+
+# Related posts stored per post by blog.related (tag similarity, category, recency)
+BLOG_RELATED_COUNT = int(os.getenv('BLOG_RELATED_COUNT', '6'))
+
+# Sitemaps and blog feeds, written as gzip files by tours_travels.sitemaps
+SITEMAP_CACHE_DIR = os.getenv('SITEMAP_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mbugani_sitemaps'))
+SITEMAP_MAX_URLS = int(os.getenv('SITEMAP_MAX_URLS', '50000'))
+SITEMAP_MAX_AGE = int(os.getenv('SITEMAP_MAX_AGE', '3600'))
+BLOG_FEED_ITEMS = int(os.getenv('BLOG_FEED_ITEMS', '20'))
+
+# Typeahead prefix index (adminside.typeahead): seconds between shared generation checks
+TYPEAHEAD_CHECK_SECONDS = int(os.getenv('TYPEAHEAD_CHECK_SECONDS', '30'))
+TYPEAHEAD_MAX_AGE = int(os.getenv('TYPEAHEAD_MAX_AGE', '60'))
+
+# Read-only catalog API (adminside.api): page sizes and cache lifetimes (seconds)
+CATALOG_API_PAGE_SIZE = int(os.getenv('CATALOG_API_PAGE_SIZE', '20'))
+CATALOG_API_MAX_PAGE_SIZE = int(os.getenv('CATALOG_API_MAX_PAGE_SIZE', '100'))
+CATALOG_API_CACHE_SECONDS = int(os.getenv('CATALOG_API_CACHE_SECONDS', '300'))
+CATALOG_API_MAX_AGE = int(os.getenv('CATALOG_API_MAX_AGE', '60'))
+
+# Facet counts of package_list and accommodation_list (adminside.facets),
+# cached per filter signature under the catalog content generation (seconds)
+FACET_CACHE_SECONDS = int(os.getenv('FACET_CACHE_SECONDS', '300'))
+
+# Status dashboard and /metrics/ counters (seconds)
+# Served fresh for STATUS_STATS_CACHE_TTL, then stale while a refresh runs
+STATUS_STATS_CACHE_TTL = int(os.getenv('STATUS_STATS_CACHE_TTL', '15'))
+STATUS_STATS_STALE_TTL = int(os.getenv('STATUS_STATS_STALE_TTL', '300'))
+
+# Per-view request metrics (status.middleware.RequestMetricsMiddleware)
+# Each worker writes its snapshot to REQUEST_METRICS_DIR every
+# REQUEST_METRICS_FLUSH_INTERVAL seconds; /metrics/ sums all snapshots
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_METRICS_DIR = os.getenv('REQUEST_METRICS_DIR', os.path.join('/tmp', 'mbugani_request_metrics'))
+REQUEST_METRICS_FLUSH_INTERVAL = int(os.getenv('REQUEST_METRICS_FLUSH_INTERVAL', '5'))
+REQUEST_METRICS_RETENTION = 24 * 60 * 60  # Drop snapshots of recycled workers after a day
+
+# Slow-query log: queries over the threshold are recorded (with their EXPLAIN
+# plan the first time a statement is seen) and listed at /status/slow-queries/
+SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '200'))
+SLOW_QUERY_EXPLAIN = config('SLOW_QUERY_EXPLAIN', default=True, cast=bool)
+
 # Django Unfold Configuration
 from django.templatetags.static import static
 from django.urls import reverse_lazy
@@ -474,7 +594,8 @@ CKEDITOR_5_CONFIGS = {
 
 # CKEditor 5 Upload settings
 CKEDITOR_5_UPLOAD_PATH = "uploads/"
-CKEDITOR_5_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+# Queues AVIF/WebP/JPEG derivatives for every editor upload (users.image_pipeline)
+CKEDITOR_5_FILE_STORAGE = "users.image_pipeline.DerivativeFileSystemStorage"
 
 # Environment and Dashboard callbacks for Unfold
 def environment_callback(request):
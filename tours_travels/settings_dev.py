@@ -37,6 +37,9 @@ DATABASES = {
         'NAME': BASE_DIR / 'mbugani_development.sqlite3',
     }
 }
+if DATABASE_REPLICA_URL:
+    # e.g. sqlite:////path/to/replica.sqlite3, a copy of the development database
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL, test_options={'MIRROR': 'default'})
 
 # Email Configuration - Novustell Travel pattern
 # Development email backend - Console
@@ -39,9 +39,23 @@ DJANGO_ENV = 'production'
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 
 # Production database - Supabase PostgreSQL
+# Each web and django-q worker process keeps a pool of up to DB_POOL_MAX_SIZE
+# connections (tours_travels.pooled_postgresql) shared by its threads, so
+# requests (and ASGI request threads) reuse open TLS sessions instead of each
+# thread holding its own. Port 6543 is the transaction-mode pooler: no
+# server-side cursors.
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=True, cast=bool)
+DB_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '5')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),  # Seconds to wait for a free connection
+    'max_lifetime': int(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+    'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    'check_interval': float(os.getenv('DB_POOL_CHECK_INTERVAL', '5')),  # SELECT 1 on checkout after this idle time
+}
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'tours_travels.pooled_postgresql' if DB_POOL_ENABLED else 'django.db.backends.postgresql',
         'NAME': 'postgres',
         'USER': 'postgres.zgwfxeemdgfryiulbapx',
         'PASSWORD': 'JDuH37tYEfVuPpX!',
@@ -49,11 +63,24 @@ DATABASES = {
         'PORT': '6543',
         'OPTIONS': {
             'sslmode': 'require',
+            **({'pool': DB_POOL_OPTIONS} if DB_POOL_ENABLED else {}),
         },
-        'CONN_MAX_AGE': 600,
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED or ASYNC_VIEWS_ENABLED else 600,
         'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': True,
     }
 }
+if DATABASE_REPLICA_URL:
+    # Supabase read replica: same engine and pool settings as the primary
+    DATABASES['replica'] = {
+        **dj_database_url.parse(DATABASE_REPLICA_URL),
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'OPTIONS': {**DATABASES['default']['OPTIONS'], 'connect_timeout': 5},
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
 
 # Production email backend - Mailtrap SMTP
 # Using Mailtrap for reliable email delivery on Railway
@@ -170,6 +197,17 @@ CACHES = {
     }
 }
 
+# Sessions live in Redis when REDIS_URL is set; tours_travels.sessions then
+# refreshes the database row only every SESSION_DB_PERSIST_INTERVAL seconds
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'mbugani',
+    }
+    SESSION_CACHE_ALIAS = 'sessions'
+
 # Production session configuration
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
@@ -236,12 +274,14 @@ ADMINS = [
 ]
 MANAGERS = ADMINS
 
-# Production database connection pooling (already configured above)
+# Production database connection pooling (DB_POOL_* above)
 
 # Production middleware order (security first)
 MIDDLEWARE = [
+    'status.middleware.RequestMetricsMiddleware',  # Per-view latency/DB/template/cache metrics
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files
+    'tours_travels.middleware.StaticFilesMiddleware',  # WhiteNoise static files (sync and ASGI)
+    'tours_travels.middleware.PrimaryPinMiddleware',  # Read-your-writes for the read replica router
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -252,7 +292,7 @@ MIDDLEWARE = [
 ]
 
 # Production static files with WhiteNoise
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+STATICFILES_STORAGE = 'tours_travels.static_assets.BundledStaticFilesStorage'  # Bundled, hashed, .gz/.br
 WHITENOISE_USE_FINDERS = True
 WHITENOISE_AUTOREFRESH = False
 
@@ -0,0 +1,237 @@
+"""
+Sitemap index and per-model sitemaps, generated as gzip files on disk
+
+Each section (posts, packages, destinations, ...) is written by streaming
+``values_list(slug, updated)`` rows from ``.iterator()`` into gzip files of
+at most SITEMAP_MAX_URLS URLs, so memory use does not grow with the catalog.
+The files live in SITEMAP_CACHE_DIR under a fingerprint of the section (row
+count and newest timestamp, one aggregate query); when a relevant row is
+saved, added or removed the fingerprint changes and the section is rebuilt
+on the next request. Older builds are deleted.
+
+cached_build() is shared with the blog feeds (blog.feeds).
+"""
+
+import gzip
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+SLUG_PLACEHOLDER = 'sitemap-slug-placeholder'
+
+
+def _published_posts():
+    from blog.models import Post
+    return Post.objects.filter(status='published')
+
+
+def _published_packages():
+    from adminside.models import Package
+    return Package.objects.filter(status=Package.PUBLISHED)
+
+
+def _active_destinations():
+    from adminside.models import Destination
+    return Destination.objects.filter(is_active=True)
+
+
+def _active_accommodations():
+    from adminside.models import Accommodation
+    return Accommodation.objects.filter(is_active=True)
+
+
+def _active_jobs():
+    from users.models import JobListing
+    return JobListing.objects.filter(is_active=True)
+
+
+# Section name -> (queryset factory, updated field, URL name taking a slug)
+SECTIONS = {
+    'posts': (_published_posts, 'updated', 'blog:blog-detail'),
+    'packages': (_published_packages, 'updated_at', 'adminside:package_detail'),
+    'destinations': (_active_destinations, 'updated_at', 'adminside:destination_detail'),
+    'accommodations': (_active_accommodations, 'updated_at', 'adminside:accommodation_detail'),
+    'jobs': (_active_jobs, 'updated_at', 'users:job_detail'),
+}
+
+
+def get_cache_dir():
+    """Directory holding the generated sitemap and feed files"""
+    return getattr(
+        settings,
+        'SITEMAP_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'mbugani_sitemaps')
+    )
+
+
+def max_urls():
+    return getattr(settings, 'SITEMAP_MAX_URLS', 50000)
+
+
+def site_url():
+    return settings.SITE_URL.rstrip('/')
+
+
+def fingerprint(*values):
+    """Short hash of ``values`` plus the site URL and deploy version"""
+    key = repr((values, site_url(), getattr(settings, 'CONDITIONAL_GET_VERSION', '')))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def cached_build(name, version, build):
+    """
+    Return the directory of build ``version`` of ``name``, running
+    ``build(directory)`` first when it does not exist yet
+
+    Builds are written to a temporary directory and renamed into place, so
+    readers never see a partial build; other versions of ``name`` are removed.
+    """
+    cache_dir = get_cache_dir()
+    target = os.path.join(cache_dir, f'{name}-{version}')
+    if os.path.isdir(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    building = tempfile.mkdtemp(prefix=f'.{name}-', dir=cache_dir)
+    try:
+        build(building)
+        os.replace(building, target)
+    except OSError:
+        # Another worker finished the same build first
+        shutil.rmtree(building, ignore_errors=True)
+        if not os.path.isdir(target):
+            raise
+    except Exception:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    prefix = f'{name}-'
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry != os.path.basename(target) and entry[len(prefix):].isalnum():
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return target
+
+
+def _gunzip_chunks(path, chunk_size=64 * 1024):
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def gzip_file_response(request, path, content_type):
+    """
+    Serve a gzip file as ``content_type``: as-is with Content-Encoding: gzip
+    to clients that accept it, decompressed on the fly to the rest
+    """
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(_gunzip_chunks(path), content_type=content_type)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'SITEMAP_MAX_AGE', 3600))
+    return response
+
+
+def section_state(section):
+    """(row count, newest timestamp) of a section, in one query"""
+    queryset_factory, updated_field, _ = SECTIONS[section]
+    state = queryset_factory().aggregate(rows=Count('pk'), updated=Max(updated_field))
+    return state['rows'], state['updated']
+
+
+def _lastmod(value):
+    return f'<lastmod>{value:%Y-%m-%d}</lastmod>' if value else ''
+
+
+def write_section(section, directory):
+    """
+    Stream a section into page-1.xml.gz, page-2.xml.gz, ... of at most
+    max_urls() URLs each; returns the number of pages written
+    """
+    queryset_factory, updated_field, url_name = SECTIONS[section]
+    # Reverse once and substitute each slug instead of reversing per row
+    url_template = site_url() + reverse(url_name, kwargs={'slug': SLUG_PLACEHOLDER})
+    rows = queryset_factory().order_by('pk').values_list('slug', updated_field).iterator(chunk_size=2000)
+
+    limit, page, urls, sitemap = max_urls(), 0, 0, None
+    try:
+        for slug, updated in rows:
+            if sitemap is None or urls == limit:
+                if sitemap is not None:
+                    sitemap.write(b'</urlset>\n')
+                    sitemap.close()
+                page += 1
+                urls = 0
+                sitemap = gzip.open(os.path.join(directory, f'page-{page}.xml.gz'), 'wb')
+                sitemap.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'.encode())
+            location = escape(url_template.replace(SLUG_PLACEHOLDER, slug))
+            sitemap.write(f'<url><loc>{location}</loc>{_lastmod(updated)}</url>\n'.encode())
+            urls += 1
+
+        if sitemap is None:
+            # Keep an empty, valid sitemap so the index never links to a 404
+            page = 1
+            sitemap = gzip.open(os.path.join(directory, 'page-1.xml.gz'), 'wb')
+            sitemap.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'.encode())
+        sitemap.write(b'</urlset>\n')
+    finally:
+        if sitemap is not None:
+            sitemap.close()
+    return page
+
+
+def build_section(section):
+    """Directory with the current pages of ``section``, building it if needed"""
+    rows, updated = section_state(section)
+    version = fingerprint(section, rows, updated, max_urls())
+    return cached_build(f'sitemap-{section}', version, lambda directory: write_section(section, directory))
+
+
+def build_index():
+    """Path of the current gzipped sitemap index, building it if needed"""
+    states = {section: section_state(section) for section in SECTIONS}
+    limit = max_urls()
+
+    def write_index(directory):
+        with gzip.open(os.path.join(directory, 'index.xml.gz'), 'wb') as index:
+            index.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'.encode())
+            for section, (rows, updated) in states.items():
+                for page in range(1, max(math.ceil(rows / limit), 1) + 1):
+                    location = escape(site_url() + reverse('sitemap_section', kwargs={'section': section, 'page': page}))
+                    index.write(f'<sitemap><loc>{location}</loc>{_lastmod(updated)}</sitemap>\n'.encode())
+            index.write(b'</sitemapindex>\n')
+
+    version = fingerprint(sorted(states.items()), limit)
+    return os.path.join(cached_build('sitemap-index', version, write_index), 'index.xml.gz')
+
+
+def sitemap_index(request):
+    """/sitemap.xml: index of every section page"""
+    return gzip_file_response(request, build_index(), 'application/xml; charset=utf-8')
+
+
+def sitemap_section(request, section, page):
+    """/sitemap-<section>-<page>.xml.gz: one gzipped sitemap file"""
+    if section not in SECTIONS:
+        raise Http404('Unknown sitemap section')
+    path = os.path.join(build_section(section), f'page-{page}.xml.gz')
+    if not os.path.exists(path):
+        raise Http404('Sitemap page out of range')
+
+    response = FileResponse(open(path, 'rb'), content_type='application/gzip')
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'SITEMAP_MAX_AGE', 3600))
+    return response
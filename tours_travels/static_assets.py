@@ -0,0 +1,272 @@
+"""
+Static asset pipeline: bundles, content-hashed names and precompressed files
+
+At collectstatic time BundledStaticFilesStorage concatenates and minifies
+the site CSS/JS listed in STATIC_BUNDLES, then lets WhiteNoise's manifest
+storage give every file a content-hashed name and write ``.gz`` (and, with
+the brotli package installed, ``.br``) siblings. WhiteNoise serves hashed
+names with ``Cache-Control: max-age=315360000, public, immutable``.
+
+Templates include bundles with ``{% static_bundle %}`` (users.templatetags.
+static_bundles), which falls back to the individual source files while
+DEBUG is on. ``manage.py check_static_assets`` fails the build when a
+template references a static file by a literal path instead of ``{% static %}``.
+"""
+
+import logging
+import os
+import posixpath
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+# Bundle name -> source files, in load order
+DEFAULT_BUNDLES = {
+    'bundles/site.css': (
+        'css/tan-garland-fonts.css',
+        'assets/fonts/flaticon/flaticon_gowilds.css',
+        'assets/fonts/fontawesome/css/all.min.css',
+        'assets/vendor/bootstrap/css/bootstrap.min.css',
+        'assets/vendor/magnific-popup/dist/magnific-popup.css',
+        'assets/vendor/slick/slick.css',
+        'assets/vendor/jquery-ui/jquery-ui.min.css',
+        'assets/vendor/nice-select/css/nice-select.css',
+        'assets/vendor/animate.css',
+        'assets/css/default.css',
+        'assets/css/style.css',
+    ),
+    # Blocking scripts: jQuery and the plugins theme.js needs at load time
+    'bundles/site.js': (
+        'assets/vendor/jquery-3.6.0.min.js',
+        'assets/vendor/popper/popper.min.js',
+        'assets/vendor/bootstrap/js/bootstrap.min.js',
+        'assets/vendor/slick/slick.min.js',
+        'assets/vendor/wow.min.js',
+        'assets/js/theme.js',
+    ),
+    # Deferred jQuery plugins
+    'bundles/site-plugins.js': (
+        'assets/vendor/magnific-popup/dist/jquery.magnific-popup.min.js',
+        'assets/vendor/isotope.min.js',
+        'assets/vendor/imagesloaded.min.js',
+        'assets/vendor/jquery.counterup.min.js',
+        'assets/vendor/jquery.waypoints.js',
+        'assets/vendor/nice-select/js/jquery.nice-select.min.js',
+        'assets/vendor/jquery-ui/jquery-ui.min.js',
+    ),
+}
+
+ASSET_EXTENSIONS = (
+    'css', 'js', 'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'avif', 'ico',
+    'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp4', 'webm',
+)
+
+# Strings and comments, so minification never touches string contents
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')|/\*(!?)[\s\S]*?\*/')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,])\s*')
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_CSS_IMPORT = re.compile(r'@import\s+(?:url\(\s*(["\']?).*?\1\s*\)|(["\']).*?\2)[^;]*;')
+_CSS_CHARSET = re.compile(r'@charset\s+[^;]+;')
+_SOURCE_MAP = re.compile(r'^\s*//[#@]\s*sourceMappingURL=.*$', re.MULTILINE)
+
+# src/href/poster/srcset attributes and CSS url() values in templates
+_LITERAL_ASSET = re.compile(
+    r'''(?:\b(?:src|href|poster|data-src|data-background)\s*=\s*["']|url\(\s*["']?)'''
+    r'''([^"'(){}\s]+\.(?:''' + '|'.join(ASSET_EXTENSIONS) + r'''))(?:[?#][^"')\s]*)?["')]''',
+    re.IGNORECASE,
+)
+_STATIC_TAG = re.compile(r'''{%\s*static\s+["']([^"']+)["']''')
+
+
+def get_bundles():
+    """Bundles from STATIC_BUNDLES, defaulting to DEFAULT_BUNDLES"""
+    return getattr(settings, 'STATIC_BUNDLES', DEFAULT_BUNDLES)
+
+
+def bundles_enabled():
+    """Serve bundles instead of their sources (STATIC_BUNDLES_ENABLED, else not DEBUG)"""
+    enabled = getattr(settings, 'STATIC_BUNDLES_ENABLED', None)
+    return not settings.DEBUG if enabled is None else enabled
+
+
+def _squeeze_css(css):
+    return _CSS_PUNCTUATION.sub(r'\1', re.sub(r'\s+', ' ', css)).replace(';}', '}')
+
+
+def minify_css(css):
+    """
+    Drop comments (except /*! licence */ ones) and redundant whitespace
+    """
+    parts, position = [], 0
+    for match in _CSS_TOKENS.finditer(css):
+        parts.append(_squeeze_css(css[position:match.start()]))
+        if match.group(1) or match.group(2):
+            parts.append(match.group(0))
+        position = match.end()
+    parts.append(_squeeze_css(css[position:]))
+    return ''.join(parts).strip()
+
+
+def minify_js(js, name=''):
+    """
+    Minify with rjsmin when it is installed; already minified files and
+    environments without rjsmin get the source unchanged
+    """
+    if name.endswith('.min.js'):
+        return js
+    try:
+        import rjsmin
+    except ImportError:
+        return js
+    return rjsmin.jsmin(js)
+
+
+def rebase_css_urls(css, source_name, bundle_name):
+    """
+    Rewrite relative url() references of ``source_name`` so they resolve
+    from the bundle's directory
+    """
+    source_dir = posixpath.dirname(source_name)
+    bundle_dir = posixpath.dirname(bundle_name) or '.'
+
+    def rebase(match):
+        quote, url = match.groups()
+        if re.match(r'^[a-z]+:', url, re.IGNORECASE) or url.startswith(('/', '#')):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        target = posixpath.normpath(posixpath.join(source_dir, path))
+        return f'url({quote}{posixpath.relpath(target, bundle_dir)}{suffix}{quote})'
+
+    return _CSS_URL.sub(rebase, css)
+
+
+def build_css_bundle(bundle_name, sources):
+    """
+    Concatenate and minify (source name, css) pairs into one stylesheet
+
+    @import rules are hoisted to the top, where browsers honour them.
+    """
+    imports, bodies = [], []
+    for source_name, css in sources:
+        css = _CSS_CHARSET.sub('', rebase_css_urls(css, source_name, bundle_name))
+        imports.extend(match.group(0) for match in _CSS_IMPORT.finditer(css))
+        bodies.append(minify_css(_CSS_IMPORT.sub('', css)))
+    return '@charset "UTF-8";' + ''.join(imports) + '\n'.join(bodies) + '\n'
+
+
+def build_js_bundle(bundle_name, sources):
+    """Concatenate and minify (source name, js) pairs into one script"""
+    scripts = [_SOURCE_MAP.sub('', minify_js(js, source_name)).strip() for source_name, js in sources]
+    return '\n;\n'.join(scripts) + '\n'
+
+
+def build_bundle(bundle_name, sources):
+    """Build a .css or .js bundle from (source name, text) pairs"""
+    if bundle_name.endswith('.css'):
+        return build_css_bundle(bundle_name, sources)
+    if bundle_name.endswith('.js'):
+        return build_js_bundle(bundle_name, sources)
+    raise ValueError(f"Static bundles must be .css or .js files: {bundle_name}")
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise manifest storage that also builds STATIC_BUNDLES
+
+    Unlike the stock storage it tolerates references to files that do not
+    exist (vendor CSS pointing at font formats that were never shipped, or
+    templates naming a missing image): those keep their original URL and
+    are logged, instead of failing collectstatic or raising at render time.
+    """
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for bundle_name in self.build_bundles():
+                paths[bundle_name] = (self, bundle_name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def build_bundles(self):
+        """Write every STATIC_BUNDLES file into STATIC_ROOT and return their names"""
+        names = []
+        for bundle_name, source_names in get_bundles().items():
+            sources = []
+            for source_name in source_names:
+                if not self.exists(source_name):
+                    raise ValueError(f"Static bundle '{bundle_name}' source '{source_name}' was not collected")
+                with self.open(source_name) as f:
+                    sources.append((source_name, f.read().decode('utf-8')))
+
+            content = build_bundle(bundle_name, sources)
+            if self.exists(bundle_name):
+                self.delete(bundle_name)
+            self.save(bundle_name, ContentFile(content.encode('utf-8')))
+            names.append(bundle_name)
+        return names
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def tolerant_converter(match):
+            try:
+                return converter(match)
+            except ValueError as e:
+                logger.warning(f"Static file {name} references a missing file: {e}")
+                return match.group(0)
+
+        return tolerant_converter
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning(f"Static file not found, serving unhashed URL: {name}")
+            # Remember the fallback so the file is only looked for once
+            clean_name = urlsplit(unquote(name)).path.strip()
+            self.hashed_files[self.hash_key(clean_name)] = clean_name
+            return clean_name
+
+
+def template_files(template_dirs):
+    """Yield (path, text) for every .html/.txt template under ``template_dirs``"""
+    for template_dir in template_dirs:
+        for root, _, files in os.walk(template_dir):
+            for filename in sorted(files):
+                if filename.endswith(('.html', '.txt')):
+                    path = os.path.join(root, filename)
+                    with open(path, encoding='utf-8', errors='replace') as f:
+                        yield path, f.read()
+
+
+def find_literal_references(text):
+    """
+    Return (line number, path) for static assets referenced by a literal
+    path, which bypasses the hashed names of {% static %}
+
+    External URLs, data URIs and template expressions are ignored.
+    """
+    static_url = settings.STATIC_URL
+    references = []
+    for match in _LITERAL_ASSET.finditer(text):
+        path = match.group(1)
+        if re.match(r'^[a-z]+:|^//', path, re.IGNORECASE):
+            continue
+        if path.startswith('/') and not path.startswith(static_url):
+            continue
+        references.append((text.count('\n', 0, match.start()) + 1, path))
+    return references
+
+
+def find_static_tag_references(text):
+    """Return (line number, path) for every literal {% static '...' %}"""
+    return [
+        (text.count('\n', 0, match.start()) + 1, match.group(1))
+        for match in _STATIC_TAG.finditer(text)
+    ]
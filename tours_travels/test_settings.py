@@ -10,7 +10,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
-    }
+    },
+    # Separate second database for the read replica router tests, which
+    # enable REPLICA_DATABASE themselves
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
 }
 
 # Disable migrations for faster testing
@@ -70,9 +76,13 @@ MEDIA_URL = '/test_media/'
 
 # Static files for testing
 STATIC_ROOT = '/tmp/mbugani_test_static'
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
 
 # Uploadcare settings for testing
 UPLOADCARE = {
     'pub_key': 'test_pub_key',
     'secret': 'test_secret_key',
 }
+
+# Read replica routing is enabled by the router tests themselves
+REPLICA_DATABASE = None
@@ -0,0 +1,47 @@
+"""
+Plain-text helpers for rich-text (CKEditor) content
+"""
+
+import re
+from html import unescape
+
+from django.utils.html import strip_tags
+
+# Tags whose boundaries separate words ("<p>a</p><p>b</p>" is "a b", not "ab")
+_BLOCK_BOUNDARY = re.compile(
+    r'<\s*(?:br|hr|/?(?:p|div|li|ul|ol|h[1-6]|blockquote|pre|tr|td|th|table|figure|figcaption|section|article))\b[^>]*>',
+    re.IGNORECASE,
+)
+_NON_TEXT = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+
+WORDS_PER_MINUTE = 200
+
+
+def html_to_text(html):
+    """
+    Return the visible text of an HTML fragment on one line, with entities
+    decoded and runs of whitespace (including &nbsp;) collapsed
+
+    Usage:
+    html_to_text('<p>Big&nbsp;Five</p><p>safari</p>')  # 'Big Five safari'
+    """
+    if not html:
+        return ''
+    text = _BLOCK_BOUNDARY.sub(' ', _NON_TEXT.sub(' ', html))
+    return _WHITESPACE.sub(' ', unescape(strip_tags(text))).strip()
+
+
+def word_count(text):
+    """Number of words in plain text"""
+    return len(text.split())
+
+
+def read_minutes(words, words_per_minute=WORDS_PER_MINUTE):
+    """Reading time in whole minutes (0 for very short texts)"""
+    return round(words / words_per_minute)
+
+
+def truncate_text(text, length):
+    """The first ``length`` characters of plain text, plus '...' when cut"""
+    return text[:length] + "..." if len(text) > length else text
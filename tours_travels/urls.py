@@ -6,6 +6,7 @@ from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
+from . import sitemaps
 from .health_check import (
     health_check, health_detailed, readiness_check,
     liveness_check, metrics, csp_report, version_info
@@ -29,6 +30,10 @@ urlpatterns = [
     path('csp-report/', csp_report, name='csp_report'),
     path('version/', version_info, name='version_info'),
 
+    # Sitemap index and gzipped per-section sitemaps
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:page>.xml.gz', sitemaps.sitemap_section, name='sitemap_section'),
+
     # Favicon handling
     path('favicon.ico', RedirectView.as_view(url='/static/assets/images/favicon_io/favicon.ico', permanent=True)),
 
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from . import session_gc
+        post_migrate.connect(session_gc.ensure_schedule, sender=self)
@@ -0,0 +1,224 @@
+"""
+Compact, versioned cart and checkout state kept in the session
+
+Cart, FormDataManager and GuestBooking share one layout, stored under
+settings.CART_SESSION_ID as a JSON array:
+
+    [STATE_VERSION, [item, ...], {step: [saved_at, value, ...], ...}]
+
+An item is [package_id, adults, children, rooms, [accommodation ids],
+[travel mode ids], custom_accommodation, self_drive], with trailing fields
+that still hold their default left out. A step holds the values of
+STEP_FIELDS[step] in order (None when not given), then a dict of any other
+fields; saved_at is a Unix time in seconds. The package selection and
+customization steps are not stored: they are read from the cart item of
+the package selected last.
+
+Sessions written before the versioned layout (a dict of string-keyed items
+under 'cart', with 'booking_form_data' and 'checkout_data' beside it) are
+converted the first time load() reads them.
+
+Usage:
+    state = booking_state.load(request.session)
+    state.items[package.id][booking_state.ADULTS] = 2
+    state.save(request.session)
+"""
+
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+STATE_VERSION = 1
+
+# Positions in an item array
+PACKAGE, ADULTS, CHILDREN, ROOMS, ACCOMMODATIONS, TRAVEL_MODES, CUSTOM_ACCOMMODATION, SELF_DRIVE = range(8)
+ITEM_DEFAULTS = (None, 0, 0, 0, [], [], '', False)
+
+# Fields of each booking step, stored by position
+STEP_FIELDS = {
+    'package_selection': ('package_id', 'adults', 'children', 'rooms'),
+    'customization': (
+        'package_id', 'selected_accommodations', 'custom_accommodation', 'selected_travel_modes', 'self_drive',
+    ),
+    'details': (
+        'full_name', 'email', 'phone_number', 'special_requests', 'travel_date', 'terms_accepted',
+        'marketing_consent',
+    ),
+}
+
+# Steps read from the most recently selected cart item unless saved explicitly
+ITEM_STEPS = ('package_selection', 'customization')
+
+# Session keys of the layout before STATE_VERSION 1
+LEGACY_FORM_DATA_KEY = 'booking_form_data'
+LEGACY_CHECKOUT_DATA_KEY = 'checkout_data'
+
+_SESSION_ATTRIBUTE = '_booking_state'
+
+
+def new_item(package_id):
+    """Item array for ``package_id`` with every other field at its default"""
+    return [package_id, 0, 0, 0, [], [], '', False]
+
+
+def pack_item(item):
+    """Copy of ``item`` without its trailing default fields"""
+    size = len(item)
+    while size > PACKAGE + 1 and item[size - 1] == ITEM_DEFAULTS[size - 1]:
+        size -= 1
+    return [list(value) if isinstance(value, list) else value for value in item[:size]]
+
+
+def unpack_item(packed):
+    """Full item array from a stored one"""
+    item = new_item(packed[PACKAGE])
+    item[:len(packed)] = [list(value) if isinstance(value, list) else value for value in packed]
+    return item
+
+
+def pack_step(step, data, saved_at):
+    """Step array for a dict of form fields; keys starting with '_' are dropped"""
+    fields = STEP_FIELDS.get(step, ())
+    packed = [saved_at, *(data.get(field) for field in fields)]
+    extra = {key: value for key, value in data.items() if key not in fields and not key.startswith('_')}
+    if extra:
+        packed.append(extra)
+    else:
+        while len(packed) > 1 and packed[-1] is None:
+            packed.pop()
+    return packed
+
+
+def item_step(step, item):
+    """Dict of the fields of an ITEM_STEPS step, read from a cart item"""
+    if step == 'package_selection':
+        return {'package_id': item[PACKAGE], 'adults': item[ADULTS], 'children': item[CHILDREN], 'rooms': item[ROOMS]}
+    return {
+        'package_id': item[PACKAGE], 'selected_accommodations': list(item[ACCOMMODATIONS]),
+        'custom_accommodation': item[CUSTOM_ACCOMMODATION], 'selected_travel_modes': list(item[TRAVEL_MODES]),
+        'self_drive': item[SELF_DRIVE],
+    }
+
+
+def unpack_step(step, packed):
+    """Dict of the saved fields of a step array, with its '_timestamp'"""
+    fields = STEP_FIELDS.get(step, ())
+    data = {field: value for field, value in zip(fields, packed[1:]) if value is not None}
+    if len(packed) > len(fields) + 1:
+        data.update(packed[-1])
+    data['_timestamp'] = datetime.fromtimestamp(packed[0]).isoformat()
+    return data
+
+
+class BookingState:
+    """
+    Cart items by package id and saved booking steps of one session
+    """
+    __slots__ = ('items', 'steps', '_stored')
+
+    def __init__(self, items=None, steps=None):
+        self.items = items if items is not None else {}  # package id -> item array
+        self.steps = steps if steps is not None else {}  # step -> step array
+        self._stored = None  # Session value this state was loaded from or saved as
+
+    @classmethod
+    def unpack(cls, value):
+        _, items, steps = value
+        return cls({item[PACKAGE]: unpack_item(item) for item in items}, dict(steps))
+
+    def pack(self):
+        return [STATE_VERSION, [pack_item(item) for item in self.items.values()], dict(self.steps)]
+
+    @property
+    def current_item(self):
+        """Item of the package selected last"""
+        return next(reversed(self.items.values()), None)
+
+    def step_names(self):
+        derived = [step for step in ITEM_STEPS if step not in self.steps] if self.items else []
+        return derived + list(self.steps)
+
+    def get_step(self, step):
+        packed = self.steps.get(step)
+        if packed:
+            return unpack_step(step, packed)
+        if step in ITEM_STEPS and self.items:
+            return item_step(step, self.current_item)
+        return {}
+
+    def set_step(self, step, data):
+        self.steps[step] = pack_step(step, data, int(time.time()))
+
+    def save(self, session):
+        """Store the state in ``session``; an unchanged state leaves it unmodified"""
+        key = settings.CART_SESSION_ID
+        if self.items or self.steps:
+            value = self.pack()
+            if session.get(key) != value:
+                session[key] = value
+        elif key in session:
+            del session[key]
+        self._stored = session.get(key)
+
+
+def _legacy_timestamp(value):
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return int(time.time())
+
+
+def from_legacy(cart, form_data=None, checkout_data=None):
+    """
+    BookingState from the pre-versioned session values: the 'cart' dict,
+    'booking_form_data' and 'checkout_data'
+    """
+    state = BookingState()
+    for package_id, entry in (cart or {}).items():
+        try:
+            item = new_item(int(package_id))
+            item[ADULTS:ROOMS + 1] = [int(entry.get(field, 0)) for field in ('adults', 'children', 'rooms')]
+            item[ACCOMMODATIONS] = [int(pk) for pk in entry.get('accommodations', [])]
+            item[TRAVEL_MODES] = [int(pk) for pk in entry.get('travel_modes', [])]
+        except (AttributeError, TypeError, ValueError):
+            continue
+        item[CUSTOM_ACCOMMODATION] = entry.get('custom_accommodation', '')
+        item[SELF_DRIVE] = bool(entry.get('self_drive', False))
+        state.items[item[PACKAGE]] = item
+
+    for step, data in (form_data or {}).items():
+        # The cart items hold what these steps duplicated
+        if step in ITEM_STEPS and state.items:
+            continue
+        if isinstance(data, dict):
+            state.steps[step] = pack_step(step, data, _legacy_timestamp(data.get('_timestamp')))
+    # checkout_data duplicated the details step; older sessions may only have it
+    if checkout_data and 'details' not in state.steps:
+        state.steps['details'] = pack_step('details', checkout_data, int(time.time()))
+    return state
+
+
+def load(session):
+    """
+    This session's BookingState, shared by every Cart and FormDataManager of
+    the request; older layouts are converted and stored once
+    """
+    value = session.get(settings.CART_SESSION_ID)
+    state = getattr(session, _SESSION_ATTRIBUTE, None)
+    if state is not None and state._stored is value:
+        return state
+
+    if isinstance(value, list) and value and value[0] == STATE_VERSION:
+        state = BookingState.unpack(value)
+        state._stored = value
+    elif value is None and LEGACY_FORM_DATA_KEY not in session and LEGACY_CHECKOUT_DATA_KEY not in session:
+        state = BookingState()
+    elif value is None or isinstance(value, dict):
+        state = from_legacy(value, session.pop(LEGACY_FORM_DATA_KEY, None), session.pop(LEGACY_CHECKOUT_DATA_KEY, None))
+        state.save(session)
+    else:
+        # A layout this release cannot read (written by a newer one): start over
+        state = BookingState()
+    setattr(session, _SESSION_ATTRIBUTE, state)
+    return state
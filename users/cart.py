@@ -3,14 +3,14 @@ Session-based cart system for Mbugani Luxe Adventures
 """
 
 from decimal import Decimal
-from django.conf import settings
 from adminside.models import Package, Accommodation, TravelMode
-from .models import GuestBooking
+from . import booking_state
+from .booking_state import ADULTS, CHILDREN, ROOMS, ACCOMMODATIONS, TRAVEL_MODES, CUSTOM_ACCOMMODATION, SELF_DRIVE
 
 
 class Cart:
     """
-    Session-based cart for guest users
+    Session-based cart for guest users, kept in the session's BookingState
     """
     
     def __init__(self, request):
@@ -18,11 +18,9 @@ class Cart:
         Initialize the cart
         """
         self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            # Save an empty cart in the session
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        self.state = booking_state.load(self.session)
+        # Package id -> item array (positions in users.booking_state)
+        self.cart = self.state.items
         self.session_key = request.session.session_key
         if not self.session_key:
             request.session.create()
@@ -32,27 +30,16 @@ class Cart:
         """
         Add a package to the cart or update its quantity
         """
-        package_id = str(package.id)
-        if package_id not in self.cart:
-            self.cart[package_id] = {
-                'adults': 0,
-                'children': 0,
-                'rooms': 0,
-                'accommodations': [],
-                'travel_modes': [],
-                'custom_accommodation': '',
-                'self_drive': False,
-                'price': str(package.adult_price)
-            }
+        # Re-inserted so the package selected last comes last
+        item = self.cart.pop(package.id, None) or booking_state.new_item(package.id)
+        self.cart[package.id] = item
         
         if override_quantity:
-            self.cart[package_id]['adults'] = adults
-            self.cart[package_id]['children'] = children
-            self.cart[package_id]['rooms'] = rooms
+            item[ADULTS], item[CHILDREN], item[ROOMS] = adults, children, rooms
         else:
-            self.cart[package_id]['adults'] += adults
-            self.cart[package_id]['children'] += children
-            self.cart[package_id]['rooms'] += rooms
+            item[ADULTS] += adults
+            item[CHILDREN] += children
+            item[ROOMS] += rooms
         
         self.save()
 
@@ -60,81 +47,75 @@ class Cart:
         """
         Add accommodation to a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            if accommodation_id not in self.cart[package_id]['accommodations']:
-                self.cart[package_id]['accommodations'].append(accommodation_id)
-                self.save()
+        item = self.cart.get(int(package_id))
+        if item is not None and accommodation_id not in item[ACCOMMODATIONS]:
+            item[ACCOMMODATIONS].append(accommodation_id)
+            self.save()
 
     def remove_accommodation(self, package_id, accommodation_id):
         """
         Remove accommodation from a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            if accommodation_id in self.cart[package_id]['accommodations']:
-                self.cart[package_id]['accommodations'].remove(accommodation_id)
-                self.save()
+        item = self.cart.get(int(package_id))
+        if item is not None and accommodation_id in item[ACCOMMODATIONS]:
+            item[ACCOMMODATIONS].remove(accommodation_id)
+            self.save()
 
     def add_travel_mode(self, package_id, travel_mode_id):
         """
         Add travel mode to a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            if travel_mode_id not in self.cart[package_id]['travel_modes']:
-                self.cart[package_id]['travel_modes'].append(travel_mode_id)
-                self.save()
+        item = self.cart.get(int(package_id))
+        if item is not None and travel_mode_id not in item[TRAVEL_MODES]:
+            item[TRAVEL_MODES].append(travel_mode_id)
+            self.save()
 
     def remove_travel_mode(self, package_id, travel_mode_id):
         """
         Remove travel mode from a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            if travel_mode_id in self.cart[package_id]['travel_modes']:
-                self.cart[package_id]['travel_modes'].remove(travel_mode_id)
-                self.save()
+        item = self.cart.get(int(package_id))
+        if item is not None and travel_mode_id in item[TRAVEL_MODES]:
+            item[TRAVEL_MODES].remove(travel_mode_id)
+            self.save()
 
     def set_custom_accommodation(self, package_id, custom_text):
         """
         Set custom accommodation text for a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            self.cart[package_id]['custom_accommodation'] = custom_text
+        item = self.cart.get(int(package_id))
+        if item is not None:
+            item[CUSTOM_ACCOMMODATION] = custom_text
             self.save()
 
     def set_self_drive(self, package_id, is_self_drive):
         """
         Set self-drive option for a package in cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            self.cart[package_id]['self_drive'] = is_self_drive
+        item = self.cart.get(int(package_id))
+        if item is not None:
+            item[SELF_DRIVE] = is_self_drive
             self.save()
 
     def remove_package(self, package_id):
         """
         Remove a package from the cart
         """
-        package_id = str(package_id)
-        if package_id in self.cart:
-            del self.cart[package_id]
+        if self.cart.pop(int(package_id), None) is not None:
             self.save()
 
     def save(self):
         """
-        Mark the session as modified to make sure it gets saved
+        Store the cart in the session; the session is only modified if it changed
         """
-        self.session.modified = True
+        self.state.save(self.session)
 
     def clear(self):
         """
-        Remove cart from session
+        Remove all packages from the cart
         """
-        del self.session[settings.CART_SESSION_ID]
-        self.session.modified = True
+        self.cart.clear()
+        self.save()
 
     def get_total_price(self):
         """
@@ -146,27 +127,27 @@ class Cart:
                 package = Package.objects.get(id=package_id)
                 
                 # Package base price
-                package_total = Decimal(str(package.adult_price)) * item['adults']
+                package_total = Decimal(str(package.adult_price)) * item[ADULTS]
                 
                 # Add children pricing (70% of adult price)
-                if item['children'] > 0:
+                if item[CHILDREN] > 0:
                     child_price = Decimal(str(package.adult_price)) * Decimal('0.7')
-                    package_total += child_price * item['children']
+                    package_total += child_price * item[CHILDREN]
                 
                 # Add accommodation costs
-                for acc_id in item['accommodations']:
+                for acc_id in item[ACCOMMODATIONS]:
                     try:
                         accommodation = Accommodation.objects.get(id=acc_id)
-                        package_total += Decimal(str(accommodation.price_per_room_per_night)) * item['rooms'] * package.duration_days
+                        package_total += Decimal(str(accommodation.price_per_room_per_night)) * item[ROOMS] * package.duration_days
                     except Accommodation.DoesNotExist:
                         continue
                 
                 # Add travel costs (skip if self-drive is selected)
-                if not item.get('self_drive', False):
-                    for travel_id in item['travel_modes']:
+                if not item[SELF_DRIVE]:
+                    for travel_id in item[TRAVEL_MODES]:
                         try:
                             travel_mode = TravelMode.objects.get(id=travel_id)
-                            package_total += Decimal(str(travel_mode.price_per_person)) * (item['adults'] + item['children'])
+                            package_total += Decimal(str(travel_mode.price_per_person)) * (item[ADULTS] + item[CHILDREN])
                         except TravelMode.DoesNotExist:
                             continue
                 
@@ -188,7 +169,7 @@ class Cart:
                 
                 # Get accommodation objects
                 accommodations = []
-                for acc_id in item['accommodations']:
+                for acc_id in item[ACCOMMODATIONS]:
                     try:
                         accommodations.append(Accommodation.objects.get(id=acc_id))
                     except Accommodation.DoesNotExist:
@@ -196,35 +177,35 @@ class Cart:
                 
                 # Get travel mode objects
                 travel_modes = []
-                for travel_id in item['travel_modes']:
+                for travel_id in item[TRAVEL_MODES]:
                     try:
                         travel_modes.append(TravelMode.objects.get(id=travel_id))
                     except TravelMode.DoesNotExist:
                         continue
                 
                 # Calculate item total
-                item_total = Decimal(str(package.adult_price)) * item['adults']
-                if item['children'] > 0:
+                item_total = Decimal(str(package.adult_price)) * item[ADULTS]
+                if item[CHILDREN] > 0:
                     child_price = Decimal(str(package.adult_price)) * Decimal('0.7')
-                    item_total += child_price * item['children']
+                    item_total += child_price * item[CHILDREN]
 
                 for accommodation in accommodations:
-                    item_total += Decimal(str(accommodation.price_per_room_per_night)) * item['rooms'] * package.duration_days
+                    item_total += Decimal(str(accommodation.price_per_room_per_night)) * item[ROOMS] * package.duration_days
 
                 # Add travel costs only if not self-drive
-                if not item.get('self_drive', False):
+                if not item[SELF_DRIVE]:
                     for travel_mode in travel_modes:
-                        item_total += Decimal(str(travel_mode.price_per_person)) * (item['adults'] + item['children'])
+                        item_total += Decimal(str(travel_mode.price_per_person)) * (item[ADULTS] + item[CHILDREN])
                 
                 items.append({
                     'package': package,
-                    'adults': item['adults'],
-                    'children': item['children'],
-                    'rooms': item['rooms'],
+                    'adults': item[ADULTS],
+                    'children': item[CHILDREN],
+                    'rooms': item[ROOMS],
                     'accommodations': accommodations,
                     'travel_modes': travel_modes,
-                    'custom_accommodation': item.get('custom_accommodation', ''),
-                    'self_drive': item.get('self_drive', False),
+                    'custom_accommodation': item[CUSTOM_ACCOMMODATION],
+                    'self_drive': item[SELF_DRIVE],
                     'total_price': item_total
                 })
                 
@@ -237,18 +218,22 @@ class Cart:
         """
         Count all items in the cart
         """
-        return sum(item['adults'] + item['children'] for item in self.cart.values())
+        return sum(item[ADULTS] + item[CHILDREN] for item in self.cart.values())
 
     def __iter__(self):
         """
         Iterate over the items in the cart and get the packages from the database
         """
-        package_ids = self.cart.keys()
-        packages = Package.objects.filter(id__in=package_ids)
-        cart = self.cart.copy()
-        
-        for package in packages:
-            cart[str(package.id)]['package'] = package
+        packages = Package.objects.in_bulk(list(self.cart))
         
-        for item in cart.values():
-            yield item
+        for package_id, item in self.cart.items():
+            yield {
+                'package': packages.get(package_id),
+                'adults': item[ADULTS],
+                'children': item[CHILDREN],
+                'rooms': item[ROOMS],
+                'accommodations': item[ACCOMMODATIONS],
+                'travel_modes': item[TRAVEL_MODES],
+                'custom_accommodation': item[CUSTOM_ACCOMMODATION],
+                'self_drive': item[SELF_DRIVE],
+            }
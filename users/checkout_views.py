@@ -41,15 +41,7 @@ def add_to_cart(request, package_id):
         children = int(request.POST.get('children', 0))
         rooms = int(request.POST.get('rooms', 1))
 
-        # Save form data for persistence
-        form_data = {
-            'package_id': package_id,
-            'adults': adults,
-            'children': children,
-            'rooms': rooms
-        }
-        form_manager.save_form_data('package_selection', form_data)
-
+        # The cart item also serves as the saved package selection step
         cart.add_package(package, adults=adults, children=children, rooms=rooms, override_quantity=True)
         messages.success(request, f'{package.name} added to your booking!')
 
@@ -69,7 +61,6 @@ def checkout_customize(request, package_id):
     """
     package = get_object_or_404(Package, id=package_id, status=Package.PUBLISHED)
     cart = Cart(request)
-    form_manager = get_form_manager(request)
 
     # Get available accommodations and travel modes for this package
     accommodations = package.available_accommodations.filter(is_active=True)
@@ -115,16 +106,6 @@ def checkout_customize(request, package_id):
         self_drive = request.POST.get('self_drive') == 'on'
         cart.set_self_drive(package_id, self_drive)
 
-        # Save customization data for persistence
-        customization_data = {
-            'package_id': package_id,
-            'selected_accommodations': selected_accommodations,
-            'custom_accommodation': custom_accommodation,
-            'selected_travel_modes': selected_travel_modes,
-            'self_drive': self_drive
-        }
-        form_manager.save_form_data('customization', customization_data)
-
         return redirect('users:checkout_details')
     
     # Get current cart item for this package
@@ -156,54 +137,15 @@ def checkout_details(request):
         messages.error(request, 'Your cart is empty. Please select a package first.')
         return redirect('users:all_packages')
 
-    # Get existing checkout data from both old session and new form persistence
-    checkout_data = request.session.get('checkout_data', {})
-    saved_form_data = form_manager.get_form_initial_data('details', CheckoutForm)
-
     if request.method == 'POST':
         form = CheckoutForm(request.POST)
         if form.is_valid():
-            # Save to both old session system (for compatibility) and new form persistence
-            form_data = {
-                'full_name': form.cleaned_data['full_name'],
-                'email': form.cleaned_data['email'],
-                'phone_number': form.cleaned_data['phone_number'],
-                'special_requests': form.cleaned_data['special_requests'],
-                'travel_date': form.cleaned_data['travel_date'].isoformat() if form.cleaned_data['travel_date'] else None,
-                'terms_accepted': form.cleaned_data['terms_accepted'],
-                'marketing_consent': form.cleaned_data['marketing_consent'],
-            }
-
-            # Store in old session system for compatibility
-            request.session['checkout_data'] = form_data
-
-            # Store in new form persistence system
             form_manager.save_form_instance_data('details', form)
 
             return redirect('users:checkout_summary')
     else:
-        # Pre-populate form with saved data (prioritize new system, fallback to old)
-        initial_data = saved_form_data or {}
-
-        # Fallback to old session data if new system has no data
-        if not initial_data and checkout_data:
-            initial_data = {
-                'full_name': checkout_data.get('full_name', ''),
-                'email': checkout_data.get('email', ''),
-                'phone_number': checkout_data.get('phone_number', ''),
-                'special_requests': checkout_data.get('special_requests', ''),
-                'terms_accepted': checkout_data.get('terms_accepted', False),
-                'marketing_consent': checkout_data.get('marketing_consent', False),
-            }
-            # Handle travel_date conversion from ISO string
-            if checkout_data.get('travel_date'):
-                try:
-                    from datetime import datetime
-                    initial_data['travel_date'] = datetime.fromisoformat(checkout_data['travel_date']).date()
-                except (ValueError, TypeError):
-                    pass
-
-        form = CheckoutForm(initial=initial_data)
+        # Pre-populate form with saved data
+        form = CheckoutForm(initial=form_manager.get_form_initial_data('details', CheckoutForm))
 
     context = {
         'form': form,
@@ -220,7 +162,7 @@ def checkout_summary(request):
     """
     cart = Cart(request)
     cart_items = cart.get_cart_items()
-    checkout_data = request.session.get('checkout_data')
+    checkout_data = get_form_manager(request).get_checkout_data()
 
     if not cart_items or not checkout_data:
         messages.error(request, 'Please complete all previous steps.')
@@ -276,13 +218,6 @@ def clear_checkout_session(request):
     """
     Clear all checkout-related session data including form persistence
     """
-    # Clear old session data
-    session_keys_to_clear = ['checkout_data']
-    for key in session_keys_to_clear:
-        if key in request.session:
-            del request.session[key]
-
-    # Clear new form persistence data
     form_manager = get_form_manager(request)
     form_manager.clear_form_data()
 
@@ -2,19 +2,19 @@
 Form data persistence utilities for Mbugani Luxe Adventures booking system
 """
 
-from django.core.serializers.json import DjangoJSONEncoder
-import json
 from datetime import datetime, date
 
+from . import booking_state
+
 
 class FormDataManager:
     """
-    Manages form data persistence across booking steps using Django sessions
+    Manages form data persistence across booking steps using the session's BookingState
     """
     
     def __init__(self, request):
         self.session = request.session
-        self.form_data_key = 'booking_form_data'
+        self.state = booking_state.load(self.session)
         
     def save_form_data(self, step, data, merge=True):
         """
@@ -25,22 +25,12 @@ class FormDataManager:
             data (dict): Form data to save
             merge (bool): Whether to merge with existing data or replace
         """
-        # Get existing form data
-        form_data = self.session.get(self.form_data_key, {})
-        
-        if merge and step in form_data:
-            # Merge with existing data
-            form_data[step].update(data)
-        else:
-            # Replace or create new step data
-            form_data[step] = data
-            
-        # Add timestamp
-        form_data[step]['_timestamp'] = datetime.now().isoformat()
+        form_data = self.state.get_step(step) if merge else {}
+        form_data.update(data)
         
-        # Save back to session
-        self.session[self.form_data_key] = form_data
-        self.session.modified = True
+        # Stamps the step with the time it was saved
+        self.state.set_step(step, form_data)
+        self.state.save(self.session)
         
     def get_form_data(self, step=None):
         """
@@ -52,11 +42,9 @@ class FormDataManager:
         Returns:
             dict: Form data for the step or all form data
         """
-        form_data = self.session.get(self.form_data_key, {})
-        
         if step:
-            return form_data.get(step, {})
-        return form_data
+            return self.state.get_step(step)
+        return {name: self.state.get_step(name) for name in self.state.step_names()}
         
     def clear_form_data(self, step=None):
         """
@@ -66,16 +54,10 @@ class FormDataManager:
             step (str, optional): Specific step to clear. If None, clears all data
         """
         if step:
-            form_data = self.session.get(self.form_data_key, {})
-            if step in form_data:
-                del form_data[step]
-                self.session[self.form_data_key] = form_data
-                self.session.modified = True
+            self.state.steps.pop(step, None)
         else:
-            # Clear all form data
-            if self.form_data_key in self.session:
-                del self.session[self.form_data_key]
-                self.session.modified = True
+            self.state.steps.clear()
+        self.state.save(self.session)
                 
     def has_form_data(self, step=None):
         """
@@ -87,11 +69,9 @@ class FormDataManager:
         Returns:
             bool: True if data exists
         """
-        form_data = self.session.get(self.form_data_key, {})
-        
         if step:
-            return step in form_data and bool(form_data[step])
-        return bool(form_data)
+            return step in self.state.step_names()
+        return bool(self.state.step_names())
         
     def get_step_progress(self):
         """
@@ -100,8 +80,17 @@ class FormDataManager:
         Returns:
             list: List of completed step names
         """
-        form_data = self.session.get(self.form_data_key, {})
-        return list(form_data.keys())
+        return self.state.step_names()
+        
+    def get_checkout_data(self):
+        """
+        Guest details saved by the details step, without internal fields
+        
+        Returns:
+            dict: The details, or None before the step was completed
+        """
+        details = self.get_form_data('details')
+        return {key: value for key, value in details.items() if not key.startswith('_')} or None
         
     def validate_step_completion(self, step):
         """
@@ -0,0 +1,276 @@
+"""
+Derivative pipeline for locally stored images
+
+Uploads kept under MEDIA_ROOT (JobListing.job_image, CKEditor 5 uploads)
+are post-processed by django-q workers: every image is decoded once,
+auto-rotated, and saved at several widths as AVIF, WebP and JPEG without
+EXIF metadata. The decoding/encoding runs in a thread pool (Pillow releases
+the GIL while resizing and encoding); ``process_image_derivatives --sync``
+uses a process pool instead, which django-q's daemonic workers cannot
+start. Results, including the source and
+derivative dimensions, are recorded on ProcessedImage; the
+``image_derivatives`` template tags fall back to the original upload until
+the row is ready.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = 'derivatives'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff')
+
+# Preferred first when picking a derivative
+FORMAT_MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+CACHE_PREFIX = 'image_derivatives:'
+CACHE_TIMEOUT = 60 * 60
+PENDING_CACHE_TIMEOUT = 60
+
+
+def get_widths():
+    return tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 1280)))
+
+
+def get_formats():
+    """Configured output formats this Pillow build can encode"""
+    from PIL import features
+
+    formats = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', ('avif', 'webp', 'jpeg'))
+    return tuple(fmt for fmt in formats if fmt == 'jpeg' or features.check(fmt))
+
+
+def is_processable(name):
+    """True for image uploads that are not derivatives themselves"""
+    return (
+        bool(name)
+        and name.lower().endswith(IMAGE_EXTENSIONS)
+        and not name.startswith(f'{DERIVATIVES_DIR}/')
+    )
+
+
+def derivative_name(source_name, width, fmt):
+    """Storage name of one derivative, e.g. derivatives/job_listings/guide-640.webp"""
+    stem = os.path.splitext(source_name)[0]
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{DERIVATIVES_DIR}/{stem}-{width}.{extension}'
+
+
+def render_derivatives(media_root, source_name, widths, formats, quality):
+    """
+    Decode one upload and write its derivatives (runs in a pool worker)
+
+    Returns {'width', 'height', 'derivatives': [{format, width, height,
+    name, size}]}. Derivatives are never wider than the original; an image
+    narrower than every configured width gets a single full-size set.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(os.path.join(media_root, source_name)) as original:
+        # Apply the EXIF orientation, then drop all metadata
+        image = ImageOps.exif_transpose(original)
+        source_width, source_height = image.size
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        target_widths = sorted({min(width, source_width) for width in widths})
+        derivatives = []
+        for width in target_widths:
+            height = max(1, round(source_height * width / source_width))
+            resized = image if width == source_width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                name = derivative_name(source_name, width, fmt)
+                path = os.path.join(media_root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                output = resized
+                if fmt == 'jpeg' and output.mode != 'RGB':
+                    output = output.convert('RGB')
+                options = {'quality': quality}
+                if fmt == 'jpeg':
+                    options.update(optimize=True, progressive=True)
+                elif fmt == 'webp':
+                    options['method'] = 4
+                output.save(path, format=fmt.upper(), **options)
+
+                derivatives.append({
+                    'format': fmt,
+                    'width': width,
+                    'height': height,
+                    'name': name,
+                    'size': os.path.getsize(path),
+                })
+
+    return {'width': source_width, 'height': source_height, 'derivatives': derivatives}
+
+
+def _cache_key(source_name):
+    return CACHE_PREFIX + hashlib.sha1(source_name.encode('utf-8')).hexdigest()
+
+
+def process_images(source_names, processes=None, use_processes=False):
+    """
+    Generate derivatives for ``source_names`` in a pool of ``processes``
+    threads, or processes with ``use_processes`` (not inside django-q
+    workers: daemonic processes cannot have children)
+
+    Returns the number of images processed successfully. Images the pool
+    could not finish are marked FAILED.
+    """
+    from .models import ProcessedImage
+
+    names = [name for name in dict.fromkeys(source_names) if is_processable(name)]
+    if not names:
+        return 0
+
+    media_root = str(settings.MEDIA_ROOT)
+    widths = get_widths()
+    formats = get_formats()
+    quality = getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+    processes = processes or getattr(settings, 'IMAGE_PIPELINE_PROCESSES', min(4, os.cpu_count() or 1))
+
+    for name in names:
+        ProcessedImage.objects.update_or_create(
+            source=name, defaults={'status': ProcessedImage.PROCESSING, 'error': ''}
+        )
+
+    def mark_failed(name, error):
+        logger.error(f"Could not process image derivatives for {name}: {error}")
+        ProcessedImage.objects.filter(source=name).update(status=ProcessedImage.FAILED, error=str(error)[:1000])
+        cache.delete(_cache_key(name))
+
+    processed = 0
+    pending = list(names)
+    executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    try:
+        with executor(max_workers=min(processes, len(names))) as pool:
+            futures = {
+                name: pool.submit(render_derivatives, media_root, name, widths, formats, quality)
+                for name in names
+            }
+            for name, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    pending.remove(name)
+                    mark_failed(name, e)
+                    continue
+
+                ProcessedImage.objects.filter(source=name).update(
+                    status=ProcessedImage.READY,
+                    width=result['width'],
+                    height=result['height'],
+                    derivatives=result['derivatives'],
+                    processed_at=timezone.now(),
+                    error='',
+                )
+                cache.delete(_cache_key(name))
+                pending.remove(name)
+                processed += 1
+    except Exception as e:
+        # The pool itself failed (could not start, broken or shut down)
+        for name in pending:
+            mark_failed(name, e)
+
+    logger.info(f"Processed image derivatives for {processed}/{len(names)} uploads")
+    return processed
+
+
+def queue_image_processing(source_names):
+    """
+    Queue derivative generation in a django-q worker
+    """
+    names = [name for name in source_names if is_processable(name)]
+    if not names:
+        return False
+
+    try:
+        from django_q.tasks import async_task
+        from .models import ProcessedImage
+        from .tasks import task_time_budget
+
+        for name in names:
+            ProcessedImage.objects.get_or_create(source=name)
+
+        task_id = async_task(
+            'users.tasks.process_image_derivatives_async',
+            names,
+            task_name=f'image_derivatives_{len(names)}',
+            timeout=task_time_budget('IMAGE_PIPELINE_TIMEOUT', margin=5),
+        )
+        logger.info(f"Image derivatives queued: task_id={task_id}, images={names}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to queue image derivatives for {names}: {e}")
+        return False
+
+
+def get_processed_images(source_names):
+    """
+    Return {source name: {'width', 'height', 'derivatives'}} for ready images
+
+    Looked up through the cache; misses are fetched in one query and
+    uploads that are not ready yet are remembered briefly.
+    """
+    from .models import ProcessedImage
+
+    names = [name for name in dict.fromkeys(source_names) if name]
+    if not names:
+        return {}
+
+    keys = {_cache_key(name): name for name in names}
+    cached = cache.get_many(list(keys))
+    found = {keys[key]: value for key, value in cached.items()}
+
+    missing = [name for name in names if name not in found]
+    if missing:
+        rows = {
+            row['source']: row
+            for row in ProcessedImage.objects.filter(
+                source__in=missing, status=ProcessedImage.READY
+            ).values('source', 'width', 'height', 'derivatives')
+        }
+        for name in missing:
+            row = rows.get(name)
+            value = (
+                {'width': row['width'], 'height': row['height'], 'derivatives': row['derivatives']}
+                if row else {}
+            )
+            found[name] = value
+            cache.set(_cache_key(name), value, CACHE_TIMEOUT if row else PENDING_CACHE_TIMEOUT)
+
+    return {name: value for name, value in found.items() if value}
+
+
+def source_name_from_url(url):
+    """Storage name for a MEDIA_URL url, or None for other URLs"""
+    media_url = settings.MEDIA_URL
+    if url and url.startswith(media_url):
+        return url[len(media_url):]
+    return None
+
+
+class DerivativeFileSystemStorage(FileSystemStorage):
+    """
+    FileSystemStorage that queues derivative generation for saved images
+
+    Used as CKEDITOR_5_FILE_STORAGE so editor uploads get derivatives too.
+    """
+
+    def save(self, name, content, max_length=None):
+        name = super().save(name, content, max_length=max_length)
+        queue_image_processing([name])
+        return name
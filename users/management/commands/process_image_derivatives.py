@@ -0,0 +1,61 @@
+"""
+Generate derivatives for local image uploads that have none yet
+
+Usage:
+    python manage.py process_image_derivatives            # queue in django-q
+    python manage.py process_image_derivatives --sync     # process in this process
+    python manage.py process_image_derivatives --all      # also redo ready images
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.image_pipeline import is_processable, process_images, queue_image_processing
+from users.models import JobListing, ProcessedImage
+
+BATCH_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = 'Generate AVIF/WebP/JPEG derivatives for job images and CKEditor uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='Process now instead of queueing tasks')
+        parser.add_argument('--all', action='store_true', help='Reprocess images that already have derivatives')
+
+    def handle(self, *args, **options):
+        names = set(
+            JobListing.objects.exclude(job_image='').exclude(job_image__isnull=True)
+            .values_list('job_image', flat=True)
+        )
+        names.update(self._ckeditor_uploads())
+        names = sorted(name for name in names if is_processable(name))
+
+        if not options['all']:
+            ready = set(
+                ProcessedImage.objects.filter(source__in=names, status=ProcessedImage.READY)
+                .values_list('source', flat=True)
+            )
+            names = [name for name in names if name not in ready]
+
+        self.stdout.write(f'{len(names)} images need derivatives')
+        processed = 0
+        for start in range(0, len(names), BATCH_SIZE):
+            batch = names[start:start + BATCH_SIZE]
+            if options['sync']:
+                # Outside django-q, so a process pool may be used
+                processed += process_images(batch, use_processes=True)
+            elif queue_image_processing(batch):
+                processed += len(batch)
+
+        verb = 'Processed' if options['sync'] else 'Queued'
+        self.stdout.write(self.style.SUCCESS(f'✅ {verb} {processed} images'))
+
+    def _ckeditor_uploads(self):
+        """Storage names of files uploaded through CKEditor 5"""
+        upload_dir = os.path.join(str(settings.MEDIA_ROOT), getattr(settings, 'CKEDITOR_5_UPLOAD_PATH', 'uploads/'))
+        for root, _, files in os.walk(upload_dir):
+            for filename in files:
+                yield os.path.relpath(os.path.join(root, filename), str(settings.MEDIA_ROOT)).replace(os.sep, '/')
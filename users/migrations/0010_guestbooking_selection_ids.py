@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+
+def _parse_ids(value):
+    return [int(pk) for pk in value.split(',') if pk.strip().isdigit()]
+
+
+def ids_to_lists(apps, schema_editor):
+    GuestBooking = apps.get_model('users', 'GuestBooking')
+    for booking in GuestBooking.objects.all().iterator():
+        booking.accommodation_ids = _parse_ids(booking.selected_accommodation_ids)
+        booking.travel_mode_ids = _parse_ids(booking.selected_travel_mode_ids)
+        booking.save(update_fields=['accommodation_ids', 'travel_mode_ids'])
+
+
+def lists_to_ids(apps, schema_editor):
+    GuestBooking = apps.get_model('users', 'GuestBooking')
+    for booking in GuestBooking.objects.all().iterator():
+        booking.selected_accommodation_ids = ','.join(map(str, booking.accommodation_ids))
+        booking.selected_travel_mode_ids = ','.join(map(str, booking.travel_mode_ids))
+        booking.save(update_fields=['selected_accommodation_ids', 'selected_travel_mode_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_processedimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guestbooking',
+            name='accommodation_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='guestbooking',
+            name='travel_mode_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(ids_to_lists, lists_to_ids),
+        migrations.RemoveField(
+            model_name='guestbooking',
+            name='selected_accommodation_ids',
+        ),
+        migrations.RemoveField(
+            model_name='guestbooking',
+            name='selected_travel_mode_ids',
+        ),
+    ]
@@ -131,9 +131,9 @@ class GuestBooking(models.Model):
     session_key = models.CharField(max_length=40)
     package = models.ForeignKey("adminside.Package", on_delete=models.CASCADE)
 
-    # Selected add-ons (stored as JSON or comma-separated IDs)
-    selected_accommodation_ids = models.TextField(blank=True, default='')
-    selected_travel_mode_ids = models.TextField(blank=True, default='')
+    # Selected add-ons, as in a users.booking_state cart item
+    accommodation_ids = models.JSONField(blank=True, default=list)
+    travel_mode_ids = models.JSONField(blank=True, default=list)
 
     # Traveler details
     number_of_adults = models.PositiveIntegerField(default=1)
@@ -147,21 +147,37 @@ class GuestBooking(models.Model):
     class Meta:
         unique_together = ['session_key', 'package']
 
+    @classmethod
+    def from_cart_item(cls, session_key, item):
+        """Unsaved GuestBooking for a users.booking_state item array"""
+        from .booking_state import ACCOMMODATIONS, ADULTS, CHILDREN, PACKAGE, ROOMS, TRAVEL_MODES
+        return cls(
+            session_key=session_key, package_id=item[PACKAGE],
+            accommodation_ids=list(item[ACCOMMODATIONS]), travel_mode_ids=list(item[TRAVEL_MODES]),
+            number_of_adults=item[ADULTS], number_of_children=item[CHILDREN], number_of_rooms=item[ROOMS],
+        )
+
+    def get_cart_item(self):
+        """This booking as a users.booking_state item array"""
+        from .booking_state import ACCOMMODATIONS, ADULTS, CHILDREN, ROOMS, TRAVEL_MODES, new_item
+        item = new_item(self.package_id)
+        item[ADULTS], item[CHILDREN], item[ROOMS] = self.number_of_adults, self.number_of_children, self.number_of_rooms
+        item[ACCOMMODATIONS], item[TRAVEL_MODES] = list(self.accommodation_ids), list(self.travel_mode_ids)
+        return item
+
     def get_selected_accommodations(self):
         """Get selected accommodation objects"""
-        if not self.selected_accommodation_ids:
+        if not self.accommodation_ids:
             return []
         from adminside.models import Accommodation
-        ids = [int(id.strip()) for id in self.selected_accommodation_ids.split(',') if id.strip()]
-        return Accommodation.objects.filter(id__in=ids)
+        return Accommodation.objects.filter(id__in=self.accommodation_ids)
 
     def get_selected_travel_modes(self):
         """Get selected travel mode objects"""
-        if not self.selected_travel_mode_ids:
+        if not self.travel_mode_ids:
             return []
         from adminside.models import TravelMode
-        ids = [int(id.strip()) for id in self.selected_travel_mode_ids.split(',') if id.strip()]
-        return TravelMode.objects.filter(id__in=ids)
+        return TravelMode.objects.filter(id__in=self.travel_mode_ids)
 
     def calculate_total_price(self):
         """Calculate total price for this booking"""
@@ -689,6 +705,49 @@ class QuoteRequest(models.Model):
         return status_classes.get(self.status, 'badge-secondary')
 
 
+class ProcessedImage(models.Model):
+    """Resized, metadata-free derivatives of a locally stored image upload"""
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
+    source = models.CharField(max_length=500, unique=True, help_text="Storage name of the original upload")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    derivatives = models.JSONField(default=list, blank=True, help_text="[{format, width, height, name, size}]")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Processed Image"
+        verbose_name_plural = "Processed Images"
+
+    def __str__(self):
+        return f"{self.source} ({self.get_status_display()})"
+
+
+@receiver(post_save, sender=JobListing)
+def queue_job_image_derivatives(sender, instance, **kwargs):
+    """Generate derivatives for a newly uploaded job image"""
+    if not instance.job_image:
+        return
+    name = instance.job_image.name
+    if not ProcessedImage.objects.filter(source=name).exists():
+        from .image_pipeline import queue_image_processing
+        queue_image_processing([name])
+
+
 # Signal to create UserProfile when User is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
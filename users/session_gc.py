@@ -0,0 +1,222 @@
+"""
+Garbage collector for expired sessions and orphaned GuestBookings
+
+``clearsessions`` deletes every expired django_session row in one
+statement, which locks the whole set and leaves a burst of dead rows for
+vacuum. The scheduled ``users.tasks.collect_session_garbage`` task deletes
+them in batches of SESSION_GC_BATCH_SIZE rows instead, one transaction per
+batch, pausing SESSION_GC_PAUSE seconds between batches and stopping after
+SESSION_GC_MAX_SECONDS, by default the django-q task timeout less a margin
+(the next run picks up where it stopped):
+
+- expired sessions are read oldest first through the expire_date index;
+  rows locked by a request saving the session are skipped;
+- GuestBookings are walked in primary-key windows of the batch size, and
+  those without an unexpired session are deleted once untouched for
+  SESSION_GC_GUEST_BOOKING_GRACE seconds (a session may be held only in the
+  session cache for a while, see tours_travels.sessions).
+
+Abandoned carts are part of the session and go with it. Each run reports
+the rows deleted and the size, live and dead rows of both tables before and
+after (PostgreSQL; other databases report the row count only). django-q
+keeps the report as the task result and /status/maintenance/ lists the
+recent runs.
+
+Usage:
+    report = session_gc.collect()
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_NAME = 'Collect expired sessions and orphaned guest bookings'
+TASK_FUNC = 'users.tasks.collect_session_garbage'
+# Seconds kept between the run's deadline and the django-q timeout, for the
+# batch in progress and the closing table statistics
+TIMEOUT_MARGIN = 15
+
+
+def _models():
+    from django.contrib.sessions.models import Session
+    from .models import GuestBooking
+    return Session, GuestBooking
+
+
+def table_stats(model):
+    """
+    Size and row counts of ``model``'s table
+
+    On PostgreSQL: total size with indexes and TOAST, and the live and dead
+    rows from pg_stat_user_tables (updated a moment after the writes).
+    Elsewhere only the row count is known.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    table = model._meta.db_table
+    stats = {
+        'table': table, 'rows': None, 'dead_rows': None, 'dead_ratio': None,
+        'size_bytes': None, 'last_autovacuum': None,
+    }
+
+    if connection.vendor != 'postgresql':
+        stats['rows'] = model._default_manager.using(using).count()
+        return stats
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_total_relation_size(c.oid), s.n_live_tup, s.n_dead_tup, s.last_autovacuum "
+            "FROM pg_class c LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid "
+            "WHERE c.oid = to_regclass(%s)",
+            [connection.ops.quote_name(table)]
+        )
+        row = cursor.fetchone()
+    if row:
+        size, live, dead, last_autovacuum = row
+        stats.update(size_bytes=size, rows=live, dead_rows=dead)
+        if live is not None and dead is not None:
+            stats['dead_ratio'] = round(dead / (live + dead), 3) if live + dead else 0.0
+        if last_autovacuum:
+            stats['last_autovacuum'] = last_autovacuum.isoformat()
+    return stats
+
+
+def delete_expired_sessions(batch_size, pause, deadline):
+    """
+    Delete expired sessions, oldest first, one batch per transaction
+
+    Returns a dict of the rows deleted, the batches run and whether every
+    expired session was reached before ``deadline`` (a time.monotonic() value).
+    """
+    Session, _ = _models()
+    using = router.db_for_write(Session)
+    now = timezone.now()
+    expired = Session.objects.using(using).filter(expire_date__lt=now)
+    deleted = batches = 0
+
+    while True:
+        with transaction.atomic(using=using):
+            keys = list(
+                expired.select_for_update(skip_locked=True)
+                .order_by('expire_date').values_list('pk', flat=True)[:batch_size]
+            )
+            if keys:
+                deleted += expired.filter(pk__in=keys).delete()[0]
+        if not keys:
+            return {'deleted': deleted, 'batches': batches, 'finished': True}
+        batches += 1
+        if len(keys) < batch_size:
+            return {'deleted': deleted, 'batches': batches, 'finished': True}
+        if time.monotonic() >= deadline:
+            return {'deleted': deleted, 'batches': batches, 'finished': False}
+        time.sleep(pause)
+
+
+def delete_orphaned_guest_bookings(batch_size, pause, deadline, grace):
+    """
+    Delete GuestBookings without an unexpired session, untouched for
+    ``grace`` seconds, one primary-key window per transaction
+
+    Returns a dict as delete_expired_sessions does.
+    """
+    Session, GuestBooking = _models()
+    using = router.db_for_write(GuestBooking)
+    now = timezone.now()
+    live_session = Session.objects.using(using).filter(session_key=OuterRef('session_key'), expire_date__gte=now)
+    bookings = GuestBooking.objects.using(using)
+    orphaned = bookings.filter(updated_at__lt=now - timedelta(seconds=grace)).exclude(Exists(live_session))
+    deleted = batches = 0
+    last_pk = 0
+
+    while True:
+        window = list(bookings.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not window:
+            return {'deleted': deleted, 'batches': batches, 'finished': True}
+        with transaction.atomic(using=using):
+            removed = orphaned.filter(pk__gt=last_pk, pk__lte=window[-1]).delete()[0]
+        deleted += removed
+        batches += 1
+        if len(window) < batch_size:
+            return {'deleted': deleted, 'batches': batches, 'finished': True}
+        if time.monotonic() >= deadline:
+            return {'deleted': deleted, 'batches': batches, 'finished': False}
+        last_pk = window[-1]
+        if removed:
+            time.sleep(pause)
+
+
+def collect(batch_size=None, pause=None, max_seconds=None, grace=None):
+    """
+    Delete expired sessions, then orphaned GuestBookings
+
+    Returns the run's report: per table the rows deleted, the batches and
+    the table statistics before and after.
+    """
+    from .tasks import task_time_budget
+
+    Session, GuestBooking = _models()
+    batch_size = batch_size or getattr(settings, 'SESSION_GC_BATCH_SIZE', 5000)
+    pause = getattr(settings, 'SESSION_GC_PAUSE', 0.5) if pause is None else pause
+    max_seconds = max_seconds or task_time_budget('SESSION_GC_MAX_SECONDS', margin=TIMEOUT_MARGIN)
+    grace = getattr(settings, 'SESSION_GC_GUEST_BOOKING_GRACE', 24 * 60 * 60) if grace is None else grace
+
+    started = time.monotonic()
+    deadline = started + max_seconds
+    tables = []
+
+    before = table_stats(Session)
+    result = delete_expired_sessions(batch_size, pause, deadline)
+    tables.append({**result, 'table': before['table'], 'before': before, 'after': table_stats(Session)})
+
+    if result['finished']:
+        before = table_stats(GuestBooking)
+        result = delete_orphaned_guest_bookings(batch_size, pause, deadline, grace)
+        tables.append({**result, 'table': before['table'], 'before': before, 'after': table_stats(GuestBooking)})
+
+    report = {
+        'tables': tables,
+        'deleted': sum(table['deleted'] for table in tables),
+        'finished': len(tables) == 2 and result['finished'],
+        'seconds': round(time.monotonic() - started, 2),
+    }
+    logger.info(f"Session GC deleted {report['deleted']} rows in {report['seconds']}s")
+    return report
+
+
+def recent_runs(limit=10):
+    """
+    Reports of the latest scheduled runs, newest first, as kept by django-q
+    (up to Q_CLUSTER['save_limit'] successful tasks of all kinds)
+    """
+    from django_q.models import Task
+
+    runs = []
+    for task in Task.objects.filter(func=TASK_FUNC).order_by('-stopped')[:limit]:
+        result = task.result if isinstance(task.result, dict) else {'success': False, 'error': str(task.result)}
+        runs.append({**result, 'stopped': task.stopped})
+    return runs
+
+
+def ensure_schedule(**kwargs):
+    """
+    Create or update the django-q schedule running collect_session_garbage
+    (connected to post_migrate by UsersConfig.ready)
+    """
+    from django_q.models import Schedule
+
+    Schedule.objects.update_or_create(
+        name=SCHEDULE_NAME,
+        defaults={
+            'func': TASK_FUNC,
+            'schedule_type': Schedule.MINUTES,
+            'minutes': getattr(settings, 'SESSION_GC_MINUTES', 60),
+            'repeats': -1,
+        },
+    )
@@ -15,6 +15,17 @@ from django.utils import timezone
 logger = logging.getLogger(__name__)
 
 
+def task_time_budget(setting, margin):
+    """
+    Seconds a task may run: ``setting`` if configured, capped at the django-q
+    timeout of the active environment less ``margin`` seconds
+    """
+    timeout = getattr(settings, 'Q_CLUSTER', {}).get('timeout') or 60
+    budget = max(timeout - margin, 1)
+    configured = getattr(settings, setting, None)
+    return min(configured, budget) if configured else budget
+
+
 def send_email_with_retry(subject, message, html_message, from_email, recipient_list, max_retries=2):
     """
     Send email with retry logic for better reliability
@@ -458,3 +469,50 @@ def send_booking_confirmation_email_async(booking_id, **kwargs):
         error_msg = f"Unexpected error in booking confirmation email task: {e}"
         logger.error(error_msg)
         return {'success': False, 'error': error_msg}
+
+
+def process_image_derivatives_async(source_names, **kwargs):
+    """
+    Async task to generate resized AVIF/WebP/JPEG derivatives of uploads
+
+    Args:
+        source_names (list): Storage names of the original images
+        **kwargs: Additional arguments (ignored, for compatibility)
+
+    Returns:
+        dict: Task result with number of processed images
+    """
+    from .image_pipeline import process_images
+
+    processed = process_images(source_names)
+    return {
+        'success': processed == len(source_names),
+        'processed': processed,
+        'timestamp': timezone.now().isoformat()
+    }
+
+
+def collect_session_garbage(**kwargs):
+    """
+    Scheduled task deleting expired sessions and orphaned GuestBookings in
+    small batches (see users.session_gc)
+
+    Args:
+        **kwargs: Additional arguments (ignored, for compatibility)
+
+    Returns:
+        dict: Task result with the rows deleted and table statistics
+    """
+    from . import session_gc
+
+    try:
+        report = session_gc.collect()
+    except Exception as e:
+        logger.error(f"Failed to collect expired sessions: {e}")
+        return {'success': False, 'error': str(e)}
+
+    return {
+        'success': True,
+        **report,
+        'timestamp': timezone.now().isoformat()
+    }
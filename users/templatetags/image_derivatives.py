@@ -0,0 +1,126 @@
+"""
+Template tags serving the AVIF/WebP/JPEG derivatives of local uploads
+
+Until users.image_pipeline has processed an upload the original file is
+used, so the tags are safe to use right after an image is saved.
+"""
+
+import re
+
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from users.image_pipeline import FORMAT_MIME_TYPES, get_processed_images, source_name_from_url
+
+register = template.Library()
+
+_IMG_TAG = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_SRC_ATTRIBUTE = re.compile(r'\bsrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def _media_url(name):
+    from django.core.files.storage import default_storage
+    return default_storage.url(name)
+
+
+def _srcsets(processed):
+    """Return {format: srcset} ordered by FORMAT_MIME_TYPES preference"""
+    by_format = {}
+    for derivative in sorted(processed['derivatives'], key=lambda d: d['width']):
+        by_format.setdefault(derivative['format'], []).append(
+            f"{_media_url(derivative['name'])} {derivative['width']}w"
+        )
+    return {fmt: ', '.join(by_format[fmt]) for fmt in FORMAT_MIME_TYPES if fmt in by_format}
+
+
+def _fallback_derivative(processed):
+    """Widest JPEG derivative (or widest of any format) for the <img> src"""
+    derivatives = processed['derivatives']
+    jpegs = [d for d in derivatives if d['format'] == 'jpeg'] or derivatives
+    return max(jpegs, key=lambda d: d['width'])
+
+
+def _picture(processed, img_attributes, sizes):
+    """<picture> with one <source> per modern format and a JPEG <img>"""
+    srcsets = _srcsets(processed)
+    fallback = _fallback_derivative(processed)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMAT_MIME_TYPES[fmt], srcset, sizes) for fmt, srcset in srcsets.items() if fmt != fallback['format'])
+    )
+    img = format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" {}>',
+        _media_url(fallback['name']), srcsets.get(fallback['format'], ''), sizes,
+        fallback['width'], fallback['height'], img_attributes
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
+
+
+@register.simple_tag
+def derivative_image(image_field, sizes="100vw", css_class="", alt_text="", style=""):
+    """
+    Render a local upload as a <picture> of its best derivatives
+
+    Falls back to the original file until processing has finished.
+
+    Usage:
+    {% load image_derivatives %}
+    {% derivative_image job.job_image "(max-width: 768px) 100vw, 33vw" "img-fluid" job.title %}
+    """
+    if not image_field:
+        return ''
+
+    attributes = format_html(
+        'class="{}" alt="{}" style="{}" loading="lazy" decoding="async"',
+        css_class, alt_text or 'Image', style
+    )
+    processed = get_processed_images([image_field.name]).get(image_field.name)
+    if not processed or not processed['derivatives']:
+        return format_html('<img src="{}" {}>', image_field.url, attributes)
+    return _picture(processed, attributes, sizes)
+
+
+@register.filter
+def responsive_media(html, sizes="(max-width: 768px) 100vw, 800px"):
+    """
+    Swap local <img> tags in rich-text HTML (CKEditor uploads) for <picture>
+    elements of their derivatives; other images are left untouched
+
+    Usage:
+    {% load image_derivatives %}
+    {{ post.content|responsive_media }}
+    """
+    if not html:
+        return ''
+
+    tags = _IMG_TAG.findall(html)
+    names = {}
+    for tag in tags:
+        match = _SRC_ATTRIBUTE.search(tag)
+        name = source_name_from_url(match.group(1)) if match else None
+        if name:
+            names[tag] = name
+    processed = get_processed_images(names.values())
+
+    def replace(match):
+        tag = match.group(0)
+        item = processed.get(names.get(tag))
+        if not item or not item['derivatives']:
+            return tag
+        fallback = _fallback_derivative(item)
+        srcsets = _srcsets(item)
+        img = _SRC_ATTRIBUTE.sub(f'src="{_media_url(fallback["name"])}"', tag, count=1)
+        extra = f' srcset="{srcsets.get(fallback["format"], "")}" sizes="{sizes}"'
+        if 'width=' not in tag:
+            extra += f' width="{fallback["width"]}" height="{fallback["height"]}"'
+        if 'loading=' not in tag:
+            extra += ' loading="lazy"'
+        img = img[:4] + extra + img[4:]
+        sources = ''.join(
+            f'<source type="{FORMAT_MIME_TYPES[fmt]}" srcset="{srcset}" sizes="{sizes}">'
+            for fmt, srcset in srcsets.items() if fmt != fallback['format']
+        )
+        return f'<picture>{sources}{img}</picture>'
+
+    return mark_safe(_IMG_TAG.sub(replace, str(html)))
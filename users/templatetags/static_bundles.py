@@ -0,0 +1,39 @@
+"""
+Template tag including the CSS/JS bundles of tours_travels.static_assets
+
+With bundles enabled (the default when DEBUG is off) one hashed, minified
+file is linked; otherwise every source file is linked separately so edits
+show up without running collectstatic.
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+
+from tours_travels.static_assets import bundles_enabled, get_bundles
+
+register = template.Library()
+
+
+@register.simple_tag
+def static_bundle(bundle_name, defer=False):
+    """
+    Render <link>/<script> tags for a STATIC_BUNDLES entry
+
+    Usage:
+    {% load static_bundles %}
+    {% static_bundle "bundles/site.css" %}
+    {% static_bundle "bundles/site-plugins.js" defer=True %}
+    """
+    bundles = get_bundles()
+    if bundle_name not in bundles:
+        raise template.TemplateSyntaxError(f"Unknown static bundle: {bundle_name}")
+
+    names = [bundle_name] if bundles_enabled() else bundles[bundle_name]
+    if bundle_name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(name),) for name in names))
+    return format_html_join(
+        '\n', '<script{} src="{}"></script>',
+        ((mark_safe(' defer') if defer else '', static(name)) for name in names)
+    )
@@ -0,0 +1,152 @@
+"""
+Tests for the compact, versioned cart and checkout state (users.booking_state)
+"""
+
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+
+from adminside.models import Accommodation, Destination, Package, TravelMode
+from users import booking_state
+from users.booking_state import ACCOMMODATIONS, ADULTS, STATE_VERSION
+from users.cart import Cart
+from users.form_persistence import FormDataManager
+from users.models import GuestBooking
+
+
+class BookingStateTest(TestCase):
+    """Test the packed layout and the conversion of older sessions"""
+
+    def setUp(self):
+        self.session = self.client.session
+
+    def test_items_drop_trailing_defaults(self):
+        """Test an item array keeps only the fields up to the last non-default one"""
+        item = booking_state.new_item(7)
+        item[ADULTS] = 2
+        self.assertEqual(booking_state.pack_item(item), [7, 2])
+
+        item[ACCOMMODATIONS].append(3)
+        packed = booking_state.pack_item(item)
+        self.assertEqual(packed, [7, 2, 0, 0, [3]])
+        self.assertEqual(booking_state.unpack_item(packed), [7, 2, 0, 0, [3], [], '', False])
+
+    def test_steps_round_trip(self):
+        """Test known fields are stored by position and others in a trailing dict"""
+        data = {'full_name': 'Amina', 'email': 'amina@example.com', 'newsletter': True, '_timestamp': 'x'}
+        packed = booking_state.pack_step('details', data, 1700000000)
+
+        self.assertEqual(packed[:3], [1700000000, 'Amina', 'amina@example.com'])
+        self.assertEqual(packed[-1], {'newsletter': True})
+        unpacked = booking_state.unpack_step('details', packed)
+        self.assertEqual(unpacked['full_name'], 'Amina')
+        self.assertTrue(unpacked['newsletter'])
+        self.assertIn('_timestamp', unpacked)
+
+    def test_legacy_session_is_converted_once(self):
+        """Test the old cart dict, booking_form_data and checkout_data become one versioned value"""
+        self.session['cart'] = {'4': {
+            'adults': 2, 'children': 1, 'rooms': 1, 'accommodations': [9], 'travel_modes': [],
+            'custom_accommodation': '', 'self_drive': False, 'price': '1500',
+        }}
+        self.session['booking_form_data'] = {
+            'package_selection': {'package_id': 4, 'adults': 2, '_timestamp': '2026-10-01T10:00:00'},
+        }
+        self.session['checkout_data'] = {'full_name': 'Amina', 'email': 'amina@example.com', 'travel_date': None}
+
+        state = booking_state.load(self.session)
+
+        self.assertEqual(state.items, {4: [4, 2, 1, 1, [9], [], '', False]})
+        details = state.get_step('details')
+        self.assertEqual((details['full_name'], details['email']), ('Amina', 'amina@example.com'))
+        self.assertNotIn('travel_date', details)
+        self.assertEqual(self.session[settings.CART_SESSION_ID][0], STATE_VERSION)
+        self.assertNotIn('booking_form_data', self.session)
+        self.assertNotIn('checkout_data', self.session)
+        self.assertIs(booking_state.load(self.session), state)
+
+    def test_unreadable_layout_starts_over(self):
+        """Test a state of an unknown version is replaced by an empty one"""
+        self.session[settings.CART_SESSION_ID] = [STATE_VERSION + 1, [[1, 2]], {}]
+
+        self.assertEqual(booking_state.load(self.session).items, {})
+
+    def test_unchanged_state_leaves_the_session_unmodified(self):
+        """Test saving a state identical to the stored one does not mark the session modified"""
+        state = booking_state.load(self.session)
+        state.items[1] = booking_state.new_item(1)
+        state.save(self.session)
+        self.session.save()
+
+        session = self.client.session
+        booking_state.load(session).save(session)
+        self.assertFalse(session.modified)
+
+
+class CheckoutStateTest(TestCase):
+    """Test Cart, FormDataManager and the checkout views share one state"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Maasai Mara', description='Wildlife reserve')
+        self.package = Package.objects.create(
+            name='Maasai Mara Safari', description='3-day safari', main_destination=destination,
+            duration_days=3, duration_nights=2, adult_price=1500, child_price=1050, status=Package.PUBLISHED
+        )
+        self.accommodation = Accommodation.objects.create(
+            name='Safari Lodge', description='Lodge', destination=destination, price_per_room_per_night=200
+        )
+        self.travel_mode = TravelMode.objects.create(
+            name='Mara Shuttle', transport_type=TravelMode.BUS, departure_location='Nairobi',
+            arrival_location='Maasai Mara', departure_time=time(7), arrival_time=time(13),
+            duration_minutes=360, price_per_person=100
+        )
+        self.package.available_accommodations.add(self.accommodation)
+        self.package.available_travel_modes.add(self.travel_mode)
+
+    def test_checkout_keeps_one_compact_session_value(self):
+        """Test the checkout steps store the cart and the guest details once"""
+        self.client.post(reverse('users:add_to_cart', args=[self.package.id]), {'adults': 2, 'children': 1, 'rooms': 1})
+        self.client.post(reverse('users:checkout_customize', args=[self.package.id]), {
+            'accommodations': [self.accommodation.id], 'travel_modes': [self.travel_mode.id],
+        })
+        self.client.post(reverse('users:checkout_details'), {
+            'full_name': 'Amina Wanjiru', 'email': 'amina@example.com', 'phone_number': '+254701363551',
+            'travel_date': (date.today() + timedelta(days=30)).isoformat(), 'terms_accepted': True,
+        })
+
+        session = self.client.session
+        version, items, steps = session[settings.CART_SESSION_ID]
+        self.assertEqual(version, STATE_VERSION)
+        self.assertEqual(items, [[self.package.id, 2, 1, 1, [self.accommodation.id], [self.travel_mode.id]]])
+        self.assertEqual(list(steps), ['details'])
+        self.assertNotIn('checkout_data', session)
+
+        response = self.client.get(reverse('users:checkout_summary'))
+        self.assertContains(response, 'Amina Wanjiru')
+        self.assertEqual(response.context['total_price'], Cart(self.client).get_total_price())
+
+    def test_cart_and_form_data_share_the_request_state(self):
+        """Test changes through a Cart and a FormDataManager of one request are both kept"""
+        request = self.client.get('/').wsgi_request
+        Cart(request).add_package(self.package, adults=2)
+        FormDataManager(request).save_form_data('details', {'full_name': 'Amina'})
+
+        state = booking_state.BookingState.unpack(request.session[settings.CART_SESSION_ID])
+        self.assertIn(self.package.id, state.items)
+        self.assertEqual(state.get_step('details')['full_name'], 'Amina')
+        self.assertEqual(FormDataManager(request).get_form_data('package_selection')['adults'], 2)
+
+    def test_guest_booking_uses_cart_items(self):
+        """Test GuestBooking stores the item's id lists and converts back to an item"""
+        item = booking_state.new_item(self.package.id)
+        item[ADULTS] = 2
+        item[ACCOMMODATIONS].append(self.accommodation.id)
+        booking = GuestBooking.from_cart_item('a' * 32, item)
+        booking.save()
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.accommodation_ids, [self.accommodation.id])
+        self.assertEqual(list(booking.get_selected_accommodations()), [self.accommodation])
+        self.assertEqual(booking.get_cart_item(), item)
@@ -0,0 +1,164 @@
+"""
+Tests for the local image derivative pipeline and its template tags
+"""
+
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from users import image_pipeline
+from users.models import JobListing, ProcessedImage
+
+
+def make_jpeg(path, size=(1600, 900), orientation=None):
+    """Write a JPEG with camera-style EXIF data"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    exif = Image.Exif()
+    exif[0x010F] = 'TestCam'  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new('RGB', size, (200, 120, 40)).save(path, format='JPEG', exif=exif)
+
+
+class ImagePipelineTest(TestCase):
+    """Test cases for derivative generation"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            IMAGE_DERIVATIVE_WIDTHS=(320, 640, 1280),
+            IMAGE_DERIVATIVE_FORMATS=('webp', 'jpeg'),
+        )
+        self.settings_override.enable()
+        make_jpeg(os.path.join(self.media_root, 'uploads', 'mara.jpg'))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_render_derivatives_strips_exif_and_records_dimensions(self):
+        """Test resized derivatives without metadata"""
+        result = image_pipeline.render_derivatives(self.media_root, 'uploads/mara.jpg', (320, 640), ('webp', 'jpeg'), 80)
+
+        self.assertEqual((result['width'], result['height']), (1600, 900))
+        self.assertEqual(len(result['derivatives']), 4)
+        jpeg = next(d for d in result['derivatives'] if d['format'] == 'jpeg' and d['width'] == 640)
+        self.assertEqual(jpeg['height'], 360)
+        with Image.open(os.path.join(self.media_root, jpeg['name'])) as image:
+            self.assertEqual(image.size, (640, 360))
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_exif_orientation_is_applied(self):
+        """Test that rotated camera photos come out upright"""
+        make_jpeg(os.path.join(self.media_root, 'uploads', 'portrait.jpg'), size=(400, 300), orientation=6)
+        result = image_pipeline.render_derivatives(self.media_root, 'uploads/portrait.jpg', (320,), ('jpeg',), 80)
+
+        self.assertEqual((result['width'], result['height']), (300, 400))
+
+    def test_small_images_are_not_upscaled(self):
+        """Test that derivatives never exceed the original width"""
+        make_jpeg(os.path.join(self.media_root, 'uploads', 'small.jpg'), size=(200, 100))
+        result = image_pipeline.render_derivatives(self.media_root, 'uploads/small.jpg', (320, 640), ('jpeg',), 80)
+
+        self.assertEqual([d['width'] for d in result['derivatives']], [200])
+
+    def test_process_images_records_ready_row(self):
+        """Test that the process pool results are stored on ProcessedImage"""
+        processed = image_pipeline.process_images(
+            ['uploads/mara.jpg', 'uploads/missing.jpg'], processes=2, use_processes=True
+        )
+
+        self.assertEqual(processed, 1)
+        row = ProcessedImage.objects.get(source='uploads/mara.jpg')
+        self.assertEqual(row.status, ProcessedImage.READY)
+        self.assertEqual(row.width, 1600)
+        self.assertEqual(len(row.derivatives), 6)
+        self.assertEqual(ProcessedImage.objects.get(source='uploads/missing.jpg').status, ProcessedImage.FAILED)
+
+    def test_task_uses_threads(self):
+        """Test the django-q task processes uploads without starting child processes"""
+        from users.tasks import process_image_derivatives_async
+
+        with mock.patch.object(image_pipeline, 'ProcessPoolExecutor', side_effect=AssertionError('no children')):
+            result = process_image_derivatives_async(['uploads/mara.jpg'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(ProcessedImage.objects.get(source='uploads/mara.jpg').status, ProcessedImage.READY)
+
+    def test_pool_failure_marks_images_failed(self):
+        """Test images are marked FAILED, not left PROCESSING, when the pool cannot start"""
+        error = AssertionError('daemonic processes are not allowed to have children')
+        with mock.patch.object(image_pipeline, 'ProcessPoolExecutor', side_effect=error):
+            processed = image_pipeline.process_images(['uploads/mara.jpg'], use_processes=True)
+
+        self.assertEqual(processed, 0)
+        row = ProcessedImage.objects.get(source='uploads/mara.jpg')
+        self.assertEqual(row.status, ProcessedImage.FAILED)
+        self.assertIn('daemonic', row.error)
+
+    def test_timeout_follows_the_cluster_timeout(self):
+        """Test the task timeout stays below the active django-q timeout"""
+        from users.tasks import task_time_budget
+
+        with override_settings(Q_CLUSTER={'timeout': 30}, IMAGE_PIPELINE_TIMEOUT=None):
+            self.assertEqual(task_time_budget('IMAGE_PIPELINE_TIMEOUT', margin=5), 25)
+        with override_settings(Q_CLUSTER={'timeout': 30}, IMAGE_PIPELINE_TIMEOUT=55):
+            self.assertEqual(task_time_budget('IMAGE_PIPELINE_TIMEOUT', margin=5), 25)
+        with override_settings(Q_CLUSTER={'timeout': 180}, IMAGE_PIPELINE_TIMEOUT=55):
+            self.assertEqual(task_time_budget('IMAGE_PIPELINE_TIMEOUT', margin=5), 55)
+
+    def test_derivatives_are_not_reprocessed(self):
+        """Test that derivative files are never treated as uploads"""
+        self.assertFalse(image_pipeline.is_processable('derivatives/uploads/mara-320.webp'))
+        self.assertFalse(image_pipeline.is_processable('resumes/cv.pdf'))
+        self.assertTrue(image_pipeline.is_processable('job_listings/guide.JPG'))
+
+    @mock.patch('django_q.tasks.async_task')
+    def test_job_image_upload_is_queued(self, async_task):
+        """Test that saving a job listing with a new image queues processing"""
+        with open(os.path.join(self.media_root, 'uploads', 'mara.jpg'), 'rb') as f:
+            upload = SimpleUploadedFile('guide.jpg', f.read(), content_type='image/jpeg')
+        job = JobListing.objects.create(
+            title='Safari Guide', description='d', requirements='r', responsibilities='r', job_image=upload
+        )
+
+        async_task.assert_called_once()
+        self.assertEqual(async_task.call_args[0][1], [job.job_image.name])
+        self.assertEqual(ProcessedImage.objects.get(source=job.job_image.name).status, ProcessedImage.PENDING)
+
+        job.save()
+        async_task.assert_called_once()
+
+    def test_template_tags_fall_back_until_ready(self):
+        """Test the original is served before processing and a <picture> after"""
+        image = SimpleNamespace(name='uploads/mara.jpg', url='/media/uploads/mara.jpg')
+        template = Template('{% load image_derivatives %}{% derivative_image image "50vw" "img-fluid" "Mara" %}')
+
+        before = template.render(Context({'image': image}))
+        self.assertIn('src="/media/uploads/mara.jpg"', before)
+        self.assertNotIn('<picture>', before)
+
+        image_pipeline.process_images(['uploads/mara.jpg'], processes=1)
+        after = template.render(Context({'image': image}))
+        self.assertIn('<source type="image/webp"', after)
+        self.assertIn('src="/media/derivatives/uploads/mara-1280.jpg"', after)
+        self.assertIn('width="1280" height="720"', after)
+
+    def test_responsive_media_filter(self):
+        """Test that local images in rich text are swapped for derivatives"""
+        image_pipeline.process_images(['uploads/mara.jpg'], processes=1)
+        html = '<p><img src="/media/uploads/mara.jpg" alt="Mara"><img src="https://example.com/a.jpg"></p>'
+
+        output = Template('{% load image_derivatives %}{{ html|responsive_media }}').render(Context({'html': html}))
+        self.assertIn('<picture><source type="image/webp"', output)
+        self.assertIn('/media/derivatives/uploads/mara-640.jpg 640w', output)
+        self.assertIn('<img src="https://example.com/a.jpg">', output)
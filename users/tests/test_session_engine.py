@@ -0,0 +1,200 @@
+"""
+Tests for the write-coalescing session engine (tours_travels.sessions)
+"""
+
+from datetime import time
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from adminside.models import Accommodation, Destination, Package, TravelMode
+from blog.models import Post
+from tours_travels.sessions import SessionStore
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'session-engine-tests'},
+}
+
+
+def session_writes(queries):
+    """INSERT and UPDATE statements on django_session among captured queries"""
+    return [
+        query['sql'] for query in queries
+        if 'django_session' in query['sql'] and query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+    ]
+
+
+class SessionStoreTest(TestCase):
+    """Test sessions are written once, and only when a value changed"""
+
+    def test_new_session_is_a_single_insert(self):
+        """Test create() reserves a key and save() stores the session with one INSERT"""
+        session = SessionStore()
+        with CaptureQueriesContext(connection) as queries:
+            session.create()
+            session['cart'] = {}
+            session.save()
+
+        self.assertEqual(len(session_writes(queries)), 1)
+        self.assertEqual(SessionStore(session.session_key)['cart'], {})
+
+    def test_unchanged_session_is_not_written(self):
+        """Test save() skips the database when session.modified was set without a change"""
+        session = SessionStore()
+        session['cart'] = {'1': {'adults': 2}}
+        session.save()
+
+        session = SessionStore(session.session_key)
+        session['cart'] = {'1': {'adults': 2}}
+        session.modified = True
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+
+        self.assertEqual(session_writes(queries), [])
+
+    def test_concurrent_requests_keep_each_others_keys(self):
+        """Test only changed keys are merged onto the stored session"""
+        session = SessionStore()
+        session['cart'] = {}
+        session.save()
+        first = SessionStore(session.session_key)
+        second = SessionStore(session.session_key)
+        first['cart'] = {'1': {'adults': 2}}
+        second['checkout_data'] = {'full_name': 'Amina'}
+
+        first.save()
+        second.save()
+
+        stored = SessionStore(session.session_key).load()
+        self.assertEqual(stored['cart'], {'1': {'adults': 2}})
+        self.assertEqual(stored['checkout_data'], {'full_name': 'Amina'})
+
+    def test_removed_keys_are_deleted(self):
+        """Test a key popped from the session is removed from the stored copy"""
+        session = SessionStore()
+        session['checkout_data'] = {'full_name': 'Amina'}
+        session.save()
+
+        session = SessionStore(session.session_key)
+        del session['checkout_data']
+        session.save()
+
+        self.assertNotIn('checkout_data', SessionStore(session.session_key).load())
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SESSION_CACHE_ALIAS='sessions', SESSION_DB_PERSIST_INTERVAL=300)
+class CachedSessionStoreTest(TestCase):
+    """Test sessions are written behind a shared cache"""
+
+    def setUp(self):
+        caches['sessions'].clear()
+
+    def test_changes_are_persisted_at_the_interval(self):
+        """Test changes stay in the cache until SESSION_DB_PERSIST_INTERVAL has passed"""
+        session = SessionStore()
+        session['cart'] = {}
+        session.save()
+        self.assertFalse(Session.objects.exists())
+
+        with mock.patch('tours_travels.sessions.time.time', return_value=session._dirty_since + 10):
+            session = SessionStore(session.session_key)
+            session['cart'] = {'1': {'adults': 2}}
+            session.save()
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(SessionStore(session.session_key)['cart'], {'1': {'adults': 2}})
+
+        with mock.patch('tours_travels.sessions.time.time', return_value=session._dirty_since + 300):
+            session = SessionStore(session.session_key)
+            session['cart'] = {'1': {'adults': 3}}
+            session.save()
+        stored = Session.objects.get(session_key=session.session_key).get_decoded()
+        self.assertEqual(stored['cart'], {'1': {'adults': 3}})
+
+    def test_login_is_persisted_at_once(self):
+        """Test changes to the authentication keys reach the database immediately"""
+        session = SessionStore()
+        session['_auth_user_id'] = '1'
+        session.save()
+
+        self.assertEqual(Session.objects.get().get_decoded()['_auth_user_id'], '1')
+
+    def test_session_falls_back_to_the_database(self):
+        """Test a persisted session is still loaded once its cache entry is gone"""
+        session = SessionStore()
+        session['_auth_user_id'] = '1'
+        session.save()
+        caches['sessions'].clear()
+
+        self.assertTrue(SessionStore().exists(session.session_key))
+        self.assertEqual(SessionStore(session.session_key)['_auth_user_id'], '1')
+
+
+class SessionChurnTest(TestCase):
+    """Test the session table writes of a visitor who reads the blog and starts a booking"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Maasai Mara', description='Wildlife reserve')
+        self.package = Package.objects.create(
+            name='Maasai Mara Safari', description='3-day safari', main_destination=destination,
+            duration_days=3, duration_nights=2, adult_price=1500, child_price=1050, status=Package.PUBLISHED
+        )
+        self.accommodation = Accommodation.objects.create(
+            name='Safari Lodge', description='Lodge', destination=destination, price_per_room_per_night=200
+        )
+        self.travel_mode = TravelMode.objects.create(
+            name='Mara Shuttle', transport_type=TravelMode.BUS, departure_location='Nairobi',
+            arrival_location='Maasai Mara', departure_time=time(7), arrival_time=time(13),
+            duration_minutes=360, price_per_person=100
+        )
+        self.package.available_accommodations.add(self.accommodation)
+        self.package.available_travel_modes.add(self.travel_mode)
+        self.posts = [
+            Post.objects.create(title=f'Safari Story {i}', content='<p>Story</p>', status='published')
+            for i in range(3)
+        ]
+
+    def browse_and_check_out(self):
+        customize = reverse('users:checkout_customize', args=[self.package.id])
+        customization = {'accommodations': [self.accommodation.id], 'travel_modes': [self.travel_mode.id]}
+        with CaptureQueriesContext(connection) as queries:
+            for post in self.posts:
+                self.client.get(reverse('blog:blog-detail', kwargs={'slug': post.slug}))
+                self.client.get(reverse('blog:blog-detail', kwargs={'slug': post.slug}))
+            # The summary redirects while the cart is empty
+            for _ in range(3):
+                self.client.get(reverse('users:checkout_summary'))
+            self.client.post(reverse('users:add_to_cart', args=[self.package.id]),
+                             {'adults': 2, 'children': 1, 'rooms': 1})
+            for _ in range(3):
+                self.client.get(customize)
+            # Submitted twice, as after a back button
+            self.client.post(customize, customization)
+            self.client.post(customize, customization)
+            for _ in range(3):
+                self.client.get(reverse('users:checkout_details'))
+        return session_writes(queries)
+
+    def test_flow_writes_only_changes(self):
+        """Test redundant saves of the db engine are skipped without a session cache"""
+        writes = self.browse_and_check_out()
+
+        # A new client loads SessionMiddleware with the overridden engine
+        self.client = self.client_class()
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            baseline = self.browse_and_check_out()
+
+        # Cart created on an empty summary page: one INSERT instead of INSERT + UPDATE
+        self.assertLess(len(writes), len(baseline))
+
+    @override_settings(CACHES=LOCMEM_CACHES, SESSION_CACHE_ALIAS='sessions')
+    def test_flow_with_a_session_cache_writes_nothing_to_the_database(self):
+        """Test an anonymous visitor's session stays in the cache"""
+        caches['sessions'].clear()
+
+        self.assertEqual(self.browse_and_check_out(), [])
@@ -0,0 +1,102 @@
+"""
+Tests for the expired session and orphaned GuestBooking collector (users.session_gc)
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from adminside.models import Destination, Package
+from users import session_gc
+from users.models import GuestBooking
+from users.tasks import collect_session_garbage
+
+
+class SessionGarbageCollectorTest(TestCase):
+    """Test batched deletion of expired sessions and orphaned guest bookings"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Maasai Mara', description='Wildlife reserve')
+        self.packages = [
+            Package.objects.create(
+                name=f'Safari {i}', slug=f'safari-{i}', description='3-day safari', main_destination=destination,
+                duration_days=3, duration_nights=2, adult_price=1500, child_price=1050
+            )
+            for i in range(2)
+        ]
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=i + 1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timedelta(days=1))
+
+    def add_booking(self, session_key, package, age):
+        booking = GuestBooking.objects.create(session_key=session_key, package=package)
+        GuestBooking.objects.filter(pk=booking.pk).update(updated_at=timezone.now() - age)
+        return booking
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        """Test every expired session is deleted, two per batch, and live ones kept"""
+        result = session_gc.delete_expired_sessions(batch_size=2, pause=0, deadline=float('inf'))
+
+        self.assertEqual(result, {'deleted': 5, 'batches': 3, 'finished': True})
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_deadline_stops_after_a_batch(self):
+        """Test a run past its deadline stops after the current batch, oldest sessions first"""
+        result = session_gc.delete_expired_sessions(batch_size=2, pause=0, deadline=0)
+
+        self.assertEqual(result, {'deleted': 2, 'batches': 1, 'finished': False})
+        self.assertFalse(Session.objects.filter(session_key__in=['expired3', 'expired4']).exists())
+
+    def test_orphaned_guest_bookings_are_deleted(self):
+        """Test bookings without a live session are deleted once older than the grace period"""
+        day = timedelta(days=1)
+        kept = [
+            self.add_booking('live', self.packages[0], 2 * day),
+            self.add_booking('cacheonly', self.packages[0], timedelta(minutes=5)),
+        ]
+        for package in self.packages:
+            self.add_booking('expired0', package, 2 * day)
+            self.add_booking('gone', package, 2 * day)
+
+        result = session_gc.delete_orphaned_guest_bookings(batch_size=2, pause=0, deadline=float('inf'), grace=3600)
+
+        self.assertEqual(result, {'deleted': 4, 'batches': 3, 'finished': True})
+        self.assertEqual(list(GuestBooking.objects.order_by('pk')), kept)
+
+    def test_task_reports_tables_before_and_after(self):
+        """Test the scheduled task deletes both kinds of rows and reports the row counts"""
+        self.add_booking('gone', self.packages[0], timedelta(days=2))
+
+        result = collect_session_garbage()
+
+        self.assertTrue(result['success'])
+        self.assertTrue(result['finished'])
+        self.assertEqual(result['deleted'], 6)
+        sessions, bookings = result['tables']
+        self.assertEqual((sessions['table'], sessions['before']['rows'], sessions['after']['rows']), ('django_session', 6, 1))
+        self.assertEqual((bookings['deleted'], bookings['before']['rows'], bookings['after']['rows']), (1, 1, 0))
+
+    def test_deadline_follows_the_cluster_timeout(self):
+        """Test a run ends its batches before the django-q timeout, even when configured longer"""
+        for max_seconds in (None, 45):
+            with override_settings(Q_CLUSTER={'timeout': 30}, SESSION_GC_MAX_SECONDS=max_seconds), \
+                    mock.patch.object(session_gc.time, 'monotonic', return_value=1000.0), \
+                    mock.patch.object(session_gc, 'delete_expired_sessions', return_value={
+                        'deleted': 0, 'batches': 0, 'finished': False
+                    }) as delete:
+                session_gc.collect(pause=0)
+
+            self.assertEqual(delete.call_args[0][2], 1000.0 + 30 - session_gc.TIMEOUT_MARGIN)
+
+    def test_schedule_is_registered(self):
+        """Test migrate creates the django-q schedule once"""
+        from django_q.models import Schedule
+
+        session_gc.ensure_schedule()
+        schedules = Schedule.objects.filter(func='users.tasks.collect_session_garbage')
+        self.assertEqual(schedules.count(), 1)
+        self.assertEqual(schedules.get().schedule_type, Schedule.MINUTES)
@@ -1,11 +1,12 @@
 from django.urls import path,include
 from . import views
 from . import checkout_views
+from tours_travels.async_views import select_view
 
 app_name = 'users'
 
 urlpatterns = [
-    path('', views.home, name='users-home'),
+    path('', select_view(views.home, views.ahome), name='users-home'),
     path('aboutus/', views.aboutus, name='aboutus'),
     path('corporate/', views.corporate, name='corporatepage'),
     path('holidays/', views.holidays, name='holidayspage'),
@@ -17,6 +18,7 @@ urlpatterns = [
     path('success/', views.success, name='success'),
     path('destination/<int:id>/',views.destination,name='users-destination'),
     path('search/',views.search, name="search"),
+    path('search/typeahead/', views.typeahead, name='typeahead'),
 
     path('bookings/<int:package_id>/', views.bookings, name='users-bookings'),
     path('booking_success/<int:booking_id>/', views.booking_success, name='users-booking-success'),
@@ -540,113 +540,121 @@ def newsletter_subscribe(request):
     return redirect(request.META.get('HTTP_REFERER', 'users:home'))
 
 
-def home(request):
-    """
-    Fully optimized homepage view with efficient database queries, caching, and featured accommodations
-    """
-    from django.core.cache import cache
+def _home_querysets():
+    """Lazy querysets of the homepage sections, shared by home and ahome"""
     from adminside.models import Accommodation, HeroSlider
-    import logging
-
-    logger = logging.getLogger(__name__)
-    logger.debug("Starting home view")
 
-    try:
-        # Get featured destinations with optimized query (limit to 8 for performance)
-        featured_destinations = Destination.objects.filter(
+    return {
+        # Featured destinations (limit to 8 for performance)
+        'featured_destinations': Destination.objects.filter(
             is_featured=True,
             is_active=True
-        ).select_related().order_by('display_order', 'name')[:8]
-
-        # Get featured accommodations with optimized query (limit to 8 for performance)
-        featured_accommodations = Accommodation.objects.select_related('destination').filter(
+        ).select_related().order_by('display_order', 'name')[:8],
+        # Featured accommodations (limit to 8 for performance)
+        'featured_accommodations': Accommodation.objects.select_related('destination').filter(
             is_featured=True,
             is_active=True
-        ).order_by('-rating', 'name')[:8]
-
-        # Get all active destinations for navigation (limited for performance)
-        all_destinations = Destination.objects.filter(
+        ).order_by('-rating', 'name')[:8],
+        # All active destinations for navigation (limited to the 50 most relevant)
+        'all_destinations': Destination.objects.filter(
             is_active=True
-        ).order_by('name')[:50]  # Limit to 50 most relevant destinations
+        ).order_by('name')[:50],
+        # Published packages (limit to 12 for homepage)
+        # (card price and transport are denormalized, see adminside.package_cards)
+        'packages': Package.objects.select_related('main_destination').filter(
+            status=Package.PUBLISHED
+        ).order_by('-is_featured', 'total_bookings')[:12],
+        # Active hero slider images
+        'hero_slides': HeroSlider.get_active_slides(),
+    }
 
-        # Get published packages with highly optimized queries (limit to 12 for homepage)
-        packages_queryset = Package.objects.select_related('main_destination').prefetch_related(
-            'available_accommodations',
-            'available_travel_modes'
-        ).filter(status=Package.PUBLISHED).order_by('-is_featured', 'total_bookings')[:12]
 
-        # Process package data efficiently with minimal loops
-        package_data = []
-        for package in packages_queryset:
-            try:
-                # Calculate nights
-                nights = max(package.duration_days - 1, 0)
-
-                # Get first accommodation price (already prefetched)
-                accommodations = list(package.available_accommodations.all())
-                accommodation_price = accommodations[0].price_per_room_per_night if accommodations else 0
-
-                # Calculate total price
-                total_price = package.adult_price + accommodation_price
-
-                # Get travel mode (already prefetched)
-                travel_modes = list(package.available_travel_modes.all())
-                if travel_modes:
-                    transport_type = travel_modes[0].transport_type
-                    travel_type = {
-                        "train": "Train",
-                        "flight": "Flight",
-                        "bus": "Bus"
-                    }.get(transport_type, "Bus")
-                else:
-                    travel_type = "N/A"
-
-                package_data.append({
-                    'package': package,
-                    'nights': nights,
-                    'price': total_price,
-                    'travel': travel_type
-                })
-            except Exception as e:
-                continue
+def _home_context(featured_destinations, featured_accommodations, all_destinations, packages, hero_slides):
+    """Homepage template context from the (evaluated or lazy) section querysets"""
+    package_data = [
+        {
+            'package': package,
+            'nights': max(package.duration_days - 1, 0),
+            'price': package.display_price,
+            'travel': package.travel_label
+        }
+        for package in packages
+    ]
+
+    return {
+        'featured_destinations': featured_destinations,
+        'featured_accommodations': featured_accommodations,
+        'all_destinations': all_destinations,
+        'package_data': package_data,
+        'packages': package_data,  # For backward compatibility with template
+        'dests1': all_destinations,  # For backward compatibility
+        'package1': packages,  # For backward compatibility
+        'hero_slides': hero_slides,  # Dynamic hero slider data
+    }
 
-        # Get active hero slider images
-        hero_slides = HeroSlider.get_active_slides()
 
-        # Create optimized context
-        context = {
-            'featured_destinations': featured_destinations,
-            'featured_accommodations': featured_accommodations,
-            'all_destinations': all_destinations,
-            'package_data': package_data,
-            'packages': package_data,  # For backward compatibility with template
-            'dests1': all_destinations,  # For backward compatibility
-            'package1': packages_queryset,  # For backward compatibility
-            'hero_slides': hero_slides,  # Dynamic hero slider data
+def _home_fallback(request, logger):
+    """Render the homepage without catalog sections after a failure"""
+    try:
+        basic_context = {
+            'featured_destinations': [],
+            'featured_accommodations': [],
+            'all_destinations': [],
+            'package_data': [],
+            'packages': [],
+            'dests1': [],
+            'package1': [],
+            'hero_slides': [],  # Empty hero slides for fallback
         }
+        logger.debug("Using basic context fallback")
+        return render(request, 'users/indexbackup.html', basic_context)
+    except Exception as e2:
+        logger.error(f"Error in home view fallback: {e2}")
+        from django.http import HttpResponse
+        return HttpResponse(f"Homepage temporarily unavailable. Error: {e2}", status=503)
 
+
+def home(request):
+    """
+    Fully optimized homepage view with efficient database queries, caching, and featured accommodations
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+    logger.debug("Starting home view")
+
+    try:
+        context = _home_context(**_home_querysets())
         return render(request, 'users/indexbackup.html', context)
 
     except Exception as e:
         logger.error(f"Error in home view main try block: {e}")
         # Fallback to basic context to prevent complete failure
-        try:
-            basic_context = {
-                'featured_destinations': [],
-                'featured_accommodations': [],
-                'all_destinations': [],
-                'package_data': [],
-                'packages': [],
-                'dests1': [],
-                'package1': [],
-                'hero_slides': [],  # Empty hero slides for fallback
-            }
-            logger.debug("Using basic context fallback")
-            return render(request, 'users/indexbackup.html', basic_context)
-        except Exception as e2:
-            logger.error(f"Error in home view fallback: {e2}")
-            from django.http import HttpResponse
-            return HttpResponse(f"Homepage temporarily unavailable. Error: {e2}", status=503)
+        return _home_fallback(request, logger)
+
+
+async def ahome(request):
+    """
+    Async home: the homepage sections are read together through the async ORM
+    """
+    import asyncio
+    import logging
+    from asgiref.sync import sync_to_async
+    from tours_travels.async_views import alist, arender
+
+    logger = logging.getLogger(__name__)
+    logger.debug("Starting async home view")
+
+    try:
+        querysets = _home_querysets()
+        sections = await asyncio.gather(*(alist(queryset) for queryset in querysets.values()))
+        context = _home_context(**dict(zip(querysets, sections)))
+        return await arender(request, 'users/indexbackup.html', context)
+
+    except Exception as e:
+        logger.error(f"Error in async home view: {e}")
+        # Fallback to basic context to prevent complete failure
+        return await sync_to_async(_home_fallback)(request, logger)
 
 
 
@@ -657,28 +665,12 @@ def destination(request,id):
 	id=id
 	dest=Destination.objects.get(id=id)
 	packs=Package.objects.filter(main_destination=dest, status=Package.PUBLISHED)
-	nights=[]
-	price=[]
-	travel=[]
-
-	for i in packs:
-		nights.append(i.duration_days-1)
-		first_accommodation = i.available_accommodations.first()
-		accommodation_price = first_accommodation.price_per_room_per_night if first_accommodation else 0
-		price.append(i.adult_price + accommodation_price)
-		first_travel = i.available_travel_modes.first()
-		if first_travel:
-			if first_travel.transport_type == "train":
-				travel.append("Train")
-			elif first_travel.transport_type == "flight":
-				travel.append("Flight")
-			else:
-				travel.append("Bus")
-		else:
-			travel.append("N/A")
-
 
-	packages=zip(packs,nights,price,travel)
+	# Card price and transport are denormalized (adminside.package_cards)
+	packages=[
+		(i, i.duration_days-1, i.display_price, i.travel_label, i.featured_image.cdn_url if i.featured_image else '')
+		for i in packs
+	]
 
 
 
@@ -690,16 +682,47 @@ def destination(request,id):
 
 
 def search(request):
+	from adminside import fuzzy
+
+	name=request.POST.get('search','').strip()
+	dest_id=None
+	if name:
+		dest_id=Destination.objects.filter(
+			Q(name__icontains=name) | Q(description__icontains=name)
+		).values_list('id', flat=True).first()
+	if dest_id is None:
+		# Tolerate typos ("Amboselli", "Capetown") before giving up
+		matches=fuzzy.search('destinations', name, limit=1)
+		if matches:
+			dest_id=matches[0][0]
+	if dest_id is None:
+		suggestions=fuzzy.suggest(name)
+		if suggestions:
+			messages.error(request, f"No results found for your search request. Did you mean {', '.join(suggestions)}?")
+		else:
+			messages.error(request, 'No results found for your search request')
+		return HttpResponseRedirect(request.META.get('HTTP_REFERER', '/'))
+	return redirect('users:users-destination', id=dest_id)
+
+
+def typeahead(request):
+	"""
+	Autocomplete suggestions for destinations, packages and accommodations
+
+	Usage:
+	GET /search/typeahead/?q=seren&limit=5
+	"""
+	from adminside import typeahead as typeahead_index
+
+	query = request.GET.get('q', '')[:100]
 	try:
-		name=request.POST.get('search','')
-		name=name.lstrip()
-		name=name.rstrip()
-		dest=Destination.objects.filter(name__icontains=name) | Destination.objects.filter(description__icontains=name)
-		print(dest[0].id)
-		return redirect('users-destination', id=dest[0].id)
-	except:
-		messages.error(request, 'No results found for your search request')
-		return HttpResponseRedirect(request.META.get('HTTP_REFERER'))
+		limit = min(max(int(request.GET.get('limit', typeahead_index.TOP_K)), 1), typeahead_index.TOP_K)
+	except ValueError:
+		limit = typeahead_index.TOP_K
+
+	response = JsonResponse({'query': query, 'results': typeahead_index.search(query, limit)})
+	response['Cache-Control'] = f"public, max-age={getattr(settings, 'TYPEAHEAD_MAX_AGE', 60)}"
+	return response
 
 
 